@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Benchmark local embedding throughput for the torch and ONNX Runtime backends."""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add backend directory to path
+backend_dir = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, backend_dir)
+
+from src.rag.embeddings import EmbeddingService  # noqa: E402
+
+WORDS = (
+    "document chunk retrieval embedding vector index query answer context source "
+    "knowledge section table page model batch token search score metadata"
+).split()
+
+
+def make_texts(count: int, seed: int = 0) -> list[str]:
+    """Build synthetic chunks with a realistic spread of lengths (20-200 words)."""
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(20, 200))) for _ in range(count)]
+
+
+def benchmark(provider: str, texts: list[str], repeats: int) -> float:
+    """Return the best texts/sec over ``repeats`` runs for a provider."""
+    load_start = time.perf_counter()
+    service = EmbeddingService(provider=provider)
+    service.cache = None  # Measure the model, not the cache
+    print(f"  {provider}: model loaded in {time.perf_counter() - load_start:.2f}s")
+
+    service._generate_local(texts[:8], service.model)  # Warm-up
+
+    best = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        service._generate_local(texts, service.model)
+        best = max(best, len(texts) / (time.perf_counter() - start))
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=512, help="Number of synthetic chunks")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per backend")
+    parser.add_argument(
+        "--providers", nargs="+", default=["local", "onnx"], choices=["local", "onnx"]
+    )
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts)
+    print(f"⏱️  Embedding {len(texts)} synthetic chunks")
+    print("=" * 50)
+
+    results = {provider: benchmark(provider, texts, args.repeats) for provider in args.providers}
+
+    print("=" * 50)
+    for provider, rate in results.items():
+        print(f"{provider:>6}: {rate:8.1f} texts/sec")
+    if "local" in results and "onnx" in results:
+        print(f"speedup: {results['onnx'] / results['local']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Benchmark batch ingestion: sequential upload_document vs the staged pipeline.
+
+Runs against temporary ChromaDB/SQLite directories, so existing data is untouched.
+With --simulate-api-ms, embeddings come from a stand-in that sleeps per request
+like a remote API would, which isolates the pipeline from model speed.
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add backend directory to path
+backend_dir = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, backend_dir)
+
+from src.config import settings  # noqa: E402
+from src.rag.embeddings import EmbeddingService  # noqa: E402
+from src.rag.retriever import RAGRetriever  # noqa: E402
+from src.schemas.api import DocumentUpload  # noqa: E402
+from src.services.document_service import DocumentService  # noqa: E402
+from src.services.document_storage import DocumentStorage  # noqa: E402
+from src.services.ingestion_pipeline import IngestionPipeline  # noqa: E402
+
+WORDS = (
+    "document chunk retrieval embedding vector index query answer context source "
+    "knowledge section table page model batch token search score metadata"
+).split()
+
+
+class SimulatedApiEmbeddingService(EmbeddingService):
+    """Embedding service returning hash-seeded vectors after a fixed per-request delay."""
+
+    def __init__(self, latency_ms: float, dimensions: int = 384) -> None:
+        self.provider = "openai"
+        self.model = "simulated-api"
+        self.dimensions = dimensions
+        self.native_dimensions = dimensions
+        self.cache = None
+        self.use_worker_pool = False
+        self._worker_pool = None
+        self._worker_pool_lock = threading.Lock()
+        self.latency = latency_ms / 1000
+
+    def _generate(self, texts: list[str], model: str) -> np.ndarray:
+        time.sleep(self.latency)
+        rows = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.md5(text.encode()).digest()[:4], "little")
+            row = np.random.default_rng(seed).standard_normal(self.dimensions)
+            rows.append(row / np.linalg.norm(row))
+        return np.asarray(rows, dtype=np.float32)
+
+
+def make_uploads(count: int, seed: int = 0) -> list[DocumentUpload]:
+    """Build synthetic documents of 2-12 paragraphs with a shared footer."""
+    rng = random.Random(seed)
+    uploads = []
+    for i in range(count):
+        paragraphs = [
+            " ".join(rng.choices(WORDS, k=rng.randint(40, 160))) for _ in range(rng.randint(2, 12))
+        ]
+        paragraphs.append("For support contact the documentation team.")
+        uploads.append(
+            DocumentUpload(filename=f"synthetic_{i}.txt", content="\n\n".join(paragraphs))
+        )
+    return uploads
+
+
+def make_service(data_dir: Path, embedding_service: EmbeddingService) -> DocumentService:
+    """Build a document service on a fresh data directory."""
+    settings.chroma_path = str(data_dir / "chroma")
+    retriever = RAGRetriever(collection_name="benchmark", embedding_service=embedding_service)
+    return DocumentService(
+        retriever=retriever,
+        storage=DocumentStorage(db_path=str(data_dir / "documents.db")),
+    )
+
+
+def run(mode: str, uploads: list[DocumentUpload], embedding_service: EmbeddingService) -> float:
+    """Ingest uploads in one mode and return documents/sec."""
+    data_dir = Path(tempfile.mkdtemp(prefix=f"ingest_{mode}_"))
+    try:
+        service = make_service(data_dir, embedding_service)
+        start = time.perf_counter()
+        if mode == "sequential":
+            for upload in uploads:
+                service.upload_document(upload)
+        else:
+            _, errors = IngestionPipeline(service).run(uploads)
+            if errors:
+                print(f"   ⚠️  {len(errors)} documents failed")
+        elapsed = time.perf_counter() - start
+        chunks = service.retriever.collection.count()
+        print(
+            f"  {mode:>10}: {elapsed:7.2f}s  {len(uploads) / elapsed:7.1f} docs/sec  {chunks} chunks"
+        )
+        return len(uploads) / elapsed
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=1000, help="Synthetic documents")
+    parser.add_argument(
+        "--simulate-api-ms",
+        type=float,
+        default=None,
+        help="Use a simulated embedding API with this latency per request",
+    )
+    parser.add_argument(
+        "--modes", nargs="+", default=["sequential", "pipeline"], choices=["sequential", "pipeline"]
+    )
+    args = parser.parse_args()
+
+    if args.simulate_api_ms is not None:
+        embedding_service: EmbeddingService = SimulatedApiEmbeddingService(args.simulate_api_ms)
+    else:
+        embedding_service = EmbeddingService()
+    embedding_service.cache = None  # Measure ingestion, not the cache
+
+    uploads = make_uploads(args.documents)
+    print(f"⏱️  Ingesting {len(uploads)} synthetic documents ({embedding_service.model})")
+    print("=" * 50)
+
+    results = {mode: run(mode, uploads, embedding_service) for mode in args.modes}
+
+    print("=" * 50)
+    if "sequential" in results and "pipeline" in results:
+        print(f"speedup: {results['pipeline'] / results['sequential']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
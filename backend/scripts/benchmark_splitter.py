@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Benchmark the native recursive splitter against LangChain's on multi-megabyte text.
+
+Generates synthetic documents of paragraphs, lines and words, splits them with
+both splitters using the chunker's default sizes and checks the outputs match.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add backend directory to path
+backend_dir = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, backend_dir)
+
+from src.rag.splitter import RecursiveTextSplitter  # noqa: E402
+
+WORDS = (
+    "document chunk retrieval embedding vector index query answer context source "
+    "knowledge section table page model batch token search score metadata"
+).split()
+
+
+def make_text(megabytes: float, seed: int = 0) -> str:
+    """Build roughly `megabytes` MB of prose-like text."""
+    rng = random.Random(seed)
+    target = int(megabytes * 1024 * 1024)
+    paragraphs: list[str] = []
+    size = 0
+    while size < target:
+        lines = [
+            " ".join(rng.choices(WORDS, k=rng.randint(5, 25))) for _ in range(rng.randint(1, 8))
+        ]
+        paragraph = "\n".join(lines)
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+
+def timed(split, text: str, repeat: int) -> tuple[float, list[str]]:
+    """Best wall time of `repeat` runs."""
+    best = float("inf")
+    chunks: list[str] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = split(text)
+        best = min(best, time.perf_counter() - start)
+    return best, chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--megabytes", type=float, default=8.0, help="Size of the input text")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Chunk size")
+    parser.add_argument("--chunk-overlap", type=int, default=200, help="Chunk overlap")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per splitter (best is kept)")
+    args = parser.parse_args()
+
+    text = make_text(args.megabytes)
+    native = RecursiveTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+
+    print(f"⏱️  Splitting {len(text) / 1024 / 1024:.1f} MB of text")
+    print("=" * 50)
+    native_seconds, native_chunks = timed(native.split_text, text, args.repeat)
+    print(
+        f"native:    {native_seconds:.3f}s "
+        f"({len(text) / 1024 / 1024 / native_seconds:.1f} MB/s, {len(native_chunks)} chunks)"
+    )
+
+    try:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+    except ImportError:
+        print("langchain-text-splitters is not installed, skipping comparison")
+        return
+
+    reference = RecursiveCharacterTextSplitter(
+        chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap, length_function=len
+    )
+    langchain_seconds, langchain_chunks = timed(reference.split_text, text, args.repeat)
+    print(
+        f"langchain: {langchain_seconds:.3f}s "
+        f"({len(text) / 1024 / 1024 / langchain_seconds:.1f} MB/s, {len(langchain_chunks)} chunks)"
+    )
+    print("=" * 50)
+    print(f"speedup: {langchain_seconds / native_seconds:.2f}x")
+    if native_chunks == langchain_chunks:
+        print("✅ Outputs are identical")
+    else:
+        print("❌ Outputs differ")
+
+
+if __name__ == "__main__":
+    main()
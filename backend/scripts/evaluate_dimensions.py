@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Measure the recall cost of truncated (Matryoshka) embedding dimensions.
+
+Embeds a sample of stored chunks at full size and uses the opening words of each
+chunk as a query. For every candidate dimension it reports how much of the
+full-size top-k survives truncation, and the resulting index size.
+"""
+
+import argparse
+import os
+import random
+import sys
+
+# Add backend directory to path
+backend_dir = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, backend_dir)
+
+import numpy as np  # noqa: E402
+
+from src.rag.embeddings import EmbeddingService, truncate_embeddings  # noqa: E402
+from src.rag.retriever import RAGRetriever  # noqa: E402
+
+
+def top_k(queries: np.ndarray, corpus: np.ndarray, k: int) -> np.ndarray:
+    """Exact cosine top-k indices for unit-norm vectors."""
+    scores = queries @ corpus.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--collection", default="documents")
+    parser.add_argument("--sample", type=int, default=2000, help="Chunks to sample")
+    parser.add_argument("--queries", type=int, default=200, help="Queries to evaluate")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--query-words", type=int, default=12)
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[64, 128, 256, 512, 768, 1024])
+    args = parser.parse_args()
+
+    # Full-size vectors are needed as the reference
+    service = EmbeddingService(dimensions=None)
+    service.cache = None
+    retriever = RAGRetriever(collection_name=args.collection, embedding_service=service)
+
+    documents = retriever.collection.get(include=["documents"])["documents"]
+    rng = random.Random(0)
+    documents = rng.sample(documents, min(args.sample, len(documents)))
+    if not documents:
+        print("⚠️  Collection is empty")
+        return
+
+    query_texts = [
+        " ".join(doc.split()[: args.query_words])
+        for doc in rng.sample(documents, min(args.queries, len(documents)))
+    ]
+
+    print(
+        f"📐 {len(documents)} chunks, {len(query_texts)} queries, native dims={service.native_dimensions}"
+    )
+    corpus = service.embed_batch(documents)
+    queries = service.embed_batch(query_texts)
+    reference = top_k(queries, corpus, args.top_k)
+
+    print("=" * 50)
+    print(f"{'dims':>6} {'recall@' + str(args.top_k):>10} {'index MB':>10}")
+    for dims in sorted(d for d in args.dimensions if d <= service.native_dimensions):
+        found = top_k(
+            truncate_embeddings(queries, dims), truncate_embeddings(corpus, dims), args.top_k
+        )
+        recall = np.mean(
+            [len(set(found[i]) & set(reference[i])) / args.top_k for i in range(len(query_texts))]
+        )
+        index_mb = retriever.collection.count() * dims * 4 / 1e6
+        print(f"{dims:>6} {recall:>10.3f} {index_mb:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Re-embed an existing ChromaDB collection, e.g. after changing the embedding model.
+
+Chunk text is read back from the collection, so documents don't need to be
+re-uploaded. The backend does the same in the background on startup (see
+EMBEDDING_MIGRATION_AUTO_START); this script runs it in the foreground with
+progress output, using the current embedding settings.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add backend directory to path
+backend_dir = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, backend_dir)
+
+from src.config import settings  # noqa: E402
+from src.rag.embeddings import EmbeddingService  # noqa: E402
+from src.rag.retriever import RAGRetriever  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--collection", default="documents", help="Collection to re-embed")
+    parser.add_argument(
+        "--dimensions",
+        type=int,
+        default=None,
+        help="Target dimension (default: EMBEDDING_DIMENSIONS)",
+    )
+    parser.add_argument("--batch-size", type=int, default=256, help="Chunks per batch")
+    args = parser.parse_args()
+
+    settings.embedding_migration_auto_start = False
+    settings.embedding_migration_batch_size = args.batch_size
+    settings.embedding_migration_throttle_seconds = 0.0
+
+    service = EmbeddingService(dimensions=args.dimensions)
+    service.cache = None
+    retriever = RAGRetriever(collection_name=args.collection, embedding_service=service)
+    total = retriever.collection.count()
+
+    print(f"🔁 Re-embedding {total} chunks of '{args.collection}'")
+    print(f"   model={service.model} dimensions={service.dimensions}")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    migration = retriever.start_reembed_migration()
+    if migration is None:
+        print("✅ Collection already uses this embedding model")
+        return
+
+    while migration.active:
+        migration.join(timeout=2.0)
+        print(f"   {migration.done}/{migration.total} chunks ({migration.state})")
+    elapsed = time.perf_counter() - start
+
+    print("=" * 50)
+    if migration.state != "completed":
+        print(f"❌ Re-embedding failed: {migration.error}")
+        sys.exit(1)
+    print(f"✅ Re-embedded {migration.done} chunks in {elapsed:.1f}s")
+    print(f"   '{args.collection}' now served by '{retriever.collection.name}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""FastAPI dependencies shared by the API routes."""
+
+from fastapi import Header, HTTPException, status
+
+from src.services.tenants import TenantServices
+from src.shared_services import tenant_registry
+
+
+def get_tenant(
+    x_tenant_id: str | None = Header(
+        default=None, description="Tenant namespace (default: the shared namespace)"
+    ),
+) -> TenantServices:
+    """
+    Resolve the X-Tenant-ID header to the services of that tenant's namespace.
+
+    Args:
+        x_tenant_id: Tenant identifier from the X-Tenant-ID header
+
+    Returns:
+        Tenant services
+
+    Raises:
+        HTTPException: 400 if the tenant id is invalid or tenants are disabled, 403
+            if it is not in the tenant allowlist
+    """
+    try:
+        return tenant_registry.get(x_tenant_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    except PermissionError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e)) from e
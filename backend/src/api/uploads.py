@@ -0,0 +1,219 @@
+"""Streaming multipart/form-data parsing for file uploads."""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import NamedTuple
+
+from fastapi import HTTPException, Request, status
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ModuleNotFoundError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+# Room allowed beyond the file size for boundaries, part headers and text fields
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+# OpenAPI request body of an endpoint reading its form with receive_multipart_file
+MULTIPART_FILE_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {
+                        "file": {
+                            "type": "string",
+                            "format": "binary",
+                            "description": "Document file (raw, not base64 encoded)",
+                        },
+                        "metadata": {
+                            "type": "string",
+                            "description": "Additional metadata as JSON object",
+                        },
+                    },
+                }
+            }
+        },
+    }
+}
+
+
+class ReceivedFile(NamedTuple):
+    """A multipart file written to a temporary file, with the form's text fields."""
+
+    path: str
+    filename: str
+    content_type: str
+    size: int
+    fields: dict[str, str]
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File too large. Maximum size is {max_bytes} bytes.",
+    )
+
+
+class _FormWriter:
+    """Parser callbacks writing the file part to disk and collecting text fields."""
+
+    def __init__(self, file_field: str, max_bytes: int) -> None:
+        self.file_field = file_field
+        self.max_bytes = max_bytes
+        self.fields: dict[str, str] = {}
+        self.file: ReceivedFile | None = None
+        self._headers: dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._name = ""
+        self._value = bytearray()
+        self._out = None  # Temporary file of the file part being received
+        self._size = 0
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        }
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+        self._value = bytearray()
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._name = options.get(b"name", b"").decode("latin-1")
+        if self._name != self.file_field:
+            return
+        if self.file is not None or self._out is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Only one '{self.file_field}' part is allowed",
+            )
+
+        filename = options.get(b"filename", b"").decode("utf-8", errors="replace") or "upload"
+        content_type = self._headers.get(b"content-type", b"").decode("latin-1")
+        self._out = tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix)
+        self._size = 0
+        self.file = ReceivedFile(
+            self._out.name, filename, content_type or "application/octet-stream", 0, {}
+        )
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._out is None:
+            self._value += data[start:end]
+            if len(self._value) > FORM_OVERHEAD_BYTES:
+                raise _too_large(self.max_bytes)
+            return
+        self._size += end - start
+        if self._size > self.max_bytes:
+            raise _too_large(self.max_bytes)
+        self._out.write(data[start:end])
+
+    def _on_part_end(self) -> None:
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+            self.file = self.file._replace(size=self._size)
+        elif self._name:
+            self.fields[self._name] = self._value.decode("utf-8", errors="replace")
+
+    @property
+    def truncated(self) -> bool:
+        """Whether the body ended inside the file part."""
+        return self._out is not None
+
+    def discard(self) -> None:
+        """Remove the temporary file of a failed or rejected upload."""
+        if self._out is not None:
+            self._out.close()
+        if self.file is not None:
+            os.unlink(self.file.path)
+            self.file = None
+
+
+async def receive_multipart_file(
+    request: Request, max_bytes: int, file_field: str = "file"
+) -> ReceivedFile:
+    """
+    Stream a multipart/form-data request body to disk as it arrives.
+
+    The body is parsed from request.stream(), so the file is written once, to a
+    temporary file, and never held in memory. A request whose Content-Length is
+    above the limit is rejected before its body is read; without one (chunked
+    transfer), reading stops as soon as the file part passes the limit.
+
+    Args:
+        request: Incoming request
+        max_bytes: Largest accepted file size
+        file_field: Form field holding the file
+
+    Returns:
+        The received file and the form's text fields; the caller removes the file
+
+    Raises:
+        HTTPException: 413 if the file is too large, 400 if the body is not a
+            multipart form with a file part
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > max_bytes + FORM_OVERHEAD_BYTES:
+            raise _too_large(max_bytes)
+
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected a multipart/form-data body",
+        )
+
+    writer = _FormWriter(file_field, max_bytes)
+    parser = MultipartParser(boundary, writer.callbacks())
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+        parser.finalize()
+    except HTTPException:
+        writer.discard()
+        raise
+    except Exception as e:
+        writer.discard()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Malformed multipart body: {str(e)}",
+        ) from e
+
+    if writer.truncated:
+        writer.discard()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Malformed multipart body: truncated file part",
+        )
+    if writer.file is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Missing '{file_field}' file part",
+        )
+    return writer.file._replace(fields=writer.fields)
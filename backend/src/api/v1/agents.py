@@ -3,13 +3,14 @@
 import json
 from collections.abc import Iterator
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Depends, Request
 from fastapi.responses import StreamingResponse
 from slowapi import Limiter
 
+from src.api.dependencies import get_tenant
 from src.config import settings
 from src.schemas.api import QueryRequest
-from src.shared_services import agent_service
+from src.services.tenants import TenantServices
 
 router = APIRouter(prefix="/agents/chat", tags=["agents"])
 
@@ -18,7 +19,9 @@ limiter: Limiter | None = None
 
 
 @router.post("", response_class=StreamingResponse)
-async def chat_stream(request: Request, query_request: QueryRequest) -> StreamingResponse:
+async def chat_stream(
+    request: Request, query_request: QueryRequest, tenant: TenantServices = Depends(get_tenant)
+) -> StreamingResponse:
     """
     Chat with agent using streaming responses (SSE).
 
@@ -36,7 +39,7 @@ async def chat_stream(request: Request, query_request: QueryRequest) -> Streamin
     def generate() -> Iterator[str]:
         """Generate SSE events from agent stream."""
         try:
-            for state_update in agent_service.process_query_stream(query_request):
+            for state_update in tenant.agent_service.process_query_stream(query_request):
                 # Format as SSE event
                 data = json.dumps(state_update)
                 yield f"data: {data}\n\n"
@@ -1,11 +1,16 @@
 """Document endpoints."""
 
 import asyncio
+import functools
+import json
+import os
 
 import structlog
-from fastapi import APIRouter, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from slowapi import Limiter
 
+from src.api.dependencies import get_tenant
+from src.api.uploads import MULTIPART_FILE_SCHEMA, receive_multipart_file
 from src.config import settings
 from src.schemas.api import (
     BatchDocumentUpload,
@@ -13,8 +18,9 @@ from src.schemas.api import (
     DocumentInfo,
     DocumentList,
     DocumentUpload,
+    IngestionJob,
 )
-from src.shared_services import document_service
+from src.services.tenants import TenantServices
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
@@ -23,7 +29,9 @@ limiter: Limiter | None = None
 
 
 @router.post("", response_model=DocumentInfo, status_code=status.HTTP_201_CREATED)
-async def upload_document(request: Request, upload: DocumentUpload) -> DocumentInfo:
+async def upload_document(
+    request: Request, upload: DocumentUpload, tenant: TenantServices = Depends(get_tenant)
+) -> DocumentInfo:
     """
     Upload a document to the knowledge base.
 
@@ -46,7 +54,7 @@ async def upload_document(request: Request, upload: DocumentUpload) -> DocumentI
 
         # Run in thread pool to avoid blocking the event loop
         loop = asyncio.get_event_loop()
-        doc = await loop.run_in_executor(None, document_service.upload_document, upload)
+        doc = await loop.run_in_executor(None, tenant.document_service.upload_document, upload)
 
         logger.info("document_upload_completed", doc_id=doc.id, chunks=doc.chunk_count)
         return doc
@@ -58,20 +66,146 @@ async def upload_document(request: Request, upload: DocumentUpload) -> DocumentI
         ) from e
 
 
+@router.post(
+    "/upload",
+    response_model=DocumentInfo,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=MULTIPART_FILE_SCHEMA,
+)
+async def upload_document_file(
+    request: Request, tenant: TenantServices = Depends(get_tenant)
+) -> DocumentInfo:
+    """
+    Upload a document as multipart/form-data.
+
+    The form has a "file" part and an optional "metadata" field (JSON object).
+    The body is parsed as it is received and the file written straight to a
+    temporary file, which is parsed from disk, so memory use does not grow with
+    the file size. Requests declaring a Content-Length above the size limit are
+    rejected before their body is read.
+
+    Args:
+        request: Incoming multipart request
+
+    Returns:
+        Document information
+    """
+    # Apply rate limiting if enabled
+    if settings.rate_limit_enabled and limiter:
+        limiter.limit(settings.rate_limit_uploads)(lambda: None)()
+
+    logger = structlog.get_logger()
+
+    received = await receive_multipart_file(request, max_bytes=settings.upload_max_bytes)
+    tmp_path, filename = received.path, received.filename
+    metadata = received.fields.get("metadata")
+    try:
+        extra = json.loads(metadata) if metadata else {}
+    except json.JSONDecodeError as e:
+        os.unlink(tmp_path)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"metadata must be a JSON object: {str(e)}",
+        ) from e
+    if not isinstance(extra, dict):
+        os.unlink(tmp_path)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="metadata must be a JSON object",
+        )
+
+    try:
+        logger.info(
+            "document_upload_started", filename=filename, size=received.size, source="multipart"
+        )
+
+        # Run in thread pool to avoid blocking the event loop
+        loop = asyncio.get_event_loop()
+        doc = await loop.run_in_executor(
+            None,
+            functools.partial(
+                tenant.document_service.upload_file,
+                tmp_path,
+                filename=filename,
+                content_type=received.content_type,
+                metadata=extra,
+            ),
+        )
+
+        logger.info("document_upload_completed", doc_id=doc.id, chunks=doc.chunk_count)
+        return doc
+    except Exception as e:
+        logger.error("document_upload_failed", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to upload document: {str(e)}",
+        ) from e
+    finally:
+        os.unlink(tmp_path)
+
+
+@router.post("/jobs", response_model=IngestionJob, status_code=status.HTTP_202_ACCEPTED)
+async def submit_document_job(
+    request: Request, upload: DocumentUpload, tenant: TenantServices = Depends(get_tenant)
+) -> IngestionJob:
+    """
+    Queue a document for background ingestion.
+
+    Returns immediately; poll ``GET /documents/jobs/{job_id}`` for progress.
+
+    Args:
+        upload: Document upload request
+
+    Returns:
+        The queued ingestion job
+    """
+    # Apply rate limiting if enabled
+    if settings.rate_limit_enabled and limiter:
+        limiter.limit(settings.rate_limit_uploads)(lambda: None)()
+
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(
+        None,
+        functools.partial(tenant.ingestion_queue.submit, upload, tenant_id=tenant.tenant_id),
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJob)
+async def get_document_job(
+    job_id: str, tenant: TenantServices = Depends(get_tenant)
+) -> IngestionJob:
+    """
+    Get the status of an ingestion job.
+
+    Args:
+        job_id: Job identifier
+
+    Returns:
+        Job status with per-stage progress
+    """
+    job = tenant.ingestion_queue.get(job_id, tenant_id=tenant.tenant_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found",
+        )
+    return job
+
+
 @router.get("", response_model=DocumentList)
-async def list_documents() -> DocumentList:
+async def list_documents(tenant: TenantServices = Depends(get_tenant)) -> DocumentList:
     """
     List all documents in the knowledge base.
 
     Returns:
         List of documents
     """
-    documents = document_service.list_documents()
+    documents = tenant.document_service.list_documents()
     return DocumentList(documents=documents, total=len(documents))
 
 
 @router.get("/{doc_id}", response_model=DocumentInfo)
-async def get_document(doc_id: str) -> DocumentInfo:
+async def get_document(doc_id: str, tenant: TenantServices = Depends(get_tenant)) -> DocumentInfo:
     """
     Get a document by ID.
 
@@ -81,7 +215,7 @@ async def get_document(doc_id: str) -> DocumentInfo:
     Returns:
         Document information
     """
-    doc = document_service.get_document(doc_id)
+    doc = tenant.document_service.get_document(doc_id)
     if doc is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -90,10 +224,62 @@ async def get_document(doc_id: str) -> DocumentInfo:
     return doc
 
 
+@router.put("/{doc_id}", response_model=DocumentInfo)
+async def update_document(
+    request: Request,
+    doc_id: str,
+    upload: DocumentUpload,
+    tenant: TenantServices = Depends(get_tenant),
+) -> DocumentInfo:
+    """
+    Replace a document with a new version.
+
+    Only chunks that changed are re-embedded; removed chunks are deleted.
+
+    Args:
+        doc_id: Document identifier
+        upload: New version of the document
+
+    Returns:
+        Updated document information
+    """
+    # Apply rate limiting if enabled
+    if settings.rate_limit_enabled and limiter:
+        limiter.limit(settings.rate_limit_uploads)(lambda: None)()
+
+    logger = structlog.get_logger()
+
+    try:
+        logger.info("document_update_started", doc_id=doc_id, size=len(upload.content))
+
+        # Run in thread pool to avoid blocking the event loop
+        loop = asyncio.get_event_loop()
+        doc = await loop.run_in_executor(
+            None, tenant.document_service.update_document, doc_id, upload
+        )
+    except Exception as e:
+        logger.error("document_update_failed", doc_id=doc_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update document: {str(e)}",
+        ) from e
+
+    if doc is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document {doc_id} not found",
+        )
+
+    logger.info("document_update_completed", doc_id=doc.id, chunks=doc.chunk_count)
+    return doc
+
+
 @router.post(
     "/batch", response_model=BatchDocumentUploadResponse, status_code=status.HTTP_201_CREATED
 )
-async def upload_documents_batch(request: Request, batch: BatchDocumentUpload) -> BatchDocumentUploadResponse:
+async def upload_documents_batch(
+    request: Request, batch: BatchDocumentUpload, tenant: TenantServices = Depends(get_tenant)
+) -> BatchDocumentUploadResponse:
     """
     Upload multiple documents in batch.
 
@@ -109,30 +295,13 @@ async def upload_documents_batch(request: Request, batch: BatchDocumentUpload) -
 
     logger = structlog.get_logger()
 
-    uploaded_docs: list[DocumentInfo] = []
-    errors: list[dict] = []
-
     logger.info("batch_upload_started", count=len(batch.documents))
 
-    # Process documents sequentially to avoid overwhelming the system
+    # Parse, chunk, embed and index in a staged pipeline off the event loop
     loop = asyncio.get_event_loop()
-
-    for idx, upload in enumerate(batch.documents):
-        try:
-            logger.info("batch_upload_item", index=idx, filename=upload.filename)
-            doc = await loop.run_in_executor(None, document_service.upload_document, upload)
-            uploaded_docs.append(doc)
-            logger.info("batch_upload_item_success", index=idx, doc_id=doc.id)
-        except Exception as e:
-            error_info = {
-                "filename": upload.filename,
-                "error": str(e),
-                "index": idx,
-            }
-            errors.append(error_info)
-            logger.error(
-                "batch_upload_item_failed", index=idx, filename=upload.filename, error=str(e)
-            )
+    uploaded_docs, errors = await loop.run_in_executor(
+        None, tenant.ingestion_pipeline.run, batch.documents
+    )
 
     logger.info(
         "batch_upload_completed",
@@ -151,14 +320,14 @@ async def upload_documents_batch(request: Request, batch: BatchDocumentUpload) -
 
 
 @router.delete("/{doc_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_document(doc_id: str) -> None:
+async def delete_document(doc_id: str, tenant: TenantServices = Depends(get_tenant)) -> None:
     """
     Delete a document.
 
     Args:
         doc_id: Document identifier
     """
-    deleted = document_service.delete_document(doc_id)
+    deleted = tenant.document_service.delete_document(doc_id)
     if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
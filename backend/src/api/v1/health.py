@@ -1,11 +1,12 @@
 """Health check endpoint."""
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 
 from src import __version__
+from src.api.dependencies import get_tenant
 from src.config import settings
 from src.schemas.api import HealthResponse
-from src.shared_services import agent_service
+from src.services.tenants import TenantServices
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -25,9 +26,9 @@ async def health_check() -> HealthResponse:
 
 
 @router.get("/debug")
-async def debug_info() -> dict:
+async def debug_info(tenant: TenantServices = Depends(get_tenant)) -> dict:
     """
-    Debug endpoint to check ChromaDB status.
+    Debug endpoint to check ChromaDB status and embedding migration progress.
 
     Only available when DEBUG mode is enabled for security.
 
@@ -44,19 +45,22 @@ async def debug_info() -> dict:
         )
 
     try:
-        collection_count = agent_service.retriever.collection.count()
+        collection_count = tenant.agent_service.retriever.collection.count()
 
         # Try a simple search
-        test_result = agent_service.retriever.retrieve("test", top_k=1, score_threshold=0.0)
+        test_result = tenant.agent_service.retriever.retrieve("test", top_k=1, score_threshold=0.0)
 
         return {
             "status": "ok",
             "chromadb_count": collection_count,
             "test_query_results": len(test_result.chunks),
-            "collection_name": agent_service.retriever.collection_name,
-            "chroma_path": agent_service.retriever.client._settings.path
-            if hasattr(agent_service.retriever.client, "_settings")
+            "tenant_id": tenant.tenant_id,
+            "collection_name": tenant.agent_service.retriever.collection_name,
+            "shard_count": tenant.agent_service.retriever.shard_count,
+            "chroma_path": tenant.agent_service.retriever.client._settings.path
+            if hasattr(tenant.agent_service.retriever.client, "_settings")
             else "unknown",
+            "embeddings": tenant.agent_service.retriever.migration_status(),
         }
     except Exception as e:
         return {"status": "error", "error": str(e)}
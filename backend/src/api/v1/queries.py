@@ -1,11 +1,18 @@
 """Query endpoints."""
 
-from fastapi import APIRouter, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from slowapi import Limiter
 
+from src.api.dependencies import get_tenant
 from src.config import settings
-from src.schemas.api import QueryRequest, QueryResponse
-from src.shared_services import agent_service
+from src.schemas.api import (
+    QueryRequest,
+    QueryResponse,
+    SearchHitInfo,
+    SearchRequest,
+    SearchResponse,
+)
+from src.services.tenants import TenantServices
 
 router = APIRouter(prefix="/queries", tags=["queries"])
 
@@ -14,7 +21,9 @@ limiter: Limiter | None = None
 
 
 @router.post("", response_model=QueryResponse)
-async def process_query(request: Request, query_request: QueryRequest) -> QueryResponse:
+async def process_query(
+    request: Request, query_request: QueryRequest, tenant: TenantServices = Depends(get_tenant)
+) -> QueryResponse:
     """
     Process a query and return an answer.
 
@@ -35,7 +44,7 @@ async def process_query(request: Request, query_request: QueryRequest) -> QueryR
         # Check directly in ChromaDB if there are indexed documents
         # This is more reliable than checking DocumentService (which uses memory)
         try:
-            collection_count = agent_service.retriever.collection.count()
+            collection_count = tenant.agent_service.retriever.collection.count()
             if collection_count == 0:
                 return QueryResponse(
                     answer="No documents are indexed in the knowledge base. Please upload at least one document before making queries.",
@@ -50,10 +59,58 @@ async def process_query(request: Request, query_request: QueryRequest) -> QueryR
             # If we can't check, try to process anyway
             pass
 
-        response = agent_service.process_query(query_request)
+        response = tenant.agent_service.process_query(query_request)
         return response
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to process query: {str(e)}",
         ) from e
+
+
+@router.post("/search", response_model=SearchResponse, response_model_exclude_none=True)
+async def search(
+    request: Request, search_request: SearchRequest, tenant: TenantServices = Depends(get_tenant)
+) -> SearchResponse:
+    """
+    Find the chunks nearest to a query, without generating an answer.
+
+    Args:
+        request: FastAPI request (for rate limiting)
+        search_request: Search request (fields selects how much of each hit is returned)
+
+    Returns:
+        Search hits with scores
+    """
+    if settings.rate_limit_enabled and limiter:
+        app_limiter = request.app.state.limiter
+        app_limiter.limit(settings.rate_limit_queries)(lambda: None)()
+
+    try:
+        hits = tenant.retriever.search(
+            search_request.query,
+            top_k=search_request.top_k,
+            score_threshold=search_request.score_threshold,
+            filter_metadata=search_request.filter,
+            fields=search_request.fields,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to search: {str(e)}",
+        ) from e
+
+    return SearchResponse(
+        query=search_request.query,
+        hits=[
+            SearchHitInfo(
+                chunk_id=hit.chunk_id,
+                score=hit.score,
+                content=hit.content,
+                source=hit.metadata.get("source") if hit.metadata else None,
+                metadata=hit.metadata,
+            )
+            for hit in hits
+        ],
+        total=len(hits),
+    )
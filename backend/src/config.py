@@ -14,6 +14,13 @@ class Settings(BaseSettings):
 
     # Vector Database
     chroma_path: str = "./data/chroma"
+    shard_count: int = 1  # Collections per logical collection, by source hash (then rebalance)
+    shard_query_workers: int = 16  # Threads fanning calls out to shards, shared by all collections
+
+    # Multi-tenancy (X-Tenant-ID header; requests without it use the shared collection)
+    tenants_enabled: bool = False  # Give each tenant its own collection, indexes and stores
+    tenant_allowlist: str = ""  # Comma-separated tenant ids that may be opened, or "*" for any
+    tenant_cache_size: int = 32  # Tenant namespaces kept open (least recently used are closed)
 
     # LLM Providers
     openai_api_key: str | None = None
@@ -23,9 +30,21 @@ class Settings(BaseSettings):
     llm_model: str = "llama-3.1-8b-instant"  # Current Groq model (70b was decommissioned)
 
     # Embeddings
-    embedding_provider: Literal["openai", "local"] = "openai"
+    embedding_provider: Literal["openai", "local", "onnx"] = "openai"
     embedding_model: str = "text-embedding-3-small"
-    local_embedding_model: str = "all-MiniLM-L6-v2"
+    local_embedding_model: str = "all-MiniLM-L6-v2"  # Also used by the "onnx" provider
+    embedding_dimensions: int | None = None  # Truncate (Matryoshka) to N dims; None = native
+
+    # Embedding model migrations (re-embedding after a model/dimension change)
+    embedding_migration_auto_start: bool = True  # Start re-embedding when the model changed
+    embedding_migration_batch_size: int = 128  # Chunks per re-embedding batch
+    embedding_migration_throttle_seconds: float = 0.5  # Pause between batches
+    embedding_migration_lease_seconds: float = 300.0  # Unrenewed migration claims expire after
+
+    # ONNX Runtime embeddings (embedding_provider="onnx")
+    onnx_model_dir: str | None = None  # None = ./data/onnx/<model>, exported on first use
+    onnx_quantized: bool = True  # Use int8 dynamically quantized weights
+    onnx_intra_op_threads: int = 0  # 0 = ONNX Runtime default (all physical cores)
 
     # LangSmith (optional)
     langchain_tracing_v2: bool = False
@@ -39,8 +58,41 @@ class Settings(BaseSettings):
 
     # Performance Settings
     chroma_batch_size: int = 100
-    embedding_batch_size_local: int = 64
-    embedding_batch_size_openai: int = 2048
+    chunk_strategy: Literal["recursive", "structured"] = "recursive"  # "structured" = by headings
+    chunk_size: int = 1000  # Characters per chunk (chunk_size_unit="chars")
+    chunk_overlap: int = 200  # Characters shared by consecutive chunks
+    chunk_size_unit: Literal["chars", "tokens"] = "chars"  # "tokens" = embedding tokenizer
+    chunk_size_tokens: int = 0  # Tokens per chunk (0 = embedding model's input limit)
+    chunk_overlap_tokens: int = 32  # Tokens shared by consecutive chunks
+    chunk_token_cache_size: int = 65536  # Text pieces whose token counts are memoized
+    parent_child_enabled: bool = False  # Embed small child chunks, answer with parent sections
+    parent_chunk_size: int = 2000  # Characters per parent section (parent_child_enabled)
+    child_chunk_size: int = 400  # Characters per embedded child chunk (chunk_size_unit="chars")
+    child_chunk_overlap: int = 50  # Characters shared by consecutive child chunks
+    # Store identical chunks once (content-hash ids). A shared chunk keeps the metadata (source,
+    # tags) of the document that first stored it, so metadata filters miss it for the others.
+    chunk_dedup_enabled: bool = False
+    ingestion_workers: int = 2  # Threads processing queued uploads (POST /documents/jobs)
+    ingestion_max_attempts: int = 3  # Attempts per ingestion job before it is marked failed
+    ingestion_retry_backoff_seconds: float = 5.0  # First retry delay, doubled per retry
+    ingestion_lease_seconds: float = 60.0  # Running jobs not renewed for this long are requeued
+    chunk_stream_window: int = 256  # Chunks embedded and inserted at a time per document
+    pipeline_parse_workers: int = 4  # Parser threads for batch uploads
+    pipeline_embed_workers: int = 1  # Embedding threads for batch uploads
+    pipeline_embed_batch_size: int = 256  # Chunks per cross-document embedding call
+    pipeline_queue_size: int = 32  # Documents buffered between pipeline stages
+    docling_workers: int = 0  # Docling worker processes (0 = convert in-process)
+    docling_pages_per_task: int = 20  # Pages per parallel task when splitting large PDFs
+    docling_timeout_seconds: float = 300.0  # Per-task limit once a worker starts it (0 = none)
+    parse_cache_enabled: bool = True  # Reuse PDF/DOCX parse results for identical files
+    parse_cache_max_bytes: int = 512 * 1024 * 1024  # Compressed text kept before LRU eviction
+    upload_max_bytes: int = 50 * 1024 * 1024  # Max file size for multipart uploads (50MB)
+    embedding_batch_size_local: int = 64  # Max texts per local batch
+    embedding_batch_size_openai: int = 2048  # Max inputs per OpenAI request
+    embedding_token_budget_local: int = 8192  # Padded tokens per local batch (texts x longest)
+    embedding_max_tokens_per_request_openai: int = 300_000  # OpenAI per-request token limit
+    embedding_workers: int = 0  # Local embedding worker processes (0 = encode in-process)
+    embedding_pool_min_texts: int = 128  # Smaller requests (e.g. queries) skip the pool
 
     # LLM Settings
     llm_temperature: float = 0.3
@@ -55,6 +107,11 @@ class Settings(BaseSettings):
     # Search Configuration
     search_type: Literal["vector", "bm25", "hybrid"] = "vector"
     hybrid_search_alpha: float = 0.5  # 0.5 = 50% vector, 50% BM25
+    metadata_index_enabled: bool = True  # Resolve search filters with an in-memory metadata index
+    write_token_max_age: float = 1.0  # Seconds a cached collection write token is trusted
+    prefilter_exact_max: int = 2000  # Filtered candidates scored exactly instead of by ANN
+    prefilter_overfetch: int = 4  # ANN results fetched per top_k result for larger candidate sets
+    search_snippet_chars: int = 200  # Content characters per hit of snippet searches
 
     # Re-ranking Configuration
     rerank_enabled: bool = False
@@ -109,6 +109,11 @@ async def startup_event() -> None:
     # Setup OpenTelemetry tracing
     setup_tracing()
 
+    # Resume queued ingestion jobs
+    from src.shared_services import ingestion_queue
+
+    ingestion_queue.start()
+
     # Instrument FastAPI if tracing is enabled
     if settings.debug:
         try:
@@ -125,6 +130,20 @@ async def shutdown_event() -> None:
     """Shutdown event handler."""
     logger.info("application_shutting_down")
 
+    # Stop ingestion workers and tenant migrations, then Docling and embedding worker processes
+    from src.shared_services import (
+        document_service,
+        ingestion_queue,
+        shared_retriever,
+        tenant_registry,
+    )
+
+    ingestion_queue.stop(timeout=30)
+    tenant_registry.close()
+    shared_retriever.close()
+    document_service.parser.close()
+    shared_retriever.embedding_service.close()
+
 
 @app.get("/")
 async def root() -> dict:
@@ -0,0 +1,100 @@
+"""Token-aware batch planning for embedding requests."""
+
+from collections.abc import Callable
+
+import structlog
+
+logger = structlog.get_logger()
+
+# Rough characters-per-token ratio used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate token count of a text without a tokenizer.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Approximate number of tokens (at least 1)
+    """
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def plan_token_batches(
+    lengths: list[int],
+    token_budget: int,
+    max_batch_size: int,
+    padded: bool = True,
+) -> list[list[int]]:
+    """
+    Group item indices into batches that respect a token budget.
+
+    With ``padded=True`` (local models), items are sorted by length so each batch
+    holds sequences of similar size, and the budget bounds the padded batch cost
+    ``len(batch) * longest_item``. With ``padded=False`` (remote APIs), the original
+    order is kept and the budget bounds the plain token sum of each batch.
+
+    An item longer than the budget on its own still gets a batch of its own.
+
+    Args:
+        lengths: Token length of each item
+        token_budget: Maximum tokens per batch
+        max_batch_size: Maximum number of items per batch
+        padded: Whether batch cost is measured with padding to the longest item
+
+    Returns:
+        List of batches, each a list of indices into ``lengths``
+    """
+    if not lengths:
+        return []
+
+    token_budget = max(1, token_budget)
+    max_batch_size = max(1, max_batch_size)
+
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i]) if padded else range(len(lengths))
+
+    batches: list[list[int]] = []
+    current: list[int] = []
+    current_tokens = 0  # Sum of lengths (unpadded) or longest length (padded)
+
+    for idx in order:
+        length = max(1, lengths[idx])
+        if padded:
+            cost = (len(current) + 1) * max(current_tokens, length)
+        else:
+            cost = current_tokens + length
+
+        if current and (cost > token_budget or len(current) >= max_batch_size):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+
+        current.append(idx)
+        current_tokens = max(current_tokens, length) if padded else current_tokens + length
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+
+def count_tokens(texts: list[str], counter: Callable[[list[str]], list[int]] | None) -> list[int]:
+    """
+    Count tokens for texts, falling back to a character estimate.
+
+    Args:
+        texts: Texts to measure
+        counter: Optional batch tokenizer returning one length per text
+
+    Returns:
+        Token length of each text
+    """
+    if counter is not None:
+        try:
+            return counter(texts)
+        except Exception as e:
+            logger.warning("token_count_failed", error=str(e))
+    return [estimate_tokens(text) for text in texts]
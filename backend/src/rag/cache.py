@@ -4,6 +4,7 @@ import hashlib
 import time
 from typing import Any, TypeVar
 
+import numpy as np
 import structlog
 
 logger = structlog.get_logger()
@@ -73,7 +74,7 @@ class TTLCache:
 
 
 class EmbeddingCache:
-    """Cache for embeddings."""
+    """Cache for embeddings, stored as read-only float32 vectors."""
 
     def __init__(self, ttl: int = 3600) -> None:
         """
@@ -90,7 +91,7 @@ class EmbeddingCache:
         key_string = f"{text}:{model}"
         return hashlib.sha256(key_string.encode()).hexdigest()
 
-    def get(self, text: str, model: str) -> list[float] | None:
+    def get(self, text: str, model: str) -> np.ndarray | None:
         """
         Get cached embedding.
 
@@ -104,7 +105,7 @@ class EmbeddingCache:
         key = self._make_key(text, model)
         return self.cache.get(key)
 
-    def set(self, text: str, model: str, embedding: list[float]) -> None:
+    def set(self, text: str, model: str, embedding: np.ndarray | list[float]) -> None:
         """
         Cache embedding.
 
@@ -114,7 +115,10 @@ class EmbeddingCache:
             embedding: Embedding vector
         """
         key = self._make_key(text, model)
-        self.cache.set(key, embedding)
+        # Copy so the cached row doesn't keep a whole batch matrix alive
+        vector = np.array(embedding, dtype=np.float32, copy=True)
+        vector.setflags(write=False)
+        self.cache.set(key, vector)
 
     def clear(self) -> None:
         """Clear all cached embeddings."""
@@ -1,13 +1,37 @@
 """Document chunking implementation."""
 
-try:
-    from langchain_text_splitters import RecursiveCharacterTextSplitter
-except ImportError:
-    # Fallback for older LangChain versions
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
+import hashlib
+import unicodedata
+from collections.abc import Callable, Iterable, Iterator
+from typing import TYPE_CHECKING, TypeVar
 
+import structlog
+
+from src.config import settings
+from src.rag.batching import CHARS_PER_TOKEN
+from src.rag.splitter import RecursiveTextSplitter
+from src.rag.structure import Block, iter_lines, parse_blocks, table_header
 from src.schemas.rag import DocumentChunk
 
+if TYPE_CHECKING:
+    from src.rag.embeddings import EmbeddingService
+
+logger = structlog.get_logger()
+
+
+def chunk_hash(text: str) -> str:
+    """
+    Content hash of a chunk, insensitive to Unicode form and whitespace layout.
+
+    Args:
+        text: Chunk text
+
+    Returns:
+        First 128 bits of the SHA-256 digest of the normalized text, as hex
+    """
+    normalized = " ".join(unicodedata.normalize("NFKC", text).split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
 
 class DocumentChunker:
     """Handles intelligent document chunking with overlap and metadata preservation."""
@@ -17,6 +41,7 @@ class DocumentChunker:
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
         separators: list[str] | None = None,
+        length_function: Callable[[str], int] | None = None,
     ) -> None:
         """
         Initialize document chunker.
@@ -25,16 +50,22 @@ class DocumentChunker:
             chunk_size: Maximum size of each chunk
             chunk_overlap: Overlap between chunks for context preservation
             separators: Custom separators for splitting (default: recursive splitting)
+            length_function: Size of a piece of text, e.g. a token counter
+                (default: number of characters)
         """
         if separators is None:
             separators = ["\n\n", "\n", " ", ""]
 
-        self.splitter = RecursiveCharacterTextSplitter(
+        self.chunk_size = chunk_size
+        self.length_function = length_function or len
+        # Approximate characters per chunk, used to size streaming windows
+        self.chunk_chars = chunk_size if length_function is None else chunk_size * CHARS_PER_TOKEN
+
+        self.splitter = RecursiveTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
             separators=separators,
-            length_function=len,
-            is_separator_regex=False,
+            length_function=length_function,
         )
 
     def chunk_document(
@@ -57,29 +88,80 @@ class DocumentChunker:
         if metadata is None:
             metadata = {}
 
-        # Split text using LangChain splitter
+        # Split text using the recursive splitter
         text_chunks = self.splitter.split_text(content)
 
         # Create DocumentChunk objects
-        chunks: list[DocumentChunk] = []
-        for idx, text in enumerate(text_chunks):
-            chunk_metadata = {
-                **metadata,
-                "position": idx,
-                "source": source,
-                "chunk_index": idx,
-            }
-
-            chunk = DocumentChunk(
-                content=text,
-                metadata=chunk_metadata,
-                chunk_id=f"{source}_chunk_{idx}" if source else f"chunk_{idx}",
-                source=source,
-                position=idx,
-            )
-            chunks.append(chunk)
-
-        return chunks
+        return [
+            self._make_chunk(text, idx, source, metadata) for idx, text in enumerate(text_chunks)
+        ]
+
+    def iter_chunks(
+        self,
+        texts: Iterable[str],
+        source: str | None = None,
+        metadata: dict | None = None,
+        window_chars: int | None = None,
+    ) -> Iterator[DocumentChunk]:
+        """
+        Yield chunks from a stream of text pieces, holding only one window in memory.
+
+        The buffered text is split a window at a time. The last chunk of each window
+        may continue past the window's end, so it is not yielded; the next window
+        starts at that chunk instead, and chunks match chunk_document's except for
+        the overlap into that restarted chunk.
+
+        Args:
+            texts: Text pieces in document order (e.g. pages or file blocks)
+            source: Source document identifier
+            metadata: Additional metadata for all chunks
+            window_chars: Characters split at a time (default: about 16 chunks)
+
+        Yields:
+            Document chunks with metadata, in document order
+        """
+        if metadata is None:
+            metadata = {}
+        window = max(window_chars or self.chunk_chars * 16, self.chunk_chars * 2)
+
+        buffer = ""
+        idx = 0
+        for piece in texts:
+            buffer += piece
+            while len(buffer) >= window:
+                spans = self.splitter.split_spans(buffer[:window])
+                if len(spans) > 1 and spans[-1][0] > 0:
+                    carry = spans[-1][0]
+                    spans = spans[:-1]
+                else:
+                    # Nothing to carry over: the window's chunks are final
+                    carry = window
+                for start, end in spans:
+                    yield self._make_chunk(buffer[start:end], idx, source, metadata)
+                    idx += 1
+                buffer = buffer[carry:]
+
+        for text in self.splitter.split_text(buffer) if buffer else []:
+            yield self._make_chunk(text, idx, source, metadata)
+            idx += 1
+
+    @staticmethod
+    def _make_chunk(text: str, idx: int, source: str | None, metadata: dict) -> DocumentChunk:
+        """Build the chunk at position idx of a document."""
+        chunk_metadata = {
+            **metadata,
+            "position": idx,
+            "source": source,
+            "chunk_index": idx,
+        }
+
+        return DocumentChunk(
+            content=text,
+            metadata=chunk_metadata,
+            chunk_id=f"{source}_chunk_{idx}" if source else f"chunk_{idx}",
+            source=source,
+            position=idx,
+        )
 
     def chunk_documents(
         self,
@@ -103,3 +185,220 @@ class DocumentChunker:
             all_chunks.extend(chunks)
 
         return all_chunks
+
+
+class StructuredChunker(DocumentChunker):
+    """
+    Chunks documents along their structure (headings, paragraphs, tables, code).
+
+    Parser output is read as markdown blocks (Docling and DOCX parsing emit
+    headings and pipe tables). Consecutive blocks of a section are packed into
+    chunks of up to chunk_size; a heading always starts a new chunk, and tables
+    and code blocks are never cut unless they alone exceed chunk_size (oversized
+    tables are split by rows, repeating the header). Each chunk records its
+    heading path in its metadata, for display and filtering.
+    """
+
+    def chunk_document(
+        self,
+        content: str,
+        source: str | None = None,
+        metadata: dict | None = None,
+    ) -> list[DocumentChunk]:
+        """
+        Split document into structure-aligned chunks.
+
+        Args:
+            content: Document content to chunk
+            source: Source document identifier
+            metadata: Additional metadata for all chunks
+
+        Returns:
+            List of document chunks with metadata
+        """
+        return list(self.iter_chunks([content], source, metadata))
+
+    def iter_chunks(
+        self,
+        texts: Iterable[str],
+        source: str | None = None,
+        metadata: dict | None = None,
+        window_chars: int | None = None,
+    ) -> Iterator[DocumentChunk]:
+        """
+        Yield structure-aligned chunks from a stream of text pieces.
+
+        Only the current block and chunk are held in memory, so window_chars is
+        not needed and only kept for interface compatibility.
+
+        Args:
+            texts: Text pieces in document order (e.g. pages or file blocks)
+            source: Source document identifier
+            metadata: Additional metadata for all chunks
+            window_chars: Ignored
+
+        Yields:
+            Document chunks with heading metadata, in document order
+        """
+        if metadata is None:
+            metadata = {}
+        joiner = self.length_function("\n\n")
+
+        idx = 0
+        parts: list[Block] = []
+        size = 0
+        for block in self._fit_blocks(parse_blocks(iter_lines(texts))):
+            length = self.length_function(block.text)
+            has_body = any(part.kind != "heading" for part in parts)
+            if parts and (
+                (block.kind == "heading" and has_body) or size + joiner + length > self.chunk_size
+            ):
+                yield self._pack(parts, idx, source, metadata)
+                idx += 1
+                parts, size = [], 0
+
+            size += length + (joiner if parts else 0)
+            parts.append(block)
+
+        if parts:
+            yield self._pack(parts, idx, source, metadata)
+
+    def _fit_blocks(self, blocks: Iterable[Block]) -> Iterator[Block]:
+        """Split blocks longer than chunk_size, keeping the pieces' heading path."""
+        for block in blocks:
+            if self.length_function(block.text) <= self.chunk_size:
+                yield block
+            elif block.kind == "table":
+                yield from self._split_table(block)
+            else:
+                for text in self.splitter.split_text(block.text):
+                    yield Block(block.kind, text, block.headings)
+
+    def _split_table(self, block: Block) -> Iterator[Block]:
+        """Split an oversized table into groups of whole rows, each under the header."""
+        header, rows = table_header(block.text)
+        header_text = "\n".join(header)
+        budget = self.chunk_size - self.length_function(header_text)
+
+        group: list[str] = []
+        size = 0
+        for row in rows:
+            length = self.length_function(row) + 1  # Row plus its line break
+            if group and size + length > budget:
+                yield Block("table", "\n".join([header_text, *group]), block.headings)
+                group, size = [], 0
+            group.append(row)
+            size += length
+        if group or not rows:
+            yield Block("table", "\n".join([header_text, *group]), block.headings)
+
+    def _pack(
+        self, parts: list[Block], idx: int, source: str | None, metadata: dict
+    ) -> DocumentChunk:
+        """Build the chunk at position idx from consecutive blocks."""
+        body = [part for part in parts if part.kind != "heading"]
+        # The section of the first body block, or of the innermost heading if there is none
+        headings = body[0].headings if body else parts[-1].headings
+        chunk_metadata = {
+            **metadata,
+            "heading_path": " > ".join(headings),
+            "heading": headings[-1] if headings else "",
+            "has_table": any(part.kind == "table" for part in parts),
+        }
+        text = "\n\n".join(part.text for part in parts)
+        return self._make_chunk(text, idx, source, chunk_metadata)
+
+
+class ChildChunker(DocumentChunker):
+    """Splits parent sections into the small child chunks that get embedded."""
+
+    def split_parent(self, parent: DocumentChunk, position: int) -> list[DocumentChunk]:
+        """
+        Split a parent chunk into child chunks linked to it.
+
+        Args:
+            parent: Parent chunk, with its chunk_id set to the parent id
+            position: Document position of the first child
+
+        Returns:
+            Child chunks carrying the parent's metadata and a parent_id
+        """
+        metadata = {**parent.metadata, "parent_id": parent.chunk_id}
+        return [
+            self._make_chunk(text, position + offset, parent.source, metadata)
+            for offset, text in enumerate(self.splitter.split_text(parent.content))
+        ]
+
+
+ChunkerT = TypeVar("ChunkerT", bound=DocumentChunker)
+
+
+def build_chunker(embedding_service: "EmbeddingService | None" = None) -> DocumentChunker:
+    """
+    Build the document chunker configured in settings.
+
+    With ``settings.chunk_size_unit == "tokens"``, chunks are measured with the
+    embedding model's tokenizer and sized to its input limit by default, so no
+    chunk text is truncated away before embedding. With parent-child retrieval,
+    this chunker produces the parent sections, which are never embedded and are
+    sized in characters (settings.parent_chunk_size).
+
+    Args:
+        embedding_service: Embedding service whose tokenizer measures chunks
+            (required for token-sized chunks)
+
+    Returns:
+        Document chunker
+    """
+    chunker_class = (
+        StructuredChunker if settings.chunk_strategy == "structured" else DocumentChunker
+    )
+    if settings.parent_child_enabled:
+        return chunker_class(chunk_size=settings.parent_chunk_size, chunk_overlap=0)
+    return _sized_chunker(
+        chunker_class, embedding_service, settings.chunk_size, settings.chunk_overlap
+    )
+
+
+def build_child_chunker(embedding_service: "EmbeddingService | None" = None) -> ChildChunker | None:
+    """
+    Build the child chunker for parent-child retrieval, if enabled in settings.
+
+    Args:
+        embedding_service: Embedding service whose tokenizer measures chunks
+            (required for token-sized chunks)
+
+    Returns:
+        Child chunker, or None when settings.parent_child_enabled is off
+    """
+    if not settings.parent_child_enabled:
+        return None
+    return _sized_chunker(
+        ChildChunker, embedding_service, settings.child_chunk_size, settings.child_chunk_overlap
+    )
+
+
+def _sized_chunker(
+    chunker_class: type[ChunkerT],
+    embedding_service: "EmbeddingService | None",
+    chunk_size: int,
+    chunk_overlap: int,
+) -> ChunkerT:
+    """Build an embedded-chunk chunker, in characters or in embedding tokens."""
+    if settings.chunk_size_unit == "chars" or embedding_service is None:
+        return chunker_class(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+    max_tokens = embedding_service.max_input_tokens()
+    chunk_size = min(settings.chunk_size_tokens or max_tokens, max_tokens)
+    chunk_overlap = min(settings.chunk_overlap_tokens, chunk_size)
+    logger.info(
+        "token_chunking_enabled",
+        model=embedding_service.model,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+    )
+    return chunker_class(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=embedding_service.token_length_function(),
+    )
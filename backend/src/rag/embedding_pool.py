@@ -0,0 +1,217 @@
+"""Process pool for CPU-bound local embedding of large ingests."""
+
+import multiprocessing as mp
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+# Model held by each worker process (set by _init_worker)
+_worker_model: Any = None
+
+
+def load_worker_model(provider: str, model: str) -> Any:
+    """
+    Load the embedding model inside a worker process.
+
+    Args:
+        provider: Embedding provider ('local' or 'onnx')
+        model: Model name
+
+    Returns:
+        Model exposing a SentenceTransformer-style ``encode``
+    """
+    from src.rag.embeddings import EmbeddingService
+
+    service = EmbeddingService(provider=provider, model=model, use_worker_pool=False)
+    return service.model_instance
+
+
+def _init_worker(
+    provider: str,
+    model: str,
+    core_sets: list[list[int]],
+    slot: Any,
+    loader: Callable[[str, str], Any],
+) -> None:
+    """Pin the worker to its core set, size its thread pools, and load the model."""
+    global _worker_model
+
+    with slot.get_lock():
+        index = slot.value
+        slot.value += 1
+    cores = core_sets[index % len(core_sets)]
+
+    if hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cores)
+        except OSError as e:
+            logger.warning("embedding_worker_pin_failed", cores=cores, error=str(e))
+
+    # One intra-op thread per pinned core, for both torch and ONNX Runtime
+    from src.config import settings
+
+    settings.onnx_intra_op_threads = len(cores)
+    try:
+        import torch
+
+        torch.set_num_threads(len(cores))
+    except ImportError:
+        pass
+
+    _worker_model = loader(provider, model)
+    logger.info("embedding_worker_ready", pid=os.getpid(), cores=cores)
+
+
+def _encode_into(
+    input_name: str,
+    output_name: str,
+    shape: tuple[int, int],
+    spans: list[tuple[int, int]],
+    indices: list[int],
+) -> int:
+    """Decode texts from the input buffer, embed them, and write rows into the output buffer."""
+    input_shm = SharedMemory(name=input_name)
+    output_shm = SharedMemory(name=output_name)
+    try:
+        texts = [bytes(input_shm.buf[start:end]).decode("utf-8") for start, end in spans]
+        embeddings = _worker_model.encode(
+            texts,
+            batch_size=len(texts),
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        output = np.ndarray(shape, dtype=np.float32, buffer=output_shm.buf)
+        output[indices] = embeddings
+        del output  # Release the buffer export before closing
+        return len(indices)
+    finally:
+        input_shm.close()
+        output_shm.close()
+
+
+def _split_cores(workers: int) -> list[list[int]]:
+    """Split the CPUs available to this process into contiguous per-worker sets."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+    else:
+        cpus = list(range(os.cpu_count() or 1))
+
+    if workers >= len(cpus):
+        return [[cpus[i % len(cpus)]] for i in range(workers)]
+
+    size, extra = divmod(len(cpus), workers)
+    core_sets: list[list[int]] = []
+    start = 0
+    for i in range(workers):
+        end = start + size + (1 if i < extra else 0)
+        core_sets.append(cpus[start:end])
+        start = end
+    return core_sets
+
+
+class EmbeddingWorkerPool:
+    """
+    Pool of embedding worker processes, each holding its own model copy.
+
+    Texts are passed to workers through a shared-memory byte buffer and embeddings
+    come back through a shared float32 matrix, so only indices cross the pipe.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        dimensions: int,
+        workers: int,
+        loader: Callable[[str, str], Any] = load_worker_model,
+    ) -> None:
+        """
+        Start the worker pool.
+
+        Args:
+            provider: Embedding provider ('local' or 'onnx')
+            model: Model name loaded by each worker
+            dimensions: Embedding dimension of the model
+            workers: Number of worker processes
+            loader: Picklable callable building the model inside a worker
+        """
+        self.dimensions = dimensions
+        self.workers = max(1, workers)
+        core_sets = _split_cores(self.workers)
+
+        ctx = mp.get_context("spawn")  # Fresh interpreters: no forked torch/thread state
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(provider, model, core_sets, ctx.Value("i", 0), loader),
+        )
+        logger.info(
+            "embedding_worker_pool_started",
+            workers=self.workers,
+            core_sets=core_sets,
+            provider=provider,
+            model=model,
+        )
+
+    def encode(self, texts: list[str], batches: list[list[int]]) -> np.ndarray:
+        """
+        Embed texts across the worker processes.
+
+        Args:
+            texts: Texts to embed
+            batches: Batches of indices into ``texts``; each batch is one worker task
+
+        Returns:
+            Float32 array of shape (len(texts), dimensions) in input order
+        """
+        if not texts:
+            return np.empty((0, self.dimensions), dtype=np.float32)
+
+        encoded = [text.encode("utf-8") for text in texts]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+        shape = (len(texts), self.dimensions)
+        input_shm = SharedMemory(create=True, size=max(1, int(offsets[-1])))
+        output_shm = SharedMemory(create=True, size=shape[0] * shape[1] * 4)
+        try:
+            input_shm.buf[: offsets[-1]] = b"".join(encoded)
+
+            futures = [
+                self._executor.submit(
+                    _encode_into,
+                    input_shm.name,
+                    output_shm.name,
+                    shape,
+                    [(int(offsets[i]), int(offsets[i + 1])) for i in batch],
+                    batch,
+                )
+                for batch in batches
+            ]
+            wait(futures)
+            for future in futures:
+                future.result()  # Re-raise worker errors
+
+            output = np.ndarray(shape, dtype=np.float32, buffer=output_shm.buf)
+            result = output.copy()
+            del output
+            return result
+        finally:
+            input_shm.close()
+            input_shm.unlink()
+            output_shm.close()
+            output_shm.unlink()
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        logger.info("embedding_worker_pool_stopped")
@@ -1,15 +1,37 @@
 """Embedding generation service."""
 
+import base64
+import functools
 import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
 
+import numpy as np
 import structlog
 
 from src.config import settings
+from src.rag.batching import count_tokens, estimate_tokens, plan_token_batches
 from src.rag.cache import EmbeddingCache
+from src.rag.embedding_pool import EmbeddingWorkerPool
 from src.schemas.rag import EmbeddingRequest, EmbeddingResponse
 
 logger = structlog.get_logger()
 
+# Input limit of OpenAI embedding models, in tokens
+OPENAI_MAX_INPUT_TOKENS = 8191
+
+# Sequence length assumed for local models that do not report one
+LOCAL_MAX_INPUT_TOKENS = 256
+
+# Native output dimensions of OpenAI embedding models
+OPENAI_MODEL_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
 
 class EmbeddingService:
     """Service for generating embeddings from text."""
@@ -18,13 +40,19 @@ class EmbeddingService:
         self,
         provider: str | None = None,
         model: str | None = None,
+        use_worker_pool: bool | None = None,
+        dimensions: int | None = None,
     ) -> None:
         """
         Initialize embedding service.
 
         Args:
-            provider: Embedding provider ('openai' or 'local')
+            provider: Embedding provider ('openai', 'local' or 'onnx')
             model: Model name to use
+            dimensions: Output dimension for Matryoshka-style truncation
+                (default: settings.embedding_dimensions, None = native size)
+            use_worker_pool: Encode large local requests in worker processes
+                (default: enabled when settings.embedding_workers > 0)
         """
         self.provider = provider or settings.embedding_provider
         self.model = model or (
@@ -35,16 +63,47 @@ class EmbeddingService:
 
         if self.provider == "local":
             self._init_local_model()
+        elif self.provider == "onnx":
+            self._init_onnx_model()
         elif self.provider == "openai":
             self._init_openai()
         else:
             raise ValueError(f"Unsupported embedding provider: {self.provider}")
 
+        # Truncated (Matryoshka) output dimension
+        self.native_dimensions: int = self.dimensions
+        target_dimensions = dimensions if dimensions is not None else settings.embedding_dimensions
+        if target_dimensions is not None:
+            if not 0 < target_dimensions <= self.native_dimensions:
+                raise ValueError(
+                    f"embedding dimensions must be between 1 and {self.native_dimensions} "
+                    f"for {self.model}, got {target_dimensions}"
+                )
+            if (
+                self.provider == "openai"
+                and not self.model.startswith("text-embedding-3")
+                and target_dimensions != self.native_dimensions
+            ):
+                raise ValueError(f"{self.model} does not support reduced dimensions")
+            self.dimensions = target_dimensions
+            logger.info(
+                "embedding_dimensions_truncated",
+                native=self.native_dimensions,
+                dimensions=self.dimensions,
+            )
+
         # Initialize cache if enabled
         self.cache: EmbeddingCache | None = None
         if settings.cache_enabled:
             self.cache = EmbeddingCache(ttl=settings.cache_embeddings_ttl)
 
+        # Worker pool for large local requests (lazy initialization)
+        if use_worker_pool is None:
+            use_worker_pool = settings.embedding_workers > 0
+        self.use_worker_pool = use_worker_pool and self.provider in ("local", "onnx")
+        self._worker_pool: EmbeddingWorkerPool | None = None
+        self._worker_pool_lock = threading.Lock()
+
     def _init_local_model(self) -> None:
         """Initialize local sentence-transformers model."""
         try:
@@ -66,6 +125,35 @@ class EmbeddingService:
                 "Install with: pip install sentence-transformers"
             ) from err
 
+    def _init_onnx_model(self) -> None:
+        """Initialize ONNX Runtime model, exporting it on first use."""
+        from src.rag.onnx_embeddings import (
+            EMBEDDING_CONFIG_FILE,
+            OnnxEmbeddingModel,
+            export_onnx_model,
+        )
+
+        model_dir = (
+            Path(settings.onnx_model_dir)
+            if settings.onnx_model_dir
+            else Path(settings.chroma_path).parent / "onnx" / self.model.replace("/", "__")
+        )
+
+        if not (model_dir / EMBEDDING_CONFIG_FILE).exists():
+            logger.info(
+                "onnx_model_not_found_exporting", model=self.model, model_dir=str(model_dir)
+            )
+            export_onnx_model(self.model, str(model_dir), quantize=settings.onnx_quantized)
+
+        logger.info("loading_embedding_model", model=self.model, backend="onnx")
+        self.model_instance = OnnxEmbeddingModel(
+            str(model_dir),
+            intra_op_threads=settings.onnx_intra_op_threads,
+            quantized=settings.onnx_quantized,
+        )
+        self.dimensions = self.model_instance.get_sentence_embedding_dimension()
+        logger.info("embedding_model_loaded", dimensions=self.dimensions)
+
     def _init_openai(self) -> None:
         """Initialize OpenAI embeddings."""
         try:
@@ -78,8 +166,10 @@ class EmbeddingService:
                 )
 
             self.client = OpenAI(api_key=api_key)
-            # Default dimensions for OpenAI models
-            self.dimensions = 1536 if "3-small" in self.model else 3072
+            # Native dimensions for OpenAI models
+            self.dimensions = OPENAI_MODEL_DIMENSIONS.get(
+                self.model, 1536 if "3-small" in self.model else 3072
+            )
         except ImportError as err:
             raise ImportError(
                 "openai package is required for OpenAI embeddings. Install with: pip install openai"
@@ -89,6 +179,8 @@ class EmbeddingService:
         """
         Generate embeddings for a list of texts.
 
+        API-facing wrapper around embed_batch; converts vectors to Python lists.
+
         Args:
             request: Embedding request with texts and optional model
 
@@ -96,57 +188,192 @@ class EmbeddingService:
             Embedding response with embeddings and metadata
         """
         model = request.model or self.model
+        vectors = self.embed_batch(request.texts, model=model)
+
+        return EmbeddingResponse(
+            embeddings=vectors.tolist(),
+            model=model,
+            dimensions=vectors.shape[1] if len(vectors) else 0,
+        )
+
+    def embed_batch(self, texts: list[str], model: str | None = None) -> np.ndarray:
+        """
+        Generate embeddings as a contiguous float32 matrix.
+
+        This is the internal fast path used by ingestion and retrieval: vectors stay
+        in NumPy from the model (or cache) to the vector store.
+
+        Args:
+            texts: Texts to embed
+            model: Model name (default: the service model)
+
+        Returns:
+            Float32 array of shape (len(texts), dimensions), rows in input order
+        """
+        model = model or self.model
+        if not texts:
+            return np.empty((0, self.dimensions), dtype=np.float32)
+
+        # Truncated vectors must not collide with full-size ones in the cache
+        cache_model = (
+            model if self.dimensions == self.native_dimensions else f"{model}@{self.dimensions}"
+        )
 
         # Check cache for each text
-        embeddings: list[list[float]] = []
+        cached_rows: dict[int, np.ndarray] = {}
         texts_to_generate: list[str] = []
         indices_to_generate: list[int] = []
 
-        if self.cache:
-            for idx, text in enumerate(request.texts):
-                cached = self.cache.get(text, model)
-                if cached is not None:
-                    embeddings.append(cached)
-                    logger.debug("embedding_cache_hit", text_length=len(text))
-                else:
-                    embeddings.append([])  # Placeholder
-                    texts_to_generate.append(text)
-                    indices_to_generate.append(idx)
+        for idx, text in enumerate(texts):
+            cached = self.cache.get(text, cache_model) if self.cache else None
+            if cached is not None:
+                cached_rows[idx] = cached
+                logger.debug("embedding_cache_hit", text_length=len(text))
+            else:
+                texts_to_generate.append(text)
+                indices_to_generate.append(idx)
+
+        # Fast path: nothing cached, the generated matrix is the result
+        if not cached_rows:
+            generated = self._generate(texts_to_generate, model)
+            if self.cache:
+                for text, row in zip(texts_to_generate, generated, strict=True):
+                    self.cache.set(text, cache_model, row)
+            return generated
+
+        dimensions = next(iter(cached_rows.values())).shape[0]
+        vectors = np.empty((len(texts), dimensions), dtype=np.float32)
+        for idx, row in cached_rows.items():
+            vectors[idx] = row
+
+        # Generate embeddings for uncached texts, fill them in and cache them
+        if texts_to_generate:
+            generated = self._generate(texts_to_generate, model)
+            vectors[indices_to_generate] = generated
+            if self.cache:
+                for text, row in zip(texts_to_generate, generated, strict=True):
+                    self.cache.set(text, cache_model, row)
+
+        return vectors
+
+    def _generate(self, texts: list[str], model: str) -> np.ndarray:
+        """Dispatch generation to the configured provider."""
+        if self.provider in ("local", "onnx"):
+            return self._generate_local(texts, model)
+        elif self.provider == "openai":
+            return self._generate_openai(texts, model)
+        raise ValueError(f"Unsupported provider: {self.provider}")
+
+    def _count_tokens_local(self, texts: list[str]) -> list[int]:
+        """Count tokens with the local model's tokenizer, capped at its max sequence length."""
+        tokenizer = getattr(self.model_instance, "tokenizer", None)
+        max_length = getattr(self.model_instance, "max_seq_length", None)
+
+        counter = None
+        if tokenizer is not None:
+
+            def counter(batch: list[str]) -> list[int]:
+                encoded = tokenizer(
+                    batch,
+                    add_special_tokens=True,
+                    truncation=max_length is not None,
+                    max_length=max_length,
+                    return_attention_mask=False,
+                    return_token_type_ids=False,
+                )
+                return [len(ids) for ids in encoded["input_ids"]]
+
+        lengths = count_tokens(texts, counter)
+        if max_length:
+            lengths = [min(length, max_length) for length in lengths]
+        return lengths
+
+    def _count_tokens_openai(self, texts: list[str], model: str) -> list[int]:
+        """Count tokens with tiktoken for the given OpenAI model."""
+        counter = None
+        encoding = _tiktoken_encoding(model)
+        if encoding is not None:
+
+            def counter(batch: list[str]) -> list[int]:
+                return [len(ids) for ids in encoding.encode_ordinary_batch(batch)]
+
+        return count_tokens(texts, counter)
+
+    def token_length_function(self) -> Callable[[str], int]:
+        """
+        Build a token counter for single texts using the model's tokenizer.
+
+        Special tokens are not counted, so the counts of adjacent pieces add up to
+        about the count of their concatenation. Counts are memoized (up to
+        settings.chunk_token_cache_size texts), since splitting measures many
+        repeated pieces. Without a tokenizer, tokens are estimated from characters.
+
+        Returns:
+            Function mapping a text to its number of tokens
+        """
+        count: Callable[[str], int] = estimate_tokens
+        if self.provider == "openai":
+            encoding = _tiktoken_encoding(self.model)
+            if encoding is not None:
+
+                def count(text: str) -> int:
+                    return len(encoding.encode_ordinary(text))
+
         else:
-            texts_to_generate = request.texts
-            indices_to_generate = list(range(len(request.texts)))
-            embeddings = [[] for _ in request.texts]
+            tokenizer = getattr(getattr(self, "model_instance", None), "tokenizer", None)
+            if tokenizer is not None:
+
+                def count(text: str) -> int:
+                    encoded = tokenizer(
+                        text,
+                        add_special_tokens=False,
+                        return_attention_mask=False,
+                        return_token_type_ids=False,
+                        verbose=False,  # Long pieces are only measured, never encoded
+                    )
+                    return len(encoded["input_ids"])
+
+        return functools.lru_cache(maxsize=settings.chunk_token_cache_size)(count)
+
+    def max_input_tokens(self) -> int:
+        """
+        Get the number of text tokens the model reads per input.
 
-        # Generate embeddings for uncached texts
-        if texts_to_generate:
-            if self.provider == "local":
-                generated = self._generate_local(texts_to_generate, model)
-            elif self.provider == "openai":
-                generated = self._generate_openai(texts_to_generate, model)
-            else:
-                raise ValueError(f"Unsupported provider: {self.provider}")
+        Returns:
+            Maximum sequence length minus the special tokens the tokenizer adds
+            (tokens past it are truncated before embedding)
+        """
+        if self.provider == "openai":
+            return OPENAI_MAX_INPUT_TOKENS
 
-            # Fill in embeddings and cache them
-            for gen_idx, orig_idx in enumerate(indices_to_generate):
-                embeddings[orig_idx] = generated[gen_idx]
-                if self.cache:
-                    self.cache.set(texts_to_generate[gen_idx], model, generated[gen_idx])
+        model_instance = getattr(self, "model_instance", None)
+        max_length = getattr(model_instance, "max_seq_length", None) or LOCAL_MAX_INPUT_TOKENS
+        tokenizer = getattr(model_instance, "tokenizer", None)
+        special = tokenizer.num_special_tokens_to_add() if tokenizer is not None else 0
+        return max_length - special
 
-        return EmbeddingResponse(
-            embeddings=embeddings,
-            model=model,
-            dimensions=len(embeddings[0]) if embeddings and embeddings[0] else 0,
+    def _generate_local(self, texts: list[str], model: str) -> np.ndarray:
+        """Generate embeddings using local sentence-transformers model."""
+        # Sort by token length and size batches by a padded-token budget, so each
+        # batch pads to a similar length instead of the longest chunk in the input
+        lengths = self._count_tokens_local(texts)
+        batches = plan_token_batches(
+            lengths,
+            token_budget=settings.embedding_token_budget_local,
+            max_batch_size=settings.embedding_batch_size_local,
+            padded=True,
         )
+        logger.debug("local_embedding_batches_planned", texts=len(texts), batches=len(batches))
 
-    def _generate_local(self, texts: list[str], model: str) -> list[list[float]]:
-        """Generate embeddings using local sentence-transformers model."""
-        # Use larger batch size for better performance (sentence-transformers handles this well)
-        # Process all at once if possible, otherwise in batches
-        batch_size = settings.embedding_batch_size_local
-        all_embeddings = []
+        # Large ingests go to the worker processes; small requests such as
+        # query embeddings stay in-process for latency
+        if self.use_worker_pool and len(texts) >= settings.embedding_pool_min_texts:
+            return self._truncate(self._get_worker_pool().encode(texts, batches))
+
+        all_embeddings = np.empty((len(texts), self.native_dimensions), dtype=np.float32)
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i : i + batch_size]
+        for batch_indices in batches:
+            batch = [texts[i] for i in batch_indices]
             batch_embeddings = self.model_instance.encode(
                 batch,
                 batch_size=len(batch),
@@ -155,26 +382,75 @@ class EmbeddingService:
                 normalize_embeddings=True,
                 device="cpu",  # Explicit device
             )
-            all_embeddings.extend(batch_embeddings.tolist())
+            # Scatter results back to their original positions
+            all_embeddings[batch_indices] = batch_embeddings
+
+        return self._truncate(all_embeddings)
+
+    def _truncate(self, vectors: np.ndarray) -> np.ndarray:
+        """Apply the configured output dimension to locally generated vectors."""
+        return truncate_embeddings(vectors, self.dimensions)
+
+    def _get_worker_pool(self) -> EmbeddingWorkerPool:
+        """Start the embedding worker pool on first use."""
+        with self._worker_pool_lock:
+            if self._worker_pool is None:
+                self._worker_pool = EmbeddingWorkerPool(
+                    provider=self.provider,
+                    model=self.model,
+                    dimensions=self.native_dimensions,
+                    workers=settings.embedding_workers,
+                )
+            return self._worker_pool
 
-        return all_embeddings
+    def close(self) -> None:
+        """Stop the embedding worker pool if it was started."""
+        with self._worker_pool_lock:
+            if self._worker_pool is not None:
+                self._worker_pool.close()
+                self._worker_pool = None
 
-    def _generate_openai(self, texts: list[str], model: str) -> list[list[float]]:
+    def _generate_openai(self, texts: list[str], model: str) -> np.ndarray:
         """Generate embeddings using OpenAI API."""
-        # OpenAI API accepts up to 2048 inputs per request
-        all_embeddings: list[list[float]] = []
-        batch_size = settings.embedding_batch_size_openai
+        # Split requests by the per-request token limit as well as the input count cap
+        lengths = self._count_tokens_openai(texts, model)
+        batches = plan_token_batches(
+            lengths,
+            token_budget=settings.embedding_max_tokens_per_request_openai,
+            max_batch_size=settings.embedding_batch_size_openai,
+            padded=False,
+        )
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i : i + batch_size]
+        rows: list[np.ndarray] = [np.empty(0, dtype=np.float32)] * len(texts)
+
+        for batch_indices in batches:
+            batch = [texts[i] for i in batch_indices]
+            extra: dict[str, Any] = {}
+            if self.dimensions != self.native_dimensions:
+                extra["dimensions"] = self.dimensions  # Server-side Matryoshka truncation
             response = self.client.embeddings.create(
                 model=model,
                 input=batch,
+                # base64 responses decode straight into float32 without per-float JSON parsing
+                encoding_format="base64",
+                **extra,
             )
-            batch_embeddings = [item.embedding for item in response.data]
-            all_embeddings.extend(batch_embeddings)
+            for orig_idx, item in zip(batch_indices, response.data, strict=True):
+                rows[orig_idx] = _decode_embedding(item.embedding)
+
+        return np.stack(rows)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """
+        Generate a float32 embedding vector for a single text.
 
-        return all_embeddings
+        Args:
+            text: Text to embed
+
+        Returns:
+            1-D float32 embedding vector
+        """
+        return self.embed_batch([text])[0]
 
     def embed_text(self, text: str) -> list[float]:
         """
@@ -186,12 +462,48 @@ class EmbeddingService:
         Returns:
             Embedding vector
         """
-        # Check cache first
-        if self.cache:
-            cached = self.cache.get(text, self.model)
-            if cached is not None:
-                return cached
+        return self.embed_query(text).tolist()
+
 
-        request = EmbeddingRequest(texts=[text])
-        response = self.generate_embeddings(request)
-        return response.embeddings[0]
+def _tiktoken_encoding(model: str) -> Any:
+    """Load the tiktoken encoding of an OpenAI model, or None if unavailable."""
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except ImportError:
+        logger.debug("tiktoken_not_available", message="Estimating tokens from characters")
+    except Exception as e:
+        # tiktoken fetches its encoding files on first use
+        logger.warning("tiktoken_encoding_unavailable", error=str(e))
+    return None
+
+
+def truncate_embeddings(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    """
+    Keep the leading dimensions of each vector and re-normalize (Matryoshka truncation).
+
+    Args:
+        vectors: Float32 matrix of shape (n, native_dimensions)
+        dimensions: Number of leading dimensions to keep
+
+    Returns:
+        Float32 matrix of shape (n, dimensions) with unit-norm rows
+    """
+    if vectors.shape[1] <= dimensions:
+        return vectors
+
+    truncated = np.ascontiguousarray(vectors[:, :dimensions])
+    norms = np.linalg.norm(truncated, axis=1, keepdims=True)
+    np.divide(truncated, np.maximum(norms, 1e-12), out=truncated)
+    return truncated
+
+
+def _decode_embedding(embedding: str | list[float]) -> np.ndarray:
+    """Decode an OpenAI embedding returned as base64 (or a float list) to float32."""
+    if isinstance(embedding, str):
+        return np.frombuffer(base64.b64decode(embedding), dtype=np.float32)
+    return np.asarray(embedding, dtype=np.float32)
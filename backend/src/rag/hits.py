@@ -0,0 +1,56 @@
+"""Lightweight search hits, converted to Pydantic schemas only at the API boundary."""
+
+from typing import Literal, NamedTuple
+
+from src.schemas.rag import DocumentChunk, RetrievalResult
+
+# What a search returns per hit: ids and scores only, plus a content snippet, or
+# the full content with metadata
+HitFields = Literal["ids", "snippet", "full"]
+
+# ChromaDB fields fetched for each kind of hit (distances give the scores)
+HIT_INCLUDE: dict[str, list[str]] = {
+    "ids": ["distances"],
+    "snippet": ["distances", "documents"],
+    "full": ["distances", "documents", "metadatas"],
+}
+
+
+class SearchHit(NamedTuple):
+    """One search result, as returned by the vector store."""
+
+    chunk_id: str
+    score: float
+    content: str | None = None  # None when not fetched ("ids" hits)
+    metadata: dict | None = None  # None when not fetched ("ids" and "snippet" hits)
+
+
+def to_retrieval_result(hits: list[SearchHit], query: str) -> RetrievalResult:
+    """
+    Build the retrieval result schema from search hits.
+
+    Args:
+        hits: Search hits, best first
+        query: Query that produced them
+
+    Returns:
+        Retrieval result with one document chunk per hit
+    """
+    chunks = []
+    for hit in hits:
+        metadata = hit.metadata or {}
+        chunks.append(
+            DocumentChunk(
+                content=hit.content or "",
+                metadata=metadata,
+                chunk_id=hit.chunk_id,
+                source=metadata.get("source"),
+                position=metadata.get("position"),
+            )
+        )
+    return RetrievalResult(
+        chunks=chunks,
+        scores=[hit.score for hit in hits],
+        query=query,
+        total_results=len(chunks),
+    )
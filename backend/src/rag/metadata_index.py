@@ -0,0 +1,275 @@
+"""In-memory inverted index over chunk metadata for resolving search filters."""
+
+import operator
+import threading
+from array import array
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+# Numeric comparisons of ChromaDB where filters
+_RANGE_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+}
+
+_EMPTY = np.empty(0, dtype=np.uint32)
+
+# Collection metadata key changed on every write through a retriever, so
+# retrievers of the same collection in other processes know their index is stale
+WRITE_TOKEN_KEY = "write_token"
+
+
+def _value_key(value: Any) -> tuple[str, Any] | None:
+    """Index key of a metadata value (None if the value is not indexable)."""
+    if isinstance(value, bool):  # Before int: True == 1, but filters tell them apart
+        return ("b", value)
+    if isinstance(value, int | float):
+        return ("n", value)  # 1 and 1.0 hash alike, matching ChromaDB's numeric equality
+    if isinstance(value, str):
+        return ("s", value)
+    return None
+
+
+def normalize_where(where: dict) -> dict:
+    """
+    Rewrite a filter into the one-operator-per-level form ChromaDB accepts.
+
+    Callers (and the BM25 search) treat {"a": 1, "b": 2} as both conditions and
+    {"n": {"$gt": 1, "$lt": 5}} as a range; ChromaDB needs explicit $and clauses.
+
+    Args:
+        where: Metadata filter
+
+    Returns:
+        Equivalent filter accepted by ChromaDB
+    """
+    clauses: list[dict] = []
+    for key, condition in where.items():
+        if key in ("$and", "$or") and isinstance(condition, list):
+            clauses.append({key: [normalize_where(clause) for clause in condition]})
+        elif isinstance(condition, dict) and len(condition) > 1:
+            clauses.extend({key: {op: operand}} for op, operand in condition.items())
+        else:
+            clauses.append({key: condition})
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+class MetadataIndex:
+    """
+    Posting lists of row numbers per metadata key and value.
+
+    Every chunk gets a row number on insertion; each (key, value) pair maps to
+    the sorted array of rows carrying it, so equality, $in and range filters
+    resolve to candidate sets with vectorized unions and intersections instead
+    of a scan. Deleted and updated chunks leave dead rows behind (updates
+    append a new row); the index is rebuilt once dead rows dominate.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty, unbuilt index."""
+        self._lock = threading.RLock()
+        self.built = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._ids: list[str] = []
+        self._live = bytearray()  # 1 per row still holding its chunk's current metadata
+        self._rows: dict[str, int] = {}
+        self._postings: dict[str, dict[tuple[str, Any], array]] = {}
+        self._unindexed: set[str] = set()  # Keys with values that cannot be indexed
+
+    @property
+    def size(self) -> int:
+        """Number of indexed chunks."""
+        return len(self._rows)
+
+    def invalidate(self) -> None:
+        """Drop the index; it is rebuilt from the collection on next use."""
+        with self._lock:
+            self.built = False
+            self._reset()
+
+    def build(self, collection: Any, page_size: int = 5000) -> None:
+        """
+        Index the metadata of every chunk in a collection.
+
+        Args:
+            collection: ChromaDB collection (or sharded collection)
+            page_size: Chunks read per request
+        """
+        with self._lock:
+            self._reset()
+            offset = 0
+            while True:
+                page = collection.get(limit=page_size, offset=offset, include=["metadatas"])
+                if not page["ids"]:
+                    break
+                self._add(page["ids"], page["metadatas"])
+                offset += len(page["ids"])
+            self.built = True
+        logger.info("metadata_index_built", chunks=self.size, keys=len(self._postings))
+
+    def add(self, ids: list[str], metadatas: list[dict | None]) -> None:
+        """
+        Index added chunks (or the new metadata of existing ones).
+
+        Args:
+            ids: Chunk ids
+            metadatas: Metadata, one per id
+        """
+        with self._lock:
+            if self.built:
+                self._add(ids, metadatas)
+
+    def remove(self, ids: list[str]) -> None:
+        """
+        Forget deleted chunks.
+
+        Args:
+            ids: Chunk ids
+        """
+        with self._lock:
+            if not self.built:
+                return
+            for chunk_id in ids:
+                row = self._rows.pop(chunk_id, None)
+                if row is not None:
+                    self._live[row] = 0
+            if len(self._ids) > 1024 and len(self._rows) < len(self._ids) // 2:
+                self.invalidate()  # Mostly dead rows: rebuild on next use
+
+    def _add(self, ids: list[str], metadatas: list[dict | None]) -> None:
+        for chunk_id, metadata in zip(ids, metadatas, strict=True):
+            previous = self._rows.get(chunk_id)
+            if previous is not None:
+                self._live[previous] = 0
+
+            row = len(self._ids)
+            self._ids.append(chunk_id)
+            self._live.append(1)
+            self._rows[chunk_id] = row
+            for key, value in (metadata or {}).items():
+                value_key = _value_key(value)
+                if value_key is None:
+                    self._unindexed.add(key)
+                    continue
+                postings = self._postings.setdefault(key, {})
+                posting = postings.get(value_key)
+                if posting is None:
+                    posting = postings[value_key] = array("I")
+                posting.append(row)
+
+    def resolve(self, where: dict) -> list[str] | None:
+        """
+        Find the chunks matching a ChromaDB where filter.
+
+        Supports $and, $or and, per key, equality, $ne, $in, $nin, $gt, $gte,
+        $lt and $lte. Several keys at one level are combined with $and.
+
+        Args:
+            where: Metadata filter
+
+        Returns:
+            Ids of the matching chunks, or None if the filter cannot be resolved
+            here (unknown operator, or a key holding unindexable values)
+        """
+        with self._lock:
+            if not self.built:
+                return None
+            rows = self._match(where)
+            if rows is None:
+                return None
+            live = np.frombuffer(self._live, dtype=np.uint8)
+            return [self._ids[row] for row in rows[live[rows] == 1]]
+
+    def _all_rows(self) -> np.ndarray:
+        return np.flatnonzero(np.frombuffer(self._live, dtype=np.uint8)).astype(np.uint32)
+
+    def _posting(self, key: str, value: Any) -> np.ndarray:
+        value_key = _value_key(value)
+        posting = self._postings.get(key, {}).get(value_key) if value_key else None
+        if posting is None:
+            return _EMPTY
+        return np.frombuffer(posting, dtype=np.uint32)
+
+    @staticmethod
+    def _union(parts: list[np.ndarray]) -> np.ndarray:
+        if not parts:
+            return _EMPTY
+        if len(parts) == 1:
+            return parts[0]
+        return np.unique(np.concatenate(parts))
+
+    @staticmethod
+    def _intersect(parts: list[np.ndarray]) -> np.ndarray:
+        parts = sorted(parts, key=len)  # Smallest first keeps every step cheap
+        result = parts[0]
+        for part in parts[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, part, assume_unique=True)
+        return result
+
+    def _match(self, where: dict) -> np.ndarray | None:
+        """Resolve a filter to sorted row numbers (dead rows included)."""
+        if not where:
+            return self._all_rows()
+
+        parts: list[np.ndarray] = []
+        for key, condition in where.items():
+            if key in ("$and", "$or"):
+                if not isinstance(condition, list) or not condition:
+                    return None
+                matched = [self._match(clause) for clause in condition]
+                if any(rows is None for rows in matched):
+                    return None
+                part = self._intersect(matched) if key == "$and" else self._union(matched)
+            elif key.startswith("$") or key in self._unindexed:
+                return None
+            else:
+                part = self._match_key(key, condition)
+                if part is None:
+                    return None
+            parts.append(part)
+        return self._intersect(parts)
+
+    def _match_key(self, key: str, condition: Any) -> np.ndarray | None:
+        """Resolve the condition on one key to rows."""
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        parts: list[np.ndarray] = []
+        for op, operand in condition.items():
+            if op == "$eq":
+                part = self._posting(key, operand)
+            elif op in ("$in", "$nin"):
+                if not isinstance(operand, list):
+                    return None
+                part = self._union([self._posting(key, value) for value in operand])
+            elif op == "$ne":
+                part = self._posting(key, operand)
+            elif op in _RANGE_OPERATORS:
+                if _value_key(operand) is None or _value_key(operand)[0] != "n":
+                    return None
+                compare = _RANGE_OPERATORS[op]
+                part = self._union(
+                    [
+                        np.frombuffer(posting, dtype=np.uint32)
+                        for (kind, value), posting in self._postings.get(key, {}).items()
+                        if kind == "n" and compare(value, operand)
+                    ]
+                )
+            else:
+                return None
+
+            if op in ("$ne", "$nin"):  # ChromaDB matches chunks without the key too
+                part = np.setdiff1d(self._all_rows(), part, assume_unique=True)
+            parts.append(part)
+        return self._intersect(parts)
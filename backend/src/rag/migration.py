@@ -0,0 +1,58 @@
+"""Re-embedding of stored chunks into another collection."""
+
+from collections.abc import Callable
+from typing import Any
+
+import structlog
+
+from src.rag.embeddings import EmbeddingService
+
+logger = structlog.get_logger()
+
+
+def reembed_collection(
+    source: Any,
+    target: Any,
+    embedding_service: EmbeddingService,
+    batch_size: int = 256,
+    on_batch: Callable[[int], None] | None = None,
+) -> int:
+    """
+    Re-embed every chunk of a collection into another collection.
+
+    Chunk text, ids and metadata are read from ``source`` page by page and written
+    to ``target`` with vectors from ``embedding_service``, so no source documents
+    need to be re-uploaded.
+
+    Args:
+        source: ChromaDB collection to read chunk text from
+        target: ChromaDB collection to write re-embedded chunks to
+        embedding_service: Embedding service producing the new vectors
+        batch_size: Chunks per read/embed/write round
+        on_batch: Optional callback receiving the running count after each batch
+
+    Returns:
+        Number of chunks re-embedded
+    """
+    done = 0
+    while True:
+        page = source.get(limit=batch_size, offset=done, include=["documents", "metadatas"])
+        ids = page.get("ids") or []
+        if not ids:
+            break
+
+        documents = [doc or "" for doc in page["documents"]]
+        vectors = embedding_service.embed_batch(documents)
+        target.upsert(
+            ids=ids,
+            embeddings=vectors,
+            documents=documents,
+            metadatas=page["metadatas"],
+        )
+
+        done += len(ids)
+        logger.info("reembed_batch_completed", done=done, target=target.name)
+        if on_batch:
+            on_batch(done)
+
+    return done
@@ -0,0 +1,230 @@
+"""ONNX Runtime backend for local sentence embeddings."""
+
+import inspect
+import json
+from pathlib import Path
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+# File names inside an exported model directory
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+EMBEDDING_CONFIG_FILE = "embedding_config.json"
+
+
+class OnnxEmbeddingModel:
+    """
+    Sentence embedding model executed with ONNX Runtime.
+
+    Mirrors the subset of the SentenceTransformer interface used by EmbeddingService
+    (``encode``, ``tokenizer``, ``max_seq_length``, ``get_sentence_embedding_dimension``),
+    so the same batching code drives both backends.
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        intra_op_threads: int = 0,
+        quantized: bool = True,
+    ) -> None:
+        """
+        Load an exported model directory.
+
+        Args:
+            model_dir: Directory created by export_onnx_model
+            intra_op_threads: ONNX Runtime intra-op thread count (0 = runtime default)
+            quantized: Use the int8-quantized graph when available
+        """
+        try:
+            import onnxruntime as ort
+            from transformers import AutoTokenizer
+        except ImportError as err:
+            raise ImportError(
+                "onnxruntime and transformers are required for ONNX embeddings. "
+                "Install with: pip install onnxruntime transformers"
+            ) from err
+
+        path = Path(model_dir)
+        config = json.loads((path / EMBEDDING_CONFIG_FILE).read_text())
+        self.max_seq_length: int = config["max_seq_length"]
+        self.pooling: str = config.get("pooling", "mean")
+        self.dimensions: int = config["dimensions"]
+
+        model_file = path / ONNX_QUANTIZED_MODEL_FILE
+        if not quantized or not model_file.exists():
+            model_file = path / ONNX_MODEL_FILE
+
+        options = ort.SessionOptions()
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.session = ort.InferenceSession(
+            str(model_file), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(str(path))
+
+        logger.info(
+            "onnx_embedding_model_loaded",
+            model_file=str(model_file),
+            dimensions=self.dimensions,
+            intra_op_threads=intra_op_threads,
+        )
+
+    def get_sentence_embedding_dimension(self) -> int:
+        """Return the embedding dimension."""
+        return self.dimensions
+
+    def encode(
+        self,
+        sentences: list[str],
+        batch_size: int = 32,
+        normalize_embeddings: bool = True,
+        **kwargs: object,
+    ) -> np.ndarray:
+        """
+        Embed sentences.
+
+        Args:
+            sentences: Texts to embed
+            batch_size: Number of texts per inference call
+            normalize_embeddings: L2-normalize the output vectors
+            **kwargs: Accepted for SentenceTransformer compatibility and ignored
+
+        Returns:
+            Float32 array of shape (len(sentences), dimensions)
+        """
+        output = np.empty((len(sentences), self.dimensions), dtype=np.float32)
+
+        for start in range(0, len(sentences), max(1, batch_size)):
+            batch = sentences[start : start + batch_size]
+            encoded = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            feeds = {
+                name: encoded[name].astype(np.int64)
+                for name in ("input_ids", "attention_mask", "token_type_ids")
+                if name in self._input_names and name in encoded
+            }
+            token_embeddings = self.session.run(None, feeds)[0]
+            output[start : start + len(batch)] = _pool(
+                token_embeddings, feeds["attention_mask"], self.pooling
+            )
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(output, axis=1, keepdims=True)
+            np.divide(output, np.maximum(norms, 1e-12), out=output)
+
+        return output
+
+
+def _pool(token_embeddings: np.ndarray, attention_mask: np.ndarray, pooling: str) -> np.ndarray:
+    """Pool token embeddings into sentence embeddings."""
+    if pooling == "cls":
+        return token_embeddings[:, 0]
+
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (token_embeddings * mask).sum(axis=1)
+    counts = np.clip(mask.sum(axis=1), 1e-9, None)
+    return summed / counts
+
+
+def export_onnx_model(model_name: str, output_dir: str, quantize: bool = True) -> Path:
+    """
+    Export a sentence-transformers model to ONNX, optionally with int8 weights.
+
+    Args:
+        model_name: sentence-transformers model name or path
+        output_dir: Directory to write the model, tokenizer and config into
+        quantize: Also write a dynamically int8-quantized graph
+
+    Returns:
+        Path of the output directory
+    """
+    try:
+        import torch
+        from sentence_transformers import SentenceTransformer
+    except ImportError as err:
+        raise ImportError(
+            "torch and sentence-transformers are required to export ONNX embeddings. "
+            "Install with: pip install sentence-transformers"
+        ) from err
+
+    path = Path(output_dir)
+    path.mkdir(parents=True, exist_ok=True)
+
+    logger.info("exporting_onnx_model", model=model_name, output_dir=str(path))
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0]
+    auto_model = transformer.auto_model.eval()
+    tokenizer = transformer.tokenizer
+
+    pooling = "mean"
+    if len(st_model) > 1 and hasattr(st_model[1], "get_pooling_mode_str"):
+        pooling = "cls" if st_model[1].get_pooling_mode_str() == "cls" else "mean"
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [
+        name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample
+    ]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    class _Encoder(torch.nn.Module):
+        """Map positional ONNX inputs to transformer keyword arguments."""
+
+        def __init__(self) -> None:
+            super().__init__()
+            self.model = auto_model
+
+        def forward(self, *inputs: "torch.Tensor") -> "torch.Tensor":
+            return self.model(**dict(zip(input_names, inputs, strict=True)))[0]
+
+    export_kwargs: dict = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        export_kwargs["dynamo"] = False  # TorchScript exporter handles dynamic_axes
+
+    with torch.no_grad():
+        torch.onnx.export(
+            _Encoder(),
+            tuple(sample[name] for name in input_names),
+            str(path / ONNX_MODEL_FILE),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            **export_kwargs,
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            str(path / ONNX_MODEL_FILE),
+            str(path / ONNX_QUANTIZED_MODEL_FILE),
+            weight_type=QuantType.QInt8,
+        )
+
+    tokenizer.save_pretrained(str(path))
+    (path / EMBEDDING_CONFIG_FILE).write_text(
+        json.dumps(
+            {
+                "model_name": model_name,
+                "max_seq_length": st_model.max_seq_length,
+                "dimensions": st_model.get_sentence_embedding_dimension(),
+                "pooling": pooling,
+            }
+        )
+    )
+
+    logger.info("onnx_model_exported", output_dir=str(path), quantized=quantize)
+    return path
@@ -0,0 +1,143 @@
+"""Parent sections for parent-child retrieval, stored in SQLite."""
+
+import json
+import sqlite3
+from pathlib import Path
+
+import structlog
+
+from src.config import settings
+from src.schemas.rag import DocumentChunk
+
+logger = structlog.get_logger()
+
+# Ids per query, below SQLite's bound parameter limit
+_LOOKUP_BATCH_SIZE = 500
+
+
+class ParentStore:
+    """
+    SQLite-based store of the parent sections of embedded child chunks.
+
+    Only child chunks go into the vector database; each carries the id of its
+    parent in its metadata, and the parents' text is looked up here by id when
+    building the final context.
+    """
+
+    def __init__(self, db_path: str | None = None) -> None:
+        """
+        Initialize parent store.
+
+        Args:
+            db_path: Path to SQLite database file (default: ./data/parents.db)
+        """
+        if db_path is None:
+            data_dir = Path(settings.chroma_path).parent
+            data_dir.mkdir(parents=True, exist_ok=True)
+            db_path = str(data_dir / "parents.db")
+
+        self.db_path = db_path
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_database(self) -> None:
+        """Initialize database schema."""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS parents (
+                parent_id TEXT PRIMARY KEY,
+                doc_id TEXT NOT NULL,
+                content TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_parents_doc_id ON parents (doc_id)")
+
+        conn.commit()
+        conn.close()
+        logger.info("parent_store_initialized", db_path=self.db_path)
+
+    def add_parents(self, doc_id: str, parents: list[DocumentChunk]) -> None:
+        """
+        Store parent sections of a document.
+
+        Args:
+            doc_id: Document identifier
+            parents: Parent chunks, with their chunk_id set to the parent id
+        """
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO parents (parent_id, doc_id, content, metadata) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (parent.chunk_id, doc_id, parent.content, json.dumps(parent.metadata))
+                    for parent in parents
+                ],
+            )
+        conn.close()
+        logger.debug("parents_saved", doc_id=doc_id, parents=len(parents))
+
+    def get_parents(self, parent_ids: list[str]) -> dict[str, DocumentChunk]:
+        """
+        Look up parent sections by id.
+
+        Args:
+            parent_ids: Parent identifiers
+
+        Returns:
+            Parent chunk by id (unknown ids are left out)
+        """
+        parents: dict[str, DocumentChunk] = {}
+        conn = self._connect()
+        for start in range(0, len(parent_ids), _LOOKUP_BATCH_SIZE):
+            batch = parent_ids[start : start + _LOOKUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                "SELECT parent_id, content, metadata FROM parents "
+                f"WHERE parent_id IN ({placeholders})",
+                batch,
+            ).fetchall()
+            for parent_id, content, metadata_json in rows:
+                metadata = json.loads(metadata_json)
+                parents[parent_id] = DocumentChunk(
+                    content=content,
+                    metadata=metadata,
+                    chunk_id=parent_id,
+                    source=metadata.get("source"),
+                    position=metadata.get("position"),
+                )
+        conn.close()
+        return parents
+
+    def get_document(self, doc_id: str) -> list[DocumentChunk]:
+        """
+        Get all parent sections of a document.
+
+        Args:
+            doc_id: Document identifier
+
+        Returns:
+            Parent chunks of the document
+        """
+        conn = self._connect()
+        rows = conn.execute("SELECT parent_id FROM parents WHERE doc_id = ?", (doc_id,)).fetchall()
+        conn.close()
+        parents = self.get_parents([row[0] for row in rows])
+        return list(parents.values())
+
+    def delete_document(self, doc_id: str) -> None:
+        """
+        Delete all parent sections of a document.
+
+        Args:
+            doc_id: Document identifier
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM parents WHERE doc_id = ?", (doc_id,))
+        conn.close()
@@ -1,8 +1,14 @@
 """RAG retriever with hybrid search and re-ranking."""
 
-from typing import Literal
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Literal
 
 import chromadb
+import numpy as np
 import structlog
 from chromadb.config import Settings as ChromaSettings
 
@@ -10,12 +16,36 @@ from src.config import settings
 from src.observability.tracing import get_tracer
 from src.rag.cache import QueryCache
 from src.rag.embeddings import EmbeddingService
+from src.rag.hits import HIT_INCLUDE, HitFields, SearchHit, to_retrieval_result
+from src.rag.metadata_index import WRITE_TOKEN_KEY, MetadataIndex, normalize_where
+from src.rag.parent_store import ParentStore
 from src.rag.query_expansion import QueryExpander
 from src.rag.reranker import Reranker
+from src.rag.sharding import ShardedCollection, physical_collections, shard_name
+from src.rag.versioning import (
+    TAG_DIMENSIONS,
+    TAG_MODEL,
+    CollectionAliases,
+    MigrationLease,
+    ReembedMigration,
+    embedding_tag,
+    service_for_tag,
+    shadow_collection_name,
+    tag_matches,
+    write_collection_tag,
+)
 from src.schemas.rag import DocumentChunk, RetrievalResult
 
 logger = structlog.get_logger()
 
+# Fields of a single-query ChromaDB result produced by the retriever's own searches
+_QUERY_FIELDS = ("ids", "distances", "documents", "metadatas")
+
+# Write tokens last read or written by this process, shared by all its retrievers:
+# (chroma path, physical collection name) -> (token, time.monotonic() of the read)
+_write_tokens: dict[tuple[str, str], tuple[str | None, float]] = {}
+_write_tokens_lock = threading.Lock()
+
 
 class RAGRetriever:
     """Retriever for semantic search with vector database."""
@@ -24,6 +54,7 @@ class RAGRetriever:
         self,
         collection_name: str = "documents",
         embedding_service: EmbeddingService | None = None,
+        parent_store: ParentStore | None = None,
     ) -> None:
         """
         Initialize RAG retriever.
@@ -31,26 +62,53 @@ class RAGRetriever:
         Args:
             collection_name: Name of the ChromaDB collection
             embedding_service: Embedding service instance
+            parent_store: Store of parent sections for parent-child retrieval
+                (default: created when settings.parent_child_enabled)
         """
         self.collection_name = collection_name
         self.embedding_service = embedding_service or EmbeddingService()
 
+        self.parent_store: ParentStore | None = parent_store
+        if self.parent_store is None and settings.parent_child_enabled:
+            self.parent_store = ParentStore()
+
         # Initialize ChromaDB client
+        self.chroma_path = settings.chroma_path
         self.client = chromadb.PersistentClient(
-            path=settings.chroma_path,
+            path=self.chroma_path,
             settings=ChromaSettings(anonymized_telemetry=False),
         )
 
-        # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name=collection_name,
-            metadata={"hnsw:space": "cosine"},
+        # Resolve the logical name to the physical collection(s) currently serving it
+        self.aliases = CollectionAliases(self.client)
+        self.shard_count = max(1, settings.shard_count)
+        self.collection = self._combine(
+            [
+                self.client.get_or_create_collection(
+                    name=self.aliases.resolve(name),
+                    metadata={"hnsw:space": "cosine"},
+                )
+                for name in self._logical_names()
+            ],
+            collection_name,
         )
 
+        # Embedding model versioning: writes are serialized so a migration can switch over
+        self._write_lock = threading.RLock()
+        self.migration: ReembedMigration | None = None
+        self.target_embedding_service = self.embedding_service
+        self.stored_embedding_tag: dict[str, Any] | None = None
+        self._check_embedding_compatibility()
+
         # BM25 index (lazy initialization)
         self._bm25_index: dict[str, str] | None = None
         self._bm25_model = None
 
+        # Metadata index for filtered searches (built on first filtered search),
+        # and the collection's write token it matches
+        self.metadata_index = MetadataIndex()
+        self._index_token: str | None = None
+
         # Re-ranker (lazy initialization)
         self.reranker: Reranker | None = None
 
@@ -68,25 +126,46 @@ class RAGRetriever:
         self._bm25_index: dict[str, list[str]] | None = None
         self._bm25_model = None
 
-    def add_documents(self, chunks: list[DocumentChunk]) -> None:
+    def _logical_names(self) -> list[str]:
+        """Logical names of the collections holding the chunks, one per shard."""
+        if self.shard_count == 1:
+            return [self.collection_name]
+        return [shard_name(self.collection_name, i) for i in range(self.shard_count)]
+
+    def _combine(self, collections: list[Any], name: str) -> Any:
+        """Wrap per-shard collections in a sharded collection (a single one is used as is)."""
+        if len(collections) == 1:
+            return collections[0]
+        return ShardedCollection(collections, name=name)
+
+    def add_documents(
+        self,
+        chunks: list[DocumentChunk],
+        embeddings: np.ndarray | None = None,
+    ) -> None:
         """
         Add document chunks to the vector database.
 
         Args:
             chunks: List of document chunks to add
+            embeddings: Optional precomputed float32 matrix, one row per chunk
         """
         if not chunks:
             return
 
+        if embeddings is not None and len(embeddings) != len(chunks):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(chunks)} chunks")
+
         # Generate embeddings for chunks that don't have them
         texts_to_embed: list[str] = []
         indices_to_embed: list[int] = []
 
         for idx, chunk in enumerate(chunks):
-            if chunk.embedding is None:
+            if embeddings is None and chunk.embedding is None:
                 texts_to_embed.append(chunk.content)
                 indices_to_embed.append(idx)
 
+        generated: np.ndarray | None = None
         if texts_to_embed:
             total = len(texts_to_embed)
             logger.info(
@@ -95,55 +174,58 @@ class RAGRetriever:
                 provider=self.embedding_service.provider,
             )
 
-            # Use generate_embeddings to respect embedding_provider setting
-            from src.schemas.rag import EmbeddingRequest
-
-            embedding_request = EmbeddingRequest(texts=texts_to_embed)
-            embedding_response = self.embedding_service.generate_embeddings(embedding_request)
-            embeddings = embedding_response.embeddings
+            # float32 fast path: vectors go from the model to ChromaDB without lists
+            generated = self.embedding_service.embed_batch(texts_to_embed)
 
             logger.info(
                 "embeddings_generated",
-                count=len(embeddings),
+                count=len(generated),
                 provider=self.embedding_service.provider,
             )
 
-            for embed_idx, chunk_idx in enumerate(indices_to_embed):
-                chunks[chunk_idx].embedding = embeddings[embed_idx]
+        # Assemble one contiguous matrix in chunk order
+        if embeddings is not None:
+            vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+        elif generated is not None and len(indices_to_embed) == len(chunks):
+            vectors = generated
+        else:
+            dimensions = (
+                generated.shape[1] if generated is not None else len(chunks[0].embedding or [])
+            )
+            vectors = np.empty((len(chunks), dimensions), dtype=np.float32)
+            for idx, chunk in enumerate(chunks):
+                if chunk.embedding is not None:
+                    vectors[idx] = chunk.embedding
+            if generated is not None:
+                vectors[indices_to_embed] = generated
 
         # Prepare data for ChromaDB and add in batches to avoid size limits
         # ChromaDB has a max batch size limit, so we process in smaller chunks
         batch_size = settings.chroma_batch_size
 
-        for batch_start in range(0, len(chunks), batch_size):
-            batch_end = min(batch_start + batch_size, len(chunks))
-            batch_chunks = chunks[batch_start:batch_end]
+        with self._tracked_write():
+            for batch_start in range(0, len(chunks), batch_size):
+                batch_end = min(batch_start + batch_size, len(chunks))
+                batch_chunks = chunks[batch_start:batch_end]
 
-            ids: list[str] = []
-            embeddings_list: list[list[float]] = []
-            documents: list[str] = []
-            metadatas: list[dict] = []
+                ids = [
+                    chunk.chunk_id or f"{chunk.source}_{chunk.position}" for chunk in batch_chunks
+                ]
+                documents = [chunk.content for chunk in batch_chunks]
+                metadatas = [chunk.metadata for chunk in batch_chunks]
 
-            for chunk in batch_chunks:
-                if chunk.embedding is None:
-                    continue
-
-                chunk_id = chunk.chunk_id or f"{chunk.source}_{chunk.position}"
-                ids.append(chunk_id)
-                embeddings_list.append(chunk.embedding)
-                documents.append(chunk.content)
-                metadatas.append(chunk.metadata)
-
-            if ids:
                 logger.info(
                     "adding_chunks_to_chromadb", batch_size=len(ids), total_chunks=len(chunks)
                 )
                 self.collection.add(
                     ids=ids,
-                    embeddings=embeddings_list,
+                    embeddings=vectors[batch_start:batch_end],
                     documents=documents,
                     metadatas=metadatas,
                 )
+                self.metadata_index.add(ids, metadatas)
+                if self.migration and self.migration.active:
+                    self.migration.record_write(ids)
 
         logger.info("all_chunks_added_to_chromadb", total_chunks=len(chunks))
 
@@ -151,6 +233,339 @@ class RAGRetriever:
         self._bm25_index = None
         self._bm25_model = None
 
+    def delete_chunks(self, chunk_ids: list[str]) -> None:
+        """
+        Delete chunks from the vector database.
+
+        Args:
+            chunk_ids: Ids of the chunks to delete
+        """
+        if not chunk_ids:
+            return
+
+        with self._tracked_write():
+            self.collection.delete(ids=chunk_ids)
+            self.metadata_index.remove(chunk_ids)
+
+        self._bm25_index = None
+        self._bm25_model = None
+
+    def _token_collection_name(self) -> str:
+        return physical_collections(self.collection)[0].name
+
+    def _set_write_token(self) -> str:
+        token = uuid.uuid4().hex
+        name = self._token_collection_name()
+        # A handle's metadata is read once, when the handle is fetched
+        write_collection_tag(self.client.get_collection(name=name), {WRITE_TOKEN_KEY: token})
+        with _write_tokens_lock:
+            _write_tokens[(self.chroma_path, name)] = (token, time.monotonic())
+        return token
+
+    def _read_write_token(self, max_age: float = 0.0) -> str | None:
+        """
+        Read the collection's write token.
+
+        Args:
+            max_age: Seconds a token cached by this process may be old instead
+                of reading it from ChromaDB (0 = always read)
+
+        Returns:
+            The current write token, None if the collection was never written
+        """
+        name = self._token_collection_name()
+        with _write_tokens_lock:
+            cached = _write_tokens.get((self.chroma_path, name))
+        if cached is not None and time.monotonic() - cached[1] < max_age:
+            return cached[0]
+
+        token = (self.client.get_collection(name=name).metadata or {}).get(WRITE_TOKEN_KEY)
+        with _write_tokens_lock:
+            _write_tokens[(self.chroma_path, name)] = (token, time.monotonic())
+        return token
+
+    @contextmanager
+    def _tracked_write(self) -> Iterator[None]:
+        """
+        Serialize a write and change the collection's write token after it.
+
+        Other retrievers of the collection (other processes, or reopened tenant
+        namespaces) see the token change and rebuild their metadata index. This
+        retriever keeps its index, updated in place by the write, unless the
+        token shows a write by someone else since the index was built.
+        """
+        with self._write_lock:
+            before = self._read_write_token()
+            if before != self._index_token:
+                self.metadata_index.invalidate()
+            try:
+                yield
+            finally:
+                # A write by someone else racing this one changed the token
+                if self._read_write_token() != before:
+                    self.metadata_index.invalidate()
+                self._index_token = self._set_write_token()
+
+    def upsert_vectors(
+        self,
+        ids: list[str],
+        embeddings: np.ndarray,
+        documents: list[str],
+        metadatas: list[dict | None],
+    ) -> None:
+        """
+        Insert or replace chunks whose vectors are already computed (e.g. from a snapshot).
+
+        Args:
+            ids: Chunk ids
+            embeddings: float32 matrix, one row per chunk
+            documents: Chunk texts
+            metadatas: Chunk metadata, one per id
+        """
+        if not ids:
+            return
+
+        with self._tracked_write():
+            self.collection.upsert(
+                ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas
+            )
+            self.metadata_index.add(ids, metadatas)
+            if self.migration and self.migration.active:
+                self.migration.record_write(ids)
+
+        self._bm25_index = None
+        self._bm25_model = None
+
+    def invalidate_indexes(self) -> None:
+        """Drop the in-memory metadata and BM25 indexes; they are rebuilt on next use."""
+        with self._write_lock:
+            self.metadata_index.invalidate()
+            self._bm25_index = None
+            self._bm25_model = None
+
+    def existing_ids(self, chunk_ids: list[str]) -> set[str]:
+        """
+        Return which of the given chunk ids are already stored.
+
+        Args:
+            chunk_ids: Chunk ids to look up
+
+        Returns:
+            Subset of ids present in the collection
+        """
+        if not chunk_ids:
+            return set()
+        return set(self.collection.get(ids=list(set(chunk_ids)), include=[])["ids"])
+
+    def update_metadata(self, chunk_ids: list[str], metadatas: list[dict]) -> None:
+        """
+        Replace the metadata of stored chunks without re-embedding them.
+
+        Args:
+            chunk_ids: Ids of the chunks to update
+            metadatas: New metadata, one per id
+        """
+        if not chunk_ids:
+            return
+
+        with self._tracked_write():
+            self.collection.update(ids=chunk_ids, metadatas=metadatas)
+            if self.metadata_index.built:
+                # ChromaDB merges updated metadata into the stored one
+                stored = self.collection.get(ids=chunk_ids, include=["metadatas"])
+                self.metadata_index.add(stored["ids"], stored["metadatas"])
+            if self.migration and self.migration.active:
+                self.migration.record_write(chunk_ids)
+
+    def _check_embedding_compatibility(self) -> None:
+        """
+        Compare the collection's embedding tag with the configured embedding service.
+
+        Untagged (legacy) collections are tagged when empty or when their stored vector
+        dimension matches. On a mismatch, queries keep using a service for the stored
+        model when one can be built, and a re-embedding migration is started if enabled.
+        """
+        tag = embedding_tag(self.embedding_service)
+        metadata = self.collection.metadata or {}
+
+        if TAG_MODEL in metadata:
+            if tag_matches(metadata, tag):
+                return
+            stored: dict[str, Any] = {key: metadata.get(key) for key in tag}
+        else:
+            stored_dimensions = self._stored_dimensions()
+            if stored_dimensions is None or stored_dimensions == tag[TAG_DIMENSIONS]:
+                write_collection_tag(self.collection, tag)
+                logger.info("collection_embedding_tagged", collection=self.collection.name, **tag)
+                return
+            stored = {TAG_DIMENSIONS: stored_dimensions}
+
+        self.stored_embedding_tag = stored
+        logger.warning(
+            "embedding_model_mismatch",
+            collection=self.collection.name,
+            stored=stored,
+            configured=tag,
+        )
+
+        # Keep answering queries in the stored vector space until the migration finishes
+        if stored.get(TAG_MODEL):
+            try:
+                self.embedding_service = service_for_tag(
+                    stored,
+                    local_provider=self.target_embedding_service.provider
+                    if self.target_embedding_service.provider != "openai"
+                    else "local",
+                )
+            except Exception as e:
+                logger.error("stored_embedding_service_unavailable", error=str(e))
+
+        if settings.embedding_migration_auto_start:
+            self.start_reembed_migration()
+
+    def _stored_dimensions(self) -> int | None:
+        """Return the dimension of stored vectors, or None for an empty collection."""
+        sample = self.collection.get(limit=1, include=["embeddings"])
+        embeddings = sample.get("embeddings")
+        if embeddings is None or len(embeddings) == 0:
+            return None
+        return len(embeddings[0])
+
+    def start_reembed_migration(self) -> ReembedMigration | None:
+        """
+        Start re-embedding the collection with the configured embedding service.
+
+        Chunks are copied into a shadow collection in the background; queries keep
+        hitting the current collection until the switch-over.
+
+        Returns:
+            The running migration, or None if the collection is already up to date
+            or another retriever (e.g. in another API worker) is migrating it
+        """
+        with self._write_lock:
+            if self.migration and self.migration.active:
+                return self.migration
+
+            tag = embedding_tag(self.target_embedding_service)
+            if tag_matches(self.collection.metadata, tag):
+                return None
+
+            # Shadows of a migration running elsewhere must not be dropped below
+            lease = MigrationLease(
+                self.aliases, self.collection_name, settings.embedding_migration_lease_seconds
+            )
+            if not lease.acquire():
+                logger.info("reembed_migration_running_elsewhere", collection=self.collection_name)
+                return None
+
+            try:
+                shadows = []
+                for name in self._logical_names():
+                    shadow_name = shadow_collection_name(name, tag)
+                    try:  # Leftover of an interrupted run
+                        self.client.delete_collection(name=shadow_name)
+                    except Exception:
+                        pass
+                    shadows.append(
+                        self.client.create_collection(
+                            name=shadow_name,
+                            metadata={"hnsw:space": "cosine", **tag},
+                        )
+                    )
+                shadow = self._combine(shadows, shadow_collection_name(self.collection_name, tag))
+            except Exception:
+                lease.release()
+                raise
+
+            self.migration = ReembedMigration(
+                source=self.collection,
+                shadow=shadow,
+                target_service=self.target_embedding_service,
+                switch=self._switch_to_shadow,
+                batch_size=settings.embedding_migration_batch_size,
+                throttle_seconds=settings.embedding_migration_throttle_seconds,
+                lease=lease,
+            )
+            self.migration.start()
+            return self.migration
+
+    def _switch_to_shadow(self, migration: ReembedMigration) -> None:
+        """Re-embed chunks written during the copy, then atomically swap collections."""
+        with self._write_lock:
+            source, shadow = migration.source, migration.shadow
+            source_ids = set(source.get(include=[])["ids"])
+            shadow_ids = set(shadow.get(include=[])["ids"])
+
+            stale = list(shadow_ids - source_ids)
+            if stale:
+                shadow.delete(ids=stale)
+
+            pending = sorted((source_ids - shadow_ids) | (migration.dirty & source_ids))
+            for start in range(0, len(pending), migration.batch_size):
+                page = source.get(
+                    ids=pending[start : start + migration.batch_size],
+                    include=["documents", "metadatas"],
+                )
+                documents = [doc or "" for doc in page["documents"]]
+                shadow.upsert(
+                    ids=page["ids"],
+                    embeddings=migration.target_service.embed_batch(documents),
+                    documents=documents,
+                    metadatas=page["metadatas"],
+                )
+
+            for name, collection in zip(
+                self._logical_names(), physical_collections(shadow), strict=True
+            ):
+                self.aliases.set(name, collection.name)
+            self.collection = shadow
+            self.embedding_service = migration.target_service
+            self.stored_embedding_tag = None
+            self.invalidate_indexes()
+            if self.query_cache:
+                self.query_cache.clear()
+
+            logger.info(
+                "embedding_collection_switched",
+                collection=self.collection_name,
+                previous=source.name,
+                current=shadow.name,
+                synced=len(pending),
+                removed=len(stale),
+            )
+            for collection in physical_collections(source):
+                self.client.delete_collection(name=collection.name)
+
+    def migration_status(self) -> dict[str, Any]:
+        """
+        Describe the embedding tag of the collection and any re-embedding migration.
+
+        Returns:
+            Status dictionary for the health/debug endpoint
+        """
+        return {
+            "collection": self.collection.name,
+            "embedding": embedding_tag(self.embedding_service),
+            "configured_embedding": embedding_tag(self.target_embedding_service),
+            "stored_embedding": self.stored_embedding_tag,
+            "migration": self.migration.status() if self.migration else None,
+        }
+
+    def close(self) -> None:
+        """
+        Release what the retriever holds in memory and in background threads.
+
+        Stops a running re-embedding migration (the next one drops its shadow)
+        and drops the metadata and BM25 indexes, so a retriever still referenced
+        after closing rebuilds them from the collection instead of serving a
+        stale copy.
+        """
+        migration = self.migration
+        if migration is not None and migration.active:
+            migration.stop()
+        self.invalidate_indexes()
+        logger.info("retriever_closed", collection=self.collection_name)
+
     def _init_bm25(self) -> None:
         """Initialize BM25 index from collection documents."""
         if self._bm25_index is not None and self._bm25_model is not None:
@@ -387,7 +802,7 @@ class RAGRetriever:
         tracer = get_tracer(__name__)
         span = None
         if tracer:
-            span = tracer.start_as_current_span("rag.retrieve")
+            span = tracer.start_span("rag.retrieve")
             span.set_attribute("query", query)
             span.set_attribute("search_type", search_type or "vector")
             span.set_attribute("top_k", top_k)
@@ -488,6 +903,10 @@ class RAGRetriever:
                 )
                 logger.info("reranking_completed", reranked_count=len(reranked_chunks))
 
+            # Swap matched child chunks for their parent sections
+            if self.parent_store is not None and result.chunks:
+                result = self._expand_parents(result)
+
             # Cache result if enabled (use original query for cache key)
             if self.query_cache:
                 self.query_cache.set(original_query, top_k, score_threshold, result, search_type, alpha)
@@ -510,142 +929,277 @@ class RAGRetriever:
                 span.end()
             raise
 
-    def _vector_search(
+    def _expand_parents(self, result: RetrievalResult) -> RetrievalResult:
+        """
+        Replace child chunks with their parent sections, fetched in one batch.
+
+        Children of the same parent collapse into one result at the rank (and
+        score) of the best child. Chunks without a stored parent are kept as is.
+
+        Args:
+            result: Retrieval result over child chunks
+
+        Returns:
+            Retrieval result over parent sections
+        """
+        parent_ids = list(
+            dict.fromkeys(
+                chunk.metadata["parent_id"]
+                for chunk in result.chunks
+                if chunk.metadata.get("parent_id")
+            )
+        )
+        if not parent_ids:
+            return result
+        parents = self.parent_store.get_parents(parent_ids)
+
+        chunks: list[DocumentChunk] = []
+        scores: list[float] = []
+        expanded: set[str] = set()
+        for chunk, score in zip(result.chunks, result.scores, strict=True):
+            parent_id = chunk.metadata.get("parent_id")
+            parent = parents.get(parent_id) if parent_id else None
+            if parent is None:
+                chunks.append(chunk)
+                scores.append(score)
+            elif parent_id not in expanded:
+                expanded.add(parent_id)
+                chunks.append(
+                    parent.model_copy(
+                        update={"metadata": {**parent.metadata, "matched_chunk_id": chunk.chunk_id}}
+                    )
+                )
+                scores.append(score)
+
+        logger.info("parents_expanded", children=len(result.chunks), parents=len(expanded))
+        return RetrievalResult(
+            chunks=chunks,
+            scores=scores,
+            query=result.query,
+            total_results=len(chunks),
+        )
+
+    def search(
         self,
         query: str,
         top_k: int = 5,
-        score_threshold: float = 0.7,
+        score_threshold: float = 0.0,
         filter_metadata: dict | None = None,
-    ) -> RetrievalResult:
+        fields: HitFields = "full",
+    ) -> list[SearchHit]:
         """
-        Perform vector search (original retrieve logic).
+        Vector search returning lightweight hits.
+
+        Only the fields asked for are read from ChromaDB, and no Pydantic
+        objects are built, so callers that need ids and scores (or a snippet)
+        pay for nothing more. Query expansion, re-ranking, parent expansion and
+        the query cache are left to retrieve().
 
         Args:
             query: Search query
             top_k: Number of results to return
-            score_threshold: Minimum similarity score
+            score_threshold: Minimum similarity score (0.0 keeps every result)
             filter_metadata: Optional metadata filters
+            fields: "ids" (ids and scores), "snippet" (plus the start of the
+                content, settings.search_snippet_chars long) or "full" (content
+                and metadata)
 
         Returns:
-            Retrieval result with chunks and scores
+            Search hits, best first
         """
-        # Generate query embedding
-        query_embedding = self.embedding_service.embed_text(query)
+        query_embedding = self.embedding_service.embed_query(query)
         logger.debug("query_embedding_generated", embedding_dim=len(query_embedding))
 
-        # Query ChromaDB
-        where = filter_metadata if filter_metadata else None
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k,
-            where=where,
+        # Query ChromaDB (or score a small filtered candidate set exactly)
+        results = self._query_collection(
+            query_embedding, top_k, filter_metadata, include=HIT_INCLUDE[fields]
         )
+        ids = results["ids"][0] if results.get("ids") else []
+        distances = results["distances"][0] if results.get("distances") else []
+        documents = results["documents"][0] if results.get("documents") else None
+        metadatas = results["metadatas"][0] if results.get("metadatas") else None
+        snippet_chars = settings.search_snippet_chars if fields == "snippet" else None
+
+        logger.info("chromadb_query_results", found_ids=len(ids), requested_top_k=top_k)
+
+        hits: list[SearchHit] = []
+        for idx, chunk_id in enumerate(ids):
+            # ChromaDB returns cosine distance (0 = identical, 1 = orthogonal)
+            similarity = 1.0 - distances[idx]
+            logger.debug(
+                "retrieval_score",
+                doc_id=str(chunk_id),
+                similarity=similarity,
+                threshold=score_threshold,
+                idx=idx,
+            )
+
+            # If threshold is 0.0, include all results
+            if score_threshold > 0.0 and similarity < score_threshold:
+                continue
 
-        # Log detailed query results for debugging
-        result_ids_count = 0
-        if results.get("ids") and len(results["ids"]) > 0 and results["ids"][0]:
-            result_ids_count = len(results["ids"][0])
+            content = None
+            if documents is not None:
+                content = (documents[idx] or "")[:snippet_chars]
+            metadata = (metadatas[idx] or {}) if metadatas is not None else None
+            hits.append(SearchHit(str(chunk_id), similarity, content, metadata))
 
         logger.info(
-            "chromadb_query_results",
-            found_ids=result_ids_count,
-            requested_top_k=top_k,
-            has_ids=bool(results.get("ids")),
-            has_documents=bool(results.get("documents")),
-            has_distances=bool(results.get("distances")),
+            "retrieval_final_result",
+            chunks_returned=len(hits),
+            first_score=hits[0].score if hits else None,
         )
+        return hits
 
-        # Process results
-        chunks: list[DocumentChunk] = []
-        scores: list[float] = []
+    def _vector_search(
+        self,
+        query: str,
+        top_k: int = 5,
+        score_threshold: float = 0.7,
+        filter_metadata: dict | None = None,
+    ) -> RetrievalResult:
+        """
+        Perform vector search (original retrieve logic).
 
-        # More robust check for results
-        if (
-            results.get("ids")
-            and len(results["ids"]) > 0
-            and results["ids"][0]
-            and len(results["ids"][0]) > 0
-        ):
-            for idx, doc_id in enumerate(results["ids"][0]):
-                # ChromaDB returns cosine distance (0 = identical, 1 = orthogonal)
-                # Convert to similarity score (higher = more similar)
-                if results["distances"] and len(results["distances"][0]) > idx:
-                    distance = results["distances"][0][idx]
-                else:
-                    distance = 0.5  # Default distance if not available
-                similarity = 1.0 - distance  # Cosine distance to similarity
-
-                # Log similarity scores for debugging
-                logger.info(
-                    "retrieval_score",
-                    doc_id=str(doc_id),
-                    similarity=similarity,
-                    threshold=score_threshold,
-                    idx=idx,
-                )
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            score_threshold: Minimum similarity score
+            filter_metadata: Optional metadata filters
 
-                # Include results based on threshold
-                # If threshold is 0.0, include all results
-                # Otherwise, only include results that meet the threshold
-                should_include = False
-                if score_threshold <= 0.0:
-                    should_include = True
-                elif similarity >= score_threshold:
-                    should_include = True
-
-                if not should_include:
-                    logger.debug(
-                        "skipping_result_below_threshold",
-                        similarity=similarity,
-                        threshold=score_threshold,
-                    )
-                    continue
+        Returns:
+            Retrieval result with chunks and scores
+        """
+        hits = self.search(query, top_k, score_threshold, filter_metadata, fields="full")
+        return to_retrieval_result(hits, query)
 
-                # Safely extract content and metadata
-                content = ""
-                if results.get("documents") and len(results["documents"]) > 0:
-                    if len(results["documents"][0]) > idx:
-                        content = results["documents"][0][idx] or ""
+    def _filter_candidates(self, filter_metadata: dict) -> list[str] | None:
+        """
+        Resolve a metadata filter to chunk ids with the metadata index.
 
-                metadata = {}
-                if results.get("metadatas") and len(results["metadatas"]) > 0:
-                    if len(results["metadatas"][0]) > idx:
-                        metadata = results["metadatas"][0][idx] or {}
+        The index is (re)built on first use and whenever the collection's write
+        token changed since, i.e. after writes by another retriever or process.
 
-                # Find embedding if available (ChromaDB may not return embeddings by default)
-                embedding = None
-                if results.get("embeddings") and len(results["embeddings"]) > 0:
-                    if len(results["embeddings"][0]) > idx:
-                        embedding = results["embeddings"][0][idx]
+        Args:
+            filter_metadata: ChromaDB where filter
 
-                chunk = DocumentChunk(
-                    content=content,
-                    metadata=metadata,
-                    chunk_id=str(doc_id),
-                    source=metadata.get("source"),
-                    position=metadata.get("position"),
-                    embedding=embedding,
-                )
-                chunks.append(chunk)
-                scores.append(similarity)
+        Returns:
+            Matching chunk ids, or None if the index is disabled or cannot resolve the filter
+        """
+        if not settings.metadata_index_enabled:
+            return None
+        with self._write_lock:
+            # Writes of this process update the cached token as they happen
+            token = self._read_write_token(max_age=settings.write_token_max_age)
+            if not self.metadata_index.built or token != self._index_token:
+                self.metadata_index.build(self.collection)
+                self._index_token = token
+        return self.metadata_index.resolve(filter_metadata)
+
+    def _query_collection(
+        self,
+        query_embedding: Any,
+        top_k: int,
+        filter_metadata: dict | None,
+        include: list[str],
+    ) -> dict:
+        """
+        Find the nearest chunks, pre-filtering through the metadata index.
 
-        logger.info(
-            "retrieval_final_result",
-            chunks_returned=len(chunks),
-            scores_count=len(scores),
-            first_score=scores[0] if scores else None,
-        )
+        Small candidate sets are scored exactly (brute-force cosine over their
+        stored vectors), which is both faster and more accurate than a filtered
+        HNSW search that has to walk past non-matching neighbours. Larger sets
+        go to ChromaDB with the filter, over-fetching to make up for the recall
+        the filtered graph search loses.
 
-        return RetrievalResult(
-            chunks=chunks,
-            scores=scores,
-            query=query,
-            total_results=len(chunks),
+        Args:
+            query_embedding: Query vector
+            top_k: Number of results
+            filter_metadata: Optional ChromaDB where filter
+            include: ChromaDB fields to return ("distances" among them)
+
+        Returns:
+            ChromaDB query result for the single query
+        """
+        if not filter_metadata:
+            return self.collection.query(
+                query_embeddings=[query_embedding], n_results=top_k, include=include
+            )
+
+        candidates = self._filter_candidates(filter_metadata)
+        where = normalize_where(filter_metadata)
+        if candidates is None:
+            return self.collection.query(
+                query_embeddings=[query_embedding], n_results=top_k, where=where, include=include
+            )
+        if len(candidates) <= settings.prefilter_exact_max:
+            logger.debug("prefilter_exact_search", candidates=len(candidates), top_k=top_k)
+            return self._exact_query(query_embedding, candidates, top_k, include)
+
+        n_results = min(top_k * max(1, settings.prefilter_overfetch), len(candidates))
+        logger.debug("prefilter_ann_search", candidates=len(candidates), n_results=n_results)
+        results = self.collection.query(
+            query_embeddings=[query_embedding], n_results=n_results, where=where, include=include
         )
+        for field in _QUERY_FIELDS:
+            if results.get(field):
+                results[field] = [results[field][0][:top_k]]
+        return results
+
+    def _exact_query(
+        self, query_embedding: Any, candidates: list[str], top_k: int, include: list[str]
+    ) -> dict:
+        """
+        Rank candidate chunks by exact cosine distance to the query.
+
+        Args:
+            query_embedding: Query vector
+            candidates: Ids of the chunks to score
+            top_k: Number of results
+            include: ChromaDB fields to return for the top chunks
+
+        Returns:
+            ChromaDB-shaped query result
+        """
+        if not candidates:
+            return {field: [[]] for field in _QUERY_FIELDS}
+        stored = self.collection.get(ids=candidates, include=["embeddings"])
+        ids = stored["ids"]
+        if not ids:  # Deleted since the index was read
+            return {field: [[]] for field in _QUERY_FIELDS}
+
+        vectors = np.asarray(stored["embeddings"], dtype=np.float32)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+        similarities = (vectors @ query) / np.where(norms > 0, norms, 1.0)
+
+        k = min(top_k, len(ids))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top], kind="stable")]
+        top_ids = [ids[i] for i in top]
+        results: dict[str, Any] = {
+            "ids": [top_ids],
+            "distances": [[float(1.0 - similarities[i]) for i in top]],
+        }
+
+        fields = [field for field in ("documents", "metadatas") if field in include]
+        if fields:
+            # get() returns chunks in storage order
+            page = self.collection.get(ids=top_ids, include=fields)
+            position = {chunk_id: i for i, chunk_id in enumerate(page["ids"])}
+            present = [j for j, chunk_id in enumerate(top_ids) if chunk_id in position]
+            if len(present) < len(top_ids):  # Deleted between the two reads
+                for field in ("ids", "distances"):
+                    results[field] = [[results[field][0][j] for j in present]]
+            order = [position[top_ids[j]] for j in present]
+            for field in fields:
+                results[field] = [[page[field][i] for i in order]]
+        return results
 
     def delete_collection(self) -> None:
         """Delete the collection (useful for testing)."""
-        try:
-            self.client.delete_collection(name=self.collection_name)
-        except Exception:
-            pass  # Collection might not exist
+        for collection in physical_collections(self.collection):
+            try:
+                self.client.delete_collection(name=collection.name)
+            except Exception:
+                pass  # Collection might not exist
@@ -0,0 +1,335 @@
+"""Collections split across several ChromaDB collections by a hash of the chunk source."""
+
+import hashlib
+import heapq
+import re
+import threading
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any
+
+import numpy as np
+import structlog
+
+from src.config import settings
+
+logger = structlog.get_logger()
+
+# Result fields merged across shards ("distances" is handled by the query merge)
+_FIELDS = ("ids", "embeddings", "documents", "uris", "data", "metadatas")
+
+# Chroma's default query include (distances are always requested for the merge)
+_DEFAULT_QUERY_INCLUDE = ["metadatas", "documents", "distances"]
+
+_SHARD_SUFFIX = re.compile(r"_shard_(\d+)$")
+
+# Threads running shard calls, shared by every sharded collection (created on first use)
+_shard_executor: ThreadPoolExecutor | None = None
+_shard_executor_lock = threading.Lock()
+
+
+def _get_shard_executor() -> ThreadPoolExecutor:
+    global _shard_executor
+
+    with _shard_executor_lock:
+        if _shard_executor is None:
+            _shard_executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.shard_query_workers), thread_name_prefix="shard-query"
+            )
+        return _shard_executor
+
+
+def shard_name(logical_name: str, index: int) -> str:
+    """
+    Build the logical collection name of one shard.
+
+    Args:
+        logical_name: Name used by the application (e.g. "documents")
+        index: Shard number
+
+    Returns:
+        Logical shard name (resolved to a physical collection through aliases)
+    """
+    return f"{logical_name}_shard_{index}"
+
+
+def parse_shard_name(name: str, logical_name: str) -> int | None:
+    """Return the shard number of a shard name of a logical collection, or None."""
+    if not name.startswith(logical_name):
+        return None
+    match = _SHARD_SUFFIX.fullmatch(name[len(logical_name) :])
+    return int(match.group(1)) if match else None
+
+
+def shard_index(key: str, shard_count: int) -> int:
+    """
+    Map a routing key to a shard with jump consistent hashing.
+
+    Growing from N to N + 1 shards moves only about 1/(N + 1) of the keys, all of
+    them to the new shard, so a rebalance copies as little as possible.
+
+    Args:
+        key: Routing key (the chunk source, i.e. the document id)
+        shard_count: Number of shards
+
+    Returns:
+        Shard number in [0, shard_count)
+    """
+    state = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+    bucket, jump = -1, 0
+    while jump < shard_count:
+        bucket = jump
+        state = (state * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        jump = int((bucket + 1) * (float(1 << 31) / float((state >> 33) + 1)))
+    return bucket
+
+
+def routing_key(chunk_id: str, metadata: dict | None) -> str:
+    """Routing key of a chunk: its source, or its id when it has none."""
+    source = (metadata or {}).get("source")
+    return str(source) if source else chunk_id
+
+
+def physical_collections(collection: Any) -> list[Any]:
+    """List the ChromaDB collections behind a (possibly sharded) collection."""
+    if isinstance(collection, ShardedCollection):
+        return list(collection.shards)
+    return [collection]
+
+
+def _merge_results(results: list[dict]) -> dict:
+    """Concatenate get() results of several shards."""
+    merged: dict[str, Any] = {"included": results[0].get("included") if results else []}
+    for field in _FIELDS:
+        parts = [r[field] for r in results if r.get(field) is not None]
+        if field != "ids" and len(parts) < len(results):
+            merged[field] = None
+        elif field == "embeddings":
+            arrays = [np.asarray(part) for part in parts if len(part)]
+            merged[field] = np.concatenate(arrays) if arrays else np.empty((0, 0))
+        else:
+            merged[field] = [value for part in parts for value in part]
+    return merged
+
+
+class ShardedCollection:
+    """
+    A logical collection partitioned across ChromaDB collections.
+
+    Writes of new chunks go to the shard picked by the hash of their source, so
+    all chunks of a document live together. Queries fan out to every shard
+    concurrently and the per-shard top-k lists are merged by distance; lookups
+    and deletes by id or filter are sent to every shard, so chunks left on
+    another shard (e.g. after a shard count change, before a rebalance) are
+    still found. Implements the subset of the ChromaDB collection API used by
+    the retriever and the services.
+    """
+
+    def __init__(self, shards: Sequence[Any], name: str) -> None:
+        """
+        Initialize sharded collection.
+
+        Args:
+            shards: One ChromaDB collection per shard, in shard order
+            name: Logical collection name
+        """
+        if not shards:
+            raise ValueError("A sharded collection needs at least one shard")
+        self.shards = list(shards)
+        self.name = name
+
+    @property
+    def metadata(self) -> dict | None:
+        """Collection metadata (kept identical on every shard)."""
+        return self.shards[0].metadata
+
+    def modify(self, **kwargs: Any) -> None:
+        """Modify every shard (e.g. to write the embedding tag)."""
+        for shard in self.shards:
+            shard.modify(**kwargs)
+
+    def count(self) -> int:
+        """Total number of chunks across shards."""
+        return sum(self._fan_out(lambda shard: shard.count()))
+
+    def shard_for(self, chunk_id: str, metadata: dict | None) -> int:
+        """Shard number a chunk is written to."""
+        return shard_index(routing_key(chunk_id, metadata), len(self.shards))
+
+    def _fan_out(self, call: Callable[[Any], Any]) -> list[Any]:
+        """Run a call on every shard concurrently, returning results in shard order."""
+        if len(self.shards) == 1:
+            return [call(self.shards[0])]
+        return list(_get_shard_executor().map(call, self.shards))
+
+    def _route(self, ids: list[str], metadatas: list | None) -> dict[int, list[int]]:
+        """Group row positions by target shard."""
+        rows: dict[int, list[int]] = {}
+        for i, chunk_id in enumerate(ids):
+            metadata = metadatas[i] if metadatas is not None else None
+            rows.setdefault(self.shard_for(chunk_id, metadata), []).append(i)
+        return rows
+
+    def _locate(self, ids: list[str]) -> list[set[str]]:
+        """Find which of the ids each shard holds."""
+        return [
+            set(found["ids"])
+            for found in self._fan_out(lambda shard: shard.get(ids=ids, include=[]))
+        ]
+
+    @staticmethod
+    def _select(values: Any, positions: list[int]) -> Any:
+        if values is None:
+            return None
+        if isinstance(values, np.ndarray):
+            return values[positions]
+        return [values[i] for i in positions]
+
+    def _write(self, method: str, ids: list[str], **columns: Any) -> None:
+        for shard_number, positions in self._route(ids, columns.get("metadatas")).items():
+            getattr(self.shards[shard_number], method)(
+                ids=[ids[i] for i in positions],
+                **{key: self._select(values, positions) for key, values in columns.items()},
+            )
+
+    def add(self, ids: list[str], **columns: Any) -> None:
+        """Add chunks, each to the shard of its source."""
+        self._write("add", ids, **columns)
+
+    def upsert(self, ids: list[str], **columns: Any) -> None:
+        """Insert or replace chunks, removing copies held by other shards."""
+        targets = self._route(ids, columns.get("metadatas"))
+        target_of = {ids[i]: shard for shard, positions in targets.items() for i in positions}
+        for shard, held in zip(self.shards, self._locate(ids), strict=True):
+            misplaced = [
+                chunk_id for chunk_id in held if self.shards[target_of[chunk_id]] is not shard
+            ]
+            if misplaced:
+                shard.delete(ids=misplaced)
+        self._write("upsert", ids, **columns)
+
+    def update(self, ids: list[str], **columns: Any) -> None:
+        """Update chunks in place, on whichever shard holds them."""
+        position = {chunk_id: i for i, chunk_id in enumerate(ids)}
+        for shard, held in zip(self.shards, self._locate(ids), strict=True):
+            if not held:
+                continue
+            positions = [position[chunk_id] for chunk_id in ids if chunk_id in held]
+            shard.update(
+                ids=[ids[i] for i in positions],
+                **{key: self._select(values, positions) for key, values in columns.items()},
+            )
+
+    def delete(self, ids: list[str] | None = None, where: dict | None = None) -> None:
+        """Delete chunks by id or metadata filter from every shard."""
+        self._fan_out(lambda shard: shard.delete(ids=ids, where=where))
+
+    def get(
+        self,
+        ids: list[str] | None = None,
+        where: dict | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+        include: list[str] | None = None,
+    ) -> dict:
+        """
+        Get chunks from all shards, paging over the shards in order.
+
+        Args:
+            ids: Chunk ids to look up
+            where: Metadata filter
+            limit: Maximum number of chunks
+            offset: Chunks to skip, counted over the shards in order
+            include: Fields to return (ChromaDB default if None)
+
+        Returns:
+            ChromaDB get result over all shards
+        """
+        options: dict[str, Any] = {"ids": ids, "where": where}
+        if include is not None:
+            options["include"] = include
+
+        if limit is None and not offset:
+            return _merge_results(self._fan_out(lambda shard: shard.get(**options)))
+
+        # Sizes of the shards' matching sets are needed to place the page
+        if ids is None and where is None:
+            sizes = self._fan_out(lambda shard: shard.count())
+        else:
+            sizes = [
+                len(r["ids"])
+                for r in self._fan_out(lambda shard: shard.get(ids=ids, where=where, include=[]))
+            ]
+
+        skip = offset or 0
+        remaining = limit
+        results: list[dict] = []
+        for shard, size in zip(self.shards, sizes, strict=True):
+            if remaining is not None and remaining <= 0:
+                break
+            if skip >= size:
+                skip -= size
+                continue
+            results.append(shard.get(limit=remaining, offset=skip, **options))
+            if remaining is not None:
+                remaining -= len(results[-1]["ids"])
+            skip = 0
+        if not results:
+            results.append(self.shards[0].get(limit=0, **options))
+        return _merge_results(results)
+
+    def query(
+        self,
+        query_embeddings: Any,
+        n_results: int = 10,
+        where: dict | None = None,
+        include: list[str] | None = None,
+    ) -> dict:
+        """
+        Query every shard concurrently and merge their top-k lists by distance.
+
+        Each shard returns its own top n_results; a k-way merge of the sorted
+        lists yields the global top n_results.
+
+        Args:
+            query_embeddings: Query vectors
+            n_results: Results per query
+            where: Metadata filter
+            include: Fields to return (ChromaDB default if None)
+
+        Returns:
+            ChromaDB query result over all shards
+        """
+        requested = list(include) if include is not None else list(_DEFAULT_QUERY_INCLUDE)
+        shard_include = requested if "distances" in requested else [*requested, "distances"]
+        results = self._fan_out(
+            lambda shard: shard.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where=where,
+                include=shard_include,
+            )
+        )
+
+        fields = [f for f in _FIELDS if results[0].get(f) is not None]
+        merged: dict[str, Any] = dict.fromkeys(_FIELDS)
+        merged.update({f: [] for f in fields})
+        merged["distances"] = [] if "distances" in requested else None
+        merged["included"] = requested
+
+        for q in range(len(query_embeddings)):
+            ranked = heapq.merge(
+                *(
+                    [(distance, s, i) for i, distance in enumerate(result["distances"][q])]
+                    for s, result in enumerate(results)
+                )
+            )
+            top = list(islice(ranked, n_results))
+            for field in fields:
+                merged[field].append([results[s][field][q][i] for _, s, i in top])
+            if merged["distances"] is not None:
+                merged["distances"].append([distance for distance, _, _ in top])
+
+        logger.debug("sharded_query_merged", shards=len(self.shards), n_results=n_results)
+        return merged
@@ -0,0 +1,174 @@
+"""Recursive character text splitter working on index spans."""
+
+from collections.abc import Callable
+
+# Span of a text: (start, end) character offsets
+Span = tuple[int, int]
+
+
+class RecursiveTextSplitter:
+    """
+    Split text recursively by a list of literal separators.
+
+    Produces the same chunks as LangChain's ``RecursiveCharacterTextSplitter`` with
+    ``keep_separator=True`` and ``strip_whitespace=True`` (its defaults), but works
+    on ``(start, end)`` offsets into the original string: separators are located
+    with ``str.find``, pieces are never joined, and with the default length
+    function sizes and overlap are plain index arithmetic. Text is only copied once
+    per emitted chunk.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        separators: list[str] | None = None,
+        length_function: Callable[[str], int] | None = None,
+    ) -> None:
+        """
+        Initialize splitter.
+
+        Args:
+            chunk_size: Maximum size of each chunk
+            chunk_overlap: Maximum overlap between consecutive chunks
+            separators: Literal separators, tried in order (default: paragraphs,
+                lines, words, characters)
+            length_function: Size of a piece of text (default: number of characters)
+
+        Raises:
+            ValueError: If the sizes are invalid
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be > 0, got {chunk_size}")
+        if chunk_overlap < 0:
+            raise ValueError(f"chunk_overlap must be >= 0, got {chunk_overlap}")
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Got a larger chunk overlap ({chunk_overlap}) than chunk size ({chunk_size})"
+            )
+
+        self._chunk_size = chunk_size
+        self._chunk_overlap = chunk_overlap
+        self._separators = separators or ["\n\n", "\n", " ", ""]
+        self._length_function = length_function
+
+    def split_text(self, text: str) -> list[str]:
+        """
+        Split text into chunks.
+
+        Args:
+            text: Text to split
+
+        Returns:
+            Chunks in document order
+        """
+        return [text[start:end] for start, end in self.split_spans(text)]
+
+    def split_spans(self, text: str) -> list[Span]:
+        """
+        Split text into chunks, returned as offsets.
+
+        Args:
+            text: Text to split
+
+        Returns:
+            (start, end) of each chunk in ``text``, in document order
+        """
+        spans: list[Span] = []
+        self._split(text, 0, len(text), self._separators, spans)
+        return spans
+
+    def _length(self, text: str, start: int, end: int) -> int:
+        if self._length_function is None:
+            return end - start
+        return self._length_function(text[start:end])
+
+    def _split(
+        self, text: str, start: int, end: int, separators: list[str], out: list[Span]
+    ) -> None:
+        """Split text[start:end] with the first separator it contains, recursing on long pieces."""
+        separator = separators[-1]
+        remaining: list[str] = []
+        for i, candidate in enumerate(separators):
+            if not candidate:
+                separator = candidate
+                break
+            if text.find(candidate, start, end) != -1:
+                separator = candidate
+                remaining = separators[i + 1 :]
+                break
+
+        good: list[Span] = []
+        good_lengths: list[int] = []
+        for piece_start, piece_end in self._pieces(text, start, end, separator):
+            length = self._length(text, piece_start, piece_end)
+            if length < self._chunk_size:
+                good.append((piece_start, piece_end))
+                good_lengths.append(length)
+                continue
+
+            if good:
+                self._merge(text, good, good_lengths, out)
+                good, good_lengths = [], []
+            if remaining:
+                self._split(text, piece_start, piece_end, remaining, out)
+            else:
+                out.append((piece_start, piece_end))  # Unsplittable: kept as is
+
+        if good:
+            self._merge(text, good, good_lengths, out)
+
+    @staticmethod
+    def _pieces(text: str, start: int, end: int, separator: str) -> list[Span]:
+        """
+        Cut text[start:end] before each separator occurrence.
+
+        Each piece but the first starts with its separator, so the pieces tile the
+        range and merging adjacent pieces is a single slice.
+        """
+        if not separator:
+            return [(i, i + 1) for i in range(start, end)]
+
+        pieces: list[Span] = []
+        piece_start = start
+        step = len(separator)
+        found = text.find(separator, start, end)
+        while found != -1:
+            if found > piece_start:
+                pieces.append((piece_start, found))
+            piece_start = found
+            found = text.find(separator, found + step, end)
+        if end > piece_start:
+            pieces.append((piece_start, end))
+        return pieces
+
+    def _merge(self, text: str, pieces: list[Span], lengths: list[int], out: list[Span]) -> None:
+        """Merge adjacent small pieces into chunks of up to chunk_size, with overlap."""
+        # Pieces are joined with "", which a custom length function may still count
+        joiner = 0 if self._length_function is None else self._length_function("")
+        first = 0  # Current chunk is pieces[first:i]
+        total = 0
+        for i, length in enumerate(lengths):
+            if total + length + (joiner if i > first else 0) > self._chunk_size:
+                if i > first:
+                    self._emit(text, pieces[first][0], pieces[i - 1][1], out)
+                    # Drop leading pieces until the rest fits as overlap for the next chunk
+                    while total > self._chunk_overlap or (
+                        total + length + (joiner if i > first else 0) > self._chunk_size
+                        and total > 0
+                    ):
+                        total -= lengths[first] + (joiner if i - first > 1 else 0)
+                        first += 1
+            total += length + (joiner if i > first else 0)
+        if len(pieces) > first:
+            self._emit(text, pieces[first][0], pieces[-1][1], out)
+
+    @staticmethod
+    def _emit(text: str, start: int, end: int, out: list[Span]) -> None:
+        """Append text[start:end] without surrounding whitespace, unless nothing is left."""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if end > start:
+            out.append((start, end))
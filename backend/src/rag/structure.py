@@ -0,0 +1,113 @@
+"""Structural blocks (headings, paragraphs, tables, code) of parser output."""
+
+import re
+from collections.abc import Iterable, Iterator
+from typing import NamedTuple
+
+# ATX heading ("## Title"), as emitted by Docling's markdown export
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)(?:\s+#+)?\s*$")
+
+# Delimiter row under a table header ("|---|:---:|")
+_TABLE_RULE = re.compile(r"^\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?$")
+
+_FENCES = ("```", "~~~")
+
+
+class Block(NamedTuple):
+    """A structural unit of a document."""
+
+    kind: str  # "heading", "text", "table" or "code"
+    text: str
+    headings: tuple[str, ...]  # Heading path of the enclosing section, outermost first
+
+
+def iter_lines(texts: Iterable[str]) -> Iterator[str]:
+    """
+    Yield the lines of a text given in pieces that may end mid-line.
+
+    Args:
+        texts: Text pieces in document order (e.g. pages or file blocks)
+
+    Yields:
+        Lines without line breaks
+    """
+    pending = ""
+    for piece in texts:
+        lines = (pending + piece).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def parse_blocks(lines: Iterable[str]) -> Iterator[Block]:
+    """
+    Group markdown lines into blocks, tracking the heading path.
+
+    Paragraphs end at blank lines; consecutive ``|`` rows form one table and a
+    fenced code block is kept whole, blank lines included. Anything else (plain
+    text included) is paragraphs, so unstructured input still yields blocks.
+
+    Args:
+        lines: Lines of markdown, e.g. from iter_lines
+
+    Yields:
+        Blocks in document order
+    """
+    headings: list[tuple[int, str]] = []
+    buffer: list[str] = []
+    kind = "text"
+    fence: str | None = None
+
+    def path() -> tuple[str, ...]:
+        return tuple(title for _, title in headings)
+
+    for line in lines:
+        stripped = line.strip()
+
+        if fence is not None:
+            buffer.append(line)
+            if stripped.startswith(fence):
+                yield Block("code", "\n".join(buffer), path())
+                buffer, kind, fence = [], "text", None
+            continue
+
+        heading = _HEADING.match(stripped)
+        is_row = stripped.startswith("|")
+        starts_fence = stripped.startswith(_FENCES)
+        if buffer and (not stripped or heading or starts_fence or is_row != (kind == "table")):
+            yield Block(kind, "\n".join(buffer), path())
+            buffer, kind = [], "text"
+
+        if heading:
+            level = len(heading.group(1))
+            while headings and headings[-1][0] >= level:
+                headings.pop()
+            headings.append((level, heading.group(2)))
+            yield Block("heading", stripped, path())
+        elif starts_fence:
+            fence = stripped[:3]
+            buffer, kind = [line], "code"
+        elif stripped:
+            kind = "table" if is_row else "text"
+            buffer.append(line)
+
+    if buffer:
+        yield Block(kind, "\n".join(buffer), path())  # Includes an unclosed code fence
+
+
+def table_header(text: str) -> tuple[list[str], list[str]]:
+    """
+    Separate the header of a markdown table from its body rows.
+
+    Args:
+        text: Table block text
+
+    Returns:
+        (header lines, i.e. the first row and its delimiter row if any, body rows)
+    """
+    rows = text.split("\n")
+    if len(rows) > 1 and _TABLE_RULE.match(rows[1].strip()):
+        return rows[:2], rows[2:]
+    return rows[:1], rows[1:]
@@ -0,0 +1,371 @@
+"""Embedding model tagging of collections and background re-embedding migrations."""
+
+import re
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+import structlog
+
+from src.rag.embeddings import EmbeddingService
+from src.rag.migration import reembed_collection
+
+logger = structlog.get_logger()
+
+# Collection holding logical name -> physical collection name in its metadata
+ALIASES_COLLECTION = "collection_aliases"
+
+# Prefix of the alias collection keys marking a migration in progress
+MIGRATION_MARKER_PREFIX = "migration:"
+
+# Alias writes are read-modify-write on one metadata dict, shared by every retriever
+_ALIASES_LOCK = threading.Lock()
+
+# Collection metadata keys describing the vectors stored in it
+TAG_FAMILY = "embedding_family"
+TAG_MODEL = "embedding_model"
+TAG_DIMENSIONS = "embedding_dimensions"
+
+
+def embedding_tag(service: EmbeddingService) -> dict[str, Any]:
+    """
+    Describe the vector space produced by an embedding service.
+
+    The local and ONNX providers run the same model weights, so they share a family
+    and their vectors are interchangeable.
+
+    Args:
+        service: Embedding service
+
+    Returns:
+        Collection metadata entries identifying the embedding space
+    """
+    family = "openai" if service.provider == "openai" else "sentence-transformers"
+    return {
+        TAG_FAMILY: family,
+        TAG_MODEL: service.model,
+        TAG_DIMENSIONS: int(service.dimensions),
+    }
+
+
+def tag_matches(metadata: dict | None, tag: dict[str, Any]) -> bool:
+    """Check whether collection metadata carries the given embedding tag."""
+    metadata = metadata or {}
+    return all(metadata.get(key) == value for key, value in tag.items())
+
+
+def shadow_collection_name(logical_name: str, tag: dict[str, Any]) -> str:
+    """
+    Build the physical collection name for a logical collection and embedding tag.
+
+    Args:
+        logical_name: Name used by the application (e.g. "documents")
+        tag: Embedding tag of the new vectors
+
+    Returns:
+        Valid ChromaDB collection name
+    """
+    slug = re.sub(r"[^a-zA-Z0-9._-]+", "-", f"{tag[TAG_MODEL]}_{tag[TAG_DIMENSIONS]}").strip("-.")
+    return f"{logical_name}__{slug}"[:512].lower()
+
+
+class CollectionAliases:
+    """Logical-to-physical collection names, stored in ChromaDB collection metadata."""
+
+    def __init__(self, client: Any) -> None:
+        """
+        Initialize alias store.
+
+        Args:
+            client: ChromaDB client
+        """
+        self.client = client
+
+    def _collection(self) -> Any:
+        return self.client.get_or_create_collection(name=ALIASES_COLLECTION)
+
+    def resolve(self, logical_name: str) -> str:
+        """Return the physical collection name for a logical name."""
+        metadata = self._collection().metadata or {}
+        return str(metadata.get(logical_name, logical_name))
+
+    def names(self) -> list[str]:
+        """Return the logical names that have an alias."""
+        return [
+            name
+            for name in (self._collection().metadata or {})
+            if not name.startswith(MIGRATION_MARKER_PREFIX)
+        ]
+
+    def set(self, logical_name: str, physical_name: str) -> None:
+        """Point a logical name at a physical collection in one metadata write."""
+        with _ALIASES_LOCK:
+            collection = self._collection()
+            metadata = {**(collection.metadata or {}), logical_name: physical_name}
+            collection.modify(metadata=metadata)
+
+    def update(self, change: Callable[[dict], dict | None]) -> dict | None:
+        """
+        Read-modify-write the alias metadata under the alias lock.
+
+        Args:
+            change: Called with the current metadata; returns the new metadata,
+                or None to leave it unchanged
+
+        Returns:
+            The metadata written, or None if unchanged
+        """
+        with _ALIASES_LOCK:
+            collection = self._collection()
+            metadata = change(dict(collection.metadata or {}))
+            if metadata is not None:
+                collection.modify(metadata=metadata)
+            return metadata
+
+
+class MigrationLease:
+    """
+    Marker in the alias collection claiming the migration of a logical collection.
+
+    Only the holder may delete or fill the shadow collections, so a second
+    retriever for the same collection (another API worker, or a tenant reopened
+    after eviction) does not drop the shadow of a migration that is still
+    running. The holder renews the lease after every batch; a lease not renewed
+    within its TTL (e.g. after a crash) can be taken over.
+    """
+
+    def __init__(self, aliases: CollectionAliases, logical_name: str, ttl_seconds: float) -> None:
+        """
+        Initialize lease.
+
+        Args:
+            aliases: Alias store holding the marker
+            logical_name: Collection being migrated
+            ttl_seconds: Time after which an unrenewed lease expires
+        """
+        self.aliases = aliases
+        self.key = f"{MIGRATION_MARKER_PREFIX}{logical_name}"
+        self.ttl_seconds = ttl_seconds
+        self.owner = uuid.uuid4().hex
+
+    def _holder(self, metadata: dict) -> tuple[str | None, float]:
+        owner, _, renewed = str(metadata.get(self.key, "")).partition("@")
+        if not owner:
+            return None, 0.0
+        try:
+            return owner, float(renewed)
+        except ValueError:
+            return owner, 0.0
+
+    def acquire(self) -> bool:
+        """Take the lease unless another live holder has it; returns whether it is held."""
+
+        def claim(metadata: dict) -> dict | None:
+            owner, renewed = self._holder(metadata)
+            if owner not in (None, self.owner) and time.time() - renewed < self.ttl_seconds:
+                return None
+            return {**metadata, self.key: f"{self.owner}@{time.time()}"}
+
+        return self.aliases.update(claim) is not None
+
+    def renew(self) -> None:
+        """
+        Extend the lease.
+
+        Raises:
+            RuntimeError: If the lease expired and was taken over
+        """
+        if not self.acquire():
+            raise RuntimeError(f"Migration lease {self.key} was taken over by another process")
+
+    def release(self) -> None:
+        """Clear the marker if this lease still holds it."""
+
+        def drop(metadata: dict) -> dict | None:
+            if self._holder(metadata)[0] != self.owner:
+                return None
+            return {**metadata, self.key: ""}  # ChromaDB cannot drop a metadata key
+
+        self.aliases.update(drop)
+
+
+def service_for_tag(tag: dict[str, Any], local_provider: str = "local") -> EmbeddingService:
+    """
+    Build an embedding service producing vectors in the space described by a tag.
+
+    Args:
+        tag: Embedding tag read from a collection
+        local_provider: Provider used for sentence-transformers models ('local' or 'onnx')
+
+    Returns:
+        Embedding service for the tagged model and dimension
+    """
+    provider = "openai" if tag.get(TAG_FAMILY) == "openai" else local_provider
+    return EmbeddingService(
+        provider=provider,
+        model=tag[TAG_MODEL],
+        dimensions=int(tag[TAG_DIMENSIONS]),
+    )
+
+
+def write_collection_tag(collection: Any, tag: dict[str, Any]) -> None:
+    """Record an embedding tag on an existing collection."""
+    metadata = {**(collection.metadata or {}), **tag}
+    try:
+        collection.modify(metadata=metadata)
+    except ValueError:
+        # Newer ChromaDB rejects hnsw:* keys on modify (the distance is fixed at creation)
+        collection.modify(metadata={k: v for k, v in metadata.items() if not k.startswith("hnsw:")})
+
+
+class MigrationStopped(Exception):
+    """Raised inside a migration asked to stop before finishing its copy."""
+
+
+class ReembedMigration:
+    """
+    Background job re-embedding a collection into a shadow collection.
+
+    Chunks are copied in throttled batches while the source keeps serving queries.
+    When the copy is done, ``switch`` is called to reconcile late writes and
+    swap the shadow in atomically.
+    """
+
+    def __init__(
+        self,
+        source: Any,
+        shadow: Any,
+        target_service: EmbeddingService,
+        switch: Callable[["ReembedMigration"], None],
+        batch_size: int = 128,
+        throttle_seconds: float = 0.0,
+        lease: MigrationLease | None = None,
+    ) -> None:
+        """
+        Prepare a migration.
+
+        Args:
+            source: Collection currently serving queries
+            shadow: Empty collection receiving re-embedded chunks
+            target_service: Embedding service for the new vectors
+            switch: Callback performing the final sync and switch-over
+            batch_size: Chunks per batch
+            throttle_seconds: Pause between batches to leave CPU/API quota for traffic
+            lease: Acquired lease of the collection, renewed per batch and released at the end
+        """
+        self.source = source
+        self.shadow = shadow
+        self.target_service = target_service
+        self._switch = switch
+        self.batch_size = batch_size
+        self.throttle_seconds = throttle_seconds
+        self.lease = lease
+
+        self.state = "pending"
+        self.done = 0
+        self.total = 0
+        self.error: str | None = None
+        self.dirty: set[str] = set()  # Chunk ids written to the source while copying
+        self.started_at: datetime | None = None
+        self.finished_at: datetime | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Run the migration in a daemon thread."""
+        self._thread = threading.Thread(target=self.run, name="reembed-migration", daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: float | None = None) -> None:
+        """Wait for the background thread."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Stop the copy after the current batch and wait for the thread.
+
+        The lease is released and the shadow left behind; the next migration of
+        the collection drops it. A switch-over already in progress completes.
+
+        Args:
+            timeout: Seconds to wait for the thread (None = until it exits)
+        """
+        self._stop.set()
+        self.join(timeout)
+
+    def record_write(self, ids: list[str]) -> None:
+        """Remember chunks added or changed in the source after the copy started."""
+        self.dirty.update(ids)
+
+    @property
+    def active(self) -> bool:
+        """Whether the migration has not finished yet."""
+        return self.state in ("pending", "running", "switching")
+
+    def _on_batch(self, done: int) -> None:
+        self.done = done
+        if self._stop.is_set():
+            raise MigrationStopped
+        if self.lease is not None:
+            self.lease.renew()
+        if self.throttle_seconds > 0 and self._stop.wait(self.throttle_seconds):
+            raise MigrationStopped
+
+    def run(self) -> None:
+        """Copy all chunks into the shadow collection, then switch over."""
+        self.state = "running"
+        self.started_at = datetime.now()
+        self.total = self.source.count()
+        logger.info(
+            "reembed_migration_started",
+            source=self.source.name,
+            shadow=self.shadow.name,
+            total=self.total,
+        )
+
+        try:
+            reembed_collection(
+                self.source,
+                self.shadow,
+                self.target_service,
+                batch_size=self.batch_size,
+                on_batch=self._on_batch,
+            )
+            self.state = "switching"
+            if self.lease is not None:
+                self.lease.renew()  # Never switch to a shadow another holder may have dropped
+            self._switch(self)
+            self.state = "completed"
+            logger.info("reembed_migration_completed", shadow=self.shadow.name, done=self.done)
+        except MigrationStopped:
+            self.state = "stopped"
+            logger.info("reembed_migration_stopped", shadow=self.shadow.name, done=self.done)
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            logger.error("reembed_migration_failed", error=str(e), shadow=self.shadow.name)
+        finally:
+            self.finished_at = datetime.now()
+            if self.lease is not None:
+                try:
+                    self.lease.release()
+                except Exception as e:
+                    logger.warning("migration_lease_release_failed", error=str(e))
+
+    def status(self) -> dict[str, Any]:
+        """Progress snapshot for the health/debug endpoint."""
+        return {
+            "state": self.state,
+            "source": self.source.name,
+            "shadow": self.shadow.name,
+            "done": self.done,
+            "total": self.total,
+            "progress": round(self.done / self.total, 4) if self.total else None,
+            "error": self.error,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -59,6 +59,27 @@ class BatchDocumentUploadResponse(BaseModel):
     error_count: int = Field(..., description="Number of failed uploads")
 
 
+class IngestionJob(BaseModel):
+    """Spec: Status of an asynchronous document ingestion job."""
+
+    id: str = Field(..., description="Job identifier")
+    doc_id: str = Field(..., description="Identifier the document will be stored under")
+    filename: str = Field(..., description="File name")
+    status: Literal["queued", "running", "completed", "failed"] = Field(
+        ..., description="Job status"
+    )
+    stage: str | None = Field(default=None, description="Stage currently running")
+    stages: dict[str, Literal["pending", "running", "completed"]] = Field(
+        default_factory=dict, description="Progress of each ingestion stage"
+    )
+    attempts: int = Field(default=0, description="Attempts made so far")
+    max_attempts: int = Field(..., description="Attempts before the job is marked failed")
+    error: str | None = Field(default=None, description="Error of the last failed attempt")
+    document: DocumentInfo | None = Field(default=None, description="Result once completed")
+    created_at: datetime = Field(..., description="Submission timestamp")
+    updated_at: datetime = Field(..., description="Last status change")
+
+
 class QueryRequest(BaseModel):
     """Spec: Request for query processing."""
 
@@ -93,6 +114,36 @@ class SourceInfo(BaseModel):
     metadata: dict = Field(default_factory=dict, description="Chunk metadata")
 
 
+class SearchRequest(BaseModel):
+    """Spec: Request for a vector search without answer generation."""
+
+    query: str = Field(..., min_length=1, max_length=5000, description="Search query")
+    top_k: int = Field(default=10, ge=1, le=100, description="Number of results")
+    score_threshold: float = Field(default=0.0, ge=0.0, le=1.0, description="Minimum score")
+    filter: dict | None = Field(default=None, description="Metadata filter (ChromaDB where)")
+    fields: Literal["ids", "snippet", "full"] = Field(
+        default="full", description="Per hit: ids and scores, plus a snippet, or full content"
+    )
+
+
+class SearchHitInfo(BaseModel):
+    """Spec: One vector search hit."""
+
+    chunk_id: str = Field(..., description="Chunk identifier")
+    score: float = Field(..., description="Similarity score")
+    content: str | None = Field(default=None, description="Content or snippet, if requested")
+    source: str | None = Field(default=None, description="Source document, if requested")
+    metadata: dict | None = Field(default=None, description="Chunk metadata, if requested")
+
+
+class SearchResponse(BaseModel):
+    """Spec: Response from a vector search."""
+
+    query: str = Field(..., description="Search query")
+    hits: list[SearchHitInfo] = Field(default_factory=list, description="Hits, best first")
+    total: int = Field(..., description="Number of hits")
+
+
 class HealthResponse(BaseModel):
     """Spec: Health check response."""
 
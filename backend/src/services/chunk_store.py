@@ -0,0 +1,174 @@
+"""Reference counts of content-addressed chunks, stored in SQLite."""
+
+import sqlite3
+from pathlib import Path
+
+import structlog
+
+from src.config import settings
+
+logger = structlog.get_logger()
+
+
+class ChunkRefStore:
+    """
+    SQLite-based store of which documents reference which chunk hashes.
+
+    Identical chunks share one vector entry keyed by their content hash; this store
+    keeps one row per (document, position) so a vector entry can be dropped once no
+    document references its hash anymore.
+    """
+
+    def __init__(self, db_path: str | None = None) -> None:
+        """
+        Initialize chunk reference store.
+
+        Args:
+            db_path: Path to SQLite database file (default: ./data/chunks.db)
+        """
+        if db_path is None:
+            data_dir = Path(settings.chroma_path).parent
+            data_dir.mkdir(parents=True, exist_ok=True)
+            db_path = str(data_dir / "chunks.db")
+
+        self.db_path = db_path
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_database(self) -> None:
+        """Initialize database schema."""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS chunk_refs (
+                doc_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                chunk_hash TEXT NOT NULL,
+                PRIMARY KEY (doc_id, position)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_chunk_refs_hash ON chunk_refs (chunk_hash)")
+
+        conn.commit()
+        conn.close()
+        logger.info("chunk_ref_store_initialized", db_path=self.db_path)
+
+    def add_document(self, doc_id: str, chunk_hashes: list[str]) -> None:
+        """
+        Record the chunk hashes of a document, replacing any previous version.
+
+        Args:
+            doc_id: Document identifier
+            chunk_hashes: Content hash of each chunk, in document order
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM chunk_refs WHERE doc_id = ?", (doc_id,))
+            conn.executemany(
+                "INSERT INTO chunk_refs (doc_id, position, chunk_hash) VALUES (?, ?, ?)",
+                [
+                    (doc_id, position, chunk_hash)
+                    for position, chunk_hash in enumerate(chunk_hashes)
+                ],
+            )
+        conn.close()
+        logger.debug("chunk_refs_saved", doc_id=doc_id, chunks=len(chunk_hashes))
+
+    def get_document(self, doc_id: str) -> list[str]:
+        """
+        Get the chunk hashes of a document.
+
+        Args:
+            doc_id: Document identifier
+
+        Returns:
+            Chunk hashes in document order (empty if unknown)
+        """
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT chunk_hash FROM chunk_refs WHERE doc_id = ? ORDER BY position", (doc_id,)
+        ).fetchall()
+        conn.close()
+        return [row[0] for row in rows]
+
+    def refcounts(self, chunk_hashes: list[str]) -> dict[str, int]:
+        """
+        Count how many chunk positions across all documents reference each hash.
+
+        Args:
+            chunk_hashes: Hashes to look up
+
+        Returns:
+            Mapping of hash to reference count (unreferenced hashes map to 0)
+        """
+        counts = dict.fromkeys(chunk_hashes, 0)
+        unique = list(counts)
+        conn = self._connect()
+        # Stay below SQLite's bound-parameter limit
+        for start in range(0, len(unique), 500):
+            batch = unique[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT chunk_hash, COUNT(*) FROM chunk_refs "
+                f"WHERE chunk_hash IN ({placeholders}) GROUP BY chunk_hash",
+                batch,
+            ).fetchall()
+            counts.update(dict(rows))
+        conn.close()
+        return counts
+
+    def owners(self, chunk_hashes: list[str]) -> dict[str, str]:
+        """
+        Pick one referencing document for each hash.
+
+        Args:
+            chunk_hashes: Hashes to look up
+
+        Returns:
+            Mapping of hash to a document id (hashes without references are omitted)
+        """
+        owners: dict[str, str] = {}
+        unique = list(dict.fromkeys(chunk_hashes))
+        conn = self._connect()
+        for start in range(0, len(unique), 500):
+            batch = unique[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT chunk_hash, MIN(doc_id) FROM chunk_refs "
+                f"WHERE chunk_hash IN ({placeholders}) GROUP BY chunk_hash",
+                batch,
+            ).fetchall()
+            owners.update(dict(rows))
+        conn.close()
+        return owners
+
+    def release_document(self, doc_id: str) -> tuple[list[str], list[str]]:
+        """
+        Drop a document's references.
+
+        Args:
+            doc_id: Document identifier
+
+        Returns:
+            Tuple of (orphaned hashes no longer referenced by any document,
+            hashes still referenced by other documents)
+        """
+        hashes = list(dict.fromkeys(self.get_document(doc_id)))
+        if not hashes:
+            return [], []
+
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM chunk_refs WHERE doc_id = ?", (doc_id,))
+        conn.close()
+
+        counts = self.refcounts(hashes)
+        orphaned = [h for h in hashes if counts[h] == 0]
+        shared = [h for h in hashes if counts[h] > 0]
+        logger.debug(
+            "chunk_refs_released", doc_id=doc_id, orphaned=len(orphaned), shared=len(shared)
+        )
+        return orphaned, shared
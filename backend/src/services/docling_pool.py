@@ -0,0 +1,257 @@
+"""Process pool for CPU-bound Docling PDF conversion."""
+
+import multiprocessing as mp
+import os
+import queue
+from collections.abc import Callable
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from multiprocessing.connection import Connection
+from typing import Any
+
+import structlog
+
+logger = structlog.get_logger()
+
+# Converter held by each worker process (set by _init_worker)
+_worker_converter: Any = None
+
+
+def load_converter() -> Any:
+    """
+    Build a Docling converter inside a worker process.
+
+    Returns:
+        DocumentConverter instance
+    """
+    from docling.document_converter import DocumentConverter
+
+    return DocumentConverter()
+
+
+def _init_worker(loader: Callable[[], Any]) -> None:
+    """Build the worker's converter once, so tasks skip Docling's model loading."""
+    global _worker_converter
+
+    _worker_converter = loader()
+    logger.info("docling_worker_ready", pid=os.getpid())
+
+
+def _convert_pages(path: str, page_range: tuple[int, int] | None) -> str:
+    """Convert a PDF (or a 1-based inclusive page range of it) to text."""
+    from src.services.document_parser import DocumentParser
+
+    if page_range is None:
+        result = _worker_converter.convert(path)
+    else:
+        result = _worker_converter.convert(path, page_range=page_range)
+    return DocumentParser._docling_text(result)
+
+
+def _worker_main(conn: Connection, loader: Callable[[], Any]) -> None:
+    """Worker process loop: convert each received task, reporting when it starts."""
+    _init_worker(loader)
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        conn.send(("started", None))
+        try:
+            result = ("ok", _convert_pages(*task))
+        except Exception as e:
+            result = ("error", e)
+        try:
+            conn.send(result)
+        except Exception:  # Unpicklable exception
+            conn.send(("error", RuntimeError(repr(result[1]))))
+
+
+class _Worker:
+    """One worker process and the pipe it receives tasks on."""
+
+    def __init__(self, ctx: Any, loader: Callable[[], Any]) -> None:
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, loader), daemon=True)
+        self.process.start()
+        child_conn.close()  # Only the worker holds it, so its exit shows up as EOF
+
+    def stop(self, kill: bool = False) -> None:
+        """Stop the process: ask it to exit, or kill it (a hung conversion never returns)."""
+        if not kill:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+def count_pages(path: str) -> int | None:
+    """
+    Count the pages of a PDF.
+
+    Args:
+        path: Path to the PDF
+
+    Returns:
+        Page count, or None if pypdfium2 is unavailable or the file cannot be read
+    """
+    try:
+        import pypdfium2
+    except ImportError:
+        return None
+
+    try:
+        pdf = pypdfium2.PdfDocument(path)
+    except Exception as e:
+        logger.warning("pdf_page_count_failed", path=path, error=str(e))
+        return None
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def split_pages(page_count: int | None, pages_per_task: int) -> list[tuple[int, int] | None]:
+    """
+    Split a document into 1-based inclusive page ranges.
+
+    Args:
+        page_count: Number of pages (None = unknown)
+        pages_per_task: Pages per range (0 = no splitting)
+
+    Returns:
+        Page ranges in order; ``[None]`` to convert the whole document in one task
+    """
+    if not page_count or pages_per_task <= 0 or page_count <= pages_per_task:
+        return [None]
+    return [
+        (start, min(start + pages_per_task - 1, page_count))
+        for start in range(1, page_count + 1, pages_per_task)
+    ]
+
+
+class DoclingWorkerPool:
+    """
+    Pool of Docling worker processes, each keeping a warm converter.
+
+    Conversion runs outside the API process, so concurrent PDF uploads are not
+    serialized by the GIL. Large PDFs are split into page ranges converted in
+    parallel and joined in page order.
+
+    Each task's timeout counts from when a worker starts it, not from when it
+    was queued. A task exceeding it kills only the worker running it, which is
+    replaced; conversions on the other workers are not affected.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        pages_per_task: int = 0,
+        timeout: float | None = None,
+        loader: Callable[[], Any] = load_converter,
+    ) -> None:
+        """
+        Start the worker pool.
+
+        Args:
+            workers: Number of worker processes
+            pages_per_task: Pages per parallel task for large PDFs (0 = no splitting)
+            timeout: Seconds allowed per task once a worker starts it (None = no limit)
+            loader: Picklable callable building the converter inside a worker
+        """
+        self.workers = max(1, workers)
+        self.pages_per_task = pages_per_task
+        self.timeout = timeout
+        self._loader = loader
+        self._ctx = mp.get_context("spawn")  # Fresh interpreters: no forked torch/thread state
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        for _ in range(self.workers):
+            self._idle.put(_Worker(self._ctx, loader))
+        # One dispatch thread per worker, each driving one task at a time
+        self._dispatch = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="docling-dispatch"
+        )
+        logger.info(
+            "docling_worker_pool_started",
+            workers=self.workers,
+            pages_per_task=self.pages_per_task,
+            timeout=self.timeout,
+        )
+
+    def _run(self, path: str, pages: tuple[int, int] | None, filename: str | None) -> str:
+        """Run one task on an idle worker, replacing the worker if it hangs or dies."""
+        worker = self._idle.get()
+        try:
+            try:
+                worker.conn.send((path, pages))
+                worker.conn.recv()  # "started": the timeout counts from here
+                finished = worker.conn.poll(self.timeout)
+                result = worker.conn.recv() if finished else None
+            except (EOFError, OSError) as e:
+                logger.error("docling_worker_died", filename=filename, pid=worker.process.pid)
+                worker.stop(kill=True)
+                worker = _Worker(self._ctx, self._loader)
+                raise RuntimeError("Docling worker process exited during conversion") from e
+
+            if result is None:
+                logger.error(
+                    "docling_conversion_timeout",
+                    filename=filename,
+                    pages=pages,
+                    timeout=self.timeout,
+                    pid=worker.process.pid,
+                )
+                worker.stop(kill=True)
+                worker = _Worker(self._ctx, self._loader)
+                raise TimeoutError(f"Docling conversion exceeded {self.timeout}s")
+        finally:
+            self._idle.put(worker)
+
+        status, value = result
+        if status == "error":
+            raise value
+        return value
+
+    def convert(self, path: str, filename: str | None = None) -> str:
+        """
+        Convert a PDF to text in the worker processes.
+
+        Args:
+            path: Path to the PDF
+            filename: Original filename (for logging)
+
+        Returns:
+            Extracted text (empty if nothing could be extracted)
+
+        Raises:
+            TimeoutError: If a task exceeds the pool timeout
+        """
+        ranges = split_pages(count_pages(path), self.pages_per_task)
+        futures = [self._dispatch.submit(self._run, path, pages, filename) for pages in ranges]
+
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in done:
+            error = future.exception()
+            if error is not None:
+                for other in pending:
+                    other.cancel()  # Ranges not started yet; running ones finish unused
+                raise error
+
+        parts = [future.result() for future in futures]
+        logger.info(
+            "docling_pool_converted",
+            filename=filename,
+            ranges=len(ranges),
+            text_length=sum(len(part) for part in parts),
+        )
+        return "\n\n".join(part for part in parts if part.strip())
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        self._dispatch.shutdown(wait=True, cancel_futures=True)
+        for _ in range(self.workers):
+            self._idle.get().stop()
+        logger.info("docling_worker_pool_stopped")
@@ -1,23 +1,100 @@
 """Document parsing service using Docling for advanced PDF parsing."""
 
-import base64
 import binascii
 import os
 import tempfile
+import threading
+from collections.abc import Callable, Iterator
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any
 
 import structlog
 
+from src.config import settings
+from src.services.docling_pool import DoclingWorkerPool
+from src.services.parse_cache import ParseCache, content_key, file_key
+
 logger = structlog.get_logger()
 
 # Constants
-BASE64_THRESHOLD = 0.1  # Consider base64 if <10% non-base64 chars
+BASE64_MIN_LENGTH = 100  # Shorter content is treated as plain text
+PARSER_VERSION = "2"  # Bump when text extraction changes (invalidates the parse cache)
+
+_BASE64_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+_LINE_BREAKS = b"\r\n"  # MIME-style wrapped base64
+
+
+def decode_base64(content: str) -> bytes | None:
+    """
+    Detect and decode base64 content in one pass.
+
+    Validation runs in C (``bytes.translate`` and strict ``a2b_base64``) instead of
+    a per-character Python loop, so multi-megabyte payloads are checked in
+    milliseconds.
+
+    Args:
+        content: Document content (base64 encoded or plain text)
+
+    Returns:
+        Decoded bytes, or None if the content is not valid base64
+    """
+    if len(content) < BASE64_MIN_LENGTH or not content.isascii():
+        return None
+    data = content.encode("ascii")
+    if data.translate(None, _BASE64_ALPHABET + _LINE_BREAKS):
+        return None  # Characters outside the base64 alphabet
+    if b"\n" in data or b"\r" in data:
+        data = data.translate(None, _LINE_BREAKS)
+    try:
+        return binascii.a2b_base64(data, strict_mode=True)
+    except binascii.Error:
+        return None
+
+
+def parser_version() -> str:
+    """
+    Version of the parsing stack, used to key cached parse results.
+
+    Returns:
+        PARSER_VERSION combined with the installed Docling and python-docx versions
+    """
+    parts = [PARSER_VERSION]
+    for package in ("docling", "python-docx"):
+        try:
+            parts.append(f"{package}-{version(package)}")
+        except PackageNotFoundError:
+            parts.append(f"{package}-none")
+    return "+".join(parts)
 
 
 class DocumentParser:
     """Service for parsing documents using Docling."""
 
-    def __init__(self) -> None:
-        """Initialize document parser."""
+    def __init__(
+        self,
+        use_worker_pool: bool | None = None,
+        cache: ParseCache | None = None,
+    ) -> None:
+        """
+        Initialize document parser.
+
+        Args:
+            use_worker_pool: Convert PDFs in Docling worker processes
+                (default: settings.docling_workers > 0)
+            cache: Cache of PDF/DOCX parse results (default: SQLite next to the
+                vector database, if settings.parse_cache_enabled)
+        """
+        self.cache: ParseCache | None = None
+        if settings.parse_cache_enabled:
+            self.cache = cache or ParseCache()
+        self.version = parser_version()
+
+        if use_worker_pool is None:
+            use_worker_pool = settings.docling_workers > 0
+        self.use_worker_pool = use_worker_pool
+        self._worker_pool: DoclingWorkerPool | None = None
+        self._worker_pool_lock = threading.Lock()
+
         self.docling_available = False
         self._init_docling()
 
@@ -26,7 +103,9 @@ class DocumentParser:
         try:
             from docling.document_converter import DocumentConverter
 
-            self.converter = DocumentConverter()
+            # Worker processes build their own converters; skip loading one here
+            if not self.use_worker_pool:
+                self.converter = DocumentConverter()
             self.docling_available = True
             logger.info("docling_initialized", available=True)
         except ImportError:
@@ -39,71 +118,196 @@ class DocumentParser:
             logger.warning("docling_init_failed", error=str(e))
             self.docling_available = False
 
-    def _looks_like_base64(self, s: str, threshold: float = BASE64_THRESHOLD) -> bool:
+    @staticmethod
+    def _detect_type(filename: str, content_type: str) -> tuple[bool, bool]:
         """
-        Check if string looks like base64 encoded data.
+        Detect PDF and DOCX documents by file extension or MIME type.
 
         Args:
-            s: String to check
-            threshold: Threshold for non-base64 characters (default BASE64_THRESHOLD = 10%)
+            filename: Original filename
+            content_type: MIME type of the document
 
         Returns:
-            True if string appears to be base64 encoded
+            Tuple of (is_pdf, is_docx)
+        """
+        # Check if it's a PDF that should use Docling
+        is_pdf = (
+            filename.lower().endswith(".pdf")
+            or content_type == "application/pdf"
+            or "pdf" in content_type.lower()
+        )
+
+        # Check if it's a DOCX file
+        is_docx = (
+            filename.lower().endswith(".docx")
+            or content_type
+            == "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+            or "docx" in content_type.lower()
+            or "word" in content_type.lower()
+        )
+
+        return is_pdf, is_docx
+
+    def parse_file(self, path: str, filename: str, content_type: str) -> str:
+        """
+        Parse a document stored on disk, without loading it into memory first.
+
+        Docling and python-docx read the file directly; other files are read as
+        UTF-8 text.
+
+        Args:
+            path: Path to the raw (not base64 encoded) document
+            filename: Original filename
+            content_type: MIME type of the document
+
+        Returns:
+            Extracted text content
+        """
+        return "".join(self.iter_file_text(path, filename, content_type))
+
+    def iter_file_text(
+        self,
+        path: str,
+        filename: str,
+        content_type: str,
+        block_chars: int = 1024 * 1024,
+    ) -> Iterator[str]:
         """
-        if len(s) < 100:
-            return False
-        base64_chars = set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=")
-        non_base64 = sum(1 for c in s if c not in base64_chars and not c.isspace())
-        return non_base64 < len(s) * threshold
+        Parse a document stored on disk, yielding its text in pieces.
+
+        Plain-text files are read block by block, so they are never held in memory
+        as a whole; PDF and DOCX text is yielded in one piece after conversion.
+
+        Args:
+            path: Path to the raw (not base64 encoded) document
+            filename: Original filename
+            content_type: MIME type of the document
+            block_chars: Characters per block for plain-text files
+
+        Yields:
+            Extracted text, in document order
+        """
+        is_pdf, is_docx = self._detect_type(filename, content_type)
+
+        if is_pdf or is_docx:
+            yield self._cached(
+                lambda: file_key(path),
+                lambda: self._parse_binary_file(path, filename, is_pdf),
+            )
+            return
+
+        logger.info("using_simple_parser", filename=filename, content_type=content_type)
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            while block := f.read(block_chars):
+                yield block
+
+    def _parse_binary_file(self, path: str, filename: str, is_pdf: bool) -> str:
+        """
+        Extract text from a PDF or DOCX file on disk.
+
+        Args:
+            path: Path to the document
+            filename: Original filename
+            is_pdf: True for PDF, False for DOCX
+
+        Returns:
+            Extracted text content
+        """
+        if is_pdf:
+            if not self.docling_available:
+                logger.warning(
+                    "pdf_binary_detected",
+                    message="Binary PDF detected. Install Docling to extract text.",
+                )
+                return ""
+            logger.info("parsing_with_docling", filename=filename, path=path)
+            text = self._convert_pdf(path, filename)
+            if not text.strip():
+                logger.warning("docling_no_text_extracted", filename=filename)
+                return ""
+            logger.info("docling_parse_success", filename=filename, text_length=len(text))
+            return text
+
+        logger.info("parsing_docx", filename=filename, path=path)
+        try:
+            return self._docx_text(path)
+        except ImportError:
+            logger.warning(
+                "python_docx_not_available",
+                message="python-docx not installed. Install with: pip install python-docx",
+            )
+            return ""
+
+    def _cached(self, key: Callable[[], str], parse: Callable[[], str]) -> str:
+        """
+        Return cached parser output for a document, parsing and caching it on a miss.
+
+        Args:
+            key: Callable returning the document's content hash
+            parse: Callable extracting the text
+
+        Returns:
+            Extracted text content
+        """
+        if self.cache is None:
+            return parse()
+
+        content_hash = key()
+        text = self.cache.get(content_hash, self.version)
+        if text is not None:
+            return text
+
+        text = parse()
+        if text.strip():  # Empty output may be a transient failure: parse again next time
+            self.cache.put(content_hash, self.version, text)
+        return text
 
     def parse_document(
         self,
         content: str,
         filename: str,
         content_type: str,
+        decoded: bytes | None = None,
     ) -> str:
         """
         Parse document content using Docling for PDFs, python-docx for DOCX, fallback for others.
 
+        Base64 content is detected and decoded once here; the decoded bytes are
+        passed down to the format-specific parsers.
+
         Args:
             content: Document content (can be base64 encoded or plain text)
             filename: Original filename
             content_type: MIME type of the document
+            decoded: Result of decode_base64(content), if the caller already has it
 
         Returns:
             Extracted text content
         """
-        # Check if it's a PDF that should use Docling
-        is_pdf = (
-            filename.lower().endswith(".pdf")
-            or content_type == "application/pdf"
-            or "pdf" in content_type.lower()
-        )
+        if decoded is None:
+            decoded = decode_base64(content)
+        is_pdf, is_docx = self._detect_type(filename, content_type)
 
-        # Check if it's a DOCX file
-        is_docx = (
-            filename.lower().endswith(".docx")
-            or content_type
-            == "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            or "docx" in content_type.lower()
-            or "word" in content_type.lower()
-        )
+        # Hash the raw bytes, so JSON and multipart uploads of a file share cache entries
+        def key() -> str:
+            return content_key(decoded if decoded is not None else content.encode("utf-8"))
 
         if is_pdf and self.docling_available:
-            return self._parse_with_docling(content, filename)
+            return self._cached(key, lambda: self._parse_with_docling(content, filename, decoded))
         elif is_docx:
-            return self._parse_docx(content, filename)
+            return self._cached(key, lambda: self._parse_docx(content, filename, decoded))
         else:
             # Fallback to simple text extraction
-            return self._parse_simple(content, filename, content_type)
+            return self._parse_simple(content, filename, content_type, decoded)
 
-    def _parse_with_docling(self, content: str, filename: str) -> str:
+    def _parse_with_docling(self, content: str, filename: str, decoded: bytes | None) -> str:
         """
         Parse PDF using Docling.
 
         Args:
             content: Document content (base64 or raw bytes)
             filename: Original filename
+            decoded: Base64-decoded content, or None if the content is not base64
 
         Returns:
             Extracted text content
@@ -112,20 +316,9 @@ class DocumentParser:
 
             logger.info("parsing_with_docling", filename=filename)
 
-            # Try to decode base64 if needed
             try:
-                # Check if content is base64 encoded
-                if isinstance(content, str) and not content.startswith("%PDF"):
-                    # Try to decode base64
-                    try:
-                        pdf_bytes = base64.b64decode(content)
-                    except Exception:
-                        # If not base64, assume it's already raw bytes as string
-                        pdf_bytes = (
-                            content.encode("latin-1") if isinstance(content, str) else content
-                        )
-                else:
-                    pdf_bytes = content.encode("latin-1") if isinstance(content, str) else content
+                # Raw PDF bytes sent as a latin-1 string if the content is not base64
+                pdf_bytes = decoded if decoded is not None else content.encode("latin-1")
 
                 # Docling needs a temporary file (doesn't accept BytesIO)
                 # Create temporary file
@@ -135,7 +328,7 @@ class DocumentParser:
 
                 try:
                     # Convert using Docling with file path
-                    result = self.converter.convert(tmp_path)
+                    text = self._convert_pdf(tmp_path, filename)
                 finally:
                     # Clean up temporary file
                     try:
@@ -143,82 +336,137 @@ class DocumentParser:
                     except Exception:
                         pass
 
-                # Extract text from DoclingDocument
-                # Docling returns a DoclingDocument with export_to_markdown() method
-                if hasattr(result, "export_to_markdown"):
-                    text = result.export_to_markdown()
-                elif hasattr(result, "document") and hasattr(result.document, "export_to_markdown"):
-                    # Try document.export_to_markdown()
-                    text = result.document.export_to_markdown()
-                elif hasattr(result, "document") and hasattr(result.document, "export_to_text"):
-                    # Try document.export_to_text() if available
-                    text = result.document.export_to_text()
-                elif hasattr(result, "document"):
-                    # Last resort: try to extract text from document structure
-                    # Avoid str() as it shows object representation
-                    try:
-                        # Try to get text content from document items
-                        if hasattr(result.document, "items"):
-                            text_parts = []
-                            for item in result.document.items:
-                                if hasattr(item, "text"):
-                                    text_parts.append(str(item.text))
-                                elif hasattr(item, "content"):
-                                    text_parts.append(str(item.content))
-                            text = "\n".join(text_parts) if text_parts else ""
-                        else:
-                            # If no items, try markdown export on document
-                            text = (
-                                result.document.export_to_markdown()
-                                if hasattr(result.document, "export_to_markdown")
-                                else ""
-                            )
-                    except Exception as e:
-                        logger.warning("docling_text_extraction_failed", error=str(e))
-                        text = ""
-                else:
-                    # Last fallback - try to get any text representation
-                    text = ""
-
-                # Clean up text - remove any remaining object representations
-                if text and ("TextItem" in text or "RefItem" in text or "<" in text[:100]):
-                    # Text might contain object representations, try to extract actual text
-                    import re
-
-                    # Try to extract text from markdown-like content
-                    text = re.sub(r"TextItem\([^)]*text=\'([^\']+)\'[^)]*\)", r"\1", text)
-                    text = re.sub(r"RefItem\([^)]*\)", "", text)
-                    # Remove other object representations
-                    text = re.sub(r"<[^>]+>", "", text)
-
                 if not text or len(text.strip()) == 0:
                     logger.warning("docling_no_text_extracted", filename=filename)
                     # Fallback to simple parsing
-                    return self._parse_simple(content, filename, "application/pdf")
+                    return self._parse_simple(content, filename, "application/pdf", decoded)
 
                 logger.info("docling_parse_success", filename=filename, text_length=len(text))
                 return text
 
+            except TimeoutError:
+                # Runaway conversion killed by the worker pool: fail the upload
+                raise
             except (ValueError, OSError) as e:
                 logger.error("docling_parse_error", error=str(e), error_type=type(e).__name__)
                 # Fallback to simple parsing
-                return self._parse_simple(content, filename, "application/pdf")
+                return self._parse_simple(content, filename, "application/pdf", decoded)
             except Exception as e:
                 logger.error("docling_unexpected_error", error=str(e), error_type=type(e).__name__)
                 # Re-raise unexpected errors
                 raise
 
+        except TimeoutError:
+            raise
         except Exception as e:
             logger.error("docling_unavailable", error=str(e), error_type=type(e).__name__)
-            return self._parse_simple(content, filename, "application/pdf")
+            return self._parse_simple(content, filename, "application/pdf", decoded)
+
+    def _convert_pdf(self, path: str, filename: str) -> str:
+        """
+        Convert a PDF file with Docling, in worker processes when enabled.
+
+        Args:
+            path: Path to the PDF
+            filename: Original filename
+
+        Returns:
+            Extracted text content
+
+        Raises:
+            TimeoutError: If a worker conversion exceeds settings.docling_timeout_seconds
+        """
+        if self.use_worker_pool:
+            return self._get_worker_pool().convert(path, filename)
+        return self._docling_text(self.converter.convert(path))
+
+    def _get_worker_pool(self) -> DoclingWorkerPool:
+        """Start the Docling worker pool on first use."""
+        with self._worker_pool_lock:
+            if self._worker_pool is None:
+                self._worker_pool = DoclingWorkerPool(
+                    workers=settings.docling_workers,
+                    pages_per_task=settings.docling_pages_per_task,
+                    timeout=settings.docling_timeout_seconds or None,
+                )
+            return self._worker_pool
+
+    def close(self) -> None:
+        """Stop the Docling worker pool if it was started."""
+        with self._worker_pool_lock:
+            if self._worker_pool is not None:
+                self._worker_pool.close()
+                self._worker_pool = None
+
+    @staticmethod
+    def _docling_text(result: Any) -> str:
+        """
+        Extract text from a Docling conversion result.
+
+        Args:
+            result: Result of DocumentConverter.convert
 
-    def _parse_docx(self, content: str, filename: str) -> str:
+        Returns:
+            Extracted text (empty if nothing could be extracted)
+        """
+        # Extract text from DoclingDocument
+        # Docling returns a DoclingDocument with export_to_markdown() method
+        if hasattr(result, "export_to_markdown"):
+            text = result.export_to_markdown()
+        elif hasattr(result, "document") and hasattr(result.document, "export_to_markdown"):
+            # Try document.export_to_markdown()
+            text = result.document.export_to_markdown()
+        elif hasattr(result, "document") and hasattr(result.document, "export_to_text"):
+            # Try document.export_to_text() if available
+            text = result.document.export_to_text()
+        elif hasattr(result, "document"):
+            # Last resort: try to extract text from document structure
+            # Avoid str() as it shows object representation
+            try:
+                # Try to get text content from document items
+                if hasattr(result.document, "items"):
+                    text_parts = []
+                    for item in result.document.items:
+                        if hasattr(item, "text"):
+                            text_parts.append(str(item.text))
+                        elif hasattr(item, "content"):
+                            text_parts.append(str(item.content))
+                    text = "\n".join(text_parts) if text_parts else ""
+                else:
+                    # If no items, try markdown export on document
+                    text = (
+                        result.document.export_to_markdown()
+                        if hasattr(result.document, "export_to_markdown")
+                        else ""
+                    )
+            except Exception as e:
+                logger.warning("docling_text_extraction_failed", error=str(e))
+                text = ""
+        else:
+            # Last fallback - try to get any text representation
+            text = ""
+
+        # Clean up text - remove any remaining object representations
+        if text and ("TextItem" in text or "RefItem" in text or "<" in text[:100]):
+            # Text might contain object representations, try to extract actual text
+            import re
+
+            # Try to extract text from markdown-like content
+            text = re.sub(r"TextItem\([^)]*text=\'([^\']+)\'[^)]*\)", r"\1", text)
+            text = re.sub(r"RefItem\([^)]*\)", "", text)
+            # Remove other object representations
+            text = re.sub(r"<[^>]+>", "", text)
+
+        return text
+
+    def _parse_docx(self, content: str, filename: str, decoded: bytes | None) -> str:
         """
         Parse DOCX file using python-docx.
 
         Args:
             content: Document content (base64 encoded)
             filename: Original filename
+            decoded: Base64-decoded content, or None if the content is not base64
 
         Returns:
             Extracted text content
@@ -226,44 +474,26 @@ class DocumentParser:
         try:
             import io
 
-            from docx import Document
-
             logger.info("parsing_docx", filename=filename)
 
-            # Decode base64 if needed
             # DOCX files start with PK (ZIP signature) when decoded
-            # Check if content is base64 encoded
             try:
-                if isinstance(content, str) and self._looks_like_base64(content):
-                    # Try to decode base64
-                    try:
-                        docx_bytes = base64.b64decode(content, validate=True)
-                        # Verify it's actually a DOCX (starts with PK)
-                        if not docx_bytes.startswith(b"PK"):
-                            logger.warning(
-                                "decoded_not_docx", message="Decoded content doesn't look like DOCX"
-                            )
-                            # Fallback to simple parsing
-                            return self._parse_simple(
-                                content,
-                                filename,
-                                "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                            )
-                    except (ValueError, binascii.Error) as e:
+                if decoded is not None:
+                    docx_bytes = decoded
+                    if not docx_bytes.startswith(b"PK"):
                         logger.warning(
-                            "docx_base64_decode_failed", error=str(e), error_type=type(e).__name__
+                            "decoded_not_docx", message="Decoded content doesn't look like DOCX"
                         )
                         # Fallback to simple parsing
                         return self._parse_simple(
                             content,
                             filename,
                             "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                            decoded,
                         )
-                elif isinstance(content, str):
+                else:
                     # Already decoded or plain text - try to encode as bytes
                     docx_bytes = content.encode("latin-1")
-                else:
-                    docx_bytes = content
             except (OSError, ValueError, UnicodeEncodeError) as e:
                 logger.error("docx_decode_error", error=str(e), error_type=type(e).__name__)
                 # Fallback to simple parsing
@@ -271,28 +501,10 @@ class DocumentParser:
                     content,
                     filename,
                     "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                    decoded,
                 )
 
-            # Parse DOCX
-            doc = Document(io.BytesIO(docx_bytes))
-
-            # Extract text from all paragraphs
-            text_parts = []
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_parts.append(paragraph.text)
-
-            # Extract text from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = []
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            row_text.append(cell.text.strip())
-                    if row_text:
-                        text_parts.append(" | ".join(row_text))
-
-            text = "\n\n".join(text_parts)
+            text = self._docx_text(io.BytesIO(docx_bytes))
 
             if not text or len(text.strip()) == 0:
                 logger.warning("docx_no_text_extracted", filename=filename)
@@ -311,6 +523,7 @@ class DocumentParser:
                 content,
                 filename,
                 "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                decoded,
             )
         except (ValueError, OSError) as e:
             logger.error("docx_parse_error", error=str(e), error_type=type(e).__name__)
@@ -319,13 +532,67 @@ class DocumentParser:
                 content,
                 filename,
                 "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                decoded,
             )
         except Exception as e:
             logger.error("docx_unexpected_error", error=str(e), error_type=type(e).__name__)
             # Re-raise unexpected errors
             raise
 
-    def _parse_simple(self, content: str, filename: str, content_type: str) -> str:
+    @staticmethod
+    def _docx_text(source: Any) -> str:
+        """
+        Extract paragraph and table text from a DOCX file as markdown.
+
+        Heading-styled paragraphs become ``#`` headings and tables become pipe
+        tables, in document order, so structure-aware chunking sees the same
+        layout as for Docling output.
+
+        Args:
+            source: Path or binary file object of the DOCX file
+
+        Returns:
+            Extracted text content
+        """
+        from docx import Document
+        from docx.table import Table
+
+        doc = Document(source)
+
+        text_parts = []
+        for item in doc.iter_inner_content():
+            if isinstance(item, Table):
+                rows = [
+                    "| " + " | ".join(" ".join(cell.text.split()) for cell in row.cells) + " |"
+                    for row in item.rows
+                ]
+                if rows:
+                    columns = len(item.rows[0].cells)
+                    rows.insert(1, "|" + "---|" * columns)
+                    text_parts.append("\n".join(rows))
+                continue
+
+            text = item.text.strip()
+            if not text:
+                continue
+            style = item.style.name if item.style is not None else ""
+            if style == "Title":
+                text_parts.append(f"# {text}")
+            elif style.startswith("Heading ") and style[8:].isdigit():
+                level = min(int(style[8:]) + 1, 6)  # Title is the top level
+                text_parts.append(f"{'#' * level} {text}")
+            else:
+                text_parts.append(text)
+
+        return "\n\n".join(text_parts)
+
+    def _parse_simple(
+        self,
+        content: str,
+        filename: str,
+        content_type: str,
+        decoded: bytes | None = None,
+    ) -> str:
         """
         Simple text extraction fallback.
 
@@ -333,39 +600,25 @@ class DocumentParser:
             content: Document content
             filename: Original filename
             content_type: MIME type
+            decoded: Base64-decoded content, or None if the content is not base64
 
         Returns:
             Extracted text content
         """
         logger.info("using_simple_parser", filename=filename, content_type=content_type)
 
-        # If it's already text, return as is
-        if isinstance(content, str):
-            # Only try base64 decode if content looks like base64
-            # Base64 strings are typically longer and contain only base64 characters
-            if self._looks_like_base64(content):
-                try:
-                    decoded = base64.b64decode(content, validate=True)
-                    # Check if decoded content is PDF
-                    if decoded.startswith(b"%PDF"):
-                        # PDF binary - can't extract text simply
-                        logger.warning(
-                            "pdf_binary_detected",
-                            message="Binary PDF detected. Install Docling to extract text.",
-                        )
-                        return ""
-                    else:
-                        # Try to decode as UTF-8
-                        return decoded.decode("utf-8", errors="ignore")
-                except Exception:
-                    # Base64 decode failed, return as plain text
-                    logger.warning(
-                        "base64_decode_failed",
-                        message="Failed to decode base64, treating as plain text",
-                    )
-                    return content
-            else:
-                # Doesn't look like base64, return as plain text
-                return content
+        if decoded is None:
+            # Not base64, return as plain text
+            return content if content else ""
+
+        # Check if decoded content is PDF
+        if decoded.startswith(b"%PDF"):
+            # PDF binary - can't extract text simply
+            logger.warning(
+                "pdf_binary_detected",
+                message="Binary PDF detected. Install Docling to extract text.",
+            )
+            return ""
 
-        return str(content) if content else ""
+        # Try to decode as UTF-8
+        return decoded.decode("utf-8", errors="ignore")
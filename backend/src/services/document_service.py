@@ -1,20 +1,41 @@
 """Document service for managing documents."""
 
+import os
 import uuid
+from collections.abc import Callable, Iterable, Iterator
 from datetime import datetime
+from itertools import islice
 
+import numpy as np
 import structlog
 
 from src.config import settings
-from src.rag.chunking import DocumentChunker
+from src.rag.chunking import DocumentChunker, build_child_chunker, build_chunker, chunk_hash
 from src.rag.retriever import RAGRetriever
 from src.schemas.api import DocumentInfo, DocumentUpload
-from src.services.document_parser import DocumentParser
+from src.schemas.rag import DocumentChunk
+from src.services.chunk_store import ChunkRefStore
+from src.services.document_parser import DocumentParser, decode_base64
 from src.services.document_storage import DocumentStorage
 from src.services.postgres_storage import PostgreSQLDocumentStorage
 
 logger = structlog.get_logger()
 
+# Stages reported through the on_stage callback of upload_document
+INGESTION_STAGES = ("parsing", "chunking", "embedding", "saving")
+
+
+def build_storage() -> DocumentStorage | PostgreSQLDocumentStorage:
+    """
+    Create the document metadata storage selected by settings.storage_backend.
+
+    Returns:
+        PostgreSQL storage, or SQLite storage (the default)
+    """
+    if settings.storage_backend == "postgresql":
+        return PostgreSQLDocumentStorage()
+    return DocumentStorage()
+
 
 class DocumentService:
     """Service for managing documents in the knowledge base."""
@@ -25,6 +46,7 @@ class DocumentService:
         retriever: RAGRetriever | None = None,
         parser: DocumentParser | None = None,
         storage: DocumentStorage | None = None,
+        chunk_store: ChunkRefStore | None = None,
     ) -> None:
         """
         Initialize document service.
@@ -34,36 +56,186 @@ class DocumentService:
             retriever: RAG retriever instance
             parser: Document parser instance (for PDF extraction)
             storage: Document metadata storage instance
+            chunk_store: Chunk reference store; passing one enables content-hash
+                deduplication (default: created when settings.chunk_dedup_enabled)
         """
-        self.chunker = chunker or DocumentChunker()
         self.retriever = retriever or RAGRetriever()
+        self.chunker = chunker or build_chunker(self.retriever.embedding_service)
+        # Parent-child retrieval: self.chunker yields parent sections, split into children
+        self.child_chunker = build_child_chunker(self.retriever.embedding_service)
         self.parser = parser or DocumentParser()
 
         # Initialize storage based on backend setting
-        if storage is None:
-            if settings.storage_backend == "postgresql":
-                self.storage = PostgreSQLDocumentStorage()
-            else:
-                self.storage = DocumentStorage()  # Default: SQLite
-        else:
-            self.storage = storage
+        self.storage = storage if storage is not None else build_storage()
+
+        self.chunk_store: ChunkRefStore | None = chunk_store
+        if self.chunk_store is None and settings.chunk_dedup_enabled:
+            self.chunk_store = ChunkRefStore()
 
-    def upload_document(self, upload: DocumentUpload) -> DocumentInfo:
+    def upload_document(
+        self,
+        upload: DocumentUpload,
+        doc_id: str | None = None,
+        on_stage: Callable[[str], None] | None = None,
+    ) -> DocumentInfo:
         """
         Upload and process a document.
 
         Args:
             upload: Document upload request
+            doc_id: Identifier to store the document under (default: new uuid)
+            on_stage: Optional callback receiving each stage of INGESTION_STAGES as it starts
 
         Returns:
             Document information
         """
-        doc_id = str(uuid.uuid4())
+        doc_id = doc_id or str(uuid.uuid4())
         content_size = len(upload.content)
         logger.info(
             "uploading_document", doc_id=doc_id, filename=upload.filename, size=content_size
         )
 
+        def parse() -> list[str]:
+            parsed_content = self.parse_content(doc_id, upload)
+            logger.info("document_parsed", doc_id=doc_id, extracted_length=len(parsed_content))
+            return [parsed_content]
+
+        return self._ingest(
+            doc_id,
+            filename=upload.filename,
+            content_type=upload.content_type,
+            metadata=upload.metadata,
+            parse=parse,
+            on_stage=on_stage,
+        )
+
+    def upload_file(
+        self,
+        path: str,
+        filename: str,
+        content_type: str = "text/plain",
+        metadata: dict | None = None,
+        doc_id: str | None = None,
+        on_stage: Callable[[str], None] | None = None,
+    ) -> DocumentInfo:
+        """
+        Upload and process a document stored on disk.
+
+        The parser reads the file directly, so the raw document is never held in
+        memory as a whole (unlike the base64 content of a DocumentUpload).
+
+        Args:
+            path: Path to the raw document
+            filename: Original filename
+            content_type: MIME type of the document
+            metadata: Additional metadata
+            doc_id: Identifier to store the document under (default: new uuid)
+            on_stage: Optional callback receiving each stage of INGESTION_STAGES as it starts
+
+        Returns:
+            Document information
+        """
+        doc_id = doc_id or str(uuid.uuid4())
+        logger.info(
+            "uploading_document",
+            doc_id=doc_id,
+            filename=filename,
+            size=os.path.getsize(path),
+            source="file",
+        )
+
+        def parse() -> Iterable[str]:
+            logger.info(
+                "parsing_document", doc_id=doc_id, filename=filename, content_type=content_type
+            )
+            return self.parser.iter_file_text(path, filename=filename, content_type=content_type)
+
+        return self._ingest(
+            doc_id,
+            filename=filename,
+            content_type=content_type,
+            metadata=metadata or {},
+            parse=parse,
+            on_stage=on_stage,
+        )
+
+    def _ingest(
+        self,
+        doc_id: str,
+        filename: str,
+        content_type: str,
+        metadata: dict,
+        parse: Callable[[], Iterable[str]],
+        on_stage: Callable[[str], None] | None = None,
+    ) -> DocumentInfo:
+        """
+        Parse, chunk, index and store one document.
+
+        Chunks are produced by a generator and embedded and inserted in windows of
+        settings.chunk_stream_window, so memory stays bounded for large documents.
+
+        Args:
+            doc_id: Document identifier
+            filename: Original filename
+            content_type: MIME type of the document
+            metadata: Additional metadata
+            parse: Callable returning the extracted text as pieces in document order
+            on_stage: Optional callback receiving each stage of INGESTION_STAGES as it starts
+
+        Returns:
+            Document information
+        """
+        if on_stage:
+            on_stage("parsing")
+        texts = parse()
+
+        # Chunk lazily; chunking interleaves with embedding below
+        if on_stage:
+            on_stage("chunking")
+        logger.info("chunking_document", doc_id=doc_id)
+        chunks = self._link_children(
+            doc_id, self.chunker.iter_chunks(texts, source=doc_id, metadata=metadata)
+        )
+
+        chunk_count = self._index_chunk_stream(doc_id, chunks, on_stage=on_stage)
+
+        if on_stage:
+            on_stage("saving")
+
+        # Create document info
+        doc_info = DocumentInfo(
+            id=doc_id,
+            filename=filename,
+            content_type=content_type,
+            uploaded_at=datetime.now(),
+            chunk_count=chunk_count,
+            metadata=metadata,
+        )
+
+        # Store document info persistently
+        try:
+            self.storage.save(doc_info)
+        except Exception:
+            self._delete_chunks(doc_id)
+            if self.retriever.parent_store is not None:
+                self.retriever.parent_store.delete_document(doc_id)
+            raise
+
+        logger.info("document_uploaded", doc_id=doc_id, chunks=chunk_count)
+
+        return doc_info
+
+    def parse_content(self, doc_id: str, upload: DocumentUpload) -> str:
+        """
+        Extract text from an uploaded document.
+
+        Args:
+            doc_id: Document identifier (for logging)
+            upload: Document upload request
+
+        Returns:
+            Extracted text
+        """
         # Parse document content (especially important for PDFs)
         logger.info(
             "parsing_document",
@@ -71,60 +243,401 @@ class DocumentService:
             filename=upload.filename,
             content_type=upload.content_type,
         )
+        # Detect and decode base64 once; the parser and the fallback below share it
+        decoded = decode_base64(upload.content)
         parsed_content = self.parser.parse_document(
             content=upload.content,
             filename=upload.filename,
             content_type=upload.content_type,
+            decoded=decoded,
         )
 
         if not parsed_content or len(parsed_content.strip()) == 0:
             logger.warning("no_content_extracted", doc_id=doc_id, filename=upload.filename)
-            # If no content extracted, try to decode base64 if it looks like base64
             # Never store base64 directly in ChromaDB - it must be decoded text
-            import base64
-
-            try:
-                # Check if content looks like base64
-                if len(upload.content) > 100 and all(
-                    c in "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=\n\r\t "
-                    for c in upload.content[:500]
-                ):
-                    decoded = base64.b64decode(upload.content, validate=True)
-                    # Try to decode as UTF-8 text
-                    parsed_content = decoded.decode("utf-8", errors="ignore")
-                    if not parsed_content or len(parsed_content.strip()) == 0:
-                        logger.error("decoded_content_empty", doc_id=doc_id)
-                        raise ValueError("Decoded content is empty")
-                else:
-                    # Not base64, use as-is
-                    parsed_content = upload.content
-            except Exception as e:
-                logger.error("fallback_decode_failed", doc_id=doc_id, error=str(e))
-                # Last resort: use original but log warning
+            if decoded is None:
+                # Not base64, use as-is
                 parsed_content = upload.content
-                logger.warning(
-                    "using_raw_content_fallback",
-                    doc_id=doc_id,
-                    warning="Content may be base64 encoded",
+            else:
+                parsed_content = decoded.decode("utf-8", errors="ignore")
+                if not parsed_content or len(parsed_content.strip()) == 0:
+                    logger.error("decoded_content_empty", doc_id=doc_id)
+                    # Last resort: use original but log warning
+                    parsed_content = upload.content
+                    logger.warning(
+                        "using_raw_content_fallback",
+                        doc_id=doc_id,
+                        warning="Content may be base64 encoded",
+                    )
+
+        return parsed_content
+
+    def parse_file(self, doc_id: str, path: str, filename: str, content_type: str) -> str:
+        """
+        Extract text from a document stored on disk, as upload_file does.
+
+        Args:
+            doc_id: Document identifier (for logging)
+            path: Path to the raw document
+            filename: Original filename
+            content_type: MIME type of the document
+
+        Returns:
+            Extracted text
+        """
+        logger.info("parsing_document", doc_id=doc_id, filename=filename, content_type=content_type)
+        return "".join(
+            self.parser.iter_file_text(path, filename=filename, content_type=content_type)
+        )
+
+    def chunk_content(self, doc_id: str, content: str, metadata: dict) -> list[DocumentChunk]:
+        """
+        Chunk a document's extracted text into the chunks to embed.
+
+        With parent-child retrieval enabled, the parent sections are stored and
+        their child chunks are returned.
+
+        Args:
+            doc_id: Document identifier
+            content: Extracted text
+            metadata: Document metadata copied onto every chunk
+
+        Returns:
+            Chunks in document order
+        """
+        chunks = self.chunker.chunk_document(content=content, source=doc_id, metadata=metadata)
+        return list(self._link_children(doc_id, chunks))
+
+    def _link_children(
+        self, doc_id: str, chunks: Iterable[DocumentChunk]
+    ) -> Iterable[DocumentChunk]:
+        """
+        Turn chunks into parent sections and the child chunks to embed, if enabled.
+
+        Args:
+            doc_id: Document identifier
+            chunks: Chunks of the document, in order
+
+        Returns:
+            Child chunks linked to stored parents, or the chunks themselves when
+            parent-child retrieval is disabled
+        """
+        if self.child_chunker is None or self.retriever.parent_store is None:
+            return chunks
+        return self._split_parents(doc_id, chunks)
+
+    def _split_parents(
+        self, doc_id: str, parents: Iterable[DocumentChunk]
+    ) -> Iterator[DocumentChunk]:
+        """Store parent sections (replacing the document's old ones) and yield their children."""
+        parent_store = self.retriever.parent_store
+        window_size = max(1, settings.chunk_stream_window)
+        parent_store.delete_document(doc_id)
+
+        position = 0
+        pending: list[DocumentChunk] = []
+        for parent in parents:
+            parent.chunk_id = f"{doc_id}_parent_{parent.position}"
+            pending.append(parent)
+            if len(pending) >= window_size:
+                parent_store.add_parents(doc_id, pending)
+                pending = []
+
+            children = self.child_chunker.split_parent(parent, position)
+            position += len(children)
+            yield from children
+
+        if pending:
+            parent_store.add_parents(doc_id, pending)
+
+    def _index_chunks(self, doc_id: str, chunks: list[DocumentChunk]) -> int:
+        """
+        Embed and store a document's chunks, reusing identical stored chunks.
+
+        With deduplication enabled, each chunk is keyed by the hash of its normalized
+        text. Chunks already in the vector database (from this or any other document)
+        are only referenced, not embedded again.
+
+        Args:
+            doc_id: Document identifier
+            chunks: Chunks of the document
+
+        Returns:
+            Number of chunks that were embedded and added
+        """
+        new_chunks = self.select_new_chunks(chunks)
+        self.retriever.add_documents(new_chunks)
+        self.record_chunks(doc_id, chunks)
+
+        logger.info(
+            "chunks_indexed",
+            doc_id=doc_id,
+            added=len(new_chunks),
+            reused=len(chunks) - len(new_chunks),
+        )
+        return len(new_chunks)
+
+    def _index_chunk_stream(
+        self,
+        doc_id: str,
+        chunks: Iterable[DocumentChunk],
+        on_stage: Callable[[str], None] | None = None,
+    ) -> int:
+        """
+        Embed and store a stream of chunks window by window.
+
+        Only one window of chunks and embeddings is held at a time; deduplication
+        state (hashes seen so far) carries across windows. If a window fails, the
+        chunks and parent sections stored for earlier windows are removed again.
+
+        Args:
+            doc_id: Document identifier
+            chunks: Chunks of the document, in order
+            on_stage: Optional callback, told "embedding" when the first window is ready
+
+        Returns:
+            Number of chunks in the document
+        """
+        window_size = max(1, settings.chunk_stream_window)
+        iterator = iter(chunks)
+        hashes: list[str] = []
+        seen: set[str] = set()
+        added: list[str] = []
+        windows = 0
+
+        try:
+            while window := list(islice(iterator, window_size)):
+                if on_stage and windows == 0:
+                    on_stage("embedding")
+                new_chunks = self.select_new_chunks(window, seen=seen)
+                self.retriever.add_documents(new_chunks)
+                hashes.extend(chunk_hash(chunk.content) for chunk in window)
+                added.extend(chunk.chunk_id for chunk in new_chunks)
+                windows += 1
+                logger.debug(
+                    "chunk_window_indexed", doc_id=doc_id, window=windows, chunks=len(window)
                 )
 
-        logger.info("document_parsed", doc_id=doc_id, extracted_length=len(parsed_content))
+            if on_stage and windows == 0:
+                on_stage("embedding")
+            if self.chunk_store is not None:
+                self.chunk_store.add_document(doc_id, hashes)
+        except Exception:
+            self.discard_partial(doc_id, added)
+            raise
 
-        # Chunk document
-        logger.info("chunking_document", doc_id=doc_id)
-        chunks = self.chunker.chunk_document(
-            content=parsed_content,
-            source=doc_id,
-            metadata=upload.metadata,
+        logger.info(
+            "chunks_indexed",
+            doc_id=doc_id,
+            chunks=len(hashes),
+            added=len(added),
+            reused=len(hashes) - len(added),
+            windows=windows,
         )
-        logger.info("document_chunked", doc_id=doc_id, chunks_count=len(chunks))
+        return len(hashes)
+
+    def discard_partial(self, doc_id: str, chunk_ids: list[str]) -> None:
+        """
+        Remove what a failed ingestion stored before failing.
+
+        Args:
+            doc_id: Document identifier
+            chunk_ids: Ids of the chunks inserted for the document
+        """
+        try:
+            if self.chunk_store is None:
+                self.retriever.delete_chunks(chunk_ids)
+            else:
+                # References recorded before the failure go first; another document
+                # may have reused a chunk in the meantime: keep those
+                self._release_chunks(doc_id)
+                self._drop_unreferenced(doc_id, chunk_ids)
+            if self.retriever.parent_store is not None:
+                self.retriever.parent_store.delete_document(doc_id)
+        except Exception as e:
+            logger.error("error_discarding_partial_document", doc_id=doc_id, error=str(e))
+            return
+        logger.warning("partial_document_discarded", doc_id=doc_id, chunks=len(chunk_ids))
 
-        # Add chunks to retriever
-        logger.info("indexing_chunks", doc_id=doc_id, chunks_count=len(chunks))
-        self.retriever.add_documents(chunks)
-        logger.info("chunks_indexed", doc_id=doc_id)
+    def select_new_chunks(
+        self,
+        chunks: list[DocumentChunk],
+        existing: set[str] | None = None,
+        seen: set[str] | None = None,
+    ) -> list[DocumentChunk]:
+        """
+        Assign content-hash ids and pick the chunks that still need embedding.
+
+        A chunk already stored for another document is not written again, so it
+        keeps that document's metadata: searches filtered on this document's
+        source or tags do not find it. Every chunk gets its hash as ``chunk_hash``
+        metadata, which update_document diffs against when deduplication is off.
+
+        Args:
+            chunks: Chunks of one document
+            existing: Hashes known to be stored (default: looked up in the vector database)
+            seen: Hashes already selected for embedding elsewhere; updated in place
+
+        Returns:
+            Chunks to embed and add (all of them when deduplication is disabled)
+        """
+        if self.chunk_store is None:
+            for chunk in chunks:
+                chunk.metadata = {**chunk.metadata, "chunk_hash": chunk_hash(chunk.content)}
+            return chunks
+
+        hashes = [chunk_hash(chunk.content) for chunk in chunks]
+        if existing is None:
+            existing = self.retriever.existing_ids(hashes)
+        if seen is None:
+            seen = set()
+
+        new_chunks: list[DocumentChunk] = []
+        for chunk, content_hash in zip(chunks, hashes, strict=True):
+            if content_hash in existing or content_hash in seen:
+                continue
+            chunk.chunk_id = content_hash
+            chunk.metadata = {**chunk.metadata, "chunk_hash": content_hash}
+            seen.add(content_hash)
+            new_chunks.append(chunk)
+        return new_chunks
+
+    def record_chunks(self, doc_id: str, chunks: list[DocumentChunk]) -> None:
+        """Record a document's chunk hashes in the reference store."""
+        if self.chunk_store is not None:
+            self.chunk_store.add_document(doc_id, [chunk_hash(chunk.content) for chunk in chunks])
+
+    def _release_chunks(self, doc_id: str) -> None:
+        """
+        Drop a document's chunk references and delete chunks nobody references anymore.
+
+        Args:
+            doc_id: Document identifier
+        """
+        if self.chunk_store is None:
+            return
+
+        orphaned, shared = self.chunk_store.release_document(doc_id)
+        self._drop_chunks(doc_id, orphaned, shared)
+
+    def _drop_unreferenced(self, doc_id: str, chunk_hashes: list[str]) -> None:
+        """
+        Delete chunks no document references anymore.
+
+        Chunks that are still shared but whose metadata names ``doc_id`` as source
+        are handed over to another referencing document.
+
+        Args:
+            doc_id: Document that stopped referencing the chunks
+            chunk_hashes: Hashes to check
+        """
+        if self.chunk_store is None or not chunk_hashes:
+            return
+
+        counts = self.chunk_store.refcounts(chunk_hashes)
+        orphaned = [h for h, count in counts.items() if count == 0]
+        shared = [h for h, count in counts.items() if count > 0]
+        self._drop_chunks(doc_id, orphaned, shared)
+
+    def _drop_chunks(self, doc_id: str, orphaned: list[str], shared: list[str]) -> None:
+        """
+        Delete orphaned chunks and hand shared chunks sourced from a document over.
+
+        Args:
+            doc_id: Document that stopped referencing the chunks
+            orphaned: Hashes no document references anymore
+            shared: Hashes still referenced by other documents
+        """
+        if orphaned:
+            self.retriever.delete_chunks(orphaned)
+
+        if shared:
+            stored = self.retriever.collection.get(ids=shared, include=["metadatas"])
+            owners = self.chunk_store.owners(stored["ids"])
+            ids: list[str] = []
+            metadatas: list[dict] = []
+            for chunk_id, metadata in zip(stored["ids"], stored["metadatas"], strict=True):
+                if metadata and metadata.get("source") == doc_id and chunk_id in owners:
+                    ids.append(chunk_id)
+                    metadatas.append({**metadata, "source": owners[chunk_id]})
+            self.retriever.update_metadata(ids, metadatas)
+
+        logger.info(
+            "chunk_refs_released",
+            doc_id=doc_id,
+            deleted=len(orphaned),
+            still_shared=len(shared),
+        )
+
+    def _refresh_metadata(
+        self, doc_id: str, chunks: list[DocumentChunk], kept_hashes: list[str]
+    ) -> None:
+        """
+        Update position and document metadata of unchanged chunks owned by a document.
+
+        Args:
+            doc_id: Document identifier
+            chunks: Chunks of the new document version
+            kept_hashes: Hashes present in both the old and the new version
+        """
+        if not kept_hashes:
+            return
+
+        wanted: dict[str, dict] = {}
+        for chunk in chunks:
+            content_hash = chunk_hash(chunk.content)
+            wanted.setdefault(content_hash, {**chunk.metadata, "chunk_hash": content_hash})
+
+        stored = self.retriever.collection.get(
+            ids=list(dict.fromkeys(kept_hashes)), include=["metadatas"]
+        )
+        ids: list[str] = []
+        metadatas: list[dict] = []
+        for chunk_id, metadata in zip(stored["ids"], stored["metadatas"], strict=True):
+            if metadata and metadata.get("source") == doc_id and metadata != wanted[chunk_id]:
+                ids.append(chunk_id)
+                metadatas.append(wanted[chunk_id])
+        self.retriever.update_metadata(ids, metadatas)
+
+    def update_document(self, doc_id: str, upload: DocumentUpload) -> DocumentInfo | None:
+        """
+        Replace a document with a new version, re-embedding only changed chunks.
+
+        The new version is re-chunked and its chunk hashes are diffed against the
+        stored ones: unchanged chunks are kept as they are, new chunks are embedded
+        and added, and chunks that disappeared are deleted once unreferenced.
+        Without deduplication the hashes come from the chunks' metadata.
+
+        Args:
+            doc_id: Document identifier
+            upload: New version of the document
+
+        Returns:
+            Updated document information or None if not found
+        """
+        existing = self.storage.get(doc_id)
+        if existing is None:
+            return None
+
+        logger.info("updating_document", doc_id=doc_id, filename=upload.filename)
+        chunks = self.chunk_content(doc_id, self.parse_content(doc_id, upload), upload.metadata)
+
+        old_hashes = self.chunk_store.get_document(doc_id) if self.chunk_store else []
+        if self.chunk_store is None:
+            added, removed = self._replace_chunks(doc_id, chunks)
+        elif not old_hashes:
+            # Stored before deduplication: no hashes to diff against
+            self._delete_chunks(doc_id)
+            added = self._index_chunks(doc_id, chunks)
+            removed = 0
+        else:
+            added = self._index_chunks(doc_id, chunks)
+            new_hashes = {chunk_hash(chunk.content) for chunk in chunks}
+            dropped = [h for h in dict.fromkeys(old_hashes) if h not in new_hashes]
+            self._drop_unreferenced(doc_id, dropped)
+            removed = len(dropped)
+            self._refresh_metadata(doc_id, chunks, [h for h in old_hashes if h in new_hashes])
 
-        # Create document info
         doc_info = DocumentInfo(
             id=doc_id,
             filename=upload.filename,
@@ -133,14 +646,78 @@ class DocumentService:
             chunk_count=len(chunks),
             metadata=upload.metadata,
         )
-
-        # Store document info persistently
         self.storage.save(doc_info)
 
-        logger.info("document_uploaded", doc_id=doc_id, chunks=len(chunks))
-
+        logger.info(
+            "document_updated",
+            doc_id=doc_id,
+            chunks=len(chunks),
+            embedded=added,
+            removed=removed,
+        )
         return doc_info
 
+    def _replace_chunks(self, doc_id: str, chunks: list[DocumentChunk]) -> tuple[int, int]:
+        """
+        Replace a document's chunks without deduplication, embedding only new content.
+
+        Chunks are keyed by position, so the stored chunks are matched to the new
+        ones by the ``chunk_hash`` in their metadata. A chunk identical to the
+        stored one under its id is left alone; a chunk whose text is stored under
+        another id (moved, or with new metadata) is written with the stored vector;
+        only text not stored before is embedded. Stored ids no longer used are
+        deleted.
+
+        Args:
+            doc_id: Document identifier
+            chunks: Chunks of the new document version
+
+        Returns:
+            Number of chunks embedded and number of stored chunks deleted
+        """
+        chunks = self.select_new_chunks(chunks)
+        stored = self.retriever.collection.get(where={"source": doc_id}, include=["metadatas"])
+        stored_metadata = dict(zip(stored["ids"], stored["metadatas"], strict=True))
+        stored_ids: dict[str, str] = {}  # Chunk hash -> an id stored with that text
+        for chunk_id, metadata in stored_metadata.items():
+            if metadata and metadata.get("chunk_hash"):
+                stored_ids.setdefault(metadata["chunk_hash"], chunk_id)
+
+        changed = [
+            chunk for chunk in chunks if stored_metadata.get(chunk.chunk_id) != chunk.metadata
+        ]
+        vectors: dict[str, np.ndarray] = {}
+        source_ids = {
+            stored_ids[chunk.metadata["chunk_hash"]]
+            for chunk in changed
+            if chunk.metadata["chunk_hash"] in stored_ids
+        }
+        if source_ids:
+            # Read before writing: a reused vector's id may be overwritten below
+            found = self.retriever.collection.get(ids=list(source_ids), include=["embeddings"])
+            for chunk_id, vector in zip(found["ids"], found["embeddings"], strict=True):
+                vectors[stored_metadata[chunk_id]["chunk_hash"]] = np.asarray(vector, np.float32)
+        embedded = [chunk for chunk in changed if chunk.metadata["chunk_hash"] not in vectors]
+        if embedded:
+            generated = self.retriever.embedding_service.embed_batch(
+                [chunk.content for chunk in embedded]
+            )
+            for chunk, vector in zip(embedded, generated, strict=True):
+                vectors[chunk.metadata["chunk_hash"]] = vector
+
+        if changed:
+            self.retriever.upsert_vectors(
+                ids=[chunk.chunk_id for chunk in changed],
+                embeddings=np.stack([vectors[chunk.metadata["chunk_hash"]] for chunk in changed]),
+                documents=[chunk.content for chunk in changed],
+                metadatas=[chunk.metadata for chunk in changed],
+            )
+
+        new_ids = {chunk.chunk_id for chunk in chunks}
+        dropped = [chunk_id for chunk_id in stored_metadata if chunk_id not in new_ids]
+        self.retriever.delete_chunks(dropped)
+        return len(embedded), len(dropped)
+
     def list_documents(self) -> list[DocumentInfo]:
         """
         List all documents.
@@ -162,20 +739,20 @@ class DocumentService:
         """
         return self.storage.get(doc_id)
 
-    def delete_document(self, doc_id: str) -> bool:
+    def _delete_chunks(self, doc_id: str) -> None:
         """
-        Delete a document and its chunks from the vector database.
+        Delete all chunks of a document from the vector database.
 
         Args:
             doc_id: Document identifier
-
-        Returns:
-            True if deleted, False if not found
         """
-        if not self.storage.exists(doc_id):
-            return False
+        # Deduplicated chunks are deleted by reference count
+        try:
+            self._release_chunks(doc_id)
+        except Exception as e:
+            logger.error("error_releasing_chunks", doc_id=doc_id, error=str(e))
 
-        # Delete chunks from ChromaDB
+        # Delete remaining (pre-deduplication) chunks from ChromaDB
         # Chunk IDs follow pattern: {doc_id}_chunk_{index} or {doc_id}_{position}
         try:
             # Get all chunks for this document from ChromaDB
@@ -186,7 +763,7 @@ class DocumentService:
             # Try to get chunks by querying with metadata filter
             try:
                 results = self.retriever.collection.get(
-                    where={"source": doc_id}, include=["metadatas", "ids"]
+                    where={"source": doc_id}, include=["metadatas"]
                 )
 
                 if results and results.get("ids"):
@@ -197,7 +774,7 @@ class DocumentService:
                             doc_id=doc_id,
                             chunk_count=len(chunk_ids),
                         )
-                        self.retriever.collection.delete(ids=chunk_ids)
+                        self.retriever.delete_chunks(chunk_ids)
                         logger.info(
                             "chunks_deleted_from_chromadb",
                             doc_id=doc_id,
@@ -208,7 +785,7 @@ class DocumentService:
                 logger.warning("metadata_filter_not_supported", error=str(e))
                 try:
                     # Get all IDs and filter by prefix
-                    all_results = self.retriever.collection.get(include=["metadatas", "ids"])
+                    all_results = self.retriever.collection.get(include=["metadatas"])
                     if all_results and all_results.get("ids"):
                         chunk_ids_to_delete = [
                             chunk_id
@@ -218,7 +795,7 @@ class DocumentService:
                             if isinstance(metadata, dict) and metadata.get("source") == doc_id
                         ]
                         if chunk_ids_to_delete:
-                            self.retriever.collection.delete(ids=chunk_ids_to_delete)
+                            self.retriever.delete_chunks(chunk_ids_to_delete)
                             logger.info(
                                 "chunks_deleted_by_pattern",
                                 doc_id=doc_id,
@@ -231,6 +808,23 @@ class DocumentService:
             logger.error("error_deleting_chunks", doc_id=doc_id, error=str(e))
             # Continue to delete from storage even if ChromaDB delete fails
 
+    def delete_document(self, doc_id: str) -> bool:
+        """
+        Delete a document and its chunks from the vector database.
+
+        Args:
+            doc_id: Document identifier
+
+        Returns:
+            True if deleted, False if not found
+        """
+        if not self.storage.exists(doc_id):
+            return False
+
+        self._delete_chunks(doc_id)
+        if self.retriever.parent_store is not None:
+            self.retriever.parent_store.delete_document(doc_id)
+
         # Delete from persistent storage
         self.storage.delete(doc_id)
         logger.info("document_deleted", doc_id=doc_id)
@@ -0,0 +1,378 @@
+"""Staged parse -> chunk -> embed -> index pipeline for batch uploads."""
+
+import queue
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime
+from typing import NamedTuple
+
+import numpy as np
+import structlog
+
+from src.config import settings
+from src.rag.chunking import chunk_hash
+from src.schemas.api import DocumentInfo, DocumentUpload
+from src.schemas.rag import DocumentChunk
+from src.services.document_service import DocumentService
+
+logger = structlog.get_logger()
+
+# Marks the end of the input on a stage queue
+_DONE = object()
+
+
+class FileUpload(NamedTuple):
+    """A document on disk, parsed from its path rather than from uploaded content."""
+
+    path: str
+    filename: str
+    content_type: str
+    metadata: dict
+
+
+class _PipelineItem:
+    """One document travelling through the pipeline."""
+
+    def __init__(
+        self, index: int, upload: DocumentUpload | FileUpload, doc_id: str | None = None
+    ) -> None:
+        self.index = index
+        self.upload = upload
+        self.doc_id = doc_id or str(uuid.uuid4())
+        self.text = ""
+        self.chunked = False  # Chunk stage started: parent sections may be stored
+        self.chunks: list[DocumentChunk] = []
+        self.new_chunks: list[DocumentChunk] = []
+        self.borrowed: list[DocumentChunk] = []  # Chunks embedded for another document of the run
+        self.vectors: np.ndarray | None = None
+        self.error: str | None = None
+        self.document: DocumentInfo | None = None
+
+
+class IngestionPipeline:
+    """
+    Batch ingestion with one worker pool per stage and bounded queues in between.
+
+    Parsing (CPU-bound) runs concurrently with embedding (network- or model-bound),
+    and embedding batches are filled with chunks from several documents, so a batch
+    of small documents makes a few large embedding calls instead of one per document.
+    """
+
+    def __init__(
+        self,
+        document_service: DocumentService,
+        parse_workers: int | None = None,
+        embed_workers: int | None = None,
+        embed_batch_size: int | None = None,
+        queue_size: int | None = None,
+        flush_interval: float = 0.05,
+    ) -> None:
+        """
+        Initialize pipeline.
+
+        Args:
+            document_service: Service providing parser, chunker, retriever and storage
+            parse_workers: Parser threads (default: settings.pipeline_parse_workers)
+            embed_workers: Embedding threads (default: settings.pipeline_embed_workers)
+            embed_batch_size: Chunks per cross-document embedding call
+                (default: settings.pipeline_embed_batch_size)
+            queue_size: Capacity of each inter-stage queue (default: settings.pipeline_queue_size)
+            flush_interval: Seconds an embedding worker waits for more chunks before
+                embedding a partial batch
+        """
+        self.document_service = document_service
+        self.parse_workers = max(1, parse_workers or settings.pipeline_parse_workers)
+        self.embed_workers = max(1, embed_workers or settings.pipeline_embed_workers)
+        self.embed_batch_size = max(1, embed_batch_size or settings.pipeline_embed_batch_size)
+        self.queue_size = max(1, queue_size or settings.pipeline_queue_size)
+        self.flush_interval = flush_interval
+
+    def run(
+        self, uploads: list[DocumentUpload | FileUpload], doc_ids: list[str] | None = None
+    ) -> tuple[list[DocumentInfo], list[dict]]:
+        """
+        Ingest a batch of documents.
+
+        Args:
+            uploads: Documents to ingest, uploaded or on disk
+            doc_ids: Identifier to store each document under (default: new uuids)
+
+        Returns:
+            Tuple of (stored documents in input order, errors with filename, error and index)
+        """
+        if doc_ids is not None and len(doc_ids) != len(uploads):
+            raise ValueError(f"Got {len(doc_ids)} document ids for {len(uploads)} uploads")
+
+        start = time.perf_counter()
+        items = [
+            _PipelineItem(index, upload, doc_ids[index] if doc_ids else None)
+            for index, upload in enumerate(uploads)
+        ]
+
+        parse_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        chunk_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        embed_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        index_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        # Hashes claimed for embedding by a document of this run, and hashes whose
+        # insert succeeded; a document reusing a claimed chunk checks at indexing
+        # time that it was inserted, so a failed document leaves no dangling refs
+        claims = _Claims()
+
+        threads = [
+            *self._start_stage("parse", self.parse_workers, parse_q, chunk_q, self._parse),
+            *self._start_stage("chunk", 1, chunk_q, embed_q, self._chunk),
+            *self._start_stage(
+                "embed",
+                self.embed_workers,
+                embed_q,
+                index_q,
+                lambda batch: self._embed(batch, claims),
+                batched=True,
+            ),
+            *self._start_stage("index", 1, index_q, None, lambda item: self._index(item, claims)),
+        ]
+
+        for item in items:
+            parse_q.put(item)
+        parse_q.put(_DONE)
+        for thread in threads:
+            thread.join()
+        for item in items:
+            if item.document is None and item.chunked:
+                self._discard_parents(item)
+
+        documents = [item.document for item in items if item.document is not None]
+        errors = [
+            {"filename": item.upload.filename, "error": item.error, "index": item.index}
+            for item in items
+            if item.document is None
+        ]
+        elapsed = time.perf_counter() - start
+        logger.info(
+            "ingestion_pipeline_completed",
+            total=len(items),
+            success=len(documents),
+            errors=len(errors),
+            chunks=sum(len(item.chunks) for item in items),
+            embedded=sum(len(item.new_chunks) for item in items),
+            seconds=round(elapsed, 3),
+        )
+        return documents, errors
+
+    def _start_stage(
+        self,
+        name: str,
+        workers: int,
+        inbox: queue.Queue,
+        outbox: queue.Queue | None,
+        handler: Callable,
+        batched: bool = False,
+    ) -> list[threading.Thread]:
+        """Start the worker threads of one stage; the last one to finish closes the outbox."""
+        remaining = [workers]
+        lock = threading.Lock()
+
+        def finish() -> None:
+            inbox.put(_DONE)  # Let sibling workers see the end of input too
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last and outbox is not None:
+                outbox.put(_DONE)
+
+        def forward(item: _PipelineItem) -> None:
+            if outbox is not None:
+                outbox.put(item)
+
+        def worker() -> None:
+            while True:
+                if batched:
+                    batch, done = self._collect(inbox)
+                    if batch:
+                        self._guard(name, batch, handler)
+                        for item in batch:
+                            forward(item)
+                    if done:
+                        break
+                    continue
+
+                item = inbox.get()
+                if item is _DONE:
+                    break
+                self._guard(name, [item], lambda items: handler(items[0]))
+                forward(item)
+            finish()
+
+        threads = [
+            threading.Thread(target=worker, name=f"ingest-{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _collect(self, inbox: queue.Queue) -> tuple[list[_PipelineItem], bool]:
+        """Gather items until the batch holds enough chunks, input pauses, or ends."""
+        batch: list[_PipelineItem] = []
+        chunk_count = 0
+        while chunk_count < self.embed_batch_size:
+            try:
+                item = inbox.get(timeout=self.flush_interval) if batch else inbox.get()
+            except queue.Empty:
+                return batch, False
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+            chunk_count += len(item.chunks)
+        return batch, False
+
+    @staticmethod
+    def _guard(stage: str, items: list[_PipelineItem], handler: Callable[[list], None]) -> None:
+        """Run a stage handler on items that have not failed; record failures on them."""
+        live = [item for item in items if item.error is None]
+        if not live:
+            return
+        try:
+            handler(live)
+        except Exception as e:
+            for item in live:
+                item.error = str(e)
+            logger.error(
+                "ingestion_pipeline_stage_failed",
+                stage=stage,
+                doc_ids=[item.doc_id for item in live],
+                error=str(e),
+            )
+
+    def _parse(self, item: _PipelineItem) -> None:
+        upload = item.upload
+        if isinstance(upload, FileUpload):
+            item.text = self.document_service.parse_file(
+                item.doc_id, upload.path, upload.filename, upload.content_type
+            )
+        else:
+            item.text = self.document_service.parse_content(item.doc_id, upload)
+
+    def _chunk(self, item: _PipelineItem) -> None:
+        item.chunked = True
+        item.chunks = self.document_service.chunk_content(
+            item.doc_id, item.text, item.upload.metadata
+        )
+        item.text = ""  # Free the parsed text early
+
+    def _discard_parents(self, item: _PipelineItem) -> None:
+        """Delete the parent sections the chunk stage stored for a failed document."""
+        parent_store = self.document_service.retriever.parent_store
+        if parent_store is None:
+            return
+        try:
+            parent_store.delete_document(item.doc_id)
+        except Exception as e:
+            logger.error("error_discarding_parents", doc_id=item.doc_id, error=str(e))
+
+    def _embed(self, batch: list[_PipelineItem], claims: "_Claims") -> None:
+        service = self.document_service
+        hashes = [chunk_hash(chunk.content) for item in batch for chunk in item.chunks]
+        existing = service.retriever.existing_ids(hashes) if service.chunk_store else set()
+
+        with claims.lock:
+            for item in batch:
+                item.new_chunks = service.select_new_chunks(item.chunks, existing, claims.seen)
+                if service.chunk_store is not None:
+                    own = {chunk.chunk_id for chunk in item.new_chunks}
+                    borrowed = {
+                        content_hash: chunk
+                        for chunk in item.chunks
+                        if (content_hash := chunk_hash(chunk.content)) not in existing
+                        and content_hash not in own
+                    }
+                    item.borrowed = list(borrowed.values())
+
+        texts = [chunk.content for item in batch for chunk in item.new_chunks]
+        if not texts:
+            return
+        try:
+            vectors = service.retriever.embedding_service.embed_batch(texts)
+        except Exception:
+            claims.release([chunk for item in batch for chunk in item.new_chunks])
+            raise
+
+        offset = 0
+        for item in batch:
+            item.vectors = vectors[offset : offset + len(item.new_chunks)]
+            offset += len(item.new_chunks)
+        logger.info("ingestion_pipeline_batch_embedded", documents=len(batch), chunks=len(texts))
+
+    def _index(self, item: _PipelineItem, claims: "_Claims") -> None:
+        service = self.document_service
+        new_chunks, vectors = item.new_chunks, item.vectors
+
+        if service.chunk_store is not None:
+            with claims.lock:
+                missing = [c for c in item.borrowed if chunk_hash(c.content) not in claims.stored]
+                # Chunks of this document inserted meanwhile by another one
+                keep = [i for i, c in enumerate(new_chunks) if c.chunk_id not in claims.stored]
+            if missing:
+                # Their document failed, or is not indexed yet: embed them here
+                missing = service.select_new_chunks(missing, existing=set())
+                logger.info(
+                    "ingestion_pipeline_borrowed_missing", doc_id=item.doc_id, chunks=len(missing)
+                )
+                extra = service.retriever.embedding_service.embed_batch(
+                    [chunk.content for chunk in missing]
+                )
+                vectors = extra if vectors is None else np.concatenate([vectors, extra])
+                keep.extend(range(len(new_chunks), len(new_chunks) + len(missing)))
+                new_chunks = [*new_chunks, *missing]
+            if len(keep) < len(new_chunks):
+                new_chunks = [new_chunks[i] for i in keep]
+                vectors = vectors[keep] if vectors is not None else None
+
+        if new_chunks:
+            try:
+                service.retriever.add_documents(new_chunks, embeddings=vectors)
+            except Exception:
+                claims.release(item.new_chunks)
+                raise
+
+        document = DocumentInfo(
+            id=item.doc_id,
+            filename=item.upload.filename,
+            content_type=item.upload.content_type,
+            uploaded_at=datetime.now(),
+            chunk_count=len(item.chunks),
+            metadata=item.upload.metadata,
+        )
+        try:
+            service.record_chunks(item.doc_id, item.chunks)
+            service.storage.save(document)
+        except Exception:
+            # Undo the insert so the chunks are neither orphaned nor reused as stored
+            claims.release(item.new_chunks)
+            service.discard_partial(item.doc_id, [chunk.chunk_id for chunk in new_chunks])
+            raise
+        claims.confirm(new_chunks)
+        item.document = document
+        item.vectors = None
+
+
+class _Claims:
+    """Content hashes claimed and stored by the documents of one pipeline run."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.seen: set[str] = set()  # Claimed for embedding (or stored)
+        self.stored: set[str] = set()  # Inserted successfully
+
+    def release(self, chunks: list[DocumentChunk]) -> None:
+        """Give up claims of chunks that failed, so later documents embed them."""
+        with self.lock:
+            self.seen.difference_update(chunk.chunk_id for chunk in chunks)
+
+    def confirm(self, chunks: list[DocumentChunk]) -> None:
+        """Record chunks as inserted."""
+        with self.lock:
+            self.stored.update(chunk.chunk_id for chunk in chunks)
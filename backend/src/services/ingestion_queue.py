@@ -0,0 +1,531 @@
+"""Persistent ingestion job queue processed by a bounded pool of worker threads."""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from src.config import settings
+from src.schemas.api import DocumentInfo, DocumentUpload, IngestionJob
+from src.services.document_service import INGESTION_STAGES, DocumentService
+
+logger = structlog.get_logger()
+
+# Longest pause of a worker after repeated job store errors
+MAX_WORKER_BACKOFF_SECONDS = 30.0
+
+
+class IngestionJobStore:
+    """SQLite-based storage for ingestion jobs and their payloads."""
+
+    def __init__(self, db_path: str | None = None) -> None:
+        """
+        Initialize job storage.
+
+        Args:
+            db_path: Path to SQLite database file (default: ./data/jobs.db)
+        """
+        if db_path is None:
+            data_dir = Path(settings.chroma_path).parent
+            data_dir.mkdir(parents=True, exist_ok=True)
+            db_path = str(data_dir / "jobs.db")
+
+        self.db_path = db_path
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def _init_database(self) -> None:
+        """Initialize database schema."""
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS ingestion_jobs (
+                id TEXT PRIMARY KEY,
+                doc_id TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                status TEXT NOT NULL,
+                stage TEXT,
+                stages TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                max_attempts INTEGER NOT NULL,
+                error TEXT,
+                payload TEXT,
+                result TEXT,
+                next_attempt_at REAL NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                tenant_id TEXT,
+                owner TEXT,
+                lease_expires_at REAL
+            )
+        """)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(ingestion_jobs)")}
+        if "tenant_id" not in columns:  # Created before tenant namespaces
+            conn.execute("ALTER TABLE ingestion_jobs ADD COLUMN tenant_id TEXT")
+        if "owner" not in columns:  # Created before job leases
+            conn.execute("ALTER TABLE ingestion_jobs ADD COLUMN owner TEXT")
+            conn.execute("ALTER TABLE ingestion_jobs ADD COLUMN lease_expires_at REAL")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_queue "
+            "ON ingestion_jobs (status, next_attempt_at)"
+        )
+        conn.close()
+        logger.info("ingestion_job_store_initialized", db_path=self.db_path)
+
+    def create(
+        self, upload: DocumentUpload, max_attempts: int, tenant_id: str | None = None
+    ) -> IngestionJob:
+        """
+        Persist a new queued job.
+
+        Args:
+            upload: Document to ingest
+            max_attempts: Attempts before the job is marked failed
+            tenant_id: Tenant namespace to ingest into (None = shared namespace)
+
+        Returns:
+            The queued job
+        """
+        now = datetime.now().isoformat()
+        job_id = str(uuid.uuid4())
+        doc_id = str(uuid.uuid4())
+        conn = self._connect()
+        conn.execute(
+            """
+            INSERT INTO ingestion_jobs
+            (id, doc_id, filename, status, stage, stages, attempts, max_attempts,
+             error, payload, result, next_attempt_at, created_at, updated_at, tenant_id)
+            VALUES (?, ?, ?, 'queued', NULL, ?, 0, ?, NULL, ?, NULL, ?, ?, ?, ?)
+        """,
+            (
+                job_id,
+                doc_id,
+                upload.filename,
+                json.dumps(dict.fromkeys(INGESTION_STAGES, "pending")),
+                max_attempts,
+                upload.model_dump_json(),
+                time.time(),
+                now,
+                now,
+                tenant_id,
+            ),
+        )
+        conn.close()
+        return IngestionJob(
+            id=job_id,
+            doc_id=doc_id,
+            filename=upload.filename,
+            status="queued",
+            stages=dict.fromkeys(INGESTION_STAGES, "pending"),
+            max_attempts=max_attempts,
+            created_at=datetime.fromisoformat(now),
+            updated_at=datetime.fromisoformat(now),
+        )
+
+    def get(self, job_id: str, tenant_id: str | None = None) -> IngestionJob | None:
+        """
+        Get a job by ID.
+
+        Args:
+            job_id: Job identifier
+            tenant_id: Tenant namespace the job must belong to (None = shared namespace)
+
+        Returns:
+            Job status or None if not found
+        """
+        conn = self._connect()
+        row = conn.execute(
+            """
+            SELECT id, doc_id, filename, status, stage, stages, attempts, max_attempts,
+                   error, result, created_at, updated_at, tenant_id
+            FROM ingestion_jobs WHERE id = ?
+        """,
+            (job_id,),
+        ).fetchone()
+        conn.close()
+
+        if row is None or row[12] != tenant_id:
+            return None
+
+        return IngestionJob(
+            id=row[0],
+            doc_id=row[1],
+            filename=row[2],
+            status=row[3],
+            stage=row[4],
+            stages=json.loads(row[5]),
+            attempts=row[6],
+            max_attempts=row[7],
+            error=row[8],
+            document=DocumentInfo.model_validate_json(row[9]) if row[9] else None,
+            created_at=datetime.fromisoformat(row[10]),
+            updated_at=datetime.fromisoformat(row[11]),
+        )
+
+    def claim_next(
+        self, owner: str, lease_seconds: float
+    ) -> tuple[IngestionJob, DocumentUpload, str | None] | None:
+        """
+        Atomically move the oldest due job from queued to running.
+
+        Args:
+            owner: Identifier of the claiming queue
+            lease_seconds: Seconds the job stays claimed unless the owner renews the lease
+
+        Returns:
+            The claimed job, its upload and its tenant, or None if no job is due
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                """
+                SELECT id, payload, tenant_id FROM ingestion_jobs
+                WHERE status = 'queued' AND next_attempt_at <= ?
+                ORDER BY created_at LIMIT 1
+            """,
+                (time.time(),),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                """
+                UPDATE ingestion_jobs
+                SET status = 'running', stage = NULL, stages = ?, attempts = attempts + 1,
+                    updated_at = ?, owner = ?, lease_expires_at = ?
+                WHERE id = ?
+            """,
+                (
+                    json.dumps(dict.fromkeys(INGESTION_STAGES, "pending")),
+                    datetime.now().isoformat(),
+                    owner,
+                    time.time() + lease_seconds,
+                    row[0],
+                ),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        job = self.get(row[0], tenant_id=row[2])
+        if job is None:
+            return None
+        return job, DocumentUpload.model_validate_json(row[1]), row[2]
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        fields["updated_at"] = datetime.now().isoformat()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        conn = self._connect()
+        conn.execute(
+            f"UPDATE ingestion_jobs SET {assignments} WHERE id = ?",
+            (*fields.values(), job_id),
+        )
+        conn.close()
+
+    def set_stage(self, job_id: str, stage: str) -> None:
+        """
+        Mark a stage as running and all earlier stages as completed.
+
+        Args:
+            job_id: Job identifier
+            stage: Stage that just started
+        """
+        index = INGESTION_STAGES.index(stage)
+        stages = {
+            name: "completed" if i < index else "running" if i == index else "pending"
+            for i, name in enumerate(INGESTION_STAGES)
+        }
+        self._update(job_id, stage=stage, stages=json.dumps(stages))
+
+    def complete(self, job_id: str, document: DocumentInfo) -> None:
+        """
+        Mark a job as completed and drop its payload.
+
+        Args:
+            job_id: Job identifier
+            document: Stored document
+        """
+        self._update(
+            job_id,
+            status="completed",
+            stage=None,
+            stages=json.dumps(dict.fromkeys(INGESTION_STAGES, "completed")),
+            error=None,
+            payload=None,
+            result=document.model_dump_json(),
+        )
+
+    def fail(self, job_id: str, error: str, retry_at: float | None) -> None:
+        """
+        Record a failed attempt.
+
+        Args:
+            job_id: Job identifier
+            error: Error message
+            retry_at: Epoch time of the next attempt, or None to fail the job for good
+        """
+        if retry_at is None:
+            self._update(job_id, status="failed", error=error)
+        else:
+            self._update(job_id, status="queued", error=error, next_attempt_at=retry_at)
+
+    def renew_leases(self, owner: str, job_ids: list[str], lease_seconds: float) -> None:
+        """
+        Extend the leases of jobs an owner is still running.
+
+        Args:
+            owner: Identifier of the queue running the jobs
+            job_ids: Jobs in progress
+            lease_seconds: Seconds from now until the leases expire
+        """
+        if not job_ids:
+            return
+        placeholders = ", ".join("?" for _ in job_ids)
+        conn = self._connect()
+        conn.execute(
+            f"""
+            UPDATE ingestion_jobs SET lease_expires_at = ?
+            WHERE status = 'running' AND owner = ? AND id IN ({placeholders})
+        """,
+            (time.time() + lease_seconds, owner, *job_ids),
+        )
+        conn.close()
+
+    def requeue_expired(self) -> int:
+        """
+        Put running jobs whose lease expired (their process died) back in the queue.
+
+        Jobs of live queues, in this or another process, keep their renewed leases.
+
+        Returns:
+            Number of jobs requeued
+        """
+        conn = self._connect()
+        cursor = conn.execute(
+            """
+            UPDATE ingestion_jobs SET status = 'queued', owner = NULL, updated_at = ?
+            WHERE status = 'running' AND (lease_expires_at IS NULL OR lease_expires_at < ?)
+        """,
+            (datetime.now().isoformat(), time.time()),
+        )
+        conn.close()
+        return cursor.rowcount
+
+
+class IngestionQueue:
+    """
+    Bounded pool of worker threads ingesting queued documents.
+
+    Jobs survive restarts: they live in an :class:`IngestionJobStore`. A running
+    job is leased to the queue running it, which renews the lease while the job
+    is in progress; jobs whose lease expired (their process died) are requeued.
+    """
+
+    def __init__(
+        self,
+        document_service: DocumentService,
+        store: IngestionJobStore | None = None,
+        workers: int | None = None,
+        max_attempts: int | None = None,
+        retry_backoff_seconds: float | None = None,
+        poll_interval: float = 1.0,
+        document_service_for: Callable[[str], DocumentService] | None = None,
+        lease_seconds: float | None = None,
+    ) -> None:
+        """
+        Initialize the queue (workers start lazily).
+
+        Args:
+            document_service: Service doing the actual ingestion
+            store: Job storage (default: SQLite next to the vector database)
+            workers: Number of worker threads (default: settings.ingestion_workers)
+            max_attempts: Attempts per job (default: settings.ingestion_max_attempts)
+            retry_backoff_seconds: Delay before the first retry, doubled on each further
+                retry (default: settings.ingestion_retry_backoff_seconds)
+            poll_interval: Seconds between queue polls when idle
+            document_service_for: Returns the document service of a tenant, for jobs
+                submitted to a tenant namespace
+            lease_seconds: Seconds a running job stays claimed without renewal
+                (default: settings.ingestion_lease_seconds)
+        """
+        self.document_service = document_service
+        self.document_service_for = document_service_for
+        self._store = store
+        self.workers = max(1, workers if workers is not None else settings.ingestion_workers)
+        self.max_attempts = max(
+            1, max_attempts if max_attempts is not None else settings.ingestion_max_attempts
+        )
+        self.retry_backoff_seconds = (
+            retry_backoff_seconds
+            if retry_backoff_seconds is not None
+            else settings.ingestion_retry_backoff_seconds
+        )
+        self.poll_interval = poll_interval
+        self.lease_seconds = (
+            lease_seconds if lease_seconds is not None else settings.ingestion_lease_seconds
+        )
+
+        self.owner = uuid.uuid4().hex
+        self._running: set[str] = set()  # Jobs in progress, whose leases are renewed
+        self._running_lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+
+    @property
+    def store(self) -> IngestionJobStore:
+        """Job storage, created on first use."""
+        if self._store is None:
+            self._store = IngestionJobStore()
+        return self._store
+
+    def start(self) -> None:
+        """Requeue interrupted jobs and start the worker and lease threads."""
+        with self._start_lock:
+            if self._threads:
+                return
+
+            requeued = self.store.requeue_expired()
+            self._stopping.clear()
+            targets = [(self._worker, f"ingestion-worker-{i}") for i in range(self.workers)]
+            targets.append((self._keep_leases, "ingestion-leases"))
+            for target, name in targets:
+                thread = threading.Thread(target=target, name=name, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            logger.info("ingestion_queue_started", workers=self.workers, requeued=requeued)
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Stop the worker threads after their current job.
+
+        Args:
+            timeout: Seconds to wait for each worker
+        """
+        with self._start_lock:
+            self._stopping.set()
+            self._wakeup.set()
+            for thread in self._threads:
+                thread.join(timeout)
+            self._threads = []
+        logger.info("ingestion_queue_stopped")
+
+    def submit(self, upload: DocumentUpload, tenant_id: str | None = None) -> IngestionJob:
+        """
+        Queue a document for ingestion.
+
+        Args:
+            upload: Document to ingest
+            tenant_id: Tenant namespace to ingest into (None = shared namespace)
+
+        Returns:
+            The queued job
+        """
+        self.start()
+        job = self.store.create(upload, max_attempts=self.max_attempts, tenant_id=tenant_id)
+        self._wakeup.set()
+        logger.info("ingestion_job_queued", job_id=job.id, doc_id=job.doc_id, filename=job.filename)
+        return job
+
+    def get(self, job_id: str, tenant_id: str | None = None) -> IngestionJob | None:
+        """
+        Get a job by ID.
+
+        Args:
+            job_id: Job identifier
+            tenant_id: Tenant namespace the job must belong to (None = shared namespace)
+
+        Returns:
+            Job status or None if not found
+        """
+        return self.store.get(job_id, tenant_id=tenant_id)
+
+    def _worker(self) -> None:
+        errors = 0
+        while not self._stopping.is_set():
+            try:
+                claimed = self.store.claim_next(self.owner, self.lease_seconds)
+                if claimed is None:
+                    self._wakeup.wait(self.poll_interval)
+                    self._wakeup.clear()
+                    continue
+                self._run(*claimed)
+                errors = 0
+            except Exception:
+                # e.g. "database is locked": keep the worker alive and retry later
+                errors += 1
+                delay = min(self.poll_interval * 2 ** (errors - 1), MAX_WORKER_BACKOFF_SECONDS)
+                logger.exception("ingestion_worker_error", retry_in=delay)
+                self._stopping.wait(delay)
+
+    def _keep_leases(self) -> None:
+        """Renew the leases of running jobs and requeue jobs of dead processes."""
+        while not self._stopping.wait(self.lease_seconds / 3):
+            try:
+                with self._running_lock:
+                    running = list(self._running)
+                self.store.renew_leases(self.owner, running, self.lease_seconds)
+                if self.store.requeue_expired():
+                    self._wakeup.set()
+            except Exception:
+                logger.exception("ingestion_lease_renewal_failed")
+
+    def _run(self, job: IngestionJob, upload: DocumentUpload, tenant_id: str | None = None) -> None:
+        with self._running_lock:
+            self._running.add(job.id)
+        try:
+            self._ingest(job, upload, tenant_id)
+        finally:
+            with self._running_lock:
+                self._running.discard(job.id)
+
+    def _ingest(self, job: IngestionJob, upload: DocumentUpload, tenant_id: str | None) -> None:
+        attempt = job.attempts
+        logger.info(
+            "ingestion_job_started",
+            job_id=job.id,
+            doc_id=job.doc_id,
+            attempt=attempt,
+            tenant_id=tenant_id,
+        )
+        try:
+            document_service = self.document_service
+            if tenant_id is not None:
+                if self.document_service_for is None:
+                    raise RuntimeError(f"No document service for tenant {tenant_id}")
+                document_service = self.document_service_for(tenant_id)
+            document = document_service.upload_document(
+                upload,
+                doc_id=job.doc_id,
+                on_stage=lambda stage: self.store.set_stage(job.id, stage),
+            )
+        except Exception as e:
+            retry_at = None
+            if attempt < job.max_attempts:
+                retry_at = time.time() + self.retry_backoff_seconds * 2 ** (attempt - 1)
+            self.store.fail(job.id, str(e), retry_at)
+            logger.error(
+                "ingestion_job_failed",
+                job_id=job.id,
+                attempt=attempt,
+                error=str(e),
+                will_retry=retry_at is not None,
+            )
+            return
+
+        self.store.complete(job.id, document)
+        logger.info("ingestion_job_completed", job_id=job.id, doc_id=document.id)
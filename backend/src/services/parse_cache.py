@@ -0,0 +1,199 @@
+"""Persistent cache of parser output keyed by document content hash."""
+
+import hashlib
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+
+import structlog
+
+from src.config import settings
+
+logger = structlog.get_logger()
+
+# Bytes read at a time when hashing files
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def content_key(data: bytes) -> str:
+    """
+    Hash raw document bytes.
+
+    Args:
+        data: Document content
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_key(path: str) -> str:
+    """
+    Hash a document file without loading it into memory.
+
+    Args:
+        path: Path to the document
+
+    Returns:
+        Hex SHA-256 digest (equal to content_key of the file's bytes)
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(_HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    SQLite-based cache from (content hash, parser version) to extracted text.
+
+    Text is stored zlib-compressed. When the stored size exceeds ``max_bytes``,
+    least recently used entries are evicted.
+    """
+
+    def __init__(self, db_path: str | None = None, max_bytes: int | None = None) -> None:
+        """
+        Initialize parse cache.
+
+        Args:
+            db_path: Path to SQLite database file (default: ./data/parse_cache.db)
+            max_bytes: Compressed size limit (default: settings.parse_cache_max_bytes)
+        """
+        if db_path is None:
+            data_dir = Path(settings.chroma_path).parent
+            data_dir.mkdir(parents=True, exist_ok=True)
+            db_path = str(data_dir / "parse_cache.db")
+
+        self.db_path = db_path
+        self.max_bytes = max_bytes if max_bytes is not None else settings.parse_cache_max_bytes
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_database(self) -> None:
+        """Initialize database schema."""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS parse_cache (
+                content_hash TEXT NOT NULL,
+                parser_version TEXT NOT NULL,
+                text BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (content_hash, parser_version)
+            )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_parse_cache_last_used ON parse_cache (last_used)"
+        )
+
+        conn.commit()
+        conn.close()
+        logger.info("parse_cache_initialized", db_path=self.db_path, max_bytes=self.max_bytes)
+
+    def get(self, content_hash: str, parser_version: str) -> str | None:
+        """
+        Look up extracted text and mark the entry as recently used.
+
+        Args:
+            content_hash: Hash of the raw document (see content_key/file_key)
+            parser_version: Version of the parser that produced the text
+
+        Returns:
+            Cached text or None on a miss
+        """
+        conn = self._connect()
+        with conn:
+            row = conn.execute(
+                "SELECT text FROM parse_cache WHERE content_hash = ? AND parser_version = ?",
+                (content_hash, parser_version),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE parse_cache SET last_used = ? "
+                    "WHERE content_hash = ? AND parser_version = ?",
+                    (time.time(), content_hash, parser_version),
+                )
+        conn.close()
+
+        if row is None:
+            logger.debug("parse_cache_miss", content_hash=content_hash)
+            return None
+        logger.info("parse_cache_hit", content_hash=content_hash)
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, content_hash: str, parser_version: str, text: str) -> None:
+        """
+        Store extracted text, evicting least recently used entries if over the size limit.
+
+        Args:
+            content_hash: Hash of the raw document
+            parser_version: Version of the parser that produced the text
+            text: Extracted text
+        """
+        compressed = zlib.compress(text.encode("utf-8"))
+        if len(compressed) > self.max_bytes:
+            return
+
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO parse_cache
+                (content_hash, parser_version, text, size, last_used)
+                VALUES (?, ?, ?, ?, ?)
+            """,
+                (content_hash, parser_version, compressed, len(compressed), time.time()),
+            )
+            evicted = self._evict(conn)
+        conn.close()
+
+        if evicted:
+            logger.info("parse_cache_evicted", entries=evicted)
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM parse_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        victims: list[tuple[str, str]] = []
+        for content_hash, parser_version, size in conn.execute(
+            "SELECT content_hash, parser_version, size FROM parse_cache ORDER BY last_used"
+        ):
+            if total <= self.max_bytes:
+                break
+            victims.append((content_hash, parser_version))
+            total -= size
+
+        conn.executemany(
+            "DELETE FROM parse_cache WHERE content_hash = ? AND parser_version = ?", victims
+        )
+        return len(victims)
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with entry count and compressed size
+        """
+        conn = self._connect()
+        entries, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM parse_cache"
+        ).fetchone()
+        conn.close()
+        return {"entries": entries, "bytes": size, "max_bytes": self.max_bytes}
+
+    def clear(self) -> None:
+        """Delete all cached entries."""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM parse_cache")
+        conn.close()
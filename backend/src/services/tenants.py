@@ -0,0 +1,218 @@
+"""Tenant namespaces with their own collections, indexes, caches and stores."""
+
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple
+
+import structlog
+
+from src.config import settings
+from src.rag.parent_store import ParentStore
+from src.rag.retriever import RAGRetriever
+from src.services.agent_service import AgentService
+from src.services.chunk_store import ChunkRefStore
+from src.services.document_service import DocumentService
+from src.services.document_storage import DocumentStorage
+from src.services.ingestion_pipeline import IngestionPipeline
+from src.services.ingestion_queue import IngestionQueue
+
+logger = structlog.get_logger()
+
+# Header value naming the shared namespace (same as sending no header)
+DEFAULT_TENANT = "default"
+
+# Tenant ids end up in collection names and directory names
+_TENANT_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,62}$")
+
+
+class TenantServices(NamedTuple):
+    """Services bound to one tenant namespace."""
+
+    tenant_id: str | None  # None for the shared (default) namespace
+    retriever: RAGRetriever
+    document_service: DocumentService
+    agent_service: AgentService
+    ingestion_queue: IngestionQueue  # Shared by all tenants; jobs record their tenant
+    ingestion_pipeline: IngestionPipeline
+
+
+class TenantStores(NamedTuple):
+    """SQLite stores of one tenant namespace."""
+
+    storage: DocumentStorage
+    chunk_store: ChunkRefStore | None  # None unless settings.chunk_dedup_enabled
+    parent_store: ParentStore | None  # None unless settings.parent_child_enabled
+
+
+def check_tenant_id(tenant_id: str) -> None:
+    """
+    Validate a tenant id.
+
+    Args:
+        tenant_id: Tenant identifier
+
+    Raises:
+        ValueError: If the id cannot name a collection and a directory
+    """
+    if not _TENANT_ID.match(tenant_id):
+        raise ValueError(
+            "Tenant id must be 1-63 letters, digits, '_' or '-', starting with a letter or digit"
+        )
+
+
+def open_tenant_stores(tenant_id: str) -> TenantStores:
+    """
+    Open a tenant's stores, creating its data directory if new.
+
+    Args:
+        tenant_id: Valid tenant identifier
+
+    Returns:
+        The tenant's document, chunk reference and parent stores
+    """
+    data_dir = tenant_data_dir(tenant_id)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return TenantStores(
+        storage=DocumentStorage(db_path=str(data_dir / "documents.db")),
+        chunk_store=ChunkRefStore(db_path=str(data_dir / "chunks.db"))
+        if settings.chunk_dedup_enabled
+        else None,
+        parent_store=ParentStore(str(data_dir / "parents.db"))
+        if settings.parent_child_enabled
+        else None,
+    )
+
+
+def tenant_data_dir(tenant_id: str) -> Path:
+    """Directory of a tenant's SQLite stores, next to the shared ones."""
+    return Path(settings.chroma_path).parent / "tenants" / tenant_id
+
+
+def tenant_allowed(tenant_id: str) -> bool:
+    """Whether settings.tenant_allowlist lets a tenant namespace be opened."""
+    allowlist = {entry.strip() for entry in settings.tenant_allowlist.split(",")}
+    return "*" in allowlist or tenant_id in allowlist
+
+
+def tenant_collection_name(tenant_id: str) -> str:
+    """Logical collection name of a tenant's chunks."""
+    return f"tenant_{tenant_id}"
+
+
+class TenantRegistry:
+    """
+    LRU of open tenant namespaces.
+
+    Each tenant gets its own ChromaDB collection (so searches never scan other
+    tenants' vectors and need no metadata filter), its own BM25 index and query
+    cache (both held by its retriever) and its own document, chunk reference and
+    parent stores. The embedding model, the parser and the ingestion workers are
+    shared. Namespaces are opened on first use and closed when they fall out of
+    the LRU; their data stays on disk.
+
+    Only ids listed in settings.tenant_allowlist (or any id, with "*") can be
+    opened, since opening a new tenant creates its collection and stores.
+    """
+
+    def __init__(self, default: TenantServices, max_open: int | None = None) -> None:
+        """
+        Initialize tenant registry.
+
+        Args:
+            default: Services of the shared namespace (never closed)
+            max_open: Tenant namespaces kept open (default: settings.tenant_cache_size)
+        """
+        self.default = default
+        self.max_open = max(1, max_open or settings.tenant_cache_size)
+        self._open: OrderedDict[str, TenantServices] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tenant_id: str | None) -> TenantServices:
+        """
+        Get the services of a tenant, opening its namespace if needed.
+
+        Args:
+            tenant_id: Tenant identifier (None or DEFAULT_TENANT for the shared namespace)
+
+        Returns:
+            Tenant services
+
+        Raises:
+            ValueError: If the tenant id is invalid or tenants are disabled
+            PermissionError: If the tenant id is not in settings.tenant_allowlist
+        """
+        if tenant_id is None or tenant_id == DEFAULT_TENANT:
+            return self.default
+        if not settings.tenants_enabled:
+            raise ValueError("Tenant namespaces are disabled")
+        check_tenant_id(tenant_id)
+        if not tenant_allowed(tenant_id):
+            raise PermissionError(f"Unknown tenant: {tenant_id}")
+
+        with self._lock:
+            services = self._open.get(tenant_id)
+            if services is not None:
+                self._open.move_to_end(tenant_id)
+                return services
+
+            services = self._create(tenant_id)
+            self._open[tenant_id] = services
+            evicted = []
+            while len(self._open) > self.max_open:
+                evicted.append(self._open.popitem(last=False)[1])
+
+        # Outside the lock: stopping a migration waits for its current batch
+        for closed in evicted:
+            self._close(closed)
+        return services
+
+    def document_service_for(self, tenant_id: str | None) -> DocumentService:
+        """Document service of a tenant (used by the shared ingestion queue)."""
+        return self.get(tenant_id).document_service
+
+    def open_tenants(self) -> list[str]:
+        """Ids of the open tenant namespaces, least recently used first."""
+        with self._lock:
+            return list(self._open)
+
+    def close(self) -> None:
+        """Close every open tenant namespace (the shared one is left open)."""
+        with self._lock:
+            evicted = list(self._open.values())
+            self._open.clear()
+        for closed in evicted:
+            self._close(closed)
+
+    def _close(self, services: TenantServices) -> None:
+        """Stop a tenant's background work and drop its in-memory indexes."""
+        try:
+            services.retriever.close()
+        except Exception as e:
+            logger.error("tenant_close_failed", tenant_id=services.tenant_id, error=str(e))
+        logger.info("tenant_closed", tenant_id=services.tenant_id, open_tenants=len(self._open))
+
+    def _create(self, tenant_id: str) -> TenantServices:
+        """Open a tenant namespace, creating its collection and stores if new."""
+        stores = open_tenant_stores(tenant_id)
+        retriever = RAGRetriever(
+            collection_name=tenant_collection_name(tenant_id),
+            embedding_service=self.default.retriever.target_embedding_service,
+            parent_store=stores.parent_store,
+        )
+        document_service = DocumentService(
+            retriever=retriever,
+            parser=self.default.document_service.parser,
+            storage=stores.storage,
+            chunk_store=stores.chunk_store,
+        )
+        logger.info("tenant_opened", tenant_id=tenant_id, collection=retriever.collection_name)
+        return TenantServices(
+            tenant_id=tenant_id,
+            retriever=retriever,
+            document_service=document_service,
+            agent_service=AgentService(retriever=retriever),
+            ingestion_queue=self.default.ingestion_queue,
+            ingestion_pipeline=IngestionPipeline(document_service),
+        )
@@ -3,6 +3,9 @@
 from src.rag.retriever import RAGRetriever
 from src.services.agent_service import AgentService
 from src.services.document_service import DocumentService
+from src.services.ingestion_pipeline import IngestionPipeline
+from src.services.ingestion_queue import IngestionQueue
+from src.services.tenants import TenantRegistry, TenantServices
 
 # Create a single shared instance of the retriever
 # This ensures that DocumentService and AgentService access the same data
@@ -11,3 +14,24 @@ shared_retriever = RAGRetriever()
 # Create services using the same retriever
 document_service = DocumentService(retriever=shared_retriever)
 agent_service = AgentService(retriever=shared_retriever)
+
+# Background ingestion queue (workers start on first submit or at app startup)
+ingestion_queue = IngestionQueue(
+    document_service,
+    document_service_for=lambda tenant_id: tenant_registry.document_service_for(tenant_id),
+)
+
+# Staged pipeline for batch uploads
+ingestion_pipeline = IngestionPipeline(document_service)
+
+# Tenant namespaces (X-Tenant-ID); requests without a tenant use the instances above
+tenant_registry = TenantRegistry(
+    TenantServices(
+        tenant_id=None,
+        retriever=shared_retriever,
+        document_service=document_service,
+        agent_service=agent_service,
+        ingestion_queue=ingestion_queue,
+        ingestion_pipeline=ingestion_pipeline,
+    )
+)
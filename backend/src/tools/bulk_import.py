@@ -0,0 +1,306 @@
+"""Import a directory tree of documents through the ingestion pipeline.
+
+Usage: python -m src.tools.bulk_import <dir> [--batch-size N] [--checkpoint PATH]
+
+Files are read in batches and ingested with parallel parsing and cross-document
+embedding batches, bypassing the HTTP API and its upload rate limit. Files are
+parsed from their paths, never read into upload payloads. Every finished batch
+is appended to a checkpoint file, so an interrupted import resumes with the
+files that are not done yet. Document ids are derived from file paths; a file
+imported again replaces its stored document instead of duplicating it.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import uuid
+from collections.abc import Iterator
+from pathlib import Path
+
+import structlog
+
+from src.config import settings
+from src.services.document_service import DocumentService
+from src.services.ingestion_pipeline import FileUpload, IngestionPipeline
+
+logger = structlog.get_logger()
+
+# Extensions imported by default, with the content type sent to the parser
+CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".txt": "text/plain",
+    ".md": "text/markdown",
+    ".markdown": "text/markdown",
+    ".rst": "text/x-rst",
+    ".csv": "text/csv",
+    ".json": "application/json",
+    ".html": "text/html",
+    ".htm": "text/html",
+}
+
+
+def find_files(root: Path, extensions: set[str]) -> list[Path]:
+    """
+    List importable files under a directory, skipping hidden files and directories.
+
+    Args:
+        root: Directory to walk
+        extensions: Lower-case extensions to include (e.g. ".pdf")
+
+    Returns:
+        File paths in a stable (sorted) order
+    """
+    files: list[Path] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in sorted(filenames):
+            path = Path(dirpath) / filename
+            if not filename.startswith(".") and path.suffix.lower() in extensions:
+                files.append(path)
+    return files
+
+
+def document_id(path: Path) -> str:
+    """
+    Derive a stable document id from a file's absolute path.
+
+    Args:
+        path: Document file
+
+    Returns:
+        UUID string (the same for every import of the same path)
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"bulk-import:{path.resolve().as_posix()}"))
+
+
+def file_upload(path: Path, relative: str) -> FileUpload:
+    """
+    Describe a file for the pipeline, which parses it from its path.
+
+    Args:
+        path: Document file
+        relative: Path relative to the import root (stored as metadata)
+
+    Returns:
+        File upload with the content type of the file's extension
+    """
+    return FileUpload(
+        path=str(path),
+        filename=path.name,
+        content_type=CONTENT_TYPES.get(path.suffix.lower(), "text/plain"),
+        metadata={"source_path": relative},
+    )
+
+
+def default_checkpoint_path(root: Path) -> Path:
+    """Checkpoint file for a directory, next to the other local data files."""
+    digest = hashlib.sha256(str(root.resolve()).encode("utf-8")).hexdigest()[:16]
+    return Path(settings.chroma_path).parent / "bulk_import" / f"{digest}.jsonl"
+
+
+class Checkpoint:
+    """
+    Append-only JSON-lines record of imported files.
+
+    Each line holds one file's relative path with either its document id and
+    chunk count, or the error it failed with. Failed files are retried on the
+    next run; the last line for a path wins.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        Initialize checkpoint.
+
+        Args:
+            path: Checkpoint file (created on first write)
+        """
+        self.path = path
+
+    def completed(self) -> set[str]:
+        """
+        Get the files imported successfully by previous runs.
+
+        Returns:
+            Relative paths of imported files
+        """
+        if not self.path.exists():
+            return set()
+
+        status: dict[str, bool] = {}
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line from a crash mid-write
+                status[entry["path"]] = "error" not in entry
+        return {path for path, ok in status.items() if ok}
+
+    def record(self, entries: list[dict]) -> None:
+        """
+        Append entries and flush them to disk.
+
+        Args:
+            entries: One dict per file, with "path" and either "doc_id" or "error"
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self) -> None:
+        """Forget all recorded files."""
+        self.path.unlink(missing_ok=True)
+
+
+def _batches(files: list[Path], batch_size: int) -> Iterator[list[Path]]:
+    for start in range(0, len(files), batch_size):
+        yield files[start : start + batch_size]
+
+
+def bulk_import(
+    root: Path,
+    pipeline: IngestionPipeline,
+    checkpoint: Checkpoint,
+    batch_size: int = 64,
+    extensions: set[str] | None = None,
+) -> dict:
+    """
+    Import every pending file under a directory.
+
+    Args:
+        root: Directory to import
+        pipeline: Ingestion pipeline to run batches through
+        checkpoint: Record of finished files, read to skip them and appended to
+        batch_size: Files read and ingested per pipeline run
+        extensions: Extensions to include (default: CONTENT_TYPES)
+
+    Returns:
+        Statistics: files found, skipped, imported and failed, chunks, seconds,
+        docs_per_second and chunks_per_second
+    """
+    files = find_files(root, extensions or set(CONTENT_TYPES))
+    done = checkpoint.completed()
+    pending = [path for path in files if path.relative_to(root).as_posix() not in done]
+    stats = {
+        "files": len(files),
+        "skipped": len(files) - len(pending),
+        "imported": 0,
+        "failed": 0,
+        "chunks": 0,
+    }
+    logger.info("bulk_import_started", root=str(root), files=len(files), pending=len(pending))
+
+    service = pipeline.document_service
+    start = time.perf_counter()
+    for batch in _batches(pending, max(1, batch_size)):
+        entries: list[dict] = []
+        relatives = [path.relative_to(root).as_posix() for path in batch]
+        uploads = [file_upload(path, rel) for path, rel in zip(batch, relatives, strict=True)]
+        doc_ids = [document_id(path) for path in batch]
+        for doc_id in doc_ids:
+            # Imported before (a --restart, or a crash before the checkpoint was
+            # written): drop the old version so none of its chunks are left over
+            if service.delete_document(doc_id):
+                logger.info("bulk_import_replacing_document", doc_id=doc_id)
+
+        documents, errors = pipeline.run(uploads, doc_ids=doc_ids)
+
+        by_id = {document.id: document for document in documents}
+        for error in errors:
+            entries.append({"path": relatives[error["index"]], "error": error["error"]})
+        for relative, doc_id in zip(relatives, doc_ids, strict=True):
+            if doc_id in by_id:
+                chunks = by_id[doc_id].chunk_count
+                entries.append({"path": relative, "doc_id": doc_id, "chunks": chunks})
+                stats["chunks"] += chunks
+        checkpoint.record(entries)
+
+        stats["imported"] += len(documents)
+        stats["failed"] += len(batch) - len(documents)
+        elapsed = time.perf_counter() - start
+        print(
+            f"   {stats['imported'] + stats['failed']}/{len(pending)} files "
+            f"({stats['imported'] / elapsed:.1f} docs/s, {stats['chunks'] / elapsed:.1f} chunks/s, "
+            f"{stats['failed']} failed)",
+            flush=True,
+        )
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = round(elapsed, 3)
+    stats["docs_per_second"] = stats["imported"] / elapsed if elapsed > 0 else 0.0
+    stats["chunks_per_second"] = stats["chunks"] / elapsed if elapsed > 0 else 0.0
+    logger.info("bulk_import_completed", **stats)
+    return stats
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.bulk_import",
+        description="Import a directory tree of documents, resuming from a checkpoint.",
+    )
+    parser.add_argument("directory", type=Path, help="Directory to import")
+    parser.add_argument("--batch-size", type=int, default=64, help="Files per pipeline run")
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help="Checkpoint file (default: data/bulk_import/<directory hash>.jsonl)",
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore the checkpoint and import everything"
+    )
+    parser.add_argument(
+        "--extensions",
+        default=",".join(sorted(CONTENT_TYPES)),
+        help="Comma-separated extensions to import",
+    )
+    parser.add_argument("--parse-workers", type=int, default=None, help="Parser threads")
+    parser.add_argument(
+        "--embed-batch-size", type=int, default=None, help="Chunks per embedding call"
+    )
+    args = parser.parse_args(argv)
+
+    root = args.directory
+    if not root.is_dir():
+        print(f"❌ Not a directory: {root}")
+        return 1
+
+    checkpoint = Checkpoint(args.checkpoint or default_checkpoint_path(root))
+    if args.restart:
+        checkpoint.clear()
+    extensions = {
+        ext if ext.startswith(".") else f".{ext}"
+        for ext in (e.strip().lower() for e in args.extensions.split(","))
+        if ext
+    }
+
+    pipeline = IngestionPipeline(
+        DocumentService(),
+        parse_workers=args.parse_workers,
+        embed_batch_size=args.embed_batch_size,
+    )
+
+    print(f"📥 Importing {root} (checkpoint: {checkpoint.path})")
+    print("=" * 50)
+    stats = bulk_import(root, pipeline, checkpoint, args.batch_size, extensions)
+    print("=" * 50)
+    print(
+        f"✅ Imported {stats['imported']} files ({stats['chunks']} chunks) "
+        f"in {stats['seconds']:.1f}s"
+    )
+    print(
+        f"   {stats['docs_per_second']:.1f} docs/s, {stats['chunks_per_second']:.1f} chunks/s, "
+        f"{stats['skipped']} already imported, {stats['failed']} failed"
+    )
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""Move chunks to their shards after a change of settings.shard_count.
+
+Usage: python -m src.tools.rebalance_shards [--collection NAME] [--batch-size N]
+
+Chunks are placed among settings.shard_count collections by a hash of their
+source. After the shard count changes (from 1, the unsharded collection, as
+well), queries only search the collections of the new layout, so run this with
+the API stopped: it copies every misplaced chunk, stored vector included, to
+the shard it belongs to and drops the collections that are no longer part of
+the layout. No embedding calls are made, and an interrupted run can simply be
+started again.
+"""
+
+import argparse
+import sys
+import time
+from typing import Any
+
+import numpy as np
+import structlog
+
+from src.config import settings
+from src.rag.retriever import RAGRetriever
+from src.rag.sharding import parse_shard_name, physical_collections, routing_key, shard_index
+from src.rag.versioning import TAG_DIMENSIONS, TAG_FAMILY, TAG_MODEL, tag_matches
+
+logger = structlog.get_logger()
+
+
+def source_collections(retriever: RAGRetriever) -> list[Any]:
+    """
+    Find every existing collection of a logical collection, in any shard layout.
+
+    Args:
+        retriever: Retriever of the logical collection
+
+    Returns:
+        ChromaDB collections: the unsharded one and every shard, current or not
+    """
+    name = retriever.collection_name
+    existing = {collection.name for collection in retriever.client.list_collections()}
+    logical = {name} | {
+        candidate
+        for candidate in existing | set(retriever.aliases.names())
+        if parse_shard_name(candidate, name) is not None
+    }
+
+    collections = []
+    for candidate in sorted(logical):
+        physical = retriever.aliases.resolve(candidate)
+        if physical in existing:
+            collections.append(retriever.client.get_collection(name=physical))
+    return collections
+
+
+def rebalance(retriever: RAGRetriever, batch_size: int = 500) -> dict:
+    """
+    Move every chunk to the shard of its source in the retriever's layout.
+
+    Args:
+        retriever: Retriever opened with the new shard count
+        batch_size: Chunks read per request
+
+    Returns:
+        Statistics: chunks scanned and moved, collections dropped, seconds
+
+    Raises:
+        ValueError: If a collection holds vectors of another embedding model
+    """
+    start = time.perf_counter()
+    targets = physical_collections(retriever.collection)
+    target_names = [collection.name for collection in targets]
+    target_metadata = targets[0].metadata or {}
+    tag = {key: target_metadata.get(key) for key in (TAG_FAMILY, TAG_MODEL, TAG_DIMENSIONS)}
+    stats = {"scanned": 0, "moved": 0, "dropped": 0}
+
+    # Current shards first, so chunks moved in from dropped collections are not read twice
+    sources = sorted(
+        source_collections(retriever), key=lambda collection: collection.name not in target_names
+    )
+    for source in sources:
+        metadata = source.metadata or {}
+        if TAG_MODEL in metadata and tag[TAG_MODEL] and not tag_matches(metadata, tag):
+            raise ValueError(
+                f"Collection {source.name} holds vectors of another embedding model; "
+                "finish the re-embedding migration first"
+            )
+        keep = source.name in target_names
+
+        offset = 0
+        while True:
+            page = source.get(
+                limit=batch_size, offset=offset, include=["embeddings", "documents", "metadatas"]
+            )
+            ids = page["ids"]
+            if not ids:
+                break
+
+            moves: dict[int, list[int]] = {}
+            for i, (chunk_id, chunk_metadata) in enumerate(
+                zip(ids, page["metadatas"], strict=True)
+            ):
+                shard = shard_index(routing_key(chunk_id, chunk_metadata), len(targets))
+                if target_names[shard] != source.name:
+                    moves.setdefault(shard, []).append(i)
+
+            vectors = np.asarray(page["embeddings"], dtype=np.float32)
+            moved: list[str] = []
+            for shard, rows in moves.items():
+                targets[shard].upsert(
+                    ids=[ids[i] for i in rows],
+                    embeddings=vectors[rows],
+                    documents=[page["documents"][i] for i in rows],
+                    metadatas=[page["metadatas"][i] for i in rows],
+                )
+                moved.extend(ids[i] for i in rows)
+            if moved:
+                source.delete(ids=moved)
+
+            stats["scanned"] += len(ids)
+            stats["moved"] += len(moved)
+            offset += len(ids) - len(moved)  # Moved chunks no longer take up a place
+
+        if not keep:
+            retriever.client.delete_collection(name=source.name)
+            stats["dropped"] += 1
+            logger.info("shard_collection_dropped", collection=source.name)
+
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    logger.info("shards_rebalanced", shards=len(targets), **stats)
+    return stats
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.rebalance_shards",
+        description="Move chunks to their shards after a change of SHARD_COUNT.",
+    )
+    parser.add_argument("--collection", default="documents", help="Collection name")
+    parser.add_argument("--batch-size", type=int, default=500, help="Chunks read per request")
+    args = parser.parse_args(argv)
+
+    settings.embedding_migration_auto_start = False
+    retriever = RAGRetriever(collection_name=args.collection)
+
+    print(f"🔀 Rebalancing '{args.collection}' across {retriever.shard_count} shard(s)")
+    try:
+        stats = rebalance(retriever, batch_size=args.batch_size)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    print(
+        f"✅ Moved {stats['moved']} of {stats['scanned']} chunks, "
+        f"dropped {stats['dropped']} collection(s) in {stats['seconds']:.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,399 @@
+"""Export and import collection snapshots (chunks, vectors and document records).
+
+Usage:
+    python -m src.tools.snapshot export <file> [--collection NAME | --tenant ID]
+    python -m src.tools.snapshot import <file> [--collection NAME | --tenant ID] [--force]
+
+A snapshot is a single file:
+
+    magic (8 bytes) | header offset, header length (2 x uint64 LE)
+    | padding to 64 bytes | sections... | header (JSON)
+
+The "vectors" section is the raw float32 little-endian matrix (count x
+dimensions), 64-byte aligned so it can be memory-mapped. The other sections are
+columns of JSON values, one per line, zlib-compressed: chunk "ids",
+"documents" and "metadatas", and the "records" of DocumentStorage (with each
+document's chunk hashes and parent sections). The header lists every section's
+offset, length and codec, along with the embedding tag of the vectors. Importing
+needs no embedding calls.
+"""
+
+import argparse
+import json
+import struct
+import sys
+import time
+import zlib
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import numpy as np
+import structlog
+
+from src.config import settings
+from src.rag.retriever import RAGRetriever
+from src.rag.versioning import embedding_tag
+from src.schemas.api import DocumentInfo
+from src.schemas.rag import DocumentChunk
+from src.services.chunk_store import ChunkRefStore
+from src.services.document_service import build_storage
+from src.services.document_storage import DocumentStorage
+from src.services.postgres_storage import PostgreSQLDocumentStorage
+from src.services.tenants import check_tenant_id, open_tenant_stores, tenant_collection_name
+
+logger = structlog.get_logger()
+
+MAGIC = b"KBSNAP\x00\x01"  # Format name and version
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct("<QQ")  # Header offset and length, after the magic
+_ALIGNMENT = 64
+_PAGE_SIZE = 1000  # Chunks read from the collection per request
+_READ_SIZE = 1024 * 1024  # Compressed bytes decoded at a time
+
+
+class _ColumnWriter:
+    """Compresses a column of JSON values in memory as it is filled."""
+
+    def __init__(self) -> None:
+        self._compressor = zlib.compressobj(6)
+        self._parts: list[bytes] = []
+        self.count = 0
+
+    def append(self, value: Any) -> None:
+        line = json.dumps(value, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._parts.append(self._compressor.compress(line.encode("utf-8")))
+        self.count += 1
+
+    def finish(self) -> bytes:
+        self._parts.append(self._compressor.flush())
+        return b"".join(self._parts)
+
+
+def _pad(f: BinaryIO) -> None:
+    """Pad the file up to the next alignment boundary."""
+    f.write(b"\0" * (-f.tell() % _ALIGNMENT))
+
+
+def export_snapshot(
+    path: Path,
+    retriever: RAGRetriever,
+    storage: DocumentStorage | PostgreSQLDocumentStorage,
+    chunk_store: ChunkRefStore | None = None,
+) -> dict:
+    """
+    Write a collection and its document records to a snapshot file.
+
+    The collection should not be written to during the export.
+
+    Args:
+        path: Snapshot file to create (overwritten if it exists)
+        retriever: Retriever whose collection is exported
+        storage: Document metadata storage to include
+        chunk_store: Chunk reference store to include (with deduplication enabled)
+
+    Returns:
+        Statistics: chunks, documents, dimensions, bytes and seconds
+    """
+    start = time.perf_counter()
+    total = retriever.collection.count()
+    columns = {name: _ColumnWriter() for name in ("ids", "documents", "metadatas", "records")}
+    sections: dict[str, dict] = {}
+    dimensions = 0
+
+    with open(path, "wb") as f:
+        f.write(MAGIC + _PREFIX.pack(0, 0))
+        _pad(f)
+
+        # Vectors stream straight to disk, page by page
+        vectors_offset = f.tell()
+        for offset in range(0, total, _PAGE_SIZE):
+            page = retriever.collection.get(
+                limit=_PAGE_SIZE, offset=offset, include=["embeddings", "documents", "metadatas"]
+            )
+            vectors = np.asarray(page["embeddings"], dtype="<f4")
+            if len(page["ids"]) and vectors.ndim == 2:
+                dimensions = vectors.shape[1]
+                f.write(np.ascontiguousarray(vectors).tobytes())
+            for chunk_id, document, metadata in zip(
+                page["ids"], page["documents"], page["metadatas"], strict=True
+            ):
+                columns["ids"].append(chunk_id)
+                columns["documents"].append(document)
+                columns["metadatas"].append(metadata)
+        count = columns["ids"].count
+        sections["vectors"] = {
+            "offset": vectors_offset,
+            "length": f.tell() - vectors_offset,
+            "codec": "float32-le",
+            "shape": [count, dimensions],
+        }
+
+        for document in storage.list_all():
+            record = document.model_dump(mode="json")
+            if chunk_store is not None:
+                record["chunk_hashes"] = chunk_store.get_document(document.id)
+            if retriever.parent_store is not None:
+                record["parents"] = [
+                    parent.model_dump(exclude={"embedding"})
+                    for parent in retriever.parent_store.get_document(document.id)
+                ]
+            columns["records"].append(record)
+
+        for name, column in columns.items():
+            _pad(f)
+            offset = f.tell()
+            f.write(column.finish())
+            sections[name] = {
+                "offset": offset,
+                "length": f.tell() - offset,
+                "codec": "zlib-jsonl",
+                "count": column.count,
+            }
+
+        header = {
+            "format_version": FORMAT_VERSION,
+            "created_at": datetime.now().isoformat(),
+            "collection": retriever.collection_name,
+            "embedding": embedding_tag(retriever.embedding_service),
+            "count": count,
+            "dimensions": dimensions,
+            "sections": sections,
+        }
+        header_bytes = json.dumps(header).encode("utf-8")
+        header_offset = f.tell()
+        f.write(header_bytes)
+        f.seek(len(MAGIC))
+        f.write(_PREFIX.pack(header_offset, len(header_bytes)))
+        size = header_offset + len(header_bytes)
+
+    stats = {
+        "chunks": count,
+        "documents": columns["records"].count,
+        "dimensions": dimensions,
+        "bytes": size,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    logger.info("snapshot_exported", path=str(path), **stats)
+    return stats
+
+
+class SnapshotReader:
+    """Reads a snapshot file; vectors are memory-mapped, columns decoded as streams."""
+
+    def __init__(self, path: Path) -> None:
+        """
+        Open a snapshot and read its header.
+
+        Args:
+            path: Snapshot file
+
+        Raises:
+            ValueError: If the file is not a snapshot of a supported version
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a snapshot file (or has an unsupported version)")
+            header_offset, header_length = _PREFIX.unpack(f.read(_PREFIX.size))
+            f.seek(header_offset)
+            self.header: dict = json.loads(f.read(header_length))
+
+        self.count: int = self.header["count"]
+        self.dimensions: int = self.header["dimensions"]
+        self.embedding: dict = self.header["embedding"]
+
+    def vectors(self) -> np.ndarray:
+        """
+        Map the vectors section without reading it.
+
+        Returns:
+            Read-only float32 matrix (count x dimensions) backed by the file
+        """
+        section = self.header["sections"]["vectors"]
+        if self.count == 0:
+            return np.empty((0, self.dimensions), dtype=np.float32)
+        return np.memmap(
+            self.path,
+            dtype="<f4",
+            mode="r",
+            offset=section["offset"],
+            shape=(self.count, self.dimensions),
+        )
+
+    def column(self, name: str) -> Iterator[Any]:
+        """
+        Decode a column one value at a time.
+
+        Args:
+            name: Section name ("ids", "documents", "metadatas" or "records")
+
+        Yields:
+            Column values in order
+        """
+        section = self.header["sections"][name]
+        decompressor = zlib.decompressobj()
+        pending = b""
+        with open(self.path, "rb") as f:
+            f.seek(section["offset"])
+            remaining = section["length"]
+            while remaining > 0:
+                data = f.read(min(_READ_SIZE, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                lines = (pending + decompressor.decompress(data)).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    yield json.loads(line)
+        pending += decompressor.flush()
+        if pending.strip():
+            yield json.loads(pending)
+
+
+def import_snapshot(
+    path: Path,
+    retriever: RAGRetriever,
+    storage: DocumentStorage | PostgreSQLDocumentStorage,
+    chunk_store: ChunkRefStore | None = None,
+    force: bool = False,
+) -> dict:
+    """
+    Load a snapshot into a collection and document storage.
+
+    Chunks are upserted, so importing into a non-empty collection adds to it and
+    re-importing the same snapshot is harmless.
+
+    Args:
+        path: Snapshot file
+        retriever: Retriever whose collection receives the chunks
+        storage: Document metadata storage receiving the document records
+        chunk_store: Chunk reference store receiving chunk hashes, if any
+        force: Import even if the snapshot's embedding model differs from the
+            configured one (queries would then compare incompatible vectors)
+
+    Returns:
+        Statistics: chunks, documents and seconds
+
+    Raises:
+        ValueError: If the snapshot's vectors were made by another embedding model
+    """
+    start = time.perf_counter()
+    reader = SnapshotReader(path)
+    configured = embedding_tag(retriever.target_embedding_service)
+    if reader.embedding != configured and not force:
+        raise ValueError(
+            f"Snapshot vectors come from {reader.embedding}, but {configured} is configured; "
+            "use --force to import anyway"
+        )
+
+    vectors = reader.vectors()
+    batch_size = retriever.client.get_max_batch_size()
+    ids: list[str] = []
+    documents: list[str] = []
+    metadatas: list[dict | None] = []
+    written = 0
+
+    def flush() -> None:
+        nonlocal written
+        retriever.upsert_vectors(
+            ids, np.asarray(vectors[written : written + len(ids)]), documents, metadatas
+        )
+        written += len(ids)
+        ids.clear()
+        documents.clear()
+        metadatas.clear()
+
+    for chunk_id, document, metadata in zip(
+        reader.column("ids"), reader.column("documents"), reader.column("metadatas"), strict=True
+    ):
+        ids.append(chunk_id)
+        documents.append(document)
+        metadatas.append(metadata or None)
+        if len(ids) >= batch_size:
+            flush()
+    if ids:
+        flush()
+
+    records = 0
+    for record in reader.column("records"):
+        chunk_hashes = record.pop("chunk_hashes", None)
+        parents = record.pop("parents", None)
+        document = DocumentInfo.model_validate(record)
+        storage.save(document)
+        if chunk_store is not None and chunk_hashes is not None:
+            chunk_store.add_document(document.id, chunk_hashes)
+        if retriever.parent_store is not None and parents:
+            retriever.parent_store.delete_document(document.id)
+            retriever.parent_store.add_parents(
+                document.id, [DocumentChunk.model_validate(parent) for parent in parents]
+            )
+        records += 1
+
+    stats = {
+        "chunks": written,
+        "documents": records,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    logger.info("snapshot_imported", path=str(path), **stats)
+    return stats
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.snapshot",
+        description="Export or import a collection snapshot.",
+    )
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("file", type=Path, help="Snapshot file")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--collection", default="documents", help="Collection name")
+    target.add_argument("--tenant", help="Tenant namespace (its collection and stores)")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Import even if the snapshot used another embedding model",
+    )
+    args = parser.parse_args(argv)
+
+    settings.embedding_migration_auto_start = False
+    if args.tenant:
+        # The stores TenantRegistry opens for the tenant
+        try:
+            check_tenant_id(args.tenant)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        args.collection = tenant_collection_name(args.tenant)
+        stores = open_tenant_stores(args.tenant)
+        retriever = RAGRetriever(collection_name=args.collection, parent_store=stores.parent_store)
+        storage, chunk_store = stores.storage, stores.chunk_store
+    else:
+        # The stores DocumentService opens for the shared namespace
+        retriever = RAGRetriever(collection_name=args.collection)
+        storage = build_storage()
+        chunk_store = ChunkRefStore() if settings.chunk_dedup_enabled else None
+
+    if args.command == "export":
+        print(f"📦 Exporting '{args.collection}' to {args.file}")
+        stats = export_snapshot(args.file, retriever, storage, chunk_store)
+        print(
+            f"✅ {stats['chunks']} chunks ({stats['dimensions']} dims), "
+            f"{stats['documents']} documents, {stats['bytes'] / 1024 / 1024:.1f} MB "
+            f"in {stats['seconds']:.1f}s"
+        )
+        return 0
+
+    print(f"📥 Importing {args.file} into '{args.collection}'")
+    try:
+        stats = import_snapshot(args.file, retriever, storage, chunk_store, force=args.force)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"✅ {stats['chunks']} chunks, {stats['documents']} documents in {stats['seconds']:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,11 @@
 """Fixtures for RAG system tests."""
 
+import hashlib
+
+import numpy as np
 import pytest
 
+from src.rag.embeddings import EmbeddingService
 from src.schemas.rag import DocumentChunk, RetrievalResult
 
 
@@ -70,3 +74,28 @@ def sample_texts() -> list[str]:
         "This is the second text to embed.",
         "This is the third text to embed.",
     ]
+
+
+class HashEmbeddingService(EmbeddingService):
+    """Deterministic bag-of-words embedding service that needs no model download."""
+
+    def __init__(self, dimensions: int = 64) -> None:
+        self.calls: list[list[str]] = []
+        self.hash_dimensions = dimensions
+        super().__init__(provider="local", model="hash-embedding", use_worker_pool=False)
+
+    def _init_local_model(self) -> None:
+        """Replace the sentence-transformers model load; vectors come from _generate."""
+        self.model_instance = None
+        self.dimensions = self.hash_dimensions
+
+    def _generate(self, texts: list[str], model: str) -> np.ndarray:
+        self.calls.append(list(texts))
+        vectors = np.zeros((len(texts), self.native_dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                digest = hashlib.md5(word.encode()).digest()
+                vectors[row, int.from_bytes(digest[:4], "little") % self.native_dimensions] += 1.0
+            vectors[row, 0] += 1e-3  # Avoid zero vectors for empty text
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
@@ -1,19 +1,23 @@
 """Test Specs for document API endpoints."""
 
+import os
 from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
 
+from src.api.uploads import FORM_OVERHEAD_BYTES
 from src.api.v1.documents import router
+from src.config import settings
 from src.schemas.api import DocumentInfo, DocumentUpload
-from src.shared_services import document_service
+from src.shared_services import document_service, ingestion_pipeline
 
 
 @pytest.fixture
 def client() -> TestClient:
     """Fixture: FastAPI test client."""
     from fastapi import FastAPI
+
     app = FastAPI()
     app.include_router(router)
     return TestClient(app)
@@ -33,6 +37,7 @@ def sample_upload() -> DocumentUpload:
 def sample_doc_info() -> DocumentInfo:
     """Fixture: Sample document info."""
     from datetime import datetime
+
     return DocumentInfo(
         id="test_doc_1",
         filename="test.txt",
@@ -43,7 +48,9 @@ def sample_doc_info() -> DocumentInfo:
     )
 
 
-def test_upload_document_success(client: TestClient, sample_upload: DocumentUpload, sample_doc_info: DocumentInfo) -> None:
+def test_upload_document_success(
+    client: TestClient, sample_upload: DocumentUpload, sample_doc_info: DocumentInfo
+) -> None:
     """Spec: POST /documents should upload a document successfully."""
     with patch.object(document_service, "upload_document", return_value=sample_doc_info):
         response = client.post("/documents", json=sample_upload.model_dump())
@@ -62,6 +69,92 @@ def test_upload_document_error(client: TestClient, sample_upload: DocumentUpload
         assert "Failed to upload document" in response.json()["detail"]
 
 
+def test_upload_document_file(client: TestClient, sample_doc_info: DocumentInfo) -> None:
+    """Spec: POST /documents/upload should parse the form as it arrives, writing the file to disk."""
+    seen = {}
+
+    def upload_file(path: str, **kwargs) -> DocumentInfo:
+        with open(path, "rb") as f:
+            seen["content"] = f.read()
+        seen["path"] = path
+        seen.update(kwargs)
+        return sample_doc_info
+
+    with patch.object(document_service, "upload_file", side_effect=upload_file):
+        response = client.post(
+            "/documents/upload",
+            files={"file": ("test.txt", b"This is test content.", "text/plain")},
+            data={"metadata": '{"team": "docs"}'},
+        )
+
+    assert response.status_code == 201
+    assert response.json()["id"] == "test_doc_1"
+    assert seen["content"] == b"This is test content."
+    assert seen["filename"] == "test.txt"
+    assert seen["content_type"] == "text/plain"
+    assert seen["metadata"] == {"team": "docs"}
+    assert not os.path.exists(seen["path"])
+
+
+def test_upload_document_file_too_large(client: TestClient) -> None:
+    """Spec: POST /documents/upload should reject a Content-Length above the limit unread."""
+    with (
+        patch.object(settings, "upload_max_bytes", 10),
+        patch.object(document_service, "upload_file") as upload_file,
+    ):
+        response = client.post(
+            "/documents/upload",
+            content=b"x" * (10 + FORM_OVERHEAD_BYTES + 1),
+            headers={"Content-Type": "multipart/form-data; boundary=b"},
+        )
+
+    assert response.status_code == 413
+    upload_file.assert_not_called()
+
+
+def test_upload_document_file_too_large_while_streaming(client: TestClient) -> None:
+    """Spec: POST /documents/upload should stop reading once the file passes the limit."""
+    body = (
+        b"--b\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="big.txt"\r\n'
+        b"Content-Type: text/plain\r\n\r\n" + b"x" * 11 + b"\r\n--b--\r\n"
+    )
+
+    def chunked():
+        for start in range(0, len(body), 8):
+            yield body[start : start + 8]
+
+    with (
+        patch.object(settings, "upload_max_bytes", 10),
+        patch.object(document_service, "upload_file") as upload_file,
+    ):
+        response = client.post(
+            "/documents/upload",
+            content=chunked(),  # No Content-Length: sent with chunked transfer encoding
+            headers={"Content-Type": "multipart/form-data; boundary=b"},
+        )
+
+    assert response.status_code == 413
+    upload_file.assert_not_called()
+
+
+def test_upload_document_file_missing_file(client: TestClient) -> None:
+    """Spec: POST /documents/upload should reject forms without a file part."""
+    response = client.post("/documents/upload", data={"metadata": "{}"}, files={"x": ("a", b"")})
+    assert response.status_code == 400
+    assert "file" in response.json()["detail"]
+
+
+def test_upload_document_file_invalid_metadata(client: TestClient) -> None:
+    """Spec: POST /documents/upload should reject metadata that is not a JSON object."""
+    response = client.post(
+        "/documents/upload",
+        files={"file": ("test.txt", b"content", "text/plain")},
+        data={"metadata": "[1, 2]"},
+    )
+    assert response.status_code == 422
+
+
 def test_list_documents(client: TestClient, sample_doc_info: DocumentInfo) -> None:
     """Spec: GET /documents should return list of documents."""
     with patch.object(document_service, "list_documents", return_value=[sample_doc_info]):
@@ -106,13 +199,72 @@ def test_delete_document_not_found(client: TestClient) -> None:
         assert "not found" in response.json()["detail"].lower()
 
 
-def test_upload_documents_batch(client: TestClient, sample_upload: DocumentUpload, sample_doc_info: DocumentInfo) -> None:
+def test_update_document_success(
+    client: TestClient, sample_upload: DocumentUpload, sample_doc_info: DocumentInfo
+) -> None:
+    """Spec: PUT /documents/{doc_id} should replace the document."""
+    with patch.object(document_service, "update_document", return_value=sample_doc_info) as update:
+        response = client.put("/documents/test_doc_1", json=sample_upload.model_dump())
+        assert response.status_code == 200
+        assert response.json()["id"] == "test_doc_1"
+        assert update.call_args.args[0] == "test_doc_1"
+
+
+def test_update_document_not_found(client: TestClient, sample_upload: DocumentUpload) -> None:
+    """Spec: PUT /documents/{doc_id} should return 404 for non-existent document."""
+    with patch.object(document_service, "update_document", return_value=None):
+        response = client.put("/documents/nonexistent", json=sample_upload.model_dump())
+        assert response.status_code == 404
+
+
+def test_submit_document_job(client: TestClient, sample_upload: DocumentUpload) -> None:
+    """Spec: POST /documents/jobs should queue the upload and return 202."""
+    from datetime import datetime
+
+    from src.schemas.api import IngestionJob
+    from src.shared_services import ingestion_queue
+
+    job = IngestionJob(
+        id="job_1",
+        doc_id="doc_1",
+        filename="test.txt",
+        status="queued",
+        max_attempts=3,
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+    )
+    with patch.object(ingestion_queue, "submit", return_value=job):
+        response = client.post("/documents/jobs", json=sample_upload.model_dump())
+        assert response.status_code == 202
+        assert response.json()["id"] == "job_1"
+        assert response.json()["status"] == "queued"
+
+    with patch.object(ingestion_queue, "get", return_value=job):
+        response = client.get("/documents/jobs/job_1")
+        assert response.status_code == 200
+        assert response.json()["doc_id"] == "doc_1"
+
+
+def test_get_document_job_not_found(client: TestClient) -> None:
+    """Spec: GET /documents/jobs/{job_id} should return 404 for unknown jobs."""
+    from src.shared_services import ingestion_queue
+
+    with patch.object(ingestion_queue, "get", return_value=None):
+        response = client.get("/documents/jobs/missing")
+        assert response.status_code == 404
+
+
+def test_upload_documents_batch(
+    client: TestClient, sample_upload: DocumentUpload, sample_doc_info: DocumentInfo
+) -> None:
     """Spec: POST /documents/batch should upload multiple documents."""
     from src.schemas.api import BatchDocumentUpload
 
     batch = BatchDocumentUpload(documents=[sample_upload, sample_upload])
 
-    with patch.object(document_service, "upload_document", return_value=sample_doc_info):
+    with patch.object(
+        ingestion_pipeline, "run", return_value=([sample_doc_info, sample_doc_info], [])
+    ):
         response = client.post("/documents/batch", json=batch.model_dump())
         assert response.status_code == 201
         data = response.json()
@@ -121,18 +273,17 @@ def test_upload_documents_batch(client: TestClient, sample_upload: DocumentUploa
         assert len(data["documents"]) == 2
 
 
-def test_upload_documents_batch_partial_failure(client: TestClient, sample_upload: DocumentUpload, sample_doc_info: DocumentInfo) -> None:
+def test_upload_documents_batch_partial_failure(
+    client: TestClient, sample_upload: DocumentUpload, sample_doc_info: DocumentInfo
+) -> None:
     """Spec: POST /documents/batch should handle partial failures."""
     from src.schemas.api import BatchDocumentUpload
 
     batch = BatchDocumentUpload(documents=[sample_upload, sample_upload])
 
-    def mock_upload(upload: DocumentUpload) -> DocumentInfo:
-        if upload.filename == "test.txt":
-            return sample_doc_info
-        raise Exception("Upload failed")
+    errors = [{"filename": "test.txt", "error": "Upload failed", "index": 1}]
 
-    with patch.object(document_service, "upload_document", side_effect=mock_upload):
+    with patch.object(ingestion_pipeline, "run", return_value=([sample_doc_info], errors)):
         response = client.post("/documents/batch", json=batch.model_dump())
         assert response.status_code == 201
         data = response.json()
@@ -140,3 +291,19 @@ def test_upload_documents_batch_partial_failure(client: TestClient, sample_uploa
         assert data["success_count"] == 1
         assert data["error_count"] == 1
         assert len(data["errors"]) == 1
+
+
+def test_invalid_tenant_header(client: TestClient) -> None:
+    """Spec: An invalid X-Tenant-ID header should be rejected with 400."""
+    response = client.get("/documents", headers={"X-Tenant-ID": "../other"})
+    assert response.status_code == 400
+
+
+def test_unlisted_tenant_header(client: TestClient) -> None:
+    """Spec: A tenant missing from the allowlist should be rejected with 403."""
+    with (
+        patch.object(settings, "tenants_enabled", True),
+        patch.object(settings, "tenant_allowlist", "acme"),
+    ):
+        response = client.get("/documents", headers={"X-Tenant-ID": "initech"})
+    assert response.status_code == 403
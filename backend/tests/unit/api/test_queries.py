@@ -6,6 +6,7 @@ import pytest
 from fastapi.testclient import TestClient
 
 from src.api.v1.queries import router
+from src.rag.hits import SearchHit
 from src.schemas.api import QueryRequest, QueryResponse, SourceInfo
 from src.shared_services import agent_service
 
@@ -85,3 +86,35 @@ def test_process_query_with_collection_error(client: TestClient, sample_query_re
             response = client.post("/queries", json=sample_query_request.model_dump())
             # Should still process query even if count check fails
             assert response.status_code == 200
+
+
+def test_search_returns_requested_fields(client: TestClient) -> None:
+    """Spec: POST /queries/search should return hits without unrequested fields."""
+    hits = [SearchHit("chunk_1", 0.9), SearchHit("chunk_2", 0.7)]
+    with patch.object(agent_service.retriever, "search", return_value=hits) as search:
+        response = client.post(
+            "/queries/search",
+            json={"query": "What is Python?", "fields": "ids", "filter": {"source": "doc1"}},
+        )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "query": "What is Python?",
+        "hits": [{"chunk_id": "chunk_1", "score": 0.9}, {"chunk_id": "chunk_2", "score": 0.7}],
+        "total": 2,
+    }
+    assert search.call_args.kwargs["fields"] == "ids"
+    assert search.call_args.kwargs["filter_metadata"] == {"source": "doc1"}
+
+
+def test_search_full_hits(client: TestClient) -> None:
+    """Spec: POST /queries/search with full fields should return content and source."""
+    hits = [SearchHit("chunk_1", 0.9, "Python is...", {"source": "doc1", "position": 0})]
+    with patch.object(agent_service.retriever, "search", return_value=hits):
+        response = client.post("/queries/search", json={"query": "What is Python?"})
+
+    assert response.status_code == 200
+    hit = response.json()["hits"][0]
+    assert hit["content"] == "Python is..."
+    assert hit["source"] == "doc1"
+    assert hit["metadata"] == {"source": "doc1", "position": 0}
@@ -0,0 +1,66 @@
+"""Test Specs for token-aware batch planning."""
+
+from src.rag.batching import count_tokens, estimate_tokens, plan_token_batches
+
+
+def test_plan_batches_empty() -> None:
+    """Spec: plan_token_batches should return no batches for no items."""
+    assert plan_token_batches([], token_budget=100, max_batch_size=10) == []
+
+
+def test_plan_batches_covers_every_index_once() -> None:
+    """Spec: Every item should appear in exactly one batch."""
+    lengths = [5, 120, 30, 7, 64, 64, 1, 250]
+    batches = plan_token_batches(lengths, token_budget=256, max_batch_size=4)
+
+    flat = [idx for batch in batches for idx in batch]
+    assert sorted(flat) == list(range(len(lengths)))
+
+
+def test_plan_batches_padded_sorted_by_length() -> None:
+    """Spec: Padded batches should group items of similar length."""
+    lengths = [100, 2, 100, 3, 100, 1]
+    batches = plan_token_batches(lengths, token_budget=300, max_batch_size=10)
+
+    assert batches[0] == [5, 1, 3]
+    assert batches[1] == [0, 2, 4]
+
+
+def test_plan_batches_padded_respects_budget() -> None:
+    """Spec: Padded batch cost (size x longest) should stay within the budget."""
+    lengths = [10, 20, 30, 40, 50, 60, 70, 80]
+    batches = plan_token_batches(lengths, token_budget=120, max_batch_size=10)
+
+    for batch in batches:
+        assert len(batch) * max(lengths[i] for i in batch) <= 120
+
+
+def test_plan_batches_respects_max_batch_size() -> None:
+    """Spec: No batch should exceed max_batch_size items."""
+    batches = plan_token_batches([1] * 10, token_budget=1000, max_batch_size=3)
+    assert [len(batch) for batch in batches] == [3, 3, 3, 1]
+
+
+def test_plan_batches_unpadded_keeps_order() -> None:
+    """Spec: Unpadded batches should keep input order and bound the token sum."""
+    lengths = [40, 40, 40, 10, 90]
+    batches = plan_token_batches(lengths, token_budget=100, max_batch_size=10, padded=False)
+
+    assert batches == [[0, 1], [2, 3], [4]]
+
+
+def test_plan_batches_oversized_item_gets_own_batch() -> None:
+    """Spec: An item larger than the budget should still be batched alone."""
+    batches = plan_token_batches([500, 10], token_budget=100, max_batch_size=10, padded=False)
+    assert batches == [[0], [1]]
+
+
+def test_count_tokens_falls_back_to_estimate() -> None:
+    """Spec: count_tokens should estimate from characters when the counter fails."""
+
+    def broken(texts: list[str]) -> list[int]:
+        raise RuntimeError("no tokenizer")
+
+    texts = ["a" * 40, "b"]
+    assert count_tokens(texts, broken) == [estimate_tokens(t) for t in texts]
+    assert count_tokens(texts, None) == [11, 1]
@@ -1,7 +1,11 @@
 """Test Specs for document chunking."""
 
-from src.rag.chunking import DocumentChunker
+import pytest
+
+from src.config import settings
+from src.rag.chunking import DocumentChunker, build_chunker
 from src.schemas.rag import DocumentChunk
+from tests.fixtures.rag import HashEmbeddingService
 
 
 def test_chunker_initialization() -> None:
@@ -66,3 +70,61 @@ def test_chunk_documents_multiple() -> None:
     sources = {chunk.source for chunk in chunks}
     assert "doc1.txt" in sources
     assert "doc2.txt" in sources
+
+
+def test_iter_chunks_matches_chunk_document_on_small_input() -> None:
+    """Spec: iter_chunks should equal chunk_document when the text fits one window."""
+    chunker = DocumentChunker(chunk_size=50, chunk_overlap=10)
+    content = "This is a test document. " * 10
+
+    streamed = list(chunker.iter_chunks(["This is a test document. " * 5] * 2, source="a"))
+
+    assert [c.content for c in streamed] == [
+        c.content for c in chunker.chunk_document(content, source="a")
+    ]
+
+
+def test_iter_chunks_streams_large_input() -> None:
+    """Spec: iter_chunks should yield ordered, size-bounded chunks window by window."""
+    chunker = DocumentChunker(chunk_size=100, chunk_overlap=20)
+    paragraphs = [f"Paragraph {i} " + "word " * (i % 30) for i in range(400)]
+    pieces = iter(paragraphs[i] + "\n\n" for i in range(400))
+
+    chunks = list(chunker.iter_chunks(pieces, source="big", window_chars=500))
+
+    assert [c.position for c in chunks] == list(range(len(chunks)))
+    assert all(len(c.content) <= 100 for c in chunks)
+    text = "".join(c.content for c in chunks)
+    assert all(f"Paragraph {i} " in text for i in range(400))
+
+
+def test_token_sized_chunks_respect_token_budget() -> None:
+    """Spec: With a token length function, chunk size and overlap should be in tokens."""
+
+    def words(text: str) -> int:
+        return len(text.split())
+
+    chunker = DocumentChunker(chunk_size=20, chunk_overlap=5, length_function=words)
+    content = "\n\n".join(f"Paragraph {i} " + "token " * (i % 40) for i in range(60))
+
+    chunks = chunker.chunk_document(content, source="doc")
+
+    assert all(words(c.content) <= 20 for c in chunks)
+    assert any(len(c.content) > 100 for c in chunks)  # Not bounded by characters
+
+
+def test_build_chunker_sizes_chunks_to_model_input(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Spec: Token mode should default the chunk size to the embedding model's input limit."""
+    monkeypatch.setattr(settings, "chunk_size_unit", "tokens")
+    monkeypatch.setattr(settings, "chunk_size_tokens", 0)
+    monkeypatch.setattr(settings, "chunk_overlap_tokens", 16)
+    embedding_service = HashEmbeddingService()
+
+    chunker = build_chunker(embedding_service)
+
+    assert chunker.chunk_size == embedding_service.max_input_tokens()
+    assert chunker.splitter._chunk_overlap == 16
+    assert chunker.splitter._length_function is not None
+
+    monkeypatch.setattr(settings, "chunk_size_unit", "chars")
+    assert build_chunker(embedding_service).splitter._length_function is None
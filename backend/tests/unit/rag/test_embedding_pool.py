@@ -0,0 +1,63 @@
+"""Test Specs for the embedding worker pool."""
+
+import os
+
+import numpy as np
+import pytest
+
+from src.rag.embedding_pool import EmbeddingWorkerPool, _split_cores
+
+
+class LengthModel:
+    """Embeds a text as [len(text), worker pid, 0.0]."""
+
+    def encode(self, texts: list[str], **kwargs: object) -> np.ndarray:
+        return np.array([[float(len(t)), float(os.getpid()), 0.0] for t in texts], dtype=np.float32)
+
+
+def load_length_model(provider: str, model: str) -> LengthModel:
+    """Loader used inside worker processes."""
+    return LengthModel()
+
+
+@pytest.fixture(scope="module")
+def pool() -> EmbeddingWorkerPool:
+    """Fixture: Two-worker pool with a trivial model."""
+    pool = EmbeddingWorkerPool(
+        provider="local", model="fake", dimensions=3, workers=2, loader=load_length_model
+    )
+    yield pool
+    pool.close()
+
+
+def test_pool_returns_rows_in_input_order(pool: EmbeddingWorkerPool) -> None:
+    """Spec: encode should write each embedding to its input row."""
+    texts = ["a" * n for n in (5, 1, 30, 12, 7, 3)]
+    batches = [[1, 5], [0, 4], [3, 2]]
+
+    result = pool.encode(texts, batches)
+
+    assert result.dtype == np.float32
+    assert result[:, 0].tolist() == [float(len(t)) for t in texts]
+
+
+def test_pool_uses_worker_processes(pool: EmbeddingWorkerPool) -> None:
+    """Spec: Embedding should run outside the calling process."""
+    result = pool.encode(["x", "y", "z", "w"], [[0], [1], [2], [3]])
+    assert os.getpid() not in set(result[:, 1].astype(int).tolist())
+
+
+def test_pool_handles_unicode(pool: EmbeddingWorkerPool) -> None:
+    """Spec: Texts should survive the shared-memory round trip."""
+    texts = ["café", "日本語テキスト", ""]
+    result = pool.encode(texts, [[0, 1, 2]])
+    assert result[:, 0].tolist() == [4.0, 7.0, 0.0]
+
+
+def test_split_cores_covers_workers() -> None:
+    """Spec: Every worker should get a non-empty, disjoint core set when cores allow."""
+    core_sets = _split_cores(2)
+    assert len(core_sets) == 2
+    assert all(core_sets)
+    if len(os.sched_getaffinity(0)) >= 2:
+        assert not set(core_sets[0]) & set(core_sets[1])
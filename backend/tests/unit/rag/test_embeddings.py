@@ -0,0 +1,176 @@
+"""Test Specs for EmbeddingService."""
+
+import numpy as np
+import pytest
+
+import src.config
+from src.rag.embeddings import EmbeddingService
+
+
+class FakeSentenceModel:
+    """Stand-in for SentenceTransformer that embeds a text as [len(text), 1.0]."""
+
+    max_seq_length = 256
+
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+
+    def encode(self, texts: list[str], **kwargs: object) -> np.ndarray:
+        self.batches.append(list(texts))
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def local_service(monkeypatch: pytest.MonkeyPatch) -> EmbeddingService:
+    """Fixture: Local embedding service backed by a fake model."""
+
+    def fake_init(self: EmbeddingService) -> None:
+        self.model_instance = FakeSentenceModel()
+        self.dimensions = 2
+
+    monkeypatch.setattr(EmbeddingService, "_init_local_model", fake_init)
+    monkeypatch.setattr(src.config.settings, "cache_enabled", False)
+    return EmbeddingService(provider="local", model="fake-model")
+
+
+def test_generate_local_preserves_input_order(
+    local_service: EmbeddingService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: Length-sorted batches should be scattered back to input positions."""
+    monkeypatch.setattr(src.config.settings, "embedding_token_budget_local", 40)
+    texts = ["x" * 120, "short", "y" * 60, "z", "w" * 200]
+
+    embeddings = local_service._generate_local(texts, "fake-model")
+
+    assert [e[0] for e in embeddings] == [float(len(t)) for t in texts]
+    assert len(local_service.model_instance.batches) > 1
+
+
+def test_generate_local_batches_similar_lengths(
+    local_service: EmbeddingService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: Short texts should not be batched together with long ones."""
+    monkeypatch.setattr(src.config.settings, "embedding_token_budget_local", 200)
+    texts = ["a" * 400, "b", "c" * 400, "d"]
+
+    local_service._generate_local(texts, "fake-model")
+
+    for batch in local_service.model_instance.batches:
+        sizes = {len(t) > 100 for t in batch}
+        assert len(sizes) == 1
+
+
+def test_generate_local_uses_worker_pool_for_large_requests(
+    local_service: EmbeddingService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: Requests above embedding_pool_min_texts should go to the worker pool."""
+    from unittest.mock import MagicMock
+
+    monkeypatch.setattr(src.config.settings, "embedding_pool_min_texts", 3)
+    pool = MagicMock()
+    pool.encode.return_value = np.zeros((3, 2), dtype=np.float32)
+    local_service.use_worker_pool = True
+    local_service._worker_pool = pool
+
+    local_service._generate_local(["one"], "fake-model")
+    assert not pool.encode.called
+
+    local_service._generate_local(["one", "two", "three"], "fake-model")
+    assert pool.encode.called
+
+
+def test_embed_batch_returns_float32_matrix(local_service: EmbeddingService) -> None:
+    """Spec: embed_batch should return a contiguous float32 matrix in input order."""
+    vectors = local_service.embed_batch(["abc", "a", "abcdef"])
+
+    assert vectors.dtype == np.float32
+    assert vectors.flags["C_CONTIGUOUS"]
+    assert vectors[:, 0].tolist() == [3.0, 1.0, 6.0]
+
+
+def test_embed_batch_merges_cached_rows(local_service: EmbeddingService) -> None:
+    """Spec: Cached vectors should be reused and only misses sent to the model."""
+    from src.rag.cache import EmbeddingCache
+
+    local_service.cache = EmbeddingCache(ttl=60)
+    local_service.embed_batch(["cached"])
+    local_service.model_instance.batches.clear()
+
+    vectors = local_service.embed_batch(["new", "cached"])
+
+    assert vectors[:, 0].tolist() == [3.0, 6.0]
+    assert local_service.model_instance.batches == [["new"]]
+
+
+def test_generate_embeddings_returns_lists_at_api_edge(local_service: EmbeddingService) -> None:
+    """Spec: generate_embeddings should keep the Pydantic list-of-floats contract."""
+    from src.schemas.rag import EmbeddingRequest
+
+    response = local_service.generate_embeddings(EmbeddingRequest(texts=["ab", "abcd"]))
+
+    assert response.embeddings == [[2.0, 1.0], [4.0, 1.0]]
+    assert response.dimensions == 2
+
+
+def test_truncated_dimensions_are_renormalized(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Spec: A reduced dimension should keep leading components with unit norm."""
+
+    class WideModel(FakeSentenceModel):
+        def encode(self, texts: list[str], **kwargs: object) -> np.ndarray:
+            return np.tile(np.array([0.6, 0.0, 0.8, 0.0], dtype=np.float32), (len(texts), 1))
+
+    def fake_init(self: EmbeddingService) -> None:
+        self.model_instance = WideModel()
+        self.dimensions = 4
+
+    monkeypatch.setattr(EmbeddingService, "_init_local_model", fake_init)
+    monkeypatch.setattr(src.config.settings, "cache_enabled", False)
+    service = EmbeddingService(provider="local", model="fake-model", dimensions=2)
+
+    vectors = service.embed_batch(["a", "b"])
+
+    assert service.native_dimensions == 4
+    assert vectors.shape == (2, 2)
+    np.testing.assert_allclose(vectors[0], [1.0, 0.0])
+
+
+def test_invalid_dimensions_rejected(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Spec: A dimension larger than the model's native size should be rejected."""
+
+    def fake_init(self: EmbeddingService) -> None:
+        self.model_instance = FakeSentenceModel()
+        self.dimensions = 2
+
+    monkeypatch.setattr(EmbeddingService, "_init_local_model", fake_init)
+    with pytest.raises(ValueError):
+        EmbeddingService(provider="local", model="fake-model", dimensions=8)
+
+
+class FakeWordTokenizer:
+    """Tokenizer stand-in with one token per word and [CLS]/[SEP] special tokens."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, text: str, add_special_tokens: bool = True, **kwargs: object) -> dict:
+        self.calls += 1
+        ids = list(range(len(text.split())))
+        return {"input_ids": [101, *ids, 102] if add_special_tokens else ids}
+
+    def num_special_tokens_to_add(self) -> int:
+        return 2
+
+
+def test_token_length_function_uses_cached_model_tokenizer(
+    local_service: EmbeddingService,
+) -> None:
+    """Spec: Token counts should come from the model tokenizer, without special tokens, memoized."""
+    tokenizer = FakeWordTokenizer()
+    local_service.model_instance.tokenizer = tokenizer
+
+    count = local_service.token_length_function()
+
+    assert count("three short words") == 3
+    assert count("three short words") == 3
+    assert tokenizer.calls == 1
+    assert local_service.max_input_tokens() == 254  # 256 minus [CLS] and [SEP]
@@ -0,0 +1,220 @@
+"""Test Specs for the metadata pre-filter index."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import src.config
+from src.rag.metadata_index import MetadataIndex, normalize_where
+from src.rag.retriever import RAGRetriever
+from src.schemas.rag import DocumentChunk
+from tests.fixtures.rag import HashEmbeddingService
+
+WORDS = "alpha beta gamma delta epsilon zeta eta theta iota kappa lambda omicron sigma".split()
+
+
+def make_chunks() -> list[DocumentChunk]:
+    """Chunks of ten documents with mixed-type metadata."""
+    chunks = []
+    for doc in range(10):
+        for position in range(5):
+            metadata: dict = {"source": f"doc-{doc}", "position": position, "page": position / 2}
+            if doc % 3:
+                metadata["lang"] = "en" if doc % 2 else "de"
+            if doc == 4:
+                metadata["draft"] = True
+            words = [WORDS[(doc * 5 + position * 2 + k) % len(WORDS)] for k in range(6)]
+            chunks.append(
+                DocumentChunk(
+                    content=" ".join(words),
+                    metadata=metadata,
+                    chunk_id=f"doc-{doc}_chunk_{position}",
+                    source=f"doc-{doc}",
+                    position=position,
+                )
+            )
+    return chunks
+
+
+@pytest.fixture
+def retriever(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> RAGRetriever:
+    """Retriever over a fresh collection holding make_chunks()."""
+    monkeypatch.setattr(src.config.settings, "chroma_path", str(tmp_path))
+    retriever = RAGRetriever(
+        collection_name="prefilter_test", embedding_service=HashEmbeddingService()
+    )
+    retriever.add_documents(make_chunks())
+    return retriever
+
+
+FILTERS = [
+    {"source": "doc-3"},
+    {"lang": "en"},
+    {"lang": {"$ne": "en"}},
+    {"lang": {"$nin": ["en", "de"]}},
+    {"lang": {"$in": ["de", "fr"]}},
+    {"position": {"$gte": 3}},
+    {"page": {"$lt": 1}},
+    {"position": 1.0},
+    {"draft": True},
+    {"draft": 1},
+    {"$and": [{"lang": "en"}, {"position": {"$gt": 0, "$lte": 2}}]},
+    {"lang": "de", "page": {"$ne": 0.5}},
+    {"$or": [{"source": "doc-0"}, {"draft": True}]},
+    {"source": "missing"},
+]
+
+
+@pytest.mark.parametrize("where", FILTERS)
+def test_resolve_matches_chromadb(retriever: RAGRetriever, where: dict) -> None:
+    """Spec: The index should match the same chunks as the ChromaDB filter."""
+    index = MetadataIndex()
+    index.build(retriever.collection, page_size=7)
+
+    expected = set(retriever.collection.get(where=normalize_where(where), include=[])["ids"])
+    assert set(index.resolve(where)) == expected
+
+
+def test_resolve_combines_top_level_keys_and_rejects_unknown(retriever: RAGRetriever) -> None:
+    """Spec: Several keys mean $and; unsupported operators are left to ChromaDB."""
+    index = MetadataIndex()
+    assert index.resolve({"source": "doc-1"}) is None  # Not built yet
+    index.build(retriever.collection)
+
+    assert sorted(index.resolve({"lang": "en", "position": 0})) == [
+        "doc-1_chunk_0",
+        "doc-5_chunk_0",
+        "doc-7_chunk_0",
+    ]
+    assert index.resolve({"source": {"$contains": "doc"}}) is None
+    assert index.resolve({"position": {"$gt": "a"}}) is None
+
+
+def test_index_follows_writes(retriever: RAGRetriever) -> None:
+    """Spec: Deletes and metadata updates through the retriever should update the index."""
+    assert len(retriever._filter_candidates({"source": "doc-2"})) == 5
+
+    retriever.delete_chunks(["doc-2_chunk_0"])
+    retriever.update_metadata(["doc-2_chunk_1"], [{"source": "doc-9"}])
+
+    assert retriever.metadata_index.built
+    assert len(retriever._filter_candidates({"source": "doc-2"})) == 3
+    assert "doc-2_chunk_1" in retriever._filter_candidates({"source": "doc-9"})
+    # Updated metadata is merged, so other keys still match
+    assert "doc-2_chunk_1" in retriever._filter_candidates({"page": 0.5})
+
+
+def test_exact_prefilter_search_matches_brute_force(
+    retriever: RAGRetriever, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: Small candidate sets should be ranked by exact cosine similarity."""
+    where = {"lang": {"$in": ["en", "de"]}, "position": {"$lte": 3}}
+    candidates = retriever.collection.get(
+        where=normalize_where(where), include=["embeddings", "documents"]
+    )
+    documents = dict(zip(candidates["ids"], candidates["documents"], strict=True))
+    query = "alpha gamma kappa"
+    vector = np.asarray(retriever.embedding_service.embed_query(query))
+    stored = np.asarray(candidates["embeddings"])
+    similarities = stored @ vector / (np.linalg.norm(stored, axis=1) * np.linalg.norm(vector))
+    expected = sorted(similarities, reverse=True)[:5]
+
+    result = retriever._vector_search(query, top_k=5, score_threshold=0.0, filter_metadata=where)
+    assert result.scores == pytest.approx(expected, abs=1e-5)
+    assert all(chunk.content == documents[chunk.chunk_id] for chunk in result.chunks)
+    assert all(chunk.metadata["position"] <= 3 for chunk in result.chunks)
+
+    # Above the exact-search limit the filtered ANN search finds the same scores
+    monkeypatch.setattr(src.config.settings, "prefilter_exact_max", 3)
+    ann = retriever._vector_search(query, top_k=5, score_threshold=0.0, filter_metadata=where)
+    assert ann.scores == pytest.approx(expected, abs=1e-5)
+    assert all(chunk.chunk_id in documents for chunk in ann.chunks)
+
+    empty = retriever._vector_search(
+        query, top_k=5, score_threshold=0.0, filter_metadata={"source": "missing"}
+    )
+    assert empty.chunks == []
+
+
+def test_index_notices_writes_by_other_retrievers(retriever: RAGRetriever) -> None:
+    """Spec: Writes by another retriever should rebuild the index, even at an unchanged count."""
+    other = RAGRetriever(
+        collection_name="prefilter_test", embedding_service=retriever.embedding_service
+    )
+    assert len(retriever._filter_candidates({"source": "doc-2"})) == 5
+
+    other.update_metadata(["doc-3_chunk_0"], [{"source": "doc-2"}])
+    assert len(retriever._filter_candidates({"source": "doc-2"})) == 6
+
+    moved = make_chunks()[10]
+    moved.chunk_id = "doc-2_chunk_9"
+    other.add_documents([moved])
+    other.delete_chunks(["doc-2_chunk_0"])
+    assert retriever.collection.count() == 50
+    assert "doc-2_chunk_9" in retriever._filter_candidates({"source": "doc-2"})
+    assert "doc-2_chunk_0" not in retriever._filter_candidates({"source": "doc-2"})
+
+
+def test_own_writes_keep_the_index(
+    retriever: RAGRetriever, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: Writes through the retriever itself should update its index in place."""
+    retriever._filter_candidates({"source": "doc-2"})
+    builds: list[int] = []
+    build = retriever.metadata_index.build
+    monkeypatch.setattr(
+        retriever.metadata_index, "build", lambda *args: (builds.append(1), build(*args))
+    )
+
+    retriever.delete_chunks(["doc-2_chunk_0"])
+    retriever.update_metadata(["doc-2_chunk_1"], [{"source": "doc-9"}])
+
+    assert len(retriever._filter_candidates({"source": "doc-2"})) == 3
+    assert builds == []
+
+
+def test_filtered_searches_use_the_cached_write_token(
+    retriever: RAGRetriever, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: Filtered searches should not read collection metadata while the token is fresh."""
+    monkeypatch.setattr(src.config.settings, "write_token_max_age", 60.0)
+    retriever._filter_candidates({"source": "doc-2"})
+    reads: list[str] = []
+    get_collection = retriever.client.get_collection
+    monkeypatch.setattr(
+        retriever.client,
+        "get_collection",
+        lambda name: (reads.append(name), get_collection(name))[1],
+    )
+
+    for _ in range(3):
+        assert len(retriever._filter_candidates({"source": "doc-2"})) == 5
+    assert reads == []
+
+    # A stale token is read again, so writes of other processes are noticed
+    monkeypatch.setattr(src.config.settings, "write_token_max_age", 0.0)
+    retriever._filter_candidates({"source": "doc-2"})
+    assert len(reads) == 1
+
+
+def test_exact_query_skips_chunks_deleted_between_reads(
+    retriever: RAGRetriever, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: A candidate deleted after scoring should be left out, not raise."""
+    candidates = retriever._filter_candidates({"source": "doc-2"})
+    collection = retriever.collection
+    get = collection.get
+
+    def get_then_delete(ids: list[str], include: list[str]) -> dict:
+        if "documents" in include:  # Second read: a concurrent delete got in first
+            collection.delete(ids=[ids[0]])
+        return get(ids=ids, include=include)
+
+    monkeypatch.setattr(collection, "get", get_then_delete)
+    query = retriever.embedding_service.embed_query("alpha")
+
+    results = retriever._exact_query(query, candidates, 3, ["documents", "distances"])
+
+    assert len(results["ids"][0]) == 2
+    assert len(results["distances"][0]) == len(results["documents"][0]) == 2
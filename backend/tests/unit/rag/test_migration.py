@@ -0,0 +1,46 @@
+"""Test Specs for collection re-embedding."""
+
+import shutil
+import tempfile
+
+import chromadb
+import numpy as np
+import pytest
+from chromadb.config import Settings as ChromaSettings
+
+from src.rag.migration import reembed_collection
+from tests.fixtures.rag import HashEmbeddingService
+
+
+@pytest.fixture
+def client() -> chromadb.ClientAPI:
+    """Fixture: ChromaDB client on a temporary directory."""
+    temp_dir = tempfile.mkdtemp()
+    yield chromadb.PersistentClient(
+        path=temp_dir, settings=ChromaSettings(anonymized_telemetry=False)
+    )
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_reembed_collection_copies_all_chunks(client: chromadb.ClientAPI) -> None:
+    """Spec: reembed_collection should rewrite every chunk with new vectors."""
+    source = client.create_collection("source", metadata={"hnsw:space": "cosine"})
+    texts = [f"chunk number {i} about topic {i % 3}" for i in range(25)]
+    source.add(
+        ids=[f"id_{i}" for i in range(25)],
+        embeddings=np.random.default_rng(0).random((25, 8)).astype(np.float32),
+        documents=texts,
+        metadatas=[{"source": "doc", "position": i} for i in range(25)],
+    )
+    target = client.create_collection("target", metadata={"hnsw:space": "cosine"})
+    service = HashEmbeddingService(dimensions=16)
+    progress: list[int] = []
+
+    done = reembed_collection(source, target, service, batch_size=10, on_batch=progress.append)
+
+    assert done == 25
+    assert progress == [10, 20, 25]
+    stored = target.get(ids=["id_7"], include=["documents", "metadatas", "embeddings"])
+    assert stored["documents"] == [texts[7]]
+    assert stored["metadatas"][0]["position"] == 7
+    np.testing.assert_allclose(stored["embeddings"][0], service.embed_query(texts[7]), rtol=1e-5)
@@ -0,0 +1,109 @@
+"""Test Specs for the ONNX Runtime embedding backend."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+
+from sentence_transformers import SentenceTransformer  # noqa: E402
+
+from src.rag.onnx_embeddings import OnnxEmbeddingModel, export_onnx_model  # noqa: E402
+
+PARITY_TEXTS = [
+    "the quick brown fox jumps over the lazy dog",
+    "a short one",
+    "documents are split into chunks before they are embedded",
+    "fox dog chunk",
+]
+
+
+def _cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+@pytest.fixture(scope="module")
+def tiny_model_dir() -> str:
+    """Fixture: Small randomly initialized BERT saved as a sentence-transformers model."""
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    temp_dir = tempfile.mkdtemp()
+    model_dir = Path(temp_dir) / "tiny-bert"
+    model_dir.mkdir()
+
+    words = sorted({w for text in PARITY_TEXTS for w in text.split()})
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", *words]
+    vocab_file = model_dir / "vocab.txt"
+    vocab_file.write_text("\n".join(vocab))
+
+    config = BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=64,
+    )
+    BertModel(config).save_pretrained(str(model_dir))
+    BertTokenizerFast(vocab_file=str(vocab_file)).save_pretrained(str(model_dir))
+
+    yield str(model_dir)
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+@pytest.fixture(scope="module")
+def exported_dir(tiny_model_dir: str) -> str:
+    """Fixture: ONNX export of the tiny model."""
+    output = Path(tiny_model_dir).parent / "onnx"
+    export_onnx_model(tiny_model_dir, str(output), quantize=True)
+    return str(output)
+
+
+def test_onnx_model_shape_and_normalization(exported_dir: str) -> None:
+    """Spec: encode should return normalized float32 vectors of the model dimension."""
+    model = OnnxEmbeddingModel(exported_dir, intra_op_threads=1)
+    embeddings = model.encode(PARITY_TEXTS, batch_size=3)
+
+    assert embeddings.dtype == np.float32
+    assert embeddings.shape == (len(PARITY_TEXTS), model.get_sentence_embedding_dimension())
+    np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1.0, rtol=1e-5)
+
+
+def test_onnx_parity_with_torch_tiny_model(tiny_model_dir: str, exported_dir: str) -> None:
+    """Spec: Full-precision ONNX output should match the torch output."""
+    torch_embeddings = SentenceTransformer(tiny_model_dir, device="cpu").encode(
+        PARITY_TEXTS, normalize_embeddings=True
+    )
+    onnx_embeddings = OnnxEmbeddingModel(exported_dir, quantized=False).encode(PARITY_TEXTS)
+
+    assert _cosine_rows(torch_embeddings, onnx_embeddings).min() >= 0.999
+
+
+def test_onnx_quantized_parity_with_torch_minilm() -> None:
+    """Spec: Quantized all-MiniLM-L6-v2 should reach cosine >= 0.99 against torch."""
+    from huggingface_hub import try_to_load_from_cache
+
+    if not isinstance(
+        try_to_load_from_cache("sentence-transformers/all-MiniLM-L6-v2", "config.json"), str
+    ):
+        pytest.skip("all-MiniLM-L6-v2 is not in the local Hugging Face cache")
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        export_onnx_model("all-MiniLM-L6-v2", temp_dir, quantize=True)
+        torch_embeddings = SentenceTransformer("all-MiniLM-L6-v2", device="cpu").encode(
+            PARITY_TEXTS, normalize_embeddings=True
+        )
+        onnx_embeddings = OnnxEmbeddingModel(temp_dir, quantized=True).encode(PARITY_TEXTS)
+
+        assert _cosine_rows(torch_embeddings, onnx_embeddings).min() >= 0.99
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
@@ -0,0 +1,53 @@
+"""Test Specs for the parent section store."""
+
+import pytest
+
+from src.rag.parent_store import ParentStore
+from src.schemas.rag import DocumentChunk
+
+
+@pytest.fixture
+def parent_store(tmp_path) -> ParentStore:
+    """Fixture: Parent store in a temporary database."""
+    return ParentStore(db_path=str(tmp_path / "parents.db"))
+
+
+def make_parent(doc_id: str, position: int) -> DocumentChunk:
+    return DocumentChunk(
+        content=f"Section {position} of {doc_id}",
+        metadata={"source": doc_id, "position": position, "heading": f"H{position}"},
+        chunk_id=f"{doc_id}_parent_{position}",
+        source=doc_id,
+        position=position,
+    )
+
+
+def test_get_parents_by_id(parent_store: ParentStore) -> None:
+    """Spec: get_parents should return stored parents by id and skip unknown ids."""
+    parent_store.add_parents("doc", [make_parent("doc", i) for i in range(3)])
+
+    parents = parent_store.get_parents(["doc_parent_2", "missing", "doc_parent_0"])
+
+    assert set(parents) == {"doc_parent_0", "doc_parent_2"}
+    assert parents["doc_parent_2"].content == "Section 2 of doc"
+    assert parents["doc_parent_2"].metadata["heading"] == "H2"
+    assert parents["doc_parent_2"].source == "doc"
+
+
+def test_get_parents_batches_large_lookups(parent_store: ParentStore) -> None:
+    """Spec: Lookups of more ids than SQLite binds per query should still succeed."""
+    parent_store.add_parents("doc", [make_parent("doc", i) for i in range(1200)])
+
+    parents = parent_store.get_parents([f"doc_parent_{i}" for i in range(1200)])
+
+    assert len(parents) == 1200
+
+
+def test_delete_document_removes_only_its_parents(parent_store: ParentStore) -> None:
+    """Spec: delete_document should drop the parents of one document."""
+    parent_store.add_parents("a", [make_parent("a", 0)])
+    parent_store.add_parents("b", [make_parent("b", 0)])
+
+    parent_store.delete_document("a")
+
+    assert set(parent_store.get_parents(["a_parent_0", "b_parent_0"])) == {"b_parent_0"}
@@ -85,3 +85,83 @@ def test_retrieve_empty_query(retriever: RAGRetriever) -> None:
     assert isinstance(result, RetrievalResult)
     assert result.query == ""
     assert len(result.chunks) == 0
+
+
+@pytest.fixture
+def hash_retriever(temp_chroma_path: str) -> RAGRetriever:
+    """Fixture: RAG retriever with a model-free embedding service."""
+    import src.config
+    from tests.fixtures.rag import HashEmbeddingService
+
+    original_path = src.config.settings.chroma_path
+    src.config.settings.chroma_path = temp_chroma_path
+
+    retriever = RAGRetriever(
+        collection_name="test_hash_collection",
+        embedding_service=HashEmbeddingService(),
+    )
+
+    yield retriever
+
+    retriever.delete_collection()
+    src.config.settings.chroma_path = original_path
+
+
+def test_add_documents_with_precomputed_matrix(hash_retriever: RAGRetriever) -> None:
+    """Spec: add_documents should accept a float32 matrix and skip embedding."""
+    chunks = [
+        DocumentChunk(
+            content="alpha beta", metadata={"source": "s"}, chunk_id="c1", source="s", position=0
+        ),
+        DocumentChunk(
+            content="gamma delta", metadata={"source": "s"}, chunk_id="c2", source="s", position=1
+        ),
+    ]
+    matrix = hash_retriever.embedding_service.embed_batch([c.content for c in chunks])
+    hash_retriever.embedding_service.calls.clear()
+
+    hash_retriever.add_documents(chunks, embeddings=matrix)
+
+    assert hash_retriever.embedding_service.calls == []
+    assert hash_retriever.collection.count() == 2
+    assert all(chunk.embedding is None for chunk in chunks)
+
+    result = hash_retriever._vector_search("gamma delta", top_k=1, score_threshold=0.0)
+    assert result.chunks[0].chunk_id == "c2"
+
+
+def test_search_fetches_only_requested_fields(hash_retriever: RAGRetriever) -> None:
+    """Spec: search should return ids and scores, snippets, or full hits as asked."""
+    import src.config
+
+    chunks = [
+        DocumentChunk(
+            content=f"alpha beta {word} " + "padding " * 40,
+            metadata={"source": "s", "position": i},
+            chunk_id=f"c{i}",
+            source="s",
+            position=i,
+        )
+        for i, word in enumerate(["gamma", "delta", "epsilon"])
+    ]
+    hash_retriever.add_documents(chunks)
+
+    full = hash_retriever.search("alpha beta delta", top_k=2, fields="full")
+    assert full[0].chunk_id == "c1"
+    assert full[0].content == chunks[1].content
+    assert full[0].metadata == {"source": "s", "position": 1}
+
+    ids = hash_retriever.search("alpha beta delta", top_k=2, fields="ids")
+    assert [(hit.chunk_id, hit.content, hit.metadata) for hit in ids] == [
+        (hit.chunk_id, None, None) for hit in full
+    ]
+    assert [hit.score for hit in ids] == pytest.approx([hit.score for hit in full])
+
+    snippet = hash_retriever.search("alpha beta delta", top_k=2, fields="snippet")
+    limit = src.config.settings.search_snippet_chars
+    assert [hit.content for hit in snippet] == [hit.content[:limit] for hit in full]
+    assert all(hit.metadata is None for hit in snippet)
+
+    result = hash_retriever.retrieve("alpha beta delta", top_k=2, score_threshold=0.0)
+    assert [chunk.chunk_id for chunk in result.chunks] == [hit.chunk_id for hit in full]
+    assert result.chunks[0].position == 1
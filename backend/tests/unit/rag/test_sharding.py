@@ -0,0 +1,122 @@
+"""Test Specs for sharded collections."""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+import src.config
+from src.rag.retriever import RAGRetriever
+from src.rag.sharding import ShardedCollection, shard_index
+from src.schemas.rag import DocumentChunk
+from tests.fixtures.rag import HashEmbeddingService
+
+WORDS = "alpha beta gamma delta epsilon zeta eta theta iota kappa lambda omicron sigma".split()
+
+
+def make_chunks() -> list[DocumentChunk]:
+    """Chunks of twelve documents with overlapping vocabularies."""
+    chunks = []
+    for doc in range(12):
+        for position in range(4):
+            words = [WORDS[(doc * 3 + position + k) % len(WORDS)] for k in range(5)]
+            chunks.append(
+                DocumentChunk(
+                    content=" ".join(words),
+                    metadata={"source": f"doc-{doc}", "position": position},
+                    chunk_id=f"doc-{doc}_chunk_{position}",
+                    source=f"doc-{doc}",
+                    position=position,
+                )
+            )
+    return chunks
+
+
+def make_retriever(path: Path, shard_count: int, monkeypatch: pytest.MonkeyPatch) -> RAGRetriever:
+    """Retriever over a fresh database with the given shard count."""
+    monkeypatch.setattr(src.config.settings, "chroma_path", str(path))
+    monkeypatch.setattr(src.config.settings, "shard_count", shard_count)
+    return RAGRetriever(collection_name="shard_test", embedding_service=HashEmbeddingService())
+
+
+def test_shard_index_moves_few_keys_when_growing() -> None:
+    """Spec: Adding a shard should only move keys onto the new shard, about 1/N of them."""
+    keys = [f"document-{i}" for i in range(4000)]
+    before = [shard_index(key, 4) for key in keys]
+    after = [shard_index(key, 5) for key in keys]
+
+    assert before == [shard_index(key, 4) for key in keys]
+    assert set(before) == {0, 1, 2, 3}
+    moved = [(old, new) for old, new in zip(before, after, strict=True) if old != new]
+    assert all(new == 4 for _, new in moved)
+    assert 0.15 < len(moved) / len(keys) < 0.25
+
+
+def test_sharded_search_matches_single_collection(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: Scatter-gather search over shards should return the single-collection top-k."""
+    single = make_retriever(tmp_path / "single", 1, monkeypatch)
+    single.add_documents(make_chunks())
+    sharded = make_retriever(tmp_path / "sharded", 4, monkeypatch)
+    sharded.add_documents(make_chunks())
+
+    assert isinstance(sharded.collection, ShardedCollection)
+    assert sharded.collection.count() == single.collection.count() == 48
+    for number, shard in enumerate(sharded.collection.shards):
+        sources = {metadata["source"] for metadata in shard.get(include=["metadatas"])["metadatas"]}
+        assert all(shard_index(source, 4) == number for source in sources)
+
+    for query in ("alpha beta gamma", "sigma omicron", "eta theta kappa delta"):
+        expected = single._vector_search(query, top_k=6, score_threshold=0.0)
+        result = sharded._vector_search(query, top_k=6, score_threshold=0.0)
+        assert result.scores == pytest.approx(expected.scores, abs=1e-5)
+        assert sorted(result.scores, reverse=True) == result.scores
+
+
+def test_sharded_collection_get_update_delete(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: Paging, updates and deletes should reach chunks on every shard."""
+    retriever = make_retriever(tmp_path, 3, monkeypatch)
+    chunks = make_chunks()
+    retriever.add_documents(chunks)
+    collection = retriever.collection
+
+    pages = [
+        collection.get(limit=10, offset=offset, include=[])["ids"] for offset in range(0, 50, 10)
+    ]
+    assert [len(page) for page in pages] == [10, 10, 10, 10, 8]
+    assert sorted(chunk_id for page in pages for chunk_id in page) == sorted(
+        chunk.chunk_id for chunk in chunks
+    )
+    filtered = collection.get(where={"source": "doc-5"}, limit=2, offset=1, include=[])
+    assert len(filtered["ids"]) == 2
+
+    ids = ["doc-0_chunk_0", "doc-7_chunk_1", "doc-11_chunk_3"]
+    retriever.update_metadata(
+        ids, [{"source": chunk_id.split("_")[0], "tag": n} for n, chunk_id in enumerate(ids)]
+    )
+    stored = collection.get(ids=ids, include=["metadatas"])
+    assert sorted(metadata["tag"] for metadata in stored["metadatas"]) == [0, 1, 2]
+
+    collection.delete(where={"source": "doc-7"})
+    retriever.delete_chunks(["doc-0_chunk_1"])
+    assert collection.count() == 48 - 4 - 1
+    assert retriever.existing_ids(["doc-7_chunk_0", "doc-0_chunk_1", "doc-0_chunk_2"]) == {
+        "doc-0_chunk_2"
+    }
+
+
+def test_sharded_collections_share_query_threads(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: Opening sharded collections should not start threads of their own."""
+    retrievers = [make_retriever(tmp_path / str(i), 3, monkeypatch) for i in range(8)]
+    for retriever in retrievers:
+        retriever.add_documents(make_chunks()[:8])
+        assert retriever.collection.count() == 8
+
+    # Per-collection pools would hold 8 x 3 threads
+    threads = {t.name for t in threading.enumerate() if t.name.startswith("shard-query")}
+    assert len(threads) <= src.config.settings.shard_query_workers
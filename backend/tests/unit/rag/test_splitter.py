@@ -0,0 +1,105 @@
+"""Test Specs for the recursive text splitter."""
+
+import random
+
+import pytest
+
+from src.rag.splitter import RecursiveTextSplitter
+
+SAMPLE = (
+    "Widgets\n\nThe widget ships in three sizes. Each size has its own mount.\n"
+    "Mounts are sold separately.\n\n\n"
+    "Warranty\n\nTwo years, parts and labour. Keep your receipt!   \n\n"
+    "Supercalifragilisticexpialidocious-part-number-ABC123456789"
+)
+
+PIECES = ["a", "bb", "word", "longerword", " ", "  ", "\n", "\n\n", "\n\n\n", "\t", "é", "x" * 40]
+
+
+def random_text(rng: random.Random) -> str:
+    """Text mixing words, runs of whitespace, blank lines and overlong tokens."""
+    return "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 300)))
+
+
+def test_golden_output() -> None:
+    """Spec: Splitting should produce the recorded chunks (same as LangChain's splitter)."""
+    splitter = RecursiveTextSplitter(chunk_size=40, chunk_overlap=10)
+
+    assert splitter.split_text(SAMPLE) == [
+        "Widgets",
+        "The widget ships in three sizes. Each",
+        "Each size has its own mount.",
+        "Mounts are sold separately.",
+        "Warranty",
+        "Two years, parts and labour. Keep your",
+        "Keep your receipt!",
+        "Supercalifragilisticexpialidocious-part",
+        "cious-part-number-ABC123456789",
+    ]
+
+
+def test_spans_point_at_chunks() -> None:
+    """Spec: split_spans should return the offsets of each chunk in the input."""
+    splitter = RecursiveTextSplitter(chunk_size=40, chunk_overlap=10)
+
+    spans = splitter.split_spans(SAMPLE)
+
+    assert [SAMPLE[start:end] for start, end in spans] == splitter.split_text(SAMPLE)
+    assert [start for start, _ in spans] == sorted(start for start, _ in spans)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_parity_with_langchain(seed: int) -> None:
+    """Spec: Output should match LangChain's RecursiveCharacterTextSplitter exactly."""
+    text_splitters = pytest.importorskip("langchain_text_splitters")
+    rng = random.Random(seed)
+
+    for _ in range(200):
+        text = random_text(rng)
+        chunk_size = rng.randint(1, 120)
+        chunk_overlap = rng.randint(0, chunk_size)
+        separators = rng.choice([None, ["\n\n", "\n", " "], ["\n"], [". ", " ", ""]])
+        reference = text_splitters.RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            separators=separators,
+            length_function=len,
+            is_separator_regex=False,
+        )
+        splitter = RecursiveTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=separators
+        )
+
+        assert splitter.split_text(text) == reference.split_text(text), (
+            text,
+            chunk_size,
+            chunk_overlap,
+        )
+
+
+def test_parity_with_custom_length_function() -> None:
+    """Spec: A custom length function should be applied the way LangChain applies it."""
+    text_splitters = pytest.importorskip("langchain_text_splitters")
+    rng = random.Random(42)
+
+    def words(text: str) -> int:
+        return len(text.split()) + 1
+
+    for _ in range(200):
+        text = random_text(rng)
+        chunk_size = rng.randint(1, 30)
+        chunk_overlap = rng.randint(0, chunk_size)
+        reference = text_splitters.RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=words
+        )
+        splitter = RecursiveTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=words
+        )
+
+        assert splitter.split_text(text) == reference.split_text(text)
+
+
+def test_rejects_overlap_larger_than_chunk() -> None:
+    """Spec: An overlap larger than the chunk size should be rejected."""
+    with pytest.raises(ValueError):
+        RecursiveTextSplitter(chunk_size=10, chunk_overlap=20)
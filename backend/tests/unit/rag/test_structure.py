@@ -0,0 +1,96 @@
+"""Test Specs for structural blocks and structure-aware chunking."""
+
+from src.rag.chunking import StructuredChunker
+from src.rag.structure import iter_lines, parse_blocks
+
+MANUAL = """# Manual
+
+## Setup
+
+Install the package.
+Check the version.
+
+| Part | Qty |
+|------|-----|
+| Bolt | 4 |
+| Nut | 4 |
+
+```
+pip install widget
+
+widget --check
+```
+
+## Usage
+
+### Running
+
+Run the widget.
+"""
+
+
+def test_iter_lines_joins_lines_split_across_pieces() -> None:
+    """Spec: iter_lines should yield whole lines when pieces end mid-line."""
+    assert list(iter_lines(["ab", "c\nde", "f\r\n", "g"])) == ["abc", "def", "g"]
+
+
+def test_parse_blocks_tracks_heading_path() -> None:
+    """Spec: parse_blocks should yield headings, paragraphs, tables and code with their section."""
+    blocks = list(parse_blocks(MANUAL.split("\n")))
+
+    assert [(b.kind, b.headings) for b in blocks] == [
+        ("heading", ("Manual",)),
+        ("heading", ("Manual", "Setup")),
+        ("text", ("Manual", "Setup")),
+        ("table", ("Manual", "Setup")),
+        ("code", ("Manual", "Setup")),
+        ("heading", ("Manual", "Usage")),
+        ("heading", ("Manual", "Usage", "Running")),
+        ("text", ("Manual", "Usage", "Running")),
+    ]
+    assert blocks[3].text.count("\n") == 3  # Whole table
+    assert "\n\nwidget --check" in blocks[4].text  # Blank line inside the fence
+
+
+def test_structured_chunks_follow_sections() -> None:
+    """Spec: Each section should start a chunk carrying its heading path."""
+    chunker = StructuredChunker(chunk_size=1000, chunk_overlap=0)
+
+    chunks = chunker.chunk_document(MANUAL, source="manual")
+
+    assert [c.metadata["heading_path"] for c in chunks] == [
+        "Manual > Setup",
+        "Manual > Usage > Running",
+    ]
+    assert chunks[0].content.startswith("# Manual\n\n## Setup\n\nInstall")
+    assert chunks[0].metadata["has_table"] is True
+    assert chunks[1].metadata["heading"] == "Running"
+    assert [c.position for c in chunks] == [0, 1]
+
+
+def test_structured_chunks_never_cut_table_rows() -> None:
+    """Spec: An oversized table should be split by whole rows, repeating the header."""
+    rows = "\n".join(f"| item {i} | {i * 7} |" for i in range(40))
+    content = f"## Parts\n\n| Item | Price |\n|---|---|\n{rows}\n"
+    chunker = StructuredChunker(chunk_size=200, chunk_overlap=0)
+
+    chunks = chunker.chunk_document(content, source="parts")
+
+    assert len(chunks) > 1
+    table_rows = []
+    for chunk in chunks:
+        assert len(chunk.content) <= 200
+        table = chunk.content.split("## Parts\n\n")[-1].split("\n")
+        assert table[:2] == ["| Item | Price |", "|---|---|"]
+        table_rows.extend(table[2:])
+    assert table_rows == rows.split("\n")
+
+
+def test_structured_chunker_streams_pieces() -> None:
+    """Spec: iter_chunks should give the same chunks for any split of the input."""
+    chunker = StructuredChunker(chunk_size=60, chunk_overlap=0)
+    pieces = [MANUAL[i : i + 7] for i in range(0, len(MANUAL), 7)]
+
+    streamed = [c.content for c in chunker.iter_chunks(pieces, source="manual")]
+
+    assert streamed == [c.content for c in chunker.chunk_document(MANUAL, source="manual")]
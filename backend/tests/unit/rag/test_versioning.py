@@ -0,0 +1,257 @@
+"""Test Specs for embedding model versioning and re-embedding migrations."""
+
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import pytest
+
+from src.rag.retriever import RAGRetriever
+from src.rag.versioning import (
+    TAG_DIMENSIONS,
+    TAG_MODEL,
+    MigrationLease,
+    ReembedMigration,
+    embedding_tag,
+    shadow_collection_name,
+)
+from src.schemas.rag import DocumentChunk
+from tests.fixtures.rag import HashEmbeddingService
+
+
+@pytest.fixture
+def chroma_path(monkeypatch: pytest.MonkeyPatch) -> str:
+    """Fixture: Temporary ChromaDB directory set as settings.chroma_path."""
+    import src.config
+
+    # Stored-model query services are hash embedders too, instead of downloaded models
+    monkeypatch.setattr(
+        "src.rag.retriever.service_for_tag",
+        lambda tag, local_provider="local": HashEmbeddingService(dimensions=tag[TAG_DIMENSIONS]),
+    )
+
+    temp_dir = tempfile.mkdtemp()
+    original = (
+        src.config.settings.chroma_path,
+        src.config.settings.embedding_migration_auto_start,
+        src.config.settings.embedding_migration_throttle_seconds,
+    )
+    src.config.settings.chroma_path = temp_dir
+    src.config.settings.embedding_migration_auto_start = False
+    src.config.settings.embedding_migration_throttle_seconds = 0.0
+    yield temp_dir
+    (
+        src.config.settings.chroma_path,
+        src.config.settings.embedding_migration_auto_start,
+        src.config.settings.embedding_migration_throttle_seconds,
+    ) = original
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def make_chunks(count: int) -> list[DocumentChunk]:
+    """Build chunks with distinct content."""
+    return [
+        DocumentChunk(
+            content=f"chunk {i} about topic {i % 4} and subject {i}",
+            metadata={"source": "doc", "position": i},
+            chunk_id=f"doc_{i}",
+            source="doc",
+            position=i,
+        )
+        for i in range(count)
+    ]
+
+
+def test_new_collection_is_tagged(chroma_path: str) -> None:
+    """Spec: A new collection should record the embedding model and dimension."""
+    service = HashEmbeddingService(dimensions=16)
+    retriever = RAGRetriever(collection_name="docs", embedding_service=service)
+
+    metadata = retriever.collection.metadata
+    assert metadata[TAG_MODEL] == service.model
+    assert metadata[TAG_DIMENSIONS] == 16
+    assert retriever.stored_embedding_tag is None
+
+
+def test_shadow_collection_name_is_valid() -> None:
+    """Spec: Shadow names should only contain characters ChromaDB accepts."""
+    tag = {TAG_MODEL: "sentence-transformers/all MiniLM", TAG_DIMENSIONS: 384}
+    assert (
+        shadow_collection_name("documents", tag)
+        == "documents__sentence-transformers-all-minilm_384"
+    )
+
+
+def test_model_change_is_detected(chroma_path: str) -> None:
+    """Spec: Reopening a collection with another model should report the stored tag."""
+    old = HashEmbeddingService(dimensions=16)
+    RAGRetriever(collection_name="docs", embedding_service=old).add_documents(make_chunks(3))
+
+    new = HashEmbeddingService(dimensions=32)
+    retriever = RAGRetriever(collection_name="docs", embedding_service=new)
+
+    assert retriever.stored_embedding_tag[TAG_DIMENSIONS] == 16
+    assert retriever.embedding_service.dimensions == 16  # Queries use the stored space
+    assert retriever.migration is None  # Auto start disabled in this test
+
+
+def test_migration_reembeds_and_switches(chroma_path: str) -> None:
+    """Spec: The migration should re-embed all chunks, then serve them from the shadow."""
+    old = HashEmbeddingService(dimensions=16)
+    chunks = make_chunks(30)
+    RAGRetriever(collection_name="docs", embedding_service=old).add_documents(chunks)
+
+    new = HashEmbeddingService(dimensions=32)
+    retriever = RAGRetriever(collection_name="docs", embedding_service=new)
+    old_name = retriever.collection.name
+
+    migration = retriever.start_reembed_migration()
+    migration.join(timeout=30)
+
+    assert migration.state == "completed"
+    assert migration.done == 30
+    assert retriever.collection.name != old_name
+    assert retriever.collection.count() == 30
+    assert retriever.embedding_service is new
+    assert retriever.migration_status()["migration"]["progress"] == 1.0
+
+    stored = retriever.collection.get(ids=["doc_5"], include=["embeddings"])
+    np.testing.assert_allclose(
+        stored["embeddings"][0], new.embed_query(chunks[5].content), rtol=1e-5
+    )
+
+    # The alias survives a restart
+    reopened = RAGRetriever(collection_name="docs", embedding_service=new)
+    assert reopened.collection.name == retriever.collection.name
+    assert reopened.stored_embedding_tag is None
+
+
+def test_switch_syncs_writes_made_during_copy(chroma_path: str) -> None:
+    """Spec: Chunks added or deleted while copying should be reconciled at switch-over."""
+    old = HashEmbeddingService(dimensions=16)
+    RAGRetriever(collection_name="docs", embedding_service=old).add_documents(make_chunks(10))
+
+    new = HashEmbeddingService(dimensions=32)
+    retriever = RAGRetriever(collection_name="docs", embedding_service=new)
+
+    migration = retriever.start_reembed_migration()
+    migration.join(timeout=30)
+    assert migration.state == "completed"
+
+    # Second migration, with writes between the copy and the switch
+    newer = HashEmbeddingService(dimensions=24)
+    retriever.target_embedding_service = newer
+    switch = retriever._switch_to_shadow
+    extra = make_chunks(12)[10:]
+
+    def switch_after_writes(m: ReembedMigration) -> None:
+        retriever.add_documents(extra)
+        retriever.delete_chunks(["doc_0"])
+        switch(m)
+
+    retriever._switch_to_shadow = switch_after_writes
+    migration = retriever.start_reembed_migration()
+    migration.join(timeout=30)
+
+    assert migration.state == "completed"
+    ids = set(retriever.collection.get(include=[])["ids"])
+    assert "doc_0" not in ids
+    assert {"doc_10", "doc_11"} <= ids
+    assert len(ids) == 11
+    assert retriever.collection.metadata[TAG_DIMENSIONS] == 24
+
+
+def test_embedding_tag_shares_family_for_local_and_onnx() -> None:
+    """Spec: Local and ONNX providers produce interchangeable vectors."""
+    local = HashEmbeddingService(dimensions=8)
+    onnx = HashEmbeddingService(dimensions=8)
+    onnx.provider = "onnx"
+    assert embedding_tag(local) == embedding_tag(onnx)
+
+
+def test_second_retriever_does_not_restart_running_migration(chroma_path: str) -> None:
+    """Spec: A migration running for a collection should block others from dropping its shadow."""
+    old = HashEmbeddingService(dimensions=16)
+    RAGRetriever(collection_name="docs", embedding_service=old).add_documents(make_chunks(10))
+
+    new = HashEmbeddingService(dimensions=32)
+    first = RAGRetriever(collection_name="docs", embedding_service=new)
+    switch = first._switch_to_shadow
+    copied, resume = threading.Event(), threading.Event()
+
+    def paused_switch(m: ReembedMigration) -> None:
+        copied.set()
+        resume.wait(timeout=30)
+        switch(m)
+
+    first._switch_to_shadow = paused_switch
+    migration = first.start_reembed_migration()
+    assert copied.wait(timeout=30)
+
+    # E.g. another API worker, or the tenant reopened after an LRU eviction
+    second = RAGRetriever(collection_name="docs", embedding_service=new)
+    assert second.start_reembed_migration() is None
+    assert migration.shadow.count() == 10
+
+    resume.set()
+    migration.join(timeout=30)
+    assert migration.state == "completed"
+    assert first.collection.count() == 10
+
+    # The lease is released once the migration is over
+    lease = MigrationLease(first.aliases, "docs", ttl_seconds=300)
+    assert lease.acquire()
+    assert "migration:docs" not in first.aliases.names()
+
+
+def test_expired_migration_lease_is_taken_over(chroma_path: str) -> None:
+    """Spec: A lease not renewed in time can be claimed, and its old holder stops."""
+    retriever = RAGRetriever(collection_name="docs", embedding_service=HashEmbeddingService())
+    holder = MigrationLease(retriever.aliases, "docs", ttl_seconds=300)
+    assert holder.acquire()
+    assert not MigrationLease(retriever.aliases, "docs", ttl_seconds=300).acquire()
+
+    # With a zero TTL every lease counts as expired
+    taker = MigrationLease(retriever.aliases, "docs", ttl_seconds=0.0)
+    assert taker.acquire()
+    with pytest.raises(RuntimeError, match="taken over"):
+        holder.renew()
+
+    holder.release()  # Releasing a lost lease leaves the new holder alone
+    assert not MigrationLease(retriever.aliases, "docs", ttl_seconds=300).acquire()
+    taker.release()
+    assert MigrationLease(retriever.aliases, "docs", ttl_seconds=300).acquire()
+
+
+def test_closed_retriever_stops_its_migration(
+    chroma_path: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: Closing a retriever should stop its migration and free the collection's lease."""
+    import src.config
+
+    old = HashEmbeddingService(dimensions=16)
+    RAGRetriever(collection_name="docs", embedding_service=old).add_documents(make_chunks(30))
+    monkeypatch.setattr(src.config.settings, "embedding_migration_batch_size", 5)
+    monkeypatch.setattr(src.config.settings, "embedding_migration_throttle_seconds", 10.0)
+
+    new = HashEmbeddingService(dimensions=32)
+    retriever = RAGRetriever(collection_name="docs", embedding_service=new)
+    old_name = retriever.collection.name
+    migration = retriever.start_reembed_migration()
+    while migration.done == 0:
+        migration.join(timeout=0.01)
+
+    retriever.close()
+
+    assert migration.state == "stopped"
+    assert retriever.collection.name == old_name
+    assert not retriever.metadata_index.built
+
+    # A later migration drops the leftover shadow and starts over
+    monkeypatch.setattr(src.config.settings, "embedding_migration_throttle_seconds", 0.0)
+    reopened = RAGRetriever(collection_name="docs", embedding_service=new)
+    restarted = reopened.start_reembed_migration()
+    restarted.join(timeout=30)
+    assert restarted.state == "completed"
+    assert reopened.collection.count() == 30
@@ -0,0 +1,192 @@
+"""Test Specs for content-hash chunk deduplication."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+import src.config
+from src.rag.chunking import DocumentChunker, chunk_hash
+from src.rag.retriever import RAGRetriever
+from src.schemas.api import DocumentUpload
+from src.services.chunk_store import ChunkRefStore
+from src.services.document_service import DocumentService
+from src.services.document_storage import DocumentStorage
+from tests.fixtures.rag import HashEmbeddingService
+
+BOILERPLATE = "Copyright ACME Corp. All rights reserved. Confidential and proprietary."
+
+
+@pytest.fixture
+def temp_data_dir() -> str:
+    """Fixture: Temporary directory for data."""
+    temp_dir = tempfile.mkdtemp()
+    yield temp_dir
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def chunk_store(temp_data_dir: str) -> ChunkRefStore:
+    """Fixture: Chunk reference store on a temporary database."""
+    return ChunkRefStore(db_path=str(Path(temp_data_dir) / "chunks.db"))
+
+
+@pytest.fixture
+def embedding_service() -> HashEmbeddingService:
+    """Fixture: Deterministic embedding service counting embedded texts."""
+    return HashEmbeddingService(dimensions=32)
+
+
+@pytest.fixture
+def document_service(
+    temp_data_dir: str,
+    chunk_store: ChunkRefStore,
+    embedding_service: HashEmbeddingService,
+) -> DocumentService:
+    """Fixture: Document service with deduplication and temporary storage."""
+    original_chroma_path = src.config.settings.chroma_path
+    src.config.settings.chroma_path = str(Path(temp_data_dir) / "chroma")
+
+    retriever = RAGRetriever(collection_name="test_dedup", embedding_service=embedding_service)
+    service = DocumentService(
+        chunker=DocumentChunker(chunk_size=80, chunk_overlap=0),
+        retriever=retriever,
+        storage=DocumentStorage(db_path=str(Path(temp_data_dir) / "documents.db")),
+        chunk_store=chunk_store,
+    )
+
+    yield service
+
+    retriever.delete_collection()
+    src.config.settings.chroma_path = original_chroma_path
+
+
+def make_upload(body: str) -> DocumentUpload:
+    """Build a plain-text upload with boilerplate around the body."""
+    return DocumentUpload(
+        filename="doc.txt",
+        content=f"{BOILERPLATE}\n\n{body}\n\n{BOILERPLATE}",
+        content_type="text/plain",
+    )
+
+
+def test_chunk_hash_normalizes_whitespace() -> None:
+    """Spec: chunk_hash should ignore whitespace layout but not wording."""
+    assert chunk_hash("hello   world\n") == chunk_hash(" hello world")
+    assert chunk_hash("hello world") != chunk_hash("hello there")
+
+
+def test_chunk_store_refcounts(chunk_store: ChunkRefStore) -> None:
+    """Spec: release_document should report which hashes became unreferenced."""
+    chunk_store.add_document("a", ["h1", "h2", "h1"])
+    chunk_store.add_document("b", ["h2", "h3"])
+
+    assert chunk_store.refcounts(["h1", "h2", "h3", "h4"]) == {"h1": 2, "h2": 2, "h3": 1, "h4": 0}
+    assert chunk_store.get_document("a") == ["h1", "h2", "h1"]
+
+    orphaned, shared = chunk_store.release_document("a")
+    assert orphaned == ["h1"]
+    assert shared == ["h2"]
+    assert chunk_store.owners(["h2", "h1"]) == {"h2": "b"}
+
+
+def test_reupload_embeds_nothing(
+    document_service: DocumentService,
+    embedding_service: HashEmbeddingService,
+) -> None:
+    """Spec: Uploading identical content again should reuse every stored chunk."""
+    upload = make_upload("The first manual explains installation of the widget.")
+    first = document_service.upload_document(upload)
+    embedded = len(embedding_service.calls)
+    stored = document_service.retriever.collection.count()
+
+    second = document_service.upload_document(upload)
+
+    assert second.id != first.id
+    assert second.chunk_count == first.chunk_count
+    assert len(embedding_service.calls) == embedded
+    assert document_service.retriever.collection.count() == stored
+
+
+def test_boilerplate_stored_once(document_service: DocumentService) -> None:
+    """Spec: Repeated paragraphs within and across documents should share one entry."""
+    first = document_service.upload_document(make_upload("Widget installation guide."))
+    document_service.upload_document(make_upload("Widget maintenance guide."))
+
+    boilerplate = document_service.retriever.collection.get(ids=[chunk_hash(BOILERPLATE)])
+    assert len(boilerplate["ids"]) == 1
+    assert document_service.chunk_store.refcounts([chunk_hash(BOILERPLATE)]) == {
+        chunk_hash(BOILERPLATE): 4
+    }
+    assert first.chunk_count == 3
+    assert document_service.retriever.collection.count() == 3
+
+
+def test_delete_keeps_shared_chunks(document_service: DocumentService) -> None:
+    """Spec: Deleting a document should keep chunks still referenced by others."""
+    first = document_service.upload_document(make_upload("Widget installation guide."))
+    second = document_service.upload_document(make_upload("Widget maintenance guide."))
+
+    assert document_service.delete_document(first.id)
+
+    collection = document_service.retriever.collection
+    assert collection.get(ids=[chunk_hash("Widget installation guide.")])["ids"] == []
+    shared = collection.get(ids=[chunk_hash(BOILERPLATE)], include=["metadatas"])
+    assert shared["metadatas"][0]["source"] == second.id
+
+    assert document_service.delete_document(second.id)
+    assert collection.count() == 0
+
+
+def test_update_embeds_only_changed_chunks(
+    document_service: DocumentService,
+    embedding_service: HashEmbeddingService,
+) -> None:
+    """Spec: update_document should embed new chunks and delete removed ones only."""
+    doc = document_service.upload_document(make_upload("Widget installation guide."))
+    embedding_service.calls.clear()
+
+    updated = document_service.update_document(
+        doc.id, make_upload("Widget installation guide, second edition.")
+    )
+
+    assert updated.id == doc.id
+    assert embedding_service.calls == [["Widget installation guide, second edition."]]
+    collection = document_service.retriever.collection
+    assert collection.get(ids=[chunk_hash("Widget installation guide.")])["ids"] == []
+    assert collection.count() == 2
+    assert document_service.chunk_store.get_document(doc.id)[0] == chunk_hash(BOILERPLATE)
+
+
+def test_update_unknown_document(document_service: DocumentService) -> None:
+    """Spec: update_document should return None for non-existent document."""
+    assert document_service.update_document("missing", make_upload("text")) is None
+
+
+def test_shared_chunk_keeps_first_source(
+    document_service: DocumentService, temp_data_dir: str
+) -> None:
+    """Spec: A reused chunk keeps the first document's source, so source filters miss it."""
+    first = document_service.upload_document(make_upload("Installing the widget."))
+    second = document_service.upload_document(make_upload("Removing the widget."))
+
+    retriever = document_service.retriever
+    boilerplate = chunk_hash(BOILERPLATE)
+    first_ids = retriever.search("ACME", top_k=10, filter_metadata={"source": first.id})
+    second_ids = retriever.search("ACME", top_k=10, filter_metadata={"source": second.id})
+    assert boilerplate in {hit.chunk_id for hit in first_ids}
+    assert boilerplate not in {hit.chunk_id for hit in second_ids}
+
+    # Without deduplication (the default) each document has its own copy
+    plain = DocumentService(
+        chunker=DocumentChunker(chunk_size=80, chunk_overlap=0),
+        retriever=RAGRetriever(
+            collection_name="test_no_dedup", embedding_service=HashEmbeddingService(dimensions=32)
+        ),
+        storage=DocumentStorage(db_path=str(Path(temp_data_dir) / "plain.db")),
+    )
+    assert plain.chunk_store is None
+    plain_second = plain.upload_document(make_upload("Removing the widget."))
+    hits = plain.retriever.search("ACME", top_k=10, filter_metadata={"source": plain_second.id})
+    assert any(BOILERPLATE in hit.content for hit in hits)
@@ -0,0 +1,99 @@
+"""Test Specs for the Docling worker process pool."""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.services import docling_pool
+from src.services.docling_pool import DoclingWorkerPool, split_pages
+
+
+class PageResult:
+    """Conversion result exposing markdown like a Docling result."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def export_to_markdown(self) -> str:
+        return self.text
+
+
+class FakeConverter:
+    """Converter reporting the converted page range; hangs or lags on 'hang' or 'slow' paths."""
+
+    def convert(self, path: str, page_range: tuple[int, int] | None = None) -> PageResult:
+        if "hang" in path:
+            time.sleep(60)
+        if "slow" in path:
+            time.sleep(0.6)
+        start, end = page_range or ("all", "all")
+        return PageResult(f"pages {start}-{end} pid {os.getpid()}")
+
+
+def load_fake_converter() -> FakeConverter:
+    """Picklable loader building the fake converter inside a worker."""
+    return FakeConverter()
+
+
+@pytest.fixture
+def pool() -> DoclingWorkerPool:
+    """Fixture: Two-worker pool with fake converters."""
+    pool = DoclingWorkerPool(workers=2, pages_per_task=2, timeout=20, loader=load_fake_converter)
+    yield pool
+    pool.close()
+
+
+def test_split_pages() -> None:
+    """Spec: split_pages should cover every page once, in order."""
+    assert split_pages(5, 2) == [(1, 2), (3, 4), (5, 5)]
+    assert split_pages(2, 2) == [None]
+    assert split_pages(None, 2) == [None]
+    assert split_pages(50, 0) == [None]
+
+
+def test_pool_merges_page_ranges_in_order(
+    pool: DoclingWorkerPool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: Large PDFs should be converted in page ranges in worker processes."""
+    monkeypatch.setattr(docling_pool, "count_pages", lambda path: 5)
+
+    text = pool.convert("report.pdf")
+
+    parts = text.split("\n\n")
+    assert [part.split(" pid ")[0] for part in parts] == ["pages 1-2", "pages 3-4", "pages 5-5"]
+    assert str(os.getpid()) not in {part.split(" pid ")[1] for part in parts}
+
+
+def test_pool_kills_runaway_conversion(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Spec: A conversion over the timeout should fail and leave a working pool."""
+    monkeypatch.setattr(docling_pool, "count_pages", lambda path: None)
+    pool = DoclingWorkerPool(workers=1, timeout=0.5, loader=load_fake_converter)
+    try:
+        # Worker start-up (converter loading) does not count against the timeout
+        with pytest.raises(TimeoutError):
+            pool.convert("hang.pdf")
+
+        assert pool.convert("next.pdf").startswith("pages all-all")
+    finally:
+        pool.close()
+
+
+def test_pool_timeout_spares_other_conversions(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Spec: A timeout should count from the task's start and kill only its worker."""
+    monkeypatch.setattr(docling_pool, "count_pages", lambda path: None)
+    pool = DoclingWorkerPool(workers=2, timeout=1, loader=load_fake_converter)
+    try:
+        pool.convert("warmup.pdf")
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            hang = executor.submit(pool.convert, "hang.pdf")
+            time.sleep(0.2)  # Let the hang take one worker
+            # Queued behind each other on the remaining worker: over a second in total
+            slow = [executor.submit(pool.convert, f"slow-{i}.pdf") for i in range(3)]
+
+            with pytest.raises(TimeoutError):
+                hang.result()
+            assert all(future.result().startswith("pages all-all") for future in slow)
+    finally:
+        pool.close()
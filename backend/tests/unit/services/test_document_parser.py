@@ -5,13 +5,14 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from src.services.document_parser import DocumentParser
+from src.services.document_parser import DocumentParser, decode_base64
+from src.services.parse_cache import ParseCache
 
 
 @pytest.fixture
-def parser() -> DocumentParser:
-    """Fixture: Document parser."""
-    return DocumentParser()
+def parser(tmp_path) -> DocumentParser:
+    """Fixture: Document parser with a temporary parse cache."""
+    return DocumentParser(cache=ParseCache(db_path=str(tmp_path / "parse_cache.db")))
 
 
 def test_parse_simple_text(parser: DocumentParser) -> None:
@@ -33,21 +34,31 @@ def test_parse_base64_text(parser: DocumentParser) -> None:
     assert result == original or "test content" in result
 
 
-def test_looks_like_base64(parser: DocumentParser) -> None:
-    """Spec: _looks_like_base64 should detect base64 strings."""
-    # Valid base64
-    base64_str = base64.b64encode(b"test content").decode()
-    assert parser._looks_like_base64(base64_str * 20)  # Make it long enough
+def test_decode_base64() -> None:
+    """Spec: decode_base64 should decode base64 (also line-wrapped) and reject plain text."""
+    original = b"Binary \x00\xff payload " * 20
+    encoded = base64.b64encode(original).decode()
+    wrapped = "\r\n".join(encoded[i : i + 76] for i in range(0, len(encoded), 76))
 
-    # Plain text
-    plain_text = "This is plain text content that is not base64 encoded."
-    assert not parser._looks_like_base64(plain_text * 2)
+    assert decode_base64(encoded) == original
+    assert decode_base64(wrapped) == original
+    assert decode_base64("Plain text with spaces, punctuation and words. " * 5) is None
+    assert decode_base64("Grüße " * 30) is None
+    assert decode_base64(encoded[:-1]) is None  # Truncated
+    assert decode_base64(base64.b64encode(b"short").decode()) is None
 
 
-def test_looks_like_base64_short_string(parser: DocumentParser) -> None:
-    """Spec: _looks_like_base64 should return False for short strings."""
-    short_str = "abc"
-    assert not parser._looks_like_base64(short_str)
+def test_parse_document_decodes_once(parser: DocumentParser) -> None:
+    """Spec: parse_document should use decoded bytes passed in instead of decoding again."""
+    encoded = base64.b64encode(b"Decoded text. " * 20).decode()
+
+    with patch("src.services.document_parser.decode_base64") as decode:
+        result = parser.parse_document(
+            encoded, "notes.txt", "text/plain", decoded=b"Already decoded."
+        )
+
+    assert result == "Already decoded."
+    decode.assert_not_called()
 
 
 def test_parse_document_pdf_without_docling(parser: DocumentParser) -> None:
@@ -86,3 +97,67 @@ def test_parse_document_unknown_type(parser: DocumentParser) -> None:
 
     # Should return string
     assert isinstance(result, str)
+
+
+def test_parse_file_text(parser: DocumentParser, tmp_path) -> None:
+    """Spec: parse_file should read text files from disk."""
+    path = tmp_path / "notes.txt"
+    path.write_text("Plain text on disk.", encoding="utf-8")
+
+    assert parser.parse_file(str(path), "notes.txt", "text/plain") == "Plain text on disk."
+
+
+def test_parse_file_pdf_uses_path(parser: DocumentParser, tmp_path) -> None:
+    """Spec: parse_file should hand the file path straight to Docling."""
+    path = tmp_path / "report.pdf"
+    path.write_bytes(b"%PDF-1.4\n")
+    parser.docling_available = True
+    result = MagicMock(spec=["document"])
+    result.document.export_to_markdown.return_value = "# Report"
+    parser.converter = MagicMock()
+    parser.converter.convert.return_value = result
+
+    result = parser.parse_file(str(path), "report.pdf", "application/pdf")
+
+    assert result == "# Report"
+    parser.converter.convert.assert_called_once_with(str(path))
+
+
+def test_parse_file_reuses_cached_result(parser: DocumentParser, tmp_path) -> None:
+    """Spec: Parsing an identical PDF again should be served from the parse cache."""
+    result = MagicMock(spec=["document"])
+    result.document.export_to_markdown.return_value = "# Report"
+    parser.docling_available = True
+    parser.converter = MagicMock()
+    parser.converter.convert.return_value = result
+
+    first = tmp_path / "first.pdf"
+    second = tmp_path / "copy.pdf"
+    first.write_bytes(b"%PDF-1.4 same bytes")
+    second.write_bytes(b"%PDF-1.4 same bytes")
+
+    assert parser.parse_file(str(first), "first.pdf", "application/pdf") == "# Report"
+    assert parser.parse_file(str(second), "copy.pdf", "application/pdf") == "# Report"
+    parser.converter.convert.assert_called_once()
+
+
+def test_docx_text_keeps_headings_and_tables_in_order(tmp_path) -> None:
+    """Spec: DOCX extraction should emit markdown headings and pipe tables in document order."""
+    docx = pytest.importorskip("docx")
+    document = docx.Document()
+    document.add_heading("Manual", 0)
+    document.add_heading("Setup", 1)
+    document.add_paragraph("Install it.")
+    table = document.add_table(rows=2, cols=2)
+    for (row, col), text in {(0, 0): "Part", (0, 1): "Qty", (1, 0): "Bolt", (1, 1): "4"}.items():
+        table.cell(row, col).text = text
+    document.add_paragraph("Then run it.")
+    path = tmp_path / "manual.docx"
+    document.save(str(path))
+
+    text = DocumentParser._docx_text(str(path))
+
+    assert text == (
+        "# Manual\n\n## Setup\n\nInstall it.\n\n"
+        "| Part | Qty |\n|---|---|\n| Bolt | 4 |\n\nThen run it."
+    )
@@ -7,11 +7,15 @@ from pathlib import Path
 import pytest
 
 import src.config
+from src.rag.chunking import DocumentChunker
 from src.rag.embeddings import EmbeddingService
+from src.rag.parent_store import ParentStore
 from src.rag.retriever import RAGRetriever
 from src.schemas.api import DocumentUpload
+from src.services.chunk_store import ChunkRefStore
 from src.services.document_service import DocumentService
 from src.services.document_storage import DocumentStorage
+from tests.fixtures.rag import HashEmbeddingService
 
 
 @pytest.fixture
@@ -153,3 +157,148 @@ def test_upload_document_empty_content(document_service: DocumentService) -> Non
     assert doc.id is not None
     # Empty content might result in 0 chunks
     assert doc.chunk_count >= 0
+
+
+def test_upload_document_indexes_in_windows(
+    temp_data_dir: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: Chunks should be embedded and inserted a window at a time."""
+    monkeypatch.setattr(src.config.settings, "chroma_path", str(Path(temp_data_dir) / "chroma"))
+    monkeypatch.setattr(src.config.settings, "chunk_stream_window", 4)
+    embedding_service = HashEmbeddingService(dimensions=16)
+    service = DocumentService(
+        chunker=DocumentChunker(chunk_size=40, chunk_overlap=0),
+        retriever=RAGRetriever(collection_name="test_windows", embedding_service=embedding_service),
+        storage=DocumentStorage(db_path=str(Path(temp_data_dir) / "documents.db")),
+        chunk_store=ChunkRefStore(db_path=str(Path(temp_data_dir) / "chunks.db")),
+    )
+    content = "\n\n".join(f"Section {i} of the streamed manual." for i in range(10))
+
+    doc_info = service.upload_document(DocumentUpload(filename="manual.txt", content=content))
+
+    assert doc_info.chunk_count == 10
+    assert [len(call) for call in embedding_service.calls] == [4, 4, 2]
+    assert service.retriever.collection.count() == 10
+    assert len(service.chunk_store.get_document(doc_info.id)) == 10
+
+
+def test_update_without_dedup_embeds_only_changed_chunks(
+    temp_data_dir: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: Under the default config, update_document should embed new text only."""
+    monkeypatch.setattr(src.config.settings, "chroma_path", str(Path(temp_data_dir) / "chroma"))
+    embedding_service = HashEmbeddingService(dimensions=16)
+    service = DocumentService(
+        chunker=DocumentChunker(chunk_size=40, chunk_overlap=0),
+        retriever=RAGRetriever(collection_name="test_update", embedding_service=embedding_service),
+        storage=DocumentStorage(db_path=str(Path(temp_data_dir) / "documents.db")),
+    )
+    assert service.chunk_store is None
+    sections = [f"Section {i} of the updated manual." for i in range(4)]
+    doc = service.upload_document(
+        DocumentUpload(filename="manual.txt", content="\n\n".join(sections))
+    )
+    embedding_service.calls.clear()
+
+    # Rewrite one section and drop the last one
+    sections[1] = "Section 1 was rewritten."
+    updated = service.update_document(
+        doc.id, DocumentUpload(filename="manual.txt", content="\n\n".join(sections[:3]))
+    )
+
+    assert updated.chunk_count == 3
+    assert embedding_service.calls == [["Section 1 was rewritten."]]
+    stored = service.retriever.collection.get(where={"source": doc.id})
+    assert sorted(stored["documents"]) == sorted(sections[:3])
+
+    # Inserting a section moves the following chunks to new ids without re-embedding them
+    embedding_service.calls.clear()
+    service.update_document(
+        doc.id,
+        DocumentUpload(filename="manual.txt", content="\n\n".join(["Preface."] + sections[:3])),
+    )
+
+    assert embedding_service.calls == [["Preface."]]
+    stored = service.retriever.collection.get(where={"source": doc.id})
+    assert sorted(stored["documents"]) == sorted(["Preface."] + sections[:3])
+
+
+@pytest.mark.parametrize("dedup", [True, False])
+def test_failed_window_leaves_nothing_behind(
+    temp_data_dir: str, monkeypatch: pytest.MonkeyPatch, dedup: bool
+) -> None:
+    """Spec: If a later window fails, chunks stored for earlier windows should be removed."""
+    monkeypatch.setattr(src.config.settings, "chroma_path", str(Path(temp_data_dir) / "chroma"))
+    monkeypatch.setattr(src.config.settings, "chunk_stream_window", 4)
+    embedding_service = HashEmbeddingService(dimensions=16)
+    service = DocumentService(
+        chunker=DocumentChunker(chunk_size=40, chunk_overlap=0),
+        retriever=RAGRetriever(collection_name="test_failed", embedding_service=embedding_service),
+        storage=DocumentStorage(db_path=str(Path(temp_data_dir) / "documents.db")),
+        chunk_store=ChunkRefStore(db_path=str(Path(temp_data_dir) / "chunks.db"))
+        if dedup
+        else None,
+    )
+    kept = service.upload_document(DocumentUpload(filename="kept.txt", content="Section 0 of it."))
+    content = "\n\n".join(f"Section {i} of the streamed manual." for i in range(10))
+
+    embed_batch = embedding_service.embed_batch
+    monkeypatch.setattr(
+        embedding_service,
+        "embed_batch",
+        lambda texts: embed_batch(texts) if len(embedding_service.calls) < 3 else 1 / 0,
+    )
+    with pytest.raises(ZeroDivisionError):
+        service.upload_document(DocumentUpload(filename="manual.txt", content=content))
+
+    assert [doc.id for doc in service.list_documents()] == [kept.id]
+    assert service.retriever.collection.count() == 1
+    if dedup:
+        assert service.chunk_store.refcounts(service.retriever.collection.get()["ids"]) == {
+            service.retriever.collection.get()["ids"][0]: 1
+        }
+
+
+def test_parent_child_retrieval_returns_parent_sections(
+    temp_data_dir: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: Small child chunks should be embedded and retrieval should return their parents."""
+    monkeypatch.setattr(src.config.settings, "chroma_path", str(Path(temp_data_dir) / "chroma"))
+    monkeypatch.setattr(src.config.settings, "parent_child_enabled", True)
+    monkeypatch.setattr(src.config.settings, "parent_chunk_size", 300)
+    monkeypatch.setattr(src.config.settings, "child_chunk_size", 60)
+    monkeypatch.setattr(src.config.settings, "child_chunk_overlap", 0)
+    monkeypatch.setattr(src.config.settings, "cache_enabled", False)
+    monkeypatch.setattr(src.config.settings, "query_expansion_enabled", False)
+    monkeypatch.setattr(src.config.settings, "rerank_enabled", False)
+    embedding_service = HashEmbeddingService(dimensions=256)
+    retriever = RAGRetriever(
+        collection_name="test_parent_child",
+        embedding_service=embedding_service,
+        parent_store=ParentStore(db_path=str(Path(temp_data_dir) / "parents.db")),
+    )
+    service = DocumentService(
+        retriever=retriever,
+        storage=DocumentStorage(db_path=str(Path(temp_data_dir) / "documents.db")),
+        chunk_store=ChunkRefStore(db_path=str(Path(temp_data_dir) / "chunks.db")),
+    )
+    sections = [
+        " ".join(f"topic{s} detail{s}x{i} filler text." for i in range(8)) for s in range(3)
+    ]
+
+    doc_info = service.upload_document(
+        DocumentUpload(filename="manual.txt", content="\n\n".join(sections))
+    )
+    result = retriever.retrieve(
+        "topic1 detail1x5", top_k=3, score_threshold=0.0, search_type="vector"
+    )
+
+    assert doc_info.chunk_count > 3  # Children, several per parent
+    assert retriever.collection.count() == doc_info.chunk_count
+    top = result.chunks[0]
+    assert top.content == sections[1]
+    assert top.chunk_id == f"{doc_info.id}_parent_1"
+    assert len({chunk.chunk_id for chunk in result.chunks}) == len(result.chunks)
+
+    service.delete_document(doc_info.id)
+    assert retriever.parent_store.get_parents([top.chunk_id]) == {}
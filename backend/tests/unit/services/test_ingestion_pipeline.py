@@ -0,0 +1,178 @@
+"""Test Specs for the staged batch ingestion pipeline."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+import src.config
+from src.rag.chunking import DocumentChunker
+from src.rag.parent_store import ParentStore
+from src.rag.retriever import RAGRetriever
+from src.schemas.api import DocumentUpload
+from src.services.chunk_store import ChunkRefStore
+from src.services.document_service import DocumentService
+from src.services.document_storage import DocumentStorage
+from src.services.ingestion_pipeline import IngestionPipeline
+from tests.fixtures.rag import HashEmbeddingService
+
+
+@pytest.fixture
+def embedding_service() -> HashEmbeddingService:
+    """Fixture: Deterministic embedding service recording each call."""
+    return HashEmbeddingService(dimensions=32)
+
+
+@pytest.fixture
+def document_service(embedding_service: HashEmbeddingService) -> DocumentService:
+    """Fixture: Document service on temporary storage."""
+    temp_dir = tempfile.mkdtemp()
+    original_chroma_path = src.config.settings.chroma_path
+    src.config.settings.chroma_path = str(Path(temp_dir) / "chroma")
+
+    retriever = RAGRetriever(collection_name="test_pipeline", embedding_service=embedding_service)
+    service = DocumentService(
+        chunker=DocumentChunker(chunk_size=50, chunk_overlap=0),
+        retriever=retriever,
+        storage=DocumentStorage(db_path=str(Path(temp_dir) / "documents.db")),
+        chunk_store=ChunkRefStore(db_path=str(Path(temp_dir) / "chunks.db")),
+    )
+
+    yield service
+
+    retriever.delete_collection()
+    src.config.settings.chroma_path = original_chroma_path
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def make_uploads(count: int) -> list[DocumentUpload]:
+    """Build small documents sharing a footer paragraph."""
+    return [
+        DocumentUpload(
+            filename=f"doc_{i}.txt",
+            content=f"Document {i} describes part number {i * 7}.\n\nShared support footer.",
+        )
+        for i in range(count)
+    ]
+
+
+def test_pipeline_ingests_all_documents(
+    document_service: DocumentService,
+    embedding_service: HashEmbeddingService,
+) -> None:
+    """Spec: run should store every document, embedding across documents in few calls."""
+    pipeline = IngestionPipeline(
+        document_service, parse_workers=3, embed_batch_size=64, flush_interval=0.2
+    )
+
+    documents, errors = pipeline.run(make_uploads(20))
+
+    assert errors == []
+    assert [doc.filename for doc in documents] == [f"doc_{i}.txt" for i in range(20)]
+    assert len(document_service.list_documents()) == 20
+    assert document_service.retriever.collection.count() == 21  # 20 bodies + 1 footer
+    assert len(embedding_service.calls) < 20
+    assert sum(len(call) for call in embedding_service.calls) == 21
+
+
+def test_pipeline_reports_failures_per_document(document_service: DocumentService) -> None:
+    """Spec: A document failing in one stage should not stop the rest of the batch."""
+    parse = document_service.parser.parse_document
+
+    def flaky_parse(content: str, filename: str, content_type: str, **kwargs) -> str:
+        if filename == "doc_3.txt":
+            raise ValueError("corrupt file")
+        return parse(content=content, filename=filename, content_type=content_type, **kwargs)
+
+    document_service.parser.parse_document = flaky_parse
+    pipeline = IngestionPipeline(document_service, parse_workers=2)
+
+    documents, errors = pipeline.run(make_uploads(5))
+
+    assert len(documents) == 4
+    assert errors == [{"filename": "doc_3.txt", "error": "corrupt file", "index": 3}]
+
+
+def test_failed_insert_leaves_no_dangling_refs(document_service: DocumentService) -> None:
+    """Spec: Documents reusing a chunk whose insert failed should store it themselves."""
+    retriever = document_service.retriever
+    add_documents = retriever.add_documents
+    failed: list[bool] = []
+
+    def flaky_add(chunks, **kwargs):
+        if not failed:
+            failed.append(True)
+            raise RuntimeError("vector store unavailable")
+        return add_documents(chunks, **kwargs)
+
+    retriever.add_documents = flaky_add
+    pipeline = IngestionPipeline(document_service, embed_batch_size=2, flush_interval=0.01)
+
+    documents, errors = pipeline.run(make_uploads(4))
+
+    assert len(documents) == 3
+    assert [error["error"] for error in errors] == ["vector store unavailable"]
+    for document in documents:
+        hashes = document_service.chunk_store.get_document(document.id)
+        assert len(hashes) == 2
+        assert retriever.existing_ids(hashes) == set(hashes)
+
+
+def test_failed_save_removes_inserted_chunks(document_service: DocumentService) -> None:
+    """Spec: If saving a document fails after its insert, its chunks should be removed."""
+    storage = document_service.storage
+    save = storage.save
+
+    def flaky_save(document):
+        if document.filename == "doc_0.txt":
+            raise RuntimeError("database is locked")
+        return save(document)
+
+    storage.save = flaky_save
+    pipeline = IngestionPipeline(document_service, embed_batch_size=1, flush_interval=0.01)
+
+    documents, errors = pipeline.run(make_uploads(3))
+
+    assert [error["error"] for error in errors] == ["database is locked"]
+    retriever = document_service.retriever
+    assert retriever.collection.count() == 3  # 2 bodies + 1 footer
+    assert not any("Document 0" in text for text in retriever.collection.get()["documents"])
+    for document in documents:
+        hashes = document_service.chunk_store.get_document(document.id)
+        assert retriever.existing_ids(hashes) == set(hashes)
+
+
+def test_failed_document_leaves_no_parent_sections(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, embedding_service: HashEmbeddingService
+) -> None:
+    """Spec: Parent sections of a document failing after chunking should be deleted."""
+    monkeypatch.setattr(src.config.settings, "chroma_path", str(tmp_path / "chroma"))
+    monkeypatch.setattr(src.config.settings, "parent_child_enabled", True)
+    monkeypatch.setattr(src.config.settings, "child_chunk_size", 40)
+    monkeypatch.setattr(src.config.settings, "child_chunk_overlap", 0)
+    retriever = RAGRetriever(
+        collection_name="test_pipeline_parents",
+        embedding_service=embedding_service,
+        parent_store=ParentStore(db_path=str(tmp_path / "parents.db")),
+    )
+    service = DocumentService(
+        retriever=retriever,
+        storage=DocumentStorage(db_path=str(tmp_path / "documents.db")),
+    )
+    embed_batch = embedding_service.embed_batch
+
+    def flaky_embed(texts: list[str]):
+        if any("Document 1" in text for text in texts):
+            raise RuntimeError("embedding service unavailable")
+        return embed_batch(texts)
+
+    monkeypatch.setattr(embedding_service, "embed_batch", flaky_embed)
+    pipeline = IngestionPipeline(service, embed_batch_size=1, flush_interval=0.01)
+
+    documents, errors = pipeline.run(make_uploads(3), doc_ids=["a", "b", "c"])
+
+    assert [error["index"] for error in errors] == [1]
+    assert retriever.parent_store.get_document("b") == []
+    assert [doc.id for doc in documents] == ["a", "c"]
+    assert all(retriever.parent_store.get_document(doc.id) for doc in documents)
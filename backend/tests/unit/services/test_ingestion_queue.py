@@ -0,0 +1,241 @@
+"""Test Specs for the ingestion job queue."""
+
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from src.schemas.api import DocumentInfo, DocumentUpload, IngestionJob
+from src.services.document_service import INGESTION_STAGES
+from src.services.ingestion_queue import IngestionJobStore, IngestionQueue
+
+
+class FakeDocumentService:
+    """Document service double reporting stages and failing on demand."""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.calls: list[str] = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def upload_document(
+        self,
+        upload: DocumentUpload,
+        doc_id: str | None = None,
+        on_stage: Callable[[str], None] | None = None,
+    ) -> DocumentInfo:
+        self.calls.append(doc_id)
+        for stage in INGESTION_STAGES[:2]:
+            on_stage(stage)
+        self.release.wait(5)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("embedding API unavailable")
+        return DocumentInfo(
+            id=doc_id,
+            filename=upload.filename,
+            content_type=upload.content_type,
+            uploaded_at=datetime.now(),
+            chunk_count=1,
+        )
+
+
+@pytest.fixture
+def store() -> IngestionJobStore:
+    """Fixture: Job store on a temporary database."""
+    temp_dir = tempfile.mkdtemp()
+    yield IngestionJobStore(db_path=str(Path(temp_dir) / "jobs.db"))
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def upload() -> DocumentUpload:
+    """Fixture: Sample document upload."""
+    return DocumentUpload(filename="manual.txt", content="Widget manual.")
+
+
+def wait_for(queue: IngestionQueue, job_id: str, status: str) -> IngestionJob:
+    """Poll a job until it reaches a status."""
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job.status == status:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job stayed {queue.get(job_id).status}")
+
+
+def test_submit_returns_queued_job(store: IngestionJobStore, upload: DocumentUpload) -> None:
+    """Spec: submit should return a queued job immediately."""
+    service = FakeDocumentService()
+    service.release.clear()
+    queue = IngestionQueue(service, store=store, workers=1)
+
+    job = queue.submit(upload)
+
+    assert job.status == "queued"
+    assert job.stages == dict.fromkeys(INGESTION_STAGES, "pending")
+    service.release.set()
+    queue.stop(timeout=5)
+
+
+def test_job_reports_stage_progress(store: IngestionJobStore, upload: DocumentUpload) -> None:
+    """Spec: A running job should expose completed, running and pending stages."""
+    service = FakeDocumentService()
+    service.release.clear()
+    queue = IngestionQueue(service, store=store, workers=1, poll_interval=0.01)
+
+    job = queue.submit(upload)
+    running = wait_for(queue, job.id, "running")
+    deadline = time.time() + 5
+    while running.stage != "chunking" and time.time() < deadline:
+        running = queue.get(job.id)
+
+    assert running.stages["parsing"] == "completed"
+    assert running.stages["chunking"] == "running"
+    assert running.stages["embedding"] == "pending"
+
+    service.release.set()
+    done = wait_for(queue, job.id, "completed")
+    assert done.document.id == job.doc_id
+    assert set(done.stages.values()) == {"completed"}
+    queue.stop(timeout=5)
+
+
+def test_failed_attempts_are_retried(store: IngestionJobStore, upload: DocumentUpload) -> None:
+    """Spec: A failing job should be retried with the same document id."""
+    service = FakeDocumentService(failures=1)
+    queue = IngestionQueue(
+        service, store=store, workers=2, retry_backoff_seconds=0.0, poll_interval=0.01
+    )
+
+    job = queue.submit(upload)
+    done = wait_for(queue, job.id, "completed")
+
+    assert done.attempts == 2
+    assert service.calls == [job.doc_id, job.doc_id]
+    queue.stop(timeout=5)
+
+
+def test_job_fails_after_max_attempts(store: IngestionJobStore, upload: DocumentUpload) -> None:
+    """Spec: A job should be marked failed once its attempts are used up."""
+    service = FakeDocumentService(failures=5)
+    queue = IngestionQueue(
+        service,
+        store=store,
+        workers=1,
+        max_attempts=2,
+        retry_backoff_seconds=0.0,
+        poll_interval=0.01,
+    )
+
+    job = queue.submit(upload)
+    failed = wait_for(queue, job.id, "failed")
+
+    assert failed.attempts == 2
+    assert "unavailable" in failed.error
+    queue.stop(timeout=5)
+
+
+def test_interrupted_jobs_resume(store: IngestionJobStore, upload: DocumentUpload) -> None:
+    """Spec: Jobs left running by a crashed process should be picked up again."""
+    job = store.create(upload, max_attempts=3)
+    store.claim_next("crashed", lease_seconds=0.0)  # Claimed by a process that then died
+    assert store.get(job.id).status == "running"
+
+    queue = IngestionQueue(FakeDocumentService(), store=store, workers=1, poll_interval=0.01)
+    queue.start()
+
+    assert wait_for(queue, job.id, "completed").attempts == 2
+    queue.stop(timeout=5)
+
+
+def test_jobs_of_live_queues_are_not_requeued(
+    store: IngestionJobStore, upload: DocumentUpload
+) -> None:
+    """Spec: Starting a queue should leave jobs leased by another live process alone."""
+    job = store.create(upload, max_attempts=3)
+    store.claim_next("other-process", lease_seconds=60.0)
+    service = FakeDocumentService()
+
+    queue = IngestionQueue(service, store=store, workers=1, poll_interval=0.01)
+    queue.start()
+    time.sleep(0.1)
+
+    assert store.get(job.id).status == "running"
+    assert service.calls == []
+    queue.stop(timeout=5)
+
+
+def test_long_jobs_keep_their_lease(store: IngestionJobStore, upload: DocumentUpload) -> None:
+    """Spec: A job running longer than the lease should not be requeued while it runs."""
+    service = FakeDocumentService()
+    service.release.clear()
+    queue = IngestionQueue(service, store=store, workers=2, poll_interval=0.01, lease_seconds=0.3)
+
+    job = queue.submit(upload)
+    wait_for(queue, job.id, "running")
+    time.sleep(0.8)
+    service.release.set()
+
+    assert wait_for(queue, job.id, "completed").attempts == 1
+    assert service.calls == [job.doc_id]
+    queue.stop(timeout=5)
+
+
+def test_worker_survives_store_errors(store: IngestionJobStore, upload: DocumentUpload) -> None:
+    """Spec: A job store error should pause a worker, not end it."""
+    claim_next = store.claim_next
+    errors = [sqlite3.OperationalError("database is locked")]
+
+    def flaky_claim(owner: str, lease_seconds: float):
+        if errors:
+            raise errors.pop()
+        return claim_next(owner, lease_seconds)
+
+    store.claim_next = flaky_claim
+    queue = IngestionQueue(FakeDocumentService(), store=store, workers=1, poll_interval=0.01)
+
+    job = queue.submit(upload)
+
+    assert wait_for(queue, job.id, "completed").attempts == 1
+    queue.stop(timeout=5)
+
+
+def test_tenant_jobs_use_tenant_service(store: IngestionJobStore, upload: DocumentUpload) -> None:
+    """Spec: A job submitted for a tenant should be ingested by that tenant's service."""
+    shared, tenant = FakeDocumentService(), FakeDocumentService()
+    queue = IngestionQueue(
+        shared,
+        store=store,
+        workers=1,
+        poll_interval=0.01,
+        document_service_for=lambda tenant_id: {"acme": tenant}[tenant_id],
+    )
+
+    job = queue.submit(upload, tenant_id="acme")
+    done = wait_for_tenant(queue, job.id, "acme")
+
+    assert tenant.calls == [done.doc_id]
+    assert shared.calls == []
+    assert queue.get(job.id) is None
+    assert queue.get(job.id, tenant_id="other") is None
+    queue.stop(timeout=5)
+
+
+def wait_for_tenant(queue: IngestionQueue, job_id: str, tenant_id: str) -> IngestionJob:
+    """Poll a tenant's job until it completes."""
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        job = queue.get(job_id, tenant_id=tenant_id)
+        if job.status == "completed":
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job stayed {queue.get(job_id, tenant_id=tenant_id).status}")
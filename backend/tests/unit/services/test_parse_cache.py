@@ -0,0 +1,48 @@
+"""Test Specs for the parse result cache."""
+
+import os
+
+import pytest
+
+from src.services.parse_cache import ParseCache, content_key, file_key
+
+
+@pytest.fixture
+def cache(tmp_path) -> ParseCache:
+    """Fixture: Parse cache on a temporary database."""
+    return ParseCache(db_path=str(tmp_path / "parse_cache.db"), max_bytes=10_000)
+
+
+def test_put_and_get(cache: ParseCache) -> None:
+    """Spec: get should return stored text for the same hash and parser version."""
+    cache.put("abc", "1", "Extracted text")
+
+    assert cache.get("abc", "1") == "Extracted text"
+    assert cache.get("abc", "2") is None
+    assert cache.get("def", "1") is None
+
+
+def test_file_key_matches_content_key(tmp_path) -> None:
+    """Spec: Hashing a file should equal hashing its bytes."""
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"%PDF-1.4" * 1000)
+
+    assert file_key(str(path)) == content_key(b"%PDF-1.4" * 1000)
+
+
+def test_evicts_least_recently_used(tmp_path) -> None:
+    """Spec: Going over the size limit should evict the least recently used entries."""
+
+    def incompressible(n: int) -> str:
+        return os.urandom(n).hex()  # ~n compressed bytes
+
+    cache = ParseCache(db_path=str(tmp_path / "parse_cache.db"), max_bytes=2_500)
+    cache.put("a", "1", incompressible(1000))
+    cache.put("b", "1", incompressible(1000))
+    cache.get("a", "1")  # a is now more recent than b
+    cache.put("c", "1", incompressible(1000))
+
+    assert cache.get("b", "1") is None
+    assert cache.get("a", "1") is not None
+    assert cache.get("c", "1") is not None
+    assert cache.stats()["bytes"] <= 2_500
@@ -0,0 +1,123 @@
+"""Test Specs for tenant namespaces."""
+
+from pathlib import Path
+
+import pytest
+
+import src.config
+from src.rag.chunking import DocumentChunker
+from src.rag.retriever import RAGRetriever
+from src.schemas.api import DocumentUpload
+from src.services.agent_service import AgentService
+from src.services.document_service import DocumentService
+from src.services.document_storage import DocumentStorage
+from src.services.ingestion_pipeline import IngestionPipeline
+from src.services.ingestion_queue import IngestionQueue
+from src.services.tenants import TenantRegistry, TenantServices
+from tests.fixtures.rag import HashEmbeddingService
+
+
+@pytest.fixture
+def registry(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> TenantRegistry:
+    """Fixture: Registry whose shared namespace lives in a temporary directory."""
+    monkeypatch.setattr(src.config.settings, "chroma_path", str(tmp_path / "chroma"))
+    monkeypatch.setattr(src.config.settings, "cache_enabled", False)
+    monkeypatch.setattr(src.config.settings, "query_expansion_enabled", False)
+    monkeypatch.setattr(src.config.settings, "rerank_enabled", False)
+    monkeypatch.setattr(src.config.settings, "tenants_enabled", True)
+    monkeypatch.setattr(src.config.settings, "tenant_allowlist", "*")
+    retriever = RAGRetriever(collection_name="documents", embedding_service=HashEmbeddingService())
+    document_service = DocumentService(
+        chunker=DocumentChunker(chunk_size=200, chunk_overlap=0),
+        retriever=retriever,
+        storage=DocumentStorage(db_path=str(tmp_path / "documents.db")),
+    )
+    return TenantRegistry(
+        TenantServices(
+            tenant_id=None,
+            retriever=retriever,
+            document_service=document_service,
+            agent_service=AgentService(retriever=retriever),
+            ingestion_queue=IngestionQueue(document_service),
+            ingestion_pipeline=IngestionPipeline(document_service),
+        ),
+        max_open=2,
+    )
+
+
+def test_tenants_are_isolated(registry: TenantRegistry) -> None:
+    """Spec: Each tenant should only see and search its own documents."""
+    acme = registry.get("acme")
+    globex = registry.get("globex")
+    acme.document_service.upload_document(
+        DocumentUpload(filename="acme.txt", content="Rocket skates ship in red boxes.")
+    )
+    globex_doc = globex.document_service.upload_document(
+        DocumentUpload(filename="globex.txt", content="Hammocks ship in green crates.")
+    )
+
+    assert [doc.filename for doc in acme.document_service.list_documents()] == ["acme.txt"]
+    assert [doc.filename for doc in globex.document_service.list_documents()] == ["globex.txt"]
+    assert registry.default.document_service.list_documents() == []
+    assert acme.retriever.collection.count() == 1
+    assert registry.default.retriever.collection.count() == 0
+
+    result = globex.retriever.retrieve("rocket skates ship", top_k=5, score_threshold=0.0)
+    assert [chunk.source for chunk in result.chunks] == [globex_doc.id]
+    assert acme.retriever.embedding_service is registry.default.retriever.embedding_service
+
+
+def test_registry_keeps_recently_used_tenants_open(registry: TenantRegistry) -> None:
+    """Spec: The least recently used tenant should be closed beyond the cache size."""
+    first = registry.get("a1")
+    registry.get("b2")
+    assert registry.get("a1") is first
+    registry.get("c3")
+
+    assert registry.open_tenants() == ["a1", "c3"]
+    assert registry.get(None) is registry.default
+    assert registry.get("default") is registry.default
+
+
+def test_evicted_tenant_is_closed(registry: TenantRegistry) -> None:
+    """Spec: A tenant falling out of the LRU should have its retriever closed."""
+    first = registry.get("a1")
+    first.retriever.metadata_index.build(first.retriever.collection)
+    closed: list[str | None] = []
+    close = first.retriever.close
+    first.retriever.close = lambda: (closed.append(first.tenant_id), close())
+
+    registry.get("b2")
+    registry.get("c3")
+
+    assert closed == ["a1"]
+    assert not first.retriever.metadata_index.built
+    assert registry.get("a1") is not first
+
+
+def test_registry_only_opens_allowed_tenants(
+    registry: TenantRegistry, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: Only tenants on the allowlist should get a namespace."""
+    monkeypatch.setattr(src.config.settings, "tenant_allowlist", "acme, globex")
+    assert registry.get("globex").tenant_id == "globex"
+    with pytest.raises(PermissionError):
+        registry.get("initech")
+
+    monkeypatch.setattr(src.config.settings, "tenant_allowlist", "")
+    with pytest.raises(PermissionError):
+        registry.get("acme")
+    assert registry.open_tenants() == ["globex"]
+
+
+def test_registry_rejects_invalid_tenant_ids(
+    registry: TenantRegistry, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: Tenant ids that cannot name a collection should be rejected."""
+    for tenant_id in ("", "-acme", "acme/../x", "a" * 64):
+        with pytest.raises(ValueError):
+            registry.get(tenant_id)
+
+    monkeypatch.setattr(src.config.settings, "tenants_enabled", False)
+    with pytest.raises(ValueError, match="disabled"):
+        registry.get("acme")
@@ -0,0 +1 @@
+"""Unit tests for command-line tools."""
@@ -0,0 +1,118 @@
+"""Test Specs for the bulk directory import tool."""
+
+from pathlib import Path
+
+import pytest
+
+import src.config
+from src.rag.chunking import DocumentChunker
+from src.rag.retriever import RAGRetriever
+from src.services.chunk_store import ChunkRefStore
+from src.services.document_service import DocumentService
+from src.services.document_storage import DocumentStorage
+from src.services.ingestion_pipeline import IngestionPipeline
+from src.tools.bulk_import import Checkpoint, bulk_import, document_id, find_files
+from tests.fixtures.rag import HashEmbeddingService
+
+
+@pytest.fixture
+def pipeline(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> IngestionPipeline:
+    """Fixture: Ingestion pipeline on temporary storage."""
+    monkeypatch.setattr(src.config.settings, "chroma_path", str(tmp_path / "data" / "chroma"))
+    retriever = RAGRetriever(
+        collection_name="test_bulk_import", embedding_service=HashEmbeddingService(dimensions=32)
+    )
+    service = DocumentService(
+        chunker=DocumentChunker(chunk_size=50, chunk_overlap=0),
+        retriever=retriever,
+        storage=DocumentStorage(db_path=str(tmp_path / "data" / "documents.db")),
+        chunk_store=ChunkRefStore(db_path=str(tmp_path / "data" / "chunks.db")),
+    )
+    yield IngestionPipeline(service, parse_workers=2)
+    retriever.delete_collection()
+
+
+def make_corpus(root: Path, count: int) -> None:
+    for i in range(count):
+        folder = root / f"part{i % 2}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"doc{i}.md").write_text(f"# Doc {i}\n\nPart number {i * 7} is in stock.")
+
+
+def test_find_files_skips_hidden_and_unknown_types(tmp_path: Path) -> None:
+    """Spec: find_files should list supported files in sorted order, skipping hidden ones."""
+    make_corpus(tmp_path, 3)
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "notes.txt").write_text("hidden")
+    (tmp_path / "image.png").write_bytes(b"\x89PNG")
+
+    files = find_files(tmp_path, {".md", ".txt"})
+
+    assert [p.relative_to(tmp_path).as_posix() for p in files] == [
+        "part0/doc0.md",
+        "part0/doc2.md",
+        "part1/doc1.md",
+    ]
+
+
+def test_bulk_import_resumes_from_checkpoint(tmp_path: Path, pipeline: IngestionPipeline) -> None:
+    """Spec: A second run should only import files the checkpoint does not list as done."""
+    corpus = tmp_path / "corpus"
+    make_corpus(corpus, 3)
+    checkpoint = Checkpoint(tmp_path / "checkpoint.jsonl")
+
+    first = bulk_import(corpus, pipeline, checkpoint, batch_size=2)
+    make_corpus(corpus, 5)  # Two new files
+    second = bulk_import(corpus, pipeline, checkpoint, batch_size=2)
+
+    assert (first["imported"], first["skipped"]) == (3, 0)
+    assert (second["imported"], second["skipped"]) == (2, 3)
+    assert second["chunks"] > 0 and second["chunks_per_second"] > 0
+    storage = pipeline.document_service.storage
+    assert len(storage.list_all()) == 5
+    doc = storage.get(document_id(corpus / "part0" / "doc4.md"))
+    assert doc is not None and doc.metadata["source_path"] == "part0/doc4.md"
+
+
+def test_failed_files_are_retried(tmp_path: Path, pipeline: IngestionPipeline) -> None:
+    """Spec: Files recorded as failed should be imported again on the next run."""
+    corpus = tmp_path / "corpus"
+    make_corpus(corpus, 2)
+    checkpoint = Checkpoint(tmp_path / "checkpoint.jsonl")
+    checkpoint.record([{"path": "part0/doc0.md", "error": "parser crashed"}])
+    checkpoint.record([{"path": "part1/doc1.md", "doc_id": "x", "chunks": 1}])
+
+    stats = bulk_import(corpus, pipeline, checkpoint)
+
+    assert (stats["imported"], stats["skipped"]) == (1, 1)
+    assert checkpoint.completed() == {"part0/doc0.md", "part1/doc1.md"}
+
+
+def test_reimport_replaces_changed_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Spec: Importing a shortened file again should leave none of its old chunks behind."""
+    monkeypatch.setattr(src.config.settings, "chroma_path", str(tmp_path / "data" / "chroma"))
+    retriever = RAGRetriever(
+        collection_name="test_reimport", embedding_service=HashEmbeddingService(dimensions=32)
+    )
+    service = DocumentService(
+        chunker=DocumentChunker(chunk_size=50, chunk_overlap=0),
+        retriever=retriever,
+        storage=DocumentStorage(db_path=str(tmp_path / "data" / "documents.db")),
+    )
+    pipeline = IngestionPipeline(service, parse_workers=1)
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    path = corpus / "manual.txt"
+    path.write_text("\n\n".join(f"Section {i} of the widget manual." for i in range(4)))
+    checkpoint = Checkpoint(tmp_path / "checkpoint.jsonl")
+
+    bulk_import(corpus, pipeline, checkpoint)
+    path.write_text("Section 0 of the rewritten manual.")
+    checkpoint.clear()
+    stats = bulk_import(corpus, pipeline, checkpoint)
+
+    assert stats["imported"] == 1
+    assert len(service.list_documents()) == 1
+    stored = retriever.collection.get(where={"source": document_id(path)})
+    assert stored["documents"] == ["Section 0 of the rewritten manual."]
+    retriever.delete_collection()
@@ -0,0 +1,75 @@
+"""Test Specs for the shard rebalancing tool."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import src.config
+from src.rag.retriever import RAGRetriever
+from src.rag.sharding import physical_collections, shard_index
+from src.schemas.rag import DocumentChunk
+from src.tools.rebalance_shards import rebalance
+from tests.fixtures.rag import HashEmbeddingService
+
+
+def open_retriever(shard_count: int, embedding_service: HashEmbeddingService) -> RAGRetriever:
+    """Retriever over the test database with the given shard count."""
+    src.config.settings.shard_count = shard_count
+    return RAGRetriever(collection_name="rebalance_test", embedding_service=embedding_service)
+
+
+@pytest.fixture
+def embedding_service(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> HashEmbeddingService:
+    """Fixture: Embedding service, with settings pointing at a temporary database."""
+    monkeypatch.setattr(src.config.settings, "chroma_path", str(tmp_path / "chroma"))
+    monkeypatch.setattr(src.config.settings, "shard_count", 1)
+    return HashEmbeddingService(dimensions=16)
+
+
+def assert_placed(retriever: RAGRetriever, total: int) -> None:
+    """Every chunk sits on the shard of its source."""
+    shards = physical_collections(retriever.collection)
+    assert retriever.collection.count() == total
+    for number, shard in enumerate(shards):
+        for metadata in shard.get(include=["metadatas"])["metadatas"]:
+            assert shard_index(metadata["source"], len(shards)) == number
+
+
+def test_rebalance_between_shard_counts(embedding_service: HashEmbeddingService) -> None:
+    """Spec: Rebalancing should move chunks with their vectors and drop old collections."""
+    retriever = open_retriever(1, embedding_service)
+    retriever.add_documents(
+        [
+            DocumentChunk(
+                content=f"document {doc} part {part}",
+                metadata={"source": f"doc-{doc}"},
+                chunk_id=f"doc-{doc}_chunk_{part}",
+            )
+            for doc in range(20)
+            for part in range(3)
+        ]
+    )
+    original = retriever.collection.get(include=["embeddings"])
+    vectors = dict(zip(original["ids"], original["embeddings"], strict=True))
+    embedding_service.calls.clear()
+
+    grown = open_retriever(4, embedding_service)
+    assert grown.collection.count() == 0
+    stats = rebalance(grown, batch_size=7)
+    assert stats == {**stats, "scanned": 60, "moved": 60, "dropped": 1}
+    assert_placed(grown, 60)
+
+    shrunk = open_retriever(3, embedding_service)
+    stats = rebalance(shrunk, batch_size=7)
+    assert stats["dropped"] == 1
+    assert stats["moved"] < stats["scanned"]
+    assert_placed(shrunk, 60)
+
+    assert embedding_service.calls == []
+    names = {collection.name for collection in shrunk.client.list_collections()}
+    assert names >= {f"rebalance_test_shard_{i}" for i in range(3)}
+    assert "rebalance_test" not in names and "rebalance_test_shard_3" not in names
+    moved = shrunk.collection.get(include=["embeddings"])
+    for chunk_id, vector in zip(moved["ids"], moved["embeddings"], strict=True):
+        np.testing.assert_allclose(vector, vectors[chunk_id], rtol=1e-6)
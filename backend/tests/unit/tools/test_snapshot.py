@@ -0,0 +1,127 @@
+"""Test Specs for collection snapshot export and import."""
+
+import functools
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import src.config
+from src.rag.chunking import DocumentChunker
+from src.rag.retriever import RAGRetriever
+from src.schemas.api import DocumentUpload
+from src.services.chunk_store import ChunkRefStore
+from src.services.document_service import DocumentService
+from src.services.document_storage import DocumentStorage
+from src.services.tenants import open_tenant_stores, tenant_collection_name
+from src.tools import snapshot as snapshot_tool
+from src.tools.snapshot import SnapshotReader, export_snapshot, import_snapshot
+from tests.fixtures.rag import HashEmbeddingService
+
+
+def make_service(data_dir: Path, embedding_service: HashEmbeddingService) -> DocumentService:
+    """Document service whose stores all live under data_dir."""
+    src.config.settings.chroma_path = str(data_dir / "chroma")
+    return DocumentService(
+        chunker=DocumentChunker(chunk_size=60, chunk_overlap=0),
+        retriever=RAGRetriever(
+            collection_name="snapshot_test", embedding_service=embedding_service
+        ),
+        storage=DocumentStorage(db_path=str(data_dir / "documents.db")),
+        chunk_store=ChunkRefStore(db_path=str(data_dir / "chunks.db")),
+    )
+
+
+@pytest.fixture
+def source(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> DocumentService:
+    """Fixture: Document service holding a few ingested documents."""
+    monkeypatch.setattr(src.config.settings, "chroma_path", src.config.settings.chroma_path)
+    service = make_service(tmp_path / "source", HashEmbeddingService(dimensions=24))
+    for i in range(3):
+        content = "\n\n".join(f"Document {i} paragraph {p} about part {i * p}." for p in range(6))
+        service.upload_document(DocumentUpload(filename=f"doc{i}.txt", content=content))
+    return service
+
+
+def test_snapshot_round_trip_without_embedding(source: DocumentService, tmp_path: Path) -> None:
+    """Spec: Importing a snapshot should restore chunks, vectors and documents with no embedding."""
+    snapshot = tmp_path / "index.kbsnap"
+    exported = export_snapshot(snapshot, source.retriever, source.storage, source.chunk_store)
+    embedding_service = HashEmbeddingService(dimensions=24)
+    replica = make_service(tmp_path / "replica", embedding_service)
+
+    imported = import_snapshot(snapshot, replica.retriever, replica.storage, replica.chunk_store)
+
+    assert imported["chunks"] == exported["chunks"] == source.retriever.collection.count()
+    assert imported["documents"] == 3
+    assert embedding_service.calls == []
+    original = source.retriever.collection.get(include=["embeddings", "documents", "metadatas"])
+    copied = replica.retriever.collection.get(
+        ids=original["ids"], include=["embeddings", "documents", "metadatas"]
+    )
+    order = [copied["ids"].index(chunk_id) for chunk_id in original["ids"]]
+    np.testing.assert_allclose(np.asarray(copied["embeddings"])[order], original["embeddings"])
+    assert [copied["documents"][i] for i in order] == original["documents"]
+    assert [copied["metadatas"][i] for i in order] == original["metadatas"]
+    for document in source.storage.list_all():
+        assert replica.storage.get(document.id) == document
+        assert replica.chunk_store.get_document(document.id) == source.chunk_store.get_document(
+            document.id
+        )
+
+
+def test_snapshot_vectors_are_memory_mapped(source: DocumentService, tmp_path: Path) -> None:
+    """Spec: The vectors section should map as an aligned float32 matrix."""
+    snapshot = tmp_path / "index.kbsnap"
+    export_snapshot(snapshot, source.retriever, source.storage)
+
+    reader = SnapshotReader(snapshot)
+    vectors = reader.vectors()
+
+    assert isinstance(vectors, np.memmap)
+    assert vectors.dtype == np.float32
+    assert vectors.shape == (source.retriever.collection.count(), 24)
+    assert reader.header["sections"]["vectors"]["offset"] % 64 == 0
+    assert len(list(reader.column("ids"))) == vectors.shape[0]
+
+
+def test_import_rejects_other_embedding_model(source: DocumentService, tmp_path: Path) -> None:
+    """Spec: A snapshot from another embedding space should not be imported without force."""
+    snapshot = tmp_path / "index.kbsnap"
+    export_snapshot(snapshot, source.retriever, source.storage)
+    replica = make_service(tmp_path / "replica", HashEmbeddingService(dimensions=16))
+
+    with pytest.raises(ValueError, match="force"):
+        import_snapshot(snapshot, replica.retriever, replica.storage)
+    assert replica.retriever.collection.count() == 0
+
+
+def test_cli_uses_tenant_namespace(
+    source: DocumentService, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Spec: --tenant should import into the tenant's collection and stores."""
+    snapshot = tmp_path / "index.kbsnap"
+    export_snapshot(snapshot, source.retriever, source.storage, source.chunk_store)
+    monkeypatch.setattr(src.config.settings, "chroma_path", str(tmp_path / "server" / "chroma"))
+    monkeypatch.setattr(src.config.settings, "chunk_dedup_enabled", True)
+    monkeypatch.setattr(src.config.settings, "embedding_migration_auto_start", False)
+    monkeypatch.setattr(
+        snapshot_tool,
+        "RAGRetriever",
+        functools.partial(RAGRetriever, embedding_service=HashEmbeddingService(dimensions=24)),
+    )
+
+    assert snapshot_tool.main(["import", str(snapshot), "--tenant", "acme"]) == 0
+
+    stores = open_tenant_stores("acme")
+    imported = stores.storage.list_all()
+    assert sorted(doc.id for doc in imported) == sorted(doc.id for doc in source.storage.list_all())
+    assert stores.chunk_store.get_document(imported[0].id)
+    tenant = RAGRetriever(
+        collection_name=tenant_collection_name("acme"),
+        embedding_service=HashEmbeddingService(dimensions=24),
+    )
+    assert tenant.collection.count() == source.retriever.collection.count()
+    assert not (tmp_path / "server" / "documents.db").exists()
+
+    assert snapshot_tool.main(["import", str(snapshot), "--tenant", "../x"]) == 1